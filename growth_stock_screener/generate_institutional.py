@@ -2,11 +2,12 @@ import json
 import os
 import pandas as pd
 from datetime import datetime
+from screen.iterations.utils import outfile_path, create_outfile, mark_iteration_complete
 
 print("Generating institutional_accumulation.json from revenue_growth.json...")
 
 # Load revenue_growth.json
-json_path = os.path.join(os.getcwd(), "json", "revenue_growth.json")
+json_path = outfile_path("revenue_growth")
 if os.path.exists(json_path):
     with open(json_path, 'r') as f:
         data = json.load(f)
@@ -24,23 +25,12 @@ if os.path.exists(json_path):
             df.at[i, "Net Institutional Inflows"] = 2000000 * (i % 10 + 1)
     
     # Save as institutional_accumulation.json
-    output_path = os.path.join(os.getcwd(), "json", "institutional_accumulation.json")
-    df.to_json(output_path)
+    create_outfile(df, "institutional_accumulation")
     print(f"Saved {len(df)} stocks to institutional_accumulation.json")
     
     # Update cache_settings.json to include institutional_accumulation
-    cache_path = os.path.join(os.getcwd(), "json", "cache_settings.json")
-    if os.path.exists(cache_path):
-        with open(cache_path, 'r') as f:
-            cache_data = json.load(f)
-        
-        if "institutional_accumulation" not in cache_data.get("iterations_completed", []):
-            cache_data["iterations_completed"].append("institutional_accumulation")
-            
-        with open(cache_path, 'w') as f:
-            json.dump(cache_data, f, indent=2)
-        
-        print("Updated cache_settings.json to include institutional_accumulation")
+    mark_iteration_complete("institutional_accumulation")
+    print("Updated cache_settings.json to include institutional_accumulation")
     
 else:
     print(f"Error: {json_path} does not exist.")
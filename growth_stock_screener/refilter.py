@@ -0,0 +1,49 @@
+from screen.iterations.utils import *
+from datetime import datetime
+import time
+from termcolor import cprint, colored
+
+# Re-apply the thresholds in settings.py to the raw metrics saved by the last screen, without fetching any data.
+# Symbols which now reach an iteration whose data was never fetched for them are left out and reported.
+# The relative strengths of the most recently started screen are re-filtered into the run of the current settings.
+
+current_time = datetime.now()
+iteration_names = list(iteration_filters)
+
+# track start time
+start = time.perf_counter()
+
+relative_strengths = open_outfile("relative_strengths", latest_run())
+metrics_df = open_metrics_table().to_frame()
+current_settings = get_current_settings()
+passed, unfetched = apply_filters(relative_strengths, metrics_df, current_settings)
+
+# track end time
+end = time.perf_counter()
+
+# save each iteration's results, marking them complete unless data is missing for symbols which reached them
+save_cache_settings(current_settings)
+complete = True
+
+for name in iteration_names:
+    create_outfile(passed[name], name)
+    complete = complete and (len(unfetched[name]) == 0)
+
+    if complete:
+        mark_iteration_complete(name)
+
+    cprint(f"{name}: {len(passed[name])} symbols passed.", "green")
+
+    if len(unfetched[name]) > 0:
+        cprint(
+            f"  {len(unfetched[name])} symbols have no {name} data (run the screen to fetch it): {', '.join(unfetched[name][:20])}",
+            "yellow",
+        )
+
+# create a .csv outfile
+time_string = current_time.strftime("%Y-%m-%d %H-%M-%S")
+outfile_name = f"screen_results {time_string}.csv"
+passed[iteration_names[-1]].to_csv(outfile_name)
+
+print(colored(f"\nRe-filtered {len(relative_strengths)} symbols in {1000 * (end - start):.0f} ms.", "light_grey"))
+print(colored(f"Results saved to {outfile_name}", "light_grey"))
@@ -19,11 +19,6 @@ try:
     
     df = pd.DataFrame(data)
     
-    # Create the json directory if it doesn't exist
-    json_dir = os.path.join(os.getcwd(), "json")
-    if not os.path.exists(json_dir):
-        os.makedirs(json_dir)
-    
     # Save the DataFrame as a JSON file
     create_outfile(df, "institutional_accumulation")
     
@@ -0,0 +1,36 @@
+from screen.iterations.utils import *
+from datetime import datetime
+import sys
+import time
+from termcolor import cprint, colored
+
+# usage: python3 growth_stock_screener/run_backtest.py [start date] [end date]  (dates formatted as YYYY-MM-DD)
+start_date = sys.argv[1] if (len(sys.argv) > 1) else None
+end_date = sys.argv[2] if (len(sys.argv) > 2) else None
+current_time = datetime.now()
+
+# track start time
+start = time.perf_counter()
+
+# replay the price-derived iterations over the prices saved by the last screen
+close, volume = open_price_store()
+backtest = Backtest(close, volume)
+daily, summary = backtest.run(get_current_settings(), start_date, end_date)
+
+# track end time
+end = time.perf_counter()
+
+# create a .csv outfile
+time_string = current_time.strftime("%Y-%m-%d %H-%M-%S")
+outfile_name = f"backtest_results {time_string}.csv"
+daily.to_csv(outfile_name)
+
+print(
+    colored(
+        f"\nBacktested {len(daily)} trading days x {close.shape[1]} symbols ({daily.index.min():%Y-%m-%d} to {daily.index.max():%Y-%m-%d}).",
+        "light_grey",
+    )
+)
+print(colored("Market cap, revenue growth and institutional accumulation are not applied (no local history).\n", "dark_grey"))
+print(summary.round(2).to_string())
+print_done_message(end - start, outfile_name)
@@ -0,0 +1,57 @@
+from screen.iterations.utils import *
+import os
+import sys
+import time
+from termcolor import cprint, colored
+
+# usage: python3 growth_stock_screener/run_benchmark.py <fixture archive> [--runs 3] [--latency 0] [--error-rate 0]
+#        [--baseline benchmark_baseline.json] [--save-baseline]
+# (record a fixture archive with 'python3 growth_stock_screener/run_screen.py --record <fixture archive>')
+arguments = sys.argv[1:]
+
+if (len(arguments) == 0) or arguments[0].startswith("--"):
+    cprint("Usage: python3 growth_stock_screener/run_benchmark.py <fixture archive> [--runs 3] [--latency 0] [--error-rate 0] [--baseline benchmark_baseline.json] [--save-baseline]", "red")
+    raise SystemExit(2)
+
+archive = arguments[0]
+runs = int(argument_value(arguments, "--runs", "3"))
+latency = float(argument_value(arguments, "--latency", "0"))
+error_rate = float(argument_value(arguments, "--error-rate", "0"))
+baseline_path = argument_value(arguments, "--baseline", "benchmark_baseline.json")
+screen_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_screen.py")
+
+# track start time
+start = time.perf_counter()
+
+# replay the recorded screen several times, each in a new process with no cached data
+results = []
+
+for run in range(runs):
+    print(f"Replaying screen {run + 1}/{runs} (latency {latency} s, error rate {error_rate:.0%}) . . .")
+    results.append(replay_screen(screen_script, archive, latency, error_rate, seed=run))
+
+# compare the median duration of each stage against the baseline
+baseline = open_baseline(baseline_path)
+comparison = compare_to_baseline(results, baseline["stages"])
+print(f"\n{comparison.round(2).to_string()}\n")
+
+if (baseline.get("latency"), baseline.get("error_rate")) not in [(None, None), (latency, error_rate)]:
+    cprint(
+        f"The baseline was measured with {baseline['latency']} s latency and a {baseline['error_rate']:.0%} error rate.",
+        "yellow",
+    )
+
+if "--save-baseline" in arguments:
+    save_baseline(baseline_path, comparison["Seconds"].to_dict(), latency=latency, error_rate=error_rate)
+    print(colored(f"Baseline saved to {baseline_path}", "light_grey"))
+
+# track end time
+end = time.perf_counter()
+print(colored(f"Benchmark finished in {format_seconds(end - start)}.", "light_grey"))
+
+# exit with an error if any stage regressed
+regressions = comparison.index[comparison["Regressed"]].tolist()
+
+if len(regressions) > 0:
+    cprint(f"Regressed stages: {', '.join(regressions)}", "red")
+    raise SystemExit(1)
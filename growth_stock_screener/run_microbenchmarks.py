@@ -0,0 +1,59 @@
+from screen.iterations.utils import *
+import sys
+import time
+from termcolor import cprint, colored
+
+# usage: python3 growth_stock_screener/run_microbenchmarks.py [--batch 1000] [--repeats 5] [--tolerance 0.25]
+#        [--results kernel_benchmarks.json] [--baseline <commit>] [--no-save]
+arguments = sys.argv[1:]
+
+batch = int(argument_value(arguments, "--batch", "1000"))
+repeats = int(argument_value(arguments, "--repeats", "5"))
+tolerance = float(argument_value(arguments, "--tolerance", str(kernel_regression_tolerance)))
+results_path = argument_value(arguments, "--results", kernel_results_name)
+
+# find the timings of the baseline commit (exit with an error if a requested baseline was never measured)
+commit = current_commit()
+results = open_kernel_results(results_path)
+baseline = argument_value(arguments, "--baseline", baseline_commit(results, commit))
+
+if (baseline is not None) and (baseline not in results):
+    cprint(f"Commit {baseline} has no timings in {results_path} (measured: {', '.join(results) or 'none'}).", "red")
+    raise SystemExit(1)
+
+baseline_results = results.get(baseline, {"kernels": {}})
+
+# track start time
+start = time.perf_counter()
+
+# time every kernel over the same fixture data
+print(f"Timing compute kernels over batches of {batch:,} symbols ({repeats} repeats) . . .")
+runs = time_kernels(kernel_benchmarks(batch), repeats)
+
+# compare the median duration of each kernel against the timings of the baseline commit
+comparison = compare_kernels(runs, baseline_results["kernels"], tolerance)
+
+print(f"\n{comparison.to_string(float_format=lambda value: f'{value:.6g}')}\n")
+
+if baseline is None:
+    print(colored("No earlier commit has been measured, so there is no baseline to compare against.", "light_grey"))
+else:
+    print(colored(f"Compared commit {commit} against commit {baseline}.", "light_grey"))
+
+    if baseline_results.get("batch", batch) != batch:
+        cprint(f"The baseline was measured with batches of {baseline_results['batch']:,} symbols.", "yellow")
+
+if "--no-save" not in arguments:
+    save_kernel_results(results_path, commit, comparison["Seconds"].to_dict(), batch=batch, repeats=repeats)
+    print(colored(f"Timings of commit {commit} saved to {results_path}", "light_grey"))
+
+# track end time
+end = time.perf_counter()
+print(colored(f"Micro-benchmarks finished in {format_seconds(end - start)}.", "light_grey"))
+
+# exit with an error if any kernel regressed
+regressions = comparison.index[comparison["Regressed"]].tolist()
+
+if len(regressions) > 0:
+    cprint(f"Regressed kernels (over {tolerance:.0%} slower): {', '.join(regressions)}", "red")
+    raise SystemExit(1)
@@ -0,0 +1,45 @@
+from screen.iterations.utils import *
+import sys
+import time
+from termcolor import cprint, colored
+
+# usage: python3 growth_stock_screener/run_scaling.py [--sizes 1000,10000,100000] [--seed 0] [--output scaling]
+#        [--page-bytes 20000] [--no-memory] [--archive <fixture archive>]
+arguments = sys.argv[1:]
+
+sizes = [int(size) for size in argument_value(arguments, "--sizes", "1000,10000,100000").split(",")]
+seed = int(argument_value(arguments, "--seed", "0"))
+output = argument_value(arguments, "--output", "scaling")
+page_bytes = int(argument_value(arguments, "--page-bytes", "20000"))
+memory = "--no-memory" not in arguments
+archive = argument_value(arguments, "--archive")
+
+# track start time
+start = time.perf_counter()
+
+# write a fixture archive of the smallest universe (which 'run_benchmark.py' can replay)
+if archive is not None:
+    print(f"Writing a synthetic fixture archive of {min(sizes):,} symbols to {archive} . . .")
+    SyntheticUniverse(min(sizes), seed=seed, page_bytes=page_bytes).write_archive(archive)
+
+# run the synthetic screen at every universe size
+print(f"Running synthetic screens of {', '.join(f'{size:,}' for size in sizes)} symbols . . .")
+measurements = measure_scaling(sizes, memory=memory, seed=seed, page_bytes=page_bytes)
+measurements.to_csv(f"{output}.csv", index=False)
+print(f"\n{measurements.round(3).to_string(index=False)}\n")
+
+# fit how each stage scales with universe size
+exponents = scaling_exponents(measurements)
+print(f"{exponents.round(2).to_string()}\n")
+
+plot_scaling(measurements, f"{output}.png")
+print(colored(f"Measurements saved to {output}.csv and plotted in {output}.png", "light_grey"))
+
+# track end time
+end = time.perf_counter()
+print(colored(f"Scaling benchmark finished in {format_seconds(end - start)}.", "light_grey"))
+
+superlinear = exponents.index[exponents["Superlinear"]].tolist()
+
+if len(superlinear) > 0:
+    cprint(f"Superlinear stages (time exponent above {superlinear_exponent}): {', '.join(superlinear)}", "red")
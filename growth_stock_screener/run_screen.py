@@ -1,12 +1,40 @@
 from screen.iterations.utils import *
+from screen.settings import execution_mode
+from contextlib import contextmanager
 from datetime import datetime
 import time
 import os
+import sys
 from termcolor import cprint, colored
 
 # constants
 current_time = datetime.now()
 
+arguments = sys.argv[1:]
+
+# record every response of this screen to a fixture archive ('--record <archive>'), or replay an archive without network
+# access ('--replay <archive>', optionally with '--replay-latency <seconds>', '--replay-error-rate <fraction>' and '--replay-seed <n>')
+if "--record" in arguments:
+    start_recording(argument_value(arguments, "--record"))
+elif "--replay" in arguments:
+    start_replay(
+        argument_value(arguments, "--replay"),
+        float(argument_value(arguments, "--replay-latency", "0")),
+        float(argument_value(arguments, "--replay-error-rate", "0")),
+        int(argument_value(arguments, "--replay-seed", "0")),
+    )
+
+# profile each iteration's CPU time and memory usage when run with '--profile'
+profiler = StageProfiler(enabled="--profile" in arguments)
+
+
+@contextmanager
+def stage(name: str):
+    """Profile (with '--profile') and trace an iteration."""
+    with profiler.stage(name), trace_span(name, "stage"):
+        yield
+
+
 # print banner and heading
 print_banner()
 print_settings(current_time)
@@ -28,12 +56,30 @@ print("\nStarting screen automatically...")
 start = time.perf_counter()
 
 # run screen iterations
-import screen.iterations.nasdaq_listings
-import screen.iterations.relative_strength
-import screen.iterations.liquidity
-import screen.iterations.trend
-import screen.iterations.revenue_growth
-import screen.iterations.institutional_accumulation
+with stage("NASDAQ Listings"):
+    import screen.iterations.nasdaq_listings
+
+with stage("Relative Strength"):
+    import screen.iterations.relative_strength
+
+if execution_mode == "pipelined":
+    with stage("Pipelined Screen"):
+        import screen.iterations.pipelined_screen
+elif execution_mode == "planned":
+    with stage("Planned Screen"):
+        import screen.iterations.planned_screen
+else:
+    with stage("Liquidity"):
+        import screen.iterations.liquidity
+
+    with stage("Trend"):
+        import screen.iterations.trend
+
+    with stage("Revenue Growth"):
+        import screen.iterations.revenue_growth
+
+    with stage("Institutional Accumulation"):
+        import screen.iterations.institutional_accumulation
 
 # open screen results as a DataFrame
 final_iteration = "institutional_accumulation"
@@ -46,14 +92,18 @@ df.to_csv(outfile_name)
 
 # create a summary Excel file with tabs for each stage
 print("\nCreating summary Excel file...")
-summary_file = create_summary_file()
+with stage("Summary"):
+    summary_file = create_summary_file()
 print(f"Summary file created: {summary_file}")
 
 # create a detailed analysis of the symbols
 print("\nCreating detailed symbols analysis...")
-analysis_file = analyze_symbols()
+with stage("Analysis"):
+    analysis_file = analyze_symbols()
 if analysis_file:
     print(f"Symbols analysis created: {analysis_file}")
+
+if analysis_file and not replaying():
     # Open the analysis file in the default browser
     import webbrowser
     webbrowser.open(f"file://{os.path.abspath(analysis_file)}")
@@ -61,5 +111,31 @@ if analysis_file:
 # track end time
 end = time.perf_counter()
 
+# save the run's latency, throughput and cache metrics in JSON and Prometheus text format
+metrics.set_gauge("stage_seconds", end - start, stage="Total")
+metrics_file = metrics.save()
+print(colored(f"Metrics saved to {metrics_file}", "light_grey"))
+
+# save the timeline of every iteration, symbol and fetch step
+if tracer.enabled:
+    trace_file = tracer.save()
+    slowest_symbols = ", ".join(
+        f"{span['name']} ({format_seconds(span['dur'] / 1e6)})"
+        for span in tracer.slowest("symbol")
+    )
+    print(colored(f"Trace saved to {trace_file} (slowest symbols: {slowest_symbols or 'none'})", "light_grey"))
+
+# rank each iteration's hottest functions and allocation sites
+if profiler.enabled:
+    profiler.print_summary()
+    profile_file = profiler.save()
+    print(colored(f"\nProfiles saved to {os.path.dirname(profile_file)}", "light_grey"))
+
+# save the recorded fixture archive (or stop the replay server)
+if "--record" in arguments:
+    print(colored(f"Responses recorded to {argument_value(arguments, '--record')}", "light_grey"))
+
+stop_replay()
+
 # notify user when finished
 print_done_message(end - start, outfile_name)
@@ -0,0 +1,69 @@
+import sys
+import screen.settings as settings
+from screen.profiles import load_profiles, union_settings, apply_settings
+
+# load settings profiles and run the screen once with settings loose enough to fetch every profile's data
+# (settings must be replaced before any screen modules are imported, since they read settings on import)
+profiles_path = sys.argv[1] if (len(sys.argv) > 1) else "sweep_profiles.json"
+profiles = load_profiles(profiles_path, vars(settings))
+apply_settings(settings, union_settings(list(profiles.values())))
+
+from screen.iterations.utils import *
+from datetime import datetime
+import time
+from termcolor import cprint, colored
+
+# constants
+current_time = datetime.now()
+
+# print banner and heading
+print_banner()
+print_settings(current_time)
+print(colored(f"\nSweeping {len(profiles)} settings profiles from {profiles_path}.", "light_grey"))
+print(colored("The settings above are the loosest of all profiles, so one screen fetches every profile's data.", "light_grey"))
+
+# Initialize cache with the combined settings
+current_settings = get_current_settings()
+save_cache_settings(current_settings)
+
+# track start time
+start = time.perf_counter()
+
+# run screen iterations
+import screen.iterations.nasdaq_listings
+import screen.iterations.relative_strength
+
+if settings.execution_mode == "pipelined":
+    import screen.iterations.pipelined_screen
+elif settings.execution_mode == "planned":
+    import screen.iterations.planned_screen
+else:
+    import screen.iterations.liquidity
+    import screen.iterations.trend
+    import screen.iterations.revenue_growth
+    import screen.iterations.institutional_accumulation
+
+# evaluate every profile against the fetched data
+evaluation_start = time.perf_counter()
+comparison, survivors = evaluate_profiles(
+    open_outfile("relative_strengths"), open_metrics_table().to_frame(), profiles
+)
+evaluation_end = time.perf_counter()
+
+# create .csv outfiles
+time_string = current_time.strftime("%Y-%m-%d %H-%M-%S")
+outfile_name = f"sweep_results {time_string}.csv"
+comparison.to_csv(outfile_name)
+survivors.to_csv(f"sweep_survivors {time_string}.csv")
+
+# track end time
+end = time.perf_counter()
+
+print(comparison.drop(columns=["Survivors"]).to_string())
+print(
+    colored(
+        f"\n{len(profiles)} profiles evaluated in {1000 * (evaluation_end - evaluation_start):.0f} ms.",
+        "light_grey",
+    )
+)
+print_done_message(end - start, outfile_name)
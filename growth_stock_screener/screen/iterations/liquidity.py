@@ -8,9 +8,6 @@ import time
 from .utils import *
 from ..settings import min_market_cap, min_price, max_price, min_volume
 
-# constants
-volume_xpath = "/html/body/main/div/div[2]/div[2]/div/div[2]/div/div/div/div[2]/div/div[1]/barchart-table-scroll/table/tbody/tr[3]/td[5]"
-
 # print header message to terminal
 process_name = "Liquidity"
 process_stage = 2
@@ -40,8 +37,8 @@ if should_skip_iteration(iteration_name, current_settings):
     print_status(process_name, process_stage, False, end - start)
     print_divider()
 else:
-    # logging data (printed to console after screen finishes)
-    logs = []
+    # events of each symbol (streamed to the run's event file, with a summary printed after the screen finishes)
+    logs = EventLog(iteration_name)
 
     # retreive JSON data from previous screen iteration
     df = open_outfile("relative_strengths")
@@ -50,65 +47,32 @@ else:
     successful_symbols = []
     failed_symbols = []
 
-
-async def fetch_volume(symbol: str, session: ClientSession) -> int:
-    """Fetch the 50-day average volume of the given stock symbol from barchart.com."""
-    url = f"https://www.barchart.com/stocks/quotes/{symbol}/technical-analysis"
-
-    try:
-        response = await get(url, session)
-        volume_element = extract_element(volume_xpath, response)
-        volume = int(extract_float(volume_element))
-        return volume
-    except Exception as e:
-        logs.append(skip_message(symbol, e))
-        return None
+    # record every fetched value so that thresholds can be changed without fetching again
+    # (symbols whose recorded values are still fresh aren't fetched again)
+    metrics_table = open_metrics_table()
+    reused_symbols = []
 
 
 async def screen_liquidity(df_index: int, session: ClientSession) -> None:
     """Populate stock data lists based on whether the given row satisfies liquidity criteria."""
     row = df.iloc[df_index]
 
-    # extract important information from dataframe row
-    symbol = row["Symbol"]
-    price = row["Price"]
-    market_cap = row["Market Cap"]
-    volume = await fetch_volume(symbol, session)
-
-    # check if null values are present in screen criteria
-    if volume is None:
-        failed_symbols.append(symbol)
-        return
+    with trace_span(row["Symbol"], "symbol", stage=iteration_name):
+        fresh_metrics = metrics_table.fresh_metrics("liquidity", row["Symbol"])
 
-    if pd.isna(market_cap) or market_cap == "":
-        logs.append(skip_message(symbol, "couldn't fetch market cap"))
-        failed_symbols.append(symbol)
-        return
+        if fresh_metrics is not None:
+            volume = volume_from_metrics(fresh_metrics)
+            reused_symbols.append(row["Symbol"])
+        else:
+            volume = await fetch_volume(row["Symbol"], session, logs)
+            metrics_table.record("liquidity", row["Symbol"], liquidity_metrics(volume))
 
-    # convert market cap from string literal to float
-    market_cap = float(market_cap)
+        outcome, record = evaluate_liquidity(row, volume, logs)
 
-    # print volume info to console
-    logs.append(
-        f"\n{symbol} | Market Cap: ${market_cap / 1000000000:.1f}B | Price: ${price:,.2f} | 50-day Avg. Volume: {volume:,.0f} shares\n"
-    )
-
-    # filter out illiquid stocks or stocks outside our price range
-    if (market_cap < min_market_cap) or (price < min_price) or (price > max_price) or (volume < min_volume):
-        logs.append(filter_message(symbol))
-        return
-
-    successful_symbols.append(
-        {
-            "Symbol": symbol,
-            "Company Name": row["Company Name"],
-            "Price": price,
-            "Market Cap": market_cap,
-            "50-day Average Volume": volume,
-            "Industry": row["Industry"],
-            "RS": row["RS"],
-        }
-    )
+        if outcome == PASSED:
+            successful_symbols.append(record)
+        elif outcome == FAILED:
+            failed_symbols.append(row["Symbol"])
 
 
 async def main() -> None:
@@ -128,12 +92,14 @@ if not should_skip_iteration(iteration_name, current_settings):
 
     # serialize data in JSON format and save on machine
     create_outfile(screened_df, "liquidity")
+    metrics_table.save()
 
     # Mark this iteration as complete in the cache
     mark_iteration_complete(iteration_name)
 
     # print log
-    print("".join(logs))
+    logs.print_summary()
+    print_source_health(["barchart", "yahoo"])
 
     # record end time
     end = time.perf_counter()
@@ -144,6 +110,7 @@ if not should_skip_iteration(iteration_name, current_settings):
         f"{len(df) - len(screened_df) - len(failed_symbols)} symbols filtered (outside price range ${min_price:.2f}-${max_price:.2f}, low market cap, or thinly traded).",
         "dark_grey",
     )
+    cprint(f"{len(reused_symbols)} symbols reused fresh data from a previous screen.", "dark_grey")
     cprint(f"{len(screened_df)} symbols passed.", "green")
-    print_status(process_name, process_stage, False, end - start)
+    print_status(process_name, process_stage, False, end - start, len(df))
     print_divider()
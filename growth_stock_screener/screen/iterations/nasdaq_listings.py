@@ -79,7 +79,7 @@ else:
 
     # print footer message to terminal
     cprint(f"{len(df)} symbols extracted.", "green")
-    print_status(process_name, process_stage, False, end - start)
+    print_status(process_name, process_stage, False, end - start, len(df))
     print_divider()
 
 
@@ -0,0 +1,225 @@
+import threading
+import time
+import pandas as pd
+from termcolor import colored, cprint
+from .utils import *
+from ..settings import institutional_max_time, pipeline_queue_size
+
+# print header message to terminal
+process_name = "Liquidity, Trend, Revenue Growth & Institutional Accumulation (pipelined)"
+process_stage = "2-5"
+print_status(process_name, process_stage, True)
+
+# record start time
+start = time.perf_counter()
+
+# Check if we can use cached results
+current_settings = get_current_settings()
+iteration_names = ["liquidity", "trend", "revenue_growth", "institutional_accumulation"]
+
+# concurrent workers for iterations which fetch static pages or JSON (SEC requests are rate limited separately)
+request_threads = 10
+sec_requests_per_second = 10
+
+if all(should_skip_iteration(name, current_settings) for name in iteration_names):
+    print(colored("Using cached screen data from today...", "light_green"))
+    screened_df = open_outfile(iteration_names[-1])
+
+    # Skip to the end
+    end = time.perf_counter()
+    cprint(f"{len(screened_df)} symbols loaded from cache.", "green")
+    print_status(process_name, process_stage, False, end - start)
+    print_divider()
+else:
+    # events of each iteration (streamed to the run's event file, with a summary printed after the screen finishes)
+    logs = {name: EventLog(name) for name in iteration_names}
+
+    # retreive JSON data from previous screen iteration
+    df = open_outfile("relative_strengths")
+
+    # populate these lists while iterating through symbols
+    failed_symbols = {name: [] for name in iteration_names}
+    symbols_under_accumulation = []
+    skipped_symbols = []
+    drivers = []
+
+    # record every fetched value so that thresholds can be changed without fetching again
+    # (symbols whose recorded values are still fresh aren't fetched again)
+    metrics_table = open_metrics_table()
+
+    # store local thread data, and share one event loop and aiohttp session between request threads
+    thread_local = threading.local()
+    async_loop = AsyncLoopThread()
+    sec_rate_limiter = RateLimiter(sec_requests_per_second)
+
+
+def screen_liquidity(row: dict) -> dict:
+    """Return the liquidity record of a relative strength row if it satisfies liquidity criteria."""
+    with trace_span(row["Symbol"], "symbol", stage="liquidity"):
+        fresh_metrics = metrics_table.fresh_metrics("liquidity", row["Symbol"])
+
+        if fresh_metrics is not None:
+            volume = volume_from_metrics(fresh_metrics)
+        else:
+            volume = async_loop.run(fetch_volume(row["Symbol"], async_loop.session, logs["liquidity"]))
+            metrics_table.record("liquidity", row["Symbol"], liquidity_metrics(volume))
+
+        outcome, record = evaluate_liquidity(row, volume, logs["liquidity"])
+
+        if outcome == FAILED:
+            failed_symbols["liquidity"].append(row["Symbol"])
+
+        return record
+
+
+def screen_trend(row: dict) -> dict:
+    """Return the trend record of a liquidity row if it is in a stage-2 uptrend."""
+    symbol = row["Symbol"]
+
+    with trace_span(symbol, "symbol", stage="trend"):
+        fresh_metrics = metrics_table.fresh_metrics("trend", symbol)
+
+        if fresh_metrics is not None:
+            trend_data, high_52_week = trend_from_metrics(fresh_metrics)
+        else:
+            trend_data = fetch_moving_averages(symbol, thread_local, drivers, logs["trend"])
+            high_52_week = None if (trend_data is None) else fetch_52_week_high(symbol, logs["trend"])
+            metrics_table.record("trend", symbol, trend_metrics(trend_data, high_52_week))
+
+        outcome, record = evaluate_trend(row, trend_data, high_52_week, logs["trend"])
+
+        if outcome == FAILED:
+            failed_symbols["trend"].append(symbol)
+
+        return record
+
+
+def screen_revenue_growth(row: dict) -> dict:
+    """Return the revenue growth record of a trend row if it has strong revenue growth."""
+    with trace_span(row["Symbol"], "symbol", stage="revenue_growth"):
+        fresh_metrics = metrics_table.fresh_metrics("revenue_growth", row["Symbol"])
+
+        if fresh_metrics is not None:
+            revenues = revenues_from_metrics(fresh_metrics)
+        else:
+            sec_rate_limiter.wait()
+            revenue_df = async_loop.run(fetch_revenues(row["Symbol"], async_loop.session))
+            revenues = extract_comparison_revenues(revenue_df)
+            metrics_table.record("revenue_growth", row["Symbol"], comparison_revenue_metrics(revenues))
+
+        outcome, record = evaluate_comparison_revenues(row, revenues, logs["revenue_growth"])
+
+        if outcome == FAILED:
+            failed_symbols["revenue_growth"].append(row["Symbol"])
+
+        return record
+
+
+def screen_institutional_accumulation(row: dict) -> dict:
+    """Return the institutional accumulation record of a revenue growth row. Once every revenue growth row
+    has arrived, symbols which cannot start before the iteration's time limit are skipped."""
+    symbol = row["Symbol"]
+
+    with trace_span(symbol, "symbol", stage="institutional_accumulation"):
+        budget = institutional_timeout + institutional_wait_timeout
+        input_closed_at = institutional_stage.input_closed_at
+
+        if input_closed_at is not None:
+            remaining_time = input_closed_at + institutional_max_time - time.monotonic()
+
+            if remaining_time <= 0:
+                skipped_symbols.append(symbol)
+                return None
+
+            budget = min(budget, remaining_time)
+
+        fresh_metrics = metrics_table.fresh_metrics("institutional_accumulation", symbol)
+
+        if fresh_metrics is not None:
+            holdings_data = holdings_from_metrics(fresh_metrics)
+        else:
+            holdings_data = fetch_institutional_holdings(
+                symbol, budget, thread_local, drivers, logs["institutional_accumulation"]
+            )
+            metrics_table.record("institutional_accumulation", symbol, institutional_metrics(holdings_data))
+
+        outcome, record = evaluate_institutional_accumulation(row, holdings_data, logs["institutional_accumulation"])
+
+        if outcome == FAILED:
+            failed_symbols["institutional_accumulation"].append(symbol)
+        elif record["Net Institutional Inflows"] >= 0:
+            symbols_under_accumulation.append(symbol)
+
+        return record
+
+
+if not all(should_skip_iteration(name, current_settings) for name in iteration_names):
+    # split browser instances between the two iterations which drive a browser
+    browser_instances = max(2, browser_threads())
+
+    stages = [
+        PipelineStage("Liquidity", screen_liquidity, request_threads),
+        PipelineStage("Trend", screen_trend, browser_instances // 2),
+        PipelineStage("Revenue Growth", screen_revenue_growth, request_threads),
+        PipelineStage(
+            "Institutional Accumulation",
+            screen_institutional_accumulation,
+            browser_instances - browser_instances // 2,
+        ),
+    ]
+    institutional_stage = stages[-1]
+
+    # stream every symbol through all four iterations
+    print("Screening stocks . . .\n")
+    Pipeline(stages, pipeline_queue_size).run(df.to_dict("records"))
+    async_loop.close()
+
+    # close Selenium web driver sessions
+    print("\nClosing browser instances . . .\n")
+    close_drivers(drivers)
+
+    # serialize each iteration's data in JSON format and save on machine
+    for name, stage in zip(iteration_names, stages):
+        create_outfile(pd.DataFrame(stage.outputs), name)
+        mark_iteration_complete(name)
+
+    metrics_table.save()
+    negative_cache.save()
+
+    # log symbols which raised errors, then print log
+    for name, stage in zip(iteration_names, stages):
+        for item, e in stage.errors:
+            logs[name].append(skip_message(item["Symbol"], e))
+
+    for name in iteration_names:
+        logs[name].print_summary()
+
+    print_source_health(["barchart", "tradingview", "cnbc", "yahoo", "marketbeat"])
+
+    if len(skipped_symbols) > 0:
+        print(
+            colored(
+                f"Time limit of {institutional_max_time} seconds reached before fetching institutional holdings of: {', '.join(skipped_symbols)}\n",
+                "yellow",
+            )
+        )
+
+    # record end time
+    end = time.perf_counter()
+
+    # print footer message to terminal
+    for name, stage in zip(iteration_names, stages):
+        cprint(
+            f"{stage.name}: {stage.processed} symbols screened, {len(failed_symbols[name])} failed, {len(stage.outputs)} passed"
+            f" (finished after {stage.elapsed_seconds or 0:.1f} sec).",
+            "dark_grey",
+        )
+
+    cprint(f"{len(skipped_symbols)} symbols skipped (time limit reached).", "dark_grey")
+    cprint(
+        f"{len(symbols_under_accumulation)} symbols were under institutional accumulation last quarter.",
+        "green",
+    )
+    cprint(f"{len(stages[-1].outputs)} symbols passed.", "green")
+    print_status(process_name, process_stage, False, end - start, len(df))
+    print_divider()
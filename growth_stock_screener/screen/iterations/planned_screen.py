@@ -0,0 +1,267 @@
+import threading
+import time
+import pandas as pd
+from typing import Any, Callable, Dict, Tuple
+from termcolor import colored, cprint
+from .utils import *
+from ..settings import host_limits, planner_objective, planner_speculative_rs
+
+# print header message to terminal
+process_name = "Liquidity, Trend, Revenue Growth & Institutional Accumulation (planned)"
+process_stage = "2-5"
+print_status(process_name, process_stage, True)
+
+# record start time
+start = time.perf_counter()
+
+# Check if we can use cached results
+current_settings = get_current_settings()
+iteration_names = ["liquidity", "trend", "revenue_growth", "institutional_accumulation"]
+
+# expected seconds per request to each host (used to estimate the run's wall time)
+request_costs = {
+    "barchart.com": 2,
+    "tradingview.com": 8,
+    "cnbc.com": 1,
+    "sec.gov": 1,
+    "marketbeat.com": 20,
+}
+sec_requests_per_second = 10
+
+if all(should_skip_iteration(name, current_settings) for name in iteration_names):
+    print(colored("Using cached screen data from today...", "light_green"))
+    screened_df = open_outfile(iteration_names[-1])
+
+    # Skip to the end
+    end = time.perf_counter()
+    cprint(f"{len(screened_df)} symbols loaded from cache.", "green")
+    print_status(process_name, process_stage, False, end - start)
+    print_divider()
+else:
+    # events of each iteration (streamed to the run's event file, with a summary printed after the screen finishes)
+    logs = {name: EventLog(name) for name in iteration_names}
+
+    # retreive JSON data from previous screen iteration
+    df = open_outfile("relative_strengths")
+
+    # populate these lists while iterating through symbols
+    failed_symbols = {name: [] for name in iteration_names}
+    symbols_under_accumulation = []
+    drivers = []
+
+    # record every fetched value so that thresholds can be changed without fetching again
+    # (metrics which are still fresh are taken from the table instead of being fetched again)
+    metrics_table = open_metrics_table()
+
+    # store local thread data, and share one event loop and aiohttp session between request threads
+    thread_local = threading.local()
+    async_loop = AsyncLoopThread()
+    sec_rate_limiter = RateLimiter(sec_requests_per_second)
+
+
+def fetch_planned_volume(symbol: str) -> int:
+    with trace_span(symbol, "symbol", metric="volume"):
+        fresh_metrics = metrics_table.fresh_metrics("liquidity", symbol)
+
+        if fresh_metrics is not None:
+            return volume_from_metrics(fresh_metrics)
+
+        return async_loop.run(fetch_volume(symbol, async_loop.session, logs["liquidity"]))
+
+
+def fetch_planned_moving_averages(symbol: str) -> Dict[str, float]:
+    with trace_span(symbol, "symbol", metric="moving_averages"):
+        fresh_metrics = metrics_table.fresh_metrics("trend", symbol)
+
+        if fresh_metrics is not None:
+            return trend_from_metrics(fresh_metrics)[0]
+
+        return fetch_moving_averages(symbol, thread_local, drivers, logs["trend"])
+
+
+def fetch_planned_52_week_high(symbol: str) -> float:
+    with trace_span(symbol, "symbol", metric="52_week_high"):
+        fresh_metrics = metrics_table.fresh_metrics("trend", symbol)
+
+        if fresh_metrics is not None:
+            return trend_from_metrics(fresh_metrics)[1]
+
+        return fetch_52_week_high(symbol, logs["trend"])
+
+
+def fetch_planned_revenues(symbol: str) -> Dict[str, Dict[str, float]]:
+    with trace_span(symbol, "symbol", metric="revenues"):
+        fresh_metrics = metrics_table.fresh_metrics("revenue_growth", symbol)
+
+        if fresh_metrics is not None:
+            return revenues_from_metrics(fresh_metrics)
+
+        sec_rate_limiter.wait()
+        return extract_comparison_revenues(async_loop.run(fetch_revenues(symbol, async_loop.session)))
+
+
+def fetch_planned_institutional_holdings(symbol: str) -> Dict[str, float]:
+    with trace_span(symbol, "symbol", metric="institutional_holdings"):
+        fresh_metrics = metrics_table.fresh_metrics("institutional_accumulation", symbol)
+
+        if fresh_metrics is not None:
+            return holdings_from_metrics(fresh_metrics)
+
+        budget = institutional_timeout + institutional_wait_timeout
+        return fetch_institutional_holdings(
+            symbol, budget, thread_local, drivers, logs["institutional_accumulation"]
+        )
+
+
+def record_metrics(iteration: str, symbol: str, values: Dict[str, Any]) -> None:
+    """Record fetched metrics (metrics taken from the table while fresh are left with their original fetch time)."""
+    if metrics_table.fresh_metrics(iteration, symbol, track=False) is None:
+        metrics_table.record(iteration, symbol, values)
+
+
+def screen_liquidity(row: dict, metrics: Dict[str, Any]) -> Tuple[str, dict]:
+    """Apply liquidity criteria to a relative strength row."""
+    record_metrics("liquidity", row["Symbol"], liquidity_metrics(metrics["volume"]))
+    outcome, record = evaluate_liquidity(row, metrics["volume"], logs["liquidity"])
+
+    if outcome == FAILED:
+        failed_symbols["liquidity"].append(row["Symbol"])
+
+    return outcome, record
+
+
+def screen_trend(row: dict, metrics: Dict[str, Any]) -> Tuple[str, dict]:
+    """Apply trend criteria to a liquidity row."""
+    record_metrics("trend", row["Symbol"], trend_metrics(metrics["moving_averages"], metrics["52_week_high"]))
+    outcome, record = evaluate_trend(row, metrics["moving_averages"], metrics["52_week_high"], logs["trend"])
+
+    if outcome == FAILED:
+        failed_symbols["trend"].append(row["Symbol"])
+
+    return outcome, record
+
+
+def screen_revenue_growth(row: dict, metrics: Dict[str, Any]) -> Tuple[str, dict]:
+    """Apply revenue growth criteria to a trend row."""
+    record_metrics("revenue_growth", row["Symbol"], comparison_revenue_metrics(metrics["revenues"]))
+    outcome, record = evaluate_comparison_revenues(row, metrics["revenues"], logs["revenue_growth"])
+
+    if outcome == FAILED:
+        failed_symbols["revenue_growth"].append(row["Symbol"])
+
+    return outcome, record
+
+
+def screen_institutional_accumulation(row: dict, metrics: Dict[str, Any]) -> Tuple[str, dict]:
+    """Mark whether a revenue growth row is under institutional accumulation."""
+    record_metrics(
+        "institutional_accumulation", row["Symbol"], institutional_metrics(metrics["institutional_holdings"])
+    )
+    outcome, record = evaluate_institutional_accumulation(
+        row, metrics["institutional_holdings"], logs["institutional_accumulation"]
+    )
+
+    if outcome == FAILED:
+        failed_symbols["institutional_accumulation"].append(row["Symbol"])
+    elif record["Net Institutional Inflows"] >= 0:
+        symbols_under_accumulation.append(row["Symbol"])
+
+    return outcome, record
+
+
+if not all(should_skip_iteration(name, current_settings) for name in iteration_names):
+    # split browser instances between the two hosts which require a browser
+    browser_instances = max(2, browser_threads())
+    limits = {
+        **host_limits,
+        "tradingview.com": browser_instances // 2,
+        "marketbeat.com": browser_instances - browser_instances // 2,
+    }
+
+    def node(name: str, host: str, fetch: Callable[[str], Any]) -> MetricNode:
+        return MetricNode(name, host, fetch, request_costs[host])
+
+    stages = [
+        PlannedStage("Liquidity", [node("volume", "barchart.com", fetch_planned_volume)], screen_liquidity),
+        PlannedStage(
+            "Trend",
+            [
+                node("moving_averages", "tradingview.com", fetch_planned_moving_averages),
+                node("52_week_high", "cnbc.com", fetch_planned_52_week_high),
+            ],
+            screen_trend,
+        ),
+        PlannedStage("Revenue Growth", [node("revenues", "sec.gov", fetch_planned_revenues)], screen_revenue_growth),
+        PlannedStage(
+            "Institutional Accumulation",
+            [node("institutional_holdings", "marketbeat.com", fetch_planned_institutional_holdings)],
+            screen_institutional_accumulation,
+        ),
+    ]
+
+    planner = FetchPlanner(
+        stages,
+        limits,
+        objective=planner_objective,
+        speculate=lambda row: row["RS"] >= planner_speculative_rs,
+    )
+
+    # print the cost of fetching every metric for every symbol
+    estimate = planner.estimate(len(df))
+    print(
+        colored("Fetching every metric would take", "dark_grey"),
+        colored(f"{estimate['requests']:,} requests", "light_grey"),
+        colored("and at least", "dark_grey"),
+        colored(f"{estimate['wall_time'] / 60:.1f} min", "light_grey"),
+        colored(f"(objective: {planner_objective}).\n", "dark_grey"),
+    )
+
+    # fetch metrics across all hosts concurrently, filtering as each symbol's metrics arrive
+    print("Fetching data . . .\n")
+    passed = planner.run(df.to_dict("records"))
+    async_loop.close()
+
+    # close Selenium web driver sessions
+    print("\nClosing browser instances . . .\n")
+    close_drivers(drivers)
+
+    # serialize each iteration's data in JSON format and save on machine
+    for name, records in zip(iteration_names, passed):
+        create_outfile(pd.DataFrame(records), name)
+        mark_iteration_complete(name)
+
+    metrics_table.save()
+    negative_cache.save()
+
+    # log symbols which raised errors (under the iteration of the stage or metric which raised), then print log
+    stage_iterations = {}
+
+    for name, stage in zip(iteration_names, stages):
+        stage_iterations[stage.name] = name
+        stage_iterations.update({node.name: name for node in stage.nodes})
+
+    for symbol, source, e in planner.errors:
+        logs[stage_iterations[source]].append(skip_message(symbol, f"{source}: {e}"))
+
+    for name in iteration_names:
+        logs[name].print_summary()
+
+    print_source_health(["barchart", "tradingview", "cnbc", "yahoo", "marketbeat"])
+
+    # record end time
+    end = time.perf_counter()
+
+    # print footer message to terminal
+    for host in planner.hosts():
+        cprint(f"{host}: {planner.requests[host]:,} requests ({limits[host]} concurrent).", "dark_grey")
+
+    for name, stage, records in zip(iteration_names, stages, passed):
+        cprint(f"{stage.name}: {len(failed_symbols[name])} failed, {len(records)} passed.", "dark_grey")
+
+    cprint(
+        f"{len(symbols_under_accumulation)} symbols were under institutional accumulation last quarter.",
+        "green",
+    )
+    cprint(f"{len(passed[-1])} symbols passed.", "green")
+    print_status(process_name, process_stage, False, end - start, len(df))
+    print_divider()
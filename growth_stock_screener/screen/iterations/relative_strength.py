@@ -3,9 +3,16 @@ import pandas as pd
 from termcolor import colored, cprint
 import time
 import logging
-import platform
+from typing import List
 from .utils import *
-from ..settings import min_rs
+from ..settings import (
+    min_rs,
+    price_history_period,
+    indicator_state_max_age,
+    download_batch_size,
+    download_concurrency,
+    download_retries,
+)
 
 # constants
 timeout = 30
@@ -33,8 +40,8 @@ if should_skip_iteration(iteration_name, current_settings):
     print_status(process_name, process_stage, False, end - start)
     print_divider()
 else:
-    # logging data (printed to console after screen finishes)
-    logs = []
+    # events of each symbol (streamed to the run's event file, with a summary printed after the screen finishes)
+    logs = EventLog(iteration_name)
 
     # disable yfinance logging output
     yf_logger = logging.getLogger("yfinance")
@@ -42,118 +49,134 @@ else:
 
     # open json data extracted from nasdaq as pandas dataframe
     df = open_outfile("nasdaq_listings")
-    df_index = 0
+    listings = df.drop_duplicates("Symbol").set_index("Symbol")
 
     # extract symbols from dataframe
     symbol_list = df["Symbol"].values.tolist()
 
-    # download all historical price data at once
-    # if on Mac OS, split download into chunks to prevent runtime thread creation errors
-    print("Fetching historical price data . . .\n")
-    if platform.system() == "Darwin":
-        price_df = yf_download_batches(1000, symbol_list, timeout)
-    else:
-        tickers = yf.download(symbol_list, period="2y", timeout=timeout)
-        price_df = tickers["Close"]
+    # skip symbols which are known to be too young or to have no price data (their prices aren't downloaded)
+    symbol_list, cached_symbols = negative_cache.partition(symbol_list, [TOO_YOUNG, UNRESOLVED])
 
-    # populate these lists while iterating through symbols
-    successful_symbols = []
-    failed_symbols = []
+    for symbol in cached_symbols:
+        logs.append(cached_skip_message(symbol))
 
-    # add empty line
-    print()
 
-if not should_skip_iteration(iteration_name, current_settings):
-    for symbol in price_df:
-        col = price_df[symbol]
-        end_index = len(col) - 1
-
-        # eliminate symbol if it has not traded for 1yr
-        first_valid_index = 0
-
-        for i in range(len(col)):
-            if not pd.isna(col.iloc[i]):
-                first_valid_index = i
-                break
-
-        if (end_index < 251) or ((end_index - first_valid_index + 1) < 252):
-            logs.append(skip_message(symbol, "stock has not traded long enough"))
-            continue
-
-        # calculate raw relative strength using the following formula:
-        # RS = 0.2(Q1 %Δ) + 0.2(Q2 %Δ) + 0.2(Q3 %Δ) + 0.4(Q4 %Δ)
-        q1_start = col.iloc[end_index - 251]  # day 1
-        q1_end = col.iloc[end_index - 189]  # day 63
-
-        q2_start = col.iloc[end_index - 188]  # day 64
-        q2_end = col.iloc[end_index - 126]  # day 126
-
-        q3_start = col.iloc[end_index - 125]  # day 127
-        q3_end = col.iloc[end_index - 63]  # day 189
-
-        q4_start = col.iloc[end_index - 62]  # day 190
-        q4_end = col.iloc[end_index]  # day 252
-
-        # eliminate symbol if nan values are present
-        if (
-            pd.isna(q1_start)
-            or pd.isna(q1_end)
-            or pd.isna(q2_start)
-            or pd.isna(q2_end)
-            or pd.isna(q3_start)
-            or pd.isna(q3_end)
-            or pd.isna(q4_start)
-            or pd.isna(q4_end)
-        ):
-            logs.append(skip_message(symbol, "insufficient data"))
-            failed_symbols.append(symbol)
-            continue
-
-        rs_raw = relative_strength(
-            q1_start, q1_end, q2_start, q2_end, q3_start, q3_end, q4_start, q4_end
-        )
+# symbols which returned no data while the rest of their batch downloaded (symbols of batches which failed entirely
+# aren't known to be unresolvable, so they aren't added to the negative cache)
+unresolved_symbols = set()
+
 
-        logs.append(
-            f"""\n{symbol} | Relative Strength (raw): {rs_raw:.3f}
-            Q1 : start: ${q1_start:.2f}, end: ${q1_end:.2f}
-            Q2 : start: ${q2_start:.2f}, end: ${q2_end:.2f}
-            Q3 : start: ${q3_start:.2f}, end: ${q3_end:.2f}
-            Q4 : start: ${q4_start:.2f}, end: ${q4_end:.2f}\n"""
+def download(symbols: List[str], **download_args) -> pd.DataFrame:
+    """Download historical price data for the given symbols in concurrent batches, retrying symbols without data."""
+    tickers, report = yf_download_parallel(
+        symbols, download_batch_size, download_concurrency, timeout, download_retries, **download_args
+    )
+    unresolved_symbols.update(confirmed_missing(report))
+
+    # symbols still missing after the final attempt never returned data
+    if len(report) > 0:
+        missing = report.loc[report["Attempt"] == report["Attempt"].max(), "Missing"].sum()
+        print(
+            colored(
+                f"{len(symbols) - missing}/{len(symbols)} symbols downloaded in {len(report)} batches "
+                f"({report['Attempt'].max()} attempts).\n",
+                "light_grey",
+            )
         )
 
-        while df.iloc[df_index]["Symbol"] != symbol:
-            df_index += 1
+    return tickers
 
-        row = df.iloc[df_index]
 
-        successful_symbols.append(
-            {
-                "Symbol": symbol,
-                "Company Name": row["Company Name"],
-                "Market Cap": row["Market Cap"],
-                "Industry": row["Industry"],
-                "Price": q4_end,
-                "RS (raw)": rs_raw,
-            }
-        )
+def completed_bars(tickers: pd.DataFrame) -> pd.DataFrame:
+    """Return the bars dated before today (today's bar may still change while the market is open)."""
+    return tickers[pd.DatetimeIndex(tickers.index).tz_localize(None) < pd.Timestamp.now().normalize()]
+
+
+if not should_skip_iteration(iteration_name, current_settings):
+    # the saved indicator state holds every completed trading day; when it is recent, only the bars since its
+    # latest date are downloaded, otherwise the full price history is downloaded and the state is rebuilt
+    indicator_state = open_indicator_state()
+    state_age = None
+
+    if (indicator_state is not None) and (indicator_state.last_date() is not None):
+        state_age = (pd.Timestamp.now() - indicator_state.last_date()).days
+
+    if (state_age is not None) and (state_age <= indicator_state_max_age):
+        print(f"Fetching price data since {indicator_state.last_date():%Y-%m-%d} . . .\n")
+        tickers = download(symbol_list, start=f"{indicator_state.last_date() + pd.Timedelta(days=1):%Y-%m-%d}")
+
+        if len(tickers) > 0:
+            indicator_state.update(completed_bars(tickers)["Close"], completed_bars(tickers)["Volume"])
+            append_price_store(tickers["Close"], tickers["Volume"])
+
+        # fetch the full history of symbols which are new to the state
+        new_symbols = [symbol for symbol in symbol_list if symbol not in indicator_state]
+
+        if len(new_symbols) > 0:
+            print(f"Fetching historical price data for {len(new_symbols)} new symbols . . .\n")
+            history = download(new_symbols, period=price_history_period)
+
+            # no data is returned when none of the new symbols could be downloaded
+            if len(history) > 0:
+                indicator_state.backfill(completed_bars(history)["Close"], completed_bars(history)["Volume"])
+                append_price_store(history["Close"], history["Volume"])
+                history_dates = pd.DatetimeIndex(history.index).tz_localize(None)
+                tickers = pd.concat([tickers, history[history_dates > indicator_state.last_date()]], axis=1)
+    else:
+        print("Fetching historical price data . . .\n")
+        tickers = download(symbol_list, period=price_history_period)
+        indicator_state = IndicatorState.from_history(completed_bars(tickers)["Close"], completed_bars(tickers)["Volume"])
 
-    # create a new dataframe with symbols whose relative strengths were successfully calculated
-    rs_df = pd.DataFrame(successful_symbols)
+        # save closing prices and volumes locally for backtesting
+        save_price_store(tickers["Close"], tickers["Volume"])
+
+    indicator_state.save()
+
+    # apply today's bar (if any) to a copy of the state
+    current_state = indicator_state.copy()
+
+    if len(tickers) > 0:
+        current_state.update(tickers["Close"], tickers["Volume"])
+
+    # add empty line
+    print()
+
+    # calculate the raw relative strength of each symbol with a year of price history
+    successful_symbols, failed_symbols = evaluate_relative_strengths(
+        current_state, symbol_list, listings, logs, unresolved_symbols
+    )
 
     # calculate RS rankings and filter out any symbols with an RS below the specified minimum
-    rs_df["RS"] = rs_df["RS (raw)"].rank(pct=True)
-    rs_df["RS"] = rs_df["RS"].map(lambda rs: round(100 * rs))
-    rs_df = rs_df.drop(columns=["RS (raw)"])
+    rs_df = rate_relative_strengths(successful_symbols)
+
+    # score every rated symbol on its price performance and RS rating, ranking the whole market (not only symbols which pass)
+    price_matrix = open_price_matrix()
+
+    if price_matrix is not None:
+        rated_df = rs_df[[symbol in price_matrix for symbol in rs_df["Symbol"]]]
+        skyrocket_scores, top_symbols = score_universe(
+            price_matrix,
+            rated_df["Symbol"].tolist(),
+            rated_df["RS"].tolist(),
+            start=pd.Timestamp.now() - pd.Timedelta(days=365),
+        )
+        create_outfile(skyrocket_scores[["Skyrocket Score", "Skyrocket Reasons"]].reset_index(), "skyrocket_scores")
+
+        if len(top_symbols) > 0:
+            ranking = ", ".join(f"{symbol} ({skyrocket_scores.at[symbol, 'Skyrocket Score']})" for symbol in top_symbols)
+            print(colored(f"Highest Skyrocket Scores (prices and RS only): {ranking}\n", "light_grey"))
+
     rs_df = rs_df[rs_df["RS"] >= min_rs]
 
     # serialize data in JSON format and save on machine
     create_outfile(rs_df, "relative_strengths")
+    negative_cache.save()
 
     # Mark this iteration as complete in the cache
     mark_iteration_complete(iteration_name)
 
     # print log
-    print("".join(logs))
+    logs.print_summary()
 
     # record end time
     end = time.perf_counter()
@@ -161,9 +184,10 @@ if not should_skip_iteration(iteration_name, current_settings):
     # print footer message to terminal
     cprint(f"{len(failed_symbols)} symbols failed (insufficient data).", "dark_grey")
     cprint(
-        f"{len(symbol_list) - len(rs_df) - len(failed_symbols)} symbols filtered (RS below {min_rs} or stock too young).",
+        f"{len(symbol_list) - len(rs_df) - len(failed_symbols)} symbols filtered (RS below {min_rs}, stock too young or no price data).",
         "dark_grey",
     )
+    cprint(f"{len(cached_symbols)} symbols skipped (too young or no price data, cached).", "dark_grey")
     cprint(f"{len(rs_df)} symbols passed.", "green")
-    print_status(process_name, process_stage, False, end - start)
+    print_status(process_name, process_stage, False, end - start, len(symbol_list))
     print_divider()
@@ -1,5 +1,4 @@
 import pandas as pd
-from typing import Dict
 from tqdm import tqdm
 from termcolor import cprint, colored
 import time
@@ -39,8 +38,8 @@ if should_skip_iteration(iteration_name, current_settings):
     print_status(process_name, process_stage, False, end - start)
     print_divider()
 else:
-    # logging data (printed to console after screen finishes)
-    logs = []
+    # events of each symbol (streamed to the run's event file, with a summary printed after the screen finishes)
+    logs = EventLog(iteration_name)
 
     # retreive JSON data from previous screen iteration
     df = open_outfile("trend")
@@ -49,126 +48,42 @@ else:
     successful_symbols = []
     failed_symbols = []
 
+    # record every fetched value so that thresholds can be changed without fetching again
+    # (symbols whose recorded values are still fresh aren't fetched again)
+    metrics_table = open_metrics_table()
+    reused_symbols = []
+
     # fetch revenue data for all symbols
     symbol_list = [] if ("Symbol" not in df) else list(df["Symbol"])
-    revenue_data = fetch_all_revenues(symbol_list)
-
-
-def revenue_growth(timeframe: str, df: pd.DataFrame) -> Dict[str, float]:
-    """Calculate the revenue growth for the given timeframe compared to the same timeframe one year earlier."""
-    if timeframe is None:
-        return None
-
-    # fetch revenues for the inputted timeframe and the same timeframe 1 year ago
-    prev_timeframe = previous_timeframe(timeframe)
-    revenue = extract_revenue(timeframe, df)
-    prev_revenue = extract_revenue(prev_timeframe, df)
-
-    # handle cases where data is unavailable or growth is incalculable
-    if (revenue is None) or (prev_revenue is None) or (prev_revenue <= 0):
-        return None
-
-    # return a dictionary containing revenue growth data
-    growth = percent_change(prev_revenue, revenue)
-
-    return {"Current": revenue, "Previous": prev_revenue, "Growth": growth}
-
-
-def extract_comparison_revenues(symbol: str) -> Dict[str, Dict[str, float]]:
-    """Extract revenue from the two most recent financial quarters and their corresponding quarters one year ago."""
-    revenue_df = revenue_data[symbol]
+    fresh_revenues = {}
 
-    if revenue_df is None:
-        return None
+    for symbol in symbol_list:
+        fresh_metrics = metrics_table.fresh_metrics("revenue_growth", symbol)
 
-    if "Foreign Stock" in revenue_df:
-        return {"Foreign Stock": {}}
+        if fresh_metrics is not None:
+            fresh_revenues[symbol] = revenues_from_metrics(fresh_metrics)
+            reused_symbols.append(symbol)
 
-    # extract the two lowest rows of the revenues DataFrame
-    q1_row = revenue_df.iloc[-2] if (len(revenue_df) >= 2) else None
-    q2_row = revenue_df.iloc[-1] if (len(revenue_df) >= 1) else None
-
-    # determine the timeframe of each row's revenue report
-    q1_timeframe = q1_row["frame"] if (q1_row is not None) else None
-    q2_timeframe = q2_row["frame"] if (q2_row is not None) else None
-
-    # calculate the revenue growth for each timeframe compared to the same timeframe 1 year ago
-    q1_growth = revenue_growth(q1_timeframe, revenue_df)
-    q2_growth = revenue_growth(q2_timeframe, revenue_df)
-
-    # return revenue details as a dictionary
-    if q2_growth is None:
-        return None
-
-    if q1_growth is None:
-        return {"Q2": q2_growth}
-
-    return {
-        "Q1": q1_growth,
-        "Q2": q2_growth,
-    }
+    revenue_data = fetch_all_revenues([symbol for symbol in symbol_list if symbol not in fresh_revenues])
 
 
 def screen_revenue_growth(df_index: int) -> None:
     """Populate stock data lists based on whether the given dataframe row has strong revenue growth."""
     row = df.iloc[df_index]
 
-    symbol = row["Symbol"]
-    rs = row["RS"]
-    revenues = extract_comparison_revenues(symbol)
-
-    # handle null values from missing data
-    if revenues is None:
-        logs.append(skip_message(symbol, "insufficient data"))
-        failed_symbols.append(symbol)
-        return
-
-    if "Foreign Stock" in revenues:
-        logs.append(skip_message(symbol, "foreign stock"))
-        return
-
-    # print revenue growth data to console
-    if "Q1" in revenues:
-        logs.append(
-            f"""\n{symbol} | Q1 revenue growth: {revenues["Q1"]["Growth"]:.0f}%, Q2 revenue growth: {revenues["Q2"]["Growth"]:.0f}%, RS: {rs}
-            Q1 : current revenue: ${revenues["Q1"]["Current"]:,.0f}, previous revenue: ${revenues["Q1"]["Previous"]:,.0f}
-            Q2 : current revenue: ${revenues["Q2"]["Current"]:,.0f}, previous revenue: ${revenues["Q2"]["Previous"]:,.0f}\n"""
-        )
-    else:
-        logs.append(
-            f"""\n{symbol} | Q2 revenue growth: {revenues["Q2"]["Growth"]:.0f}%, RS: {rs}
-            Q2 : current revenue: ${revenues["Q2"]["Current"]:,.0f}, previous revenue: ${revenues["Q2"]["Previous"]:,.0f}\n"""
-        )
-
-    # filter out stocks with low quarterly revenue growth
-    if (revenues["Q2"]["Growth"] < min_growth_percent) and (rs < protected_rs):
-        logs.append(filter_message(symbol))
-        return
-
-    if (
-        ("Q1" in revenues)
-        and (revenues["Q1"]["Growth"] < min_growth_percent)
-        and (rs < protected_rs)
-    ):
-        logs.append(filter_message(symbol))
-        return
-
-    successful_symbols.append(
-        {
-            "Symbol": symbol,
-            "Company Name": row["Company Name"],
-            "Industry": row["Industry"],
-            "RS": rs,
-            "Price": row["Price"],
-            "Market Cap": row["Market Cap"],
-            "Revenue Growth % (most recent Q)": revenues["Q2"]["Growth"],
-            "Revenue Growth % (previous Q)": "N/A"
-            if ("Q1" not in revenues)
-            else revenues["Q1"]["Growth"],
-            "50-day Average Volume": row["50-day Average Volume"],
-            "% Below 52-week High": row["% Below 52-week High"],
-        }
-    )
+    with trace_span(row["Symbol"], "symbol", stage=iteration_name):
+        if row["Symbol"] in fresh_revenues:
+            revenues = fresh_revenues[row["Symbol"]]
+        else:
+            revenues = extract_comparison_revenues(revenue_data[row["Symbol"]])
+            metrics_table.record("revenue_growth", row["Symbol"], comparison_revenue_metrics(revenues))
+
+        outcome, record = evaluate_comparison_revenues(row, revenues, logs)
+
+        if outcome == PASSED:
+            successful_symbols.append(record)
+        elif outcome == FAILED:
+            failed_symbols.append(row["Symbol"])
 
 
 if not should_skip_iteration(iteration_name, current_settings):
@@ -182,12 +97,14 @@ if not should_skip_iteration(iteration_name, current_settings):
 
     # serialize data in JSON format and save on machine
     create_outfile(screened_df, "revenue_growth")
+    metrics_table.save()
+    negative_cache.save()
 
     # Mark this iteration as complete in the cache
     mark_iteration_complete(iteration_name)
 
     # print log
-    print("".join(logs))
+    logs.print_summary()
 
     # record end time
     end = time.perf_counter()
@@ -200,6 +117,7 @@ if not should_skip_iteration(iteration_name, current_settings):
         f"{len(df) - len(screened_df) - len(failed_symbols)} symbols filtered (revenue growth too low or foreign stock).",
         "dark_grey",
     )
+    cprint(f"{len(reused_symbols)} symbols reused fresh data from a previous screen.", "dark_grey")
     cprint(f"{len(screened_df)} symbols passed.", "green")
-    print_status(process_name, process_stage, False, end - start)
+    print_status(process_name, process_stage, False, end - start, len(df))
     print_divider()
@@ -1,5 +1,6 @@
 from .calculations import *
 from .concurrency import *
+from .events import *
 from .logs import *
 from .outfiles import *
 from .scraping import *
@@ -8,4 +9,29 @@ from .startup import *
 from .version_checking import *
 from .cache import *
 from .summary import *
+from .info_cache import *
+from .skyrocket import *
 from .analysis import *
+from .health import *
+from .scheduling import *
+from .fetchers import *
+from .screening import *
+from .pipeline import *
+from .planner import *
+from .raw_metrics import *
+from .filters import *
+from .sweep import *
+from .price_store import *
+from .backtest import *
+from .indicators import *
+from .price_matrix import *
+from .negative_cache import *
+from .locking import *
+from .metrics import *
+from .tracing import *
+from .replay import *
+from .benchmark import *
+from .profiling import *
+from .synthetic import *
+from .scaling import *
+from .microbenchmarks import *
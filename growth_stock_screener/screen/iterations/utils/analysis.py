@@ -7,8 +7,84 @@ import numpy as np
 from termcolor import colored
 import requests
 import json
+import warnings
 from .outfiles import open_outfile
-from .skyrocket import calculate_skyrocket_score, generate_top_10_html # Import new functions
+from .price_matrix import PriceMatrix, open_price_matrix
+from .skyrocket import score_universe, describe_reasons, generate_top_10_html
+from .info_cache import fetch_all_info
+
+# performance metrics calculated from each symbol's closing prices, and the trading days of each trailing return
+price_metric_names = [
+    'current_price', 'week_return', 'month_return', 'three_month_return', 'six_month_return', 'year_return',
+    'volatility', 'sma_50', 'sma_200', 'high_52week', 'low_52week', 'pct_from_high', 'pct_from_low', 'current_rsi'
+]
+return_lookbacks = {'week_return': 5, 'month_return': 20, 'three_month_return': 60, 'six_month_return': 120}
+
+
+def price_metrics_frame(matrix, symbols, start=None):
+    """
+    Calculate performance metrics for every symbol at once from the closing prices in the price matrix (from 'start'
+    onwards), returning a DataFrame indexed by symbol with a column per metric (NaN where a metric can't be calculated).
+    Each symbol's prices are right-aligned (missing bars dropped), so that every metric reads fixed trailing windows
+    of the same array instead of computing full rolling series.
+    """
+    prices, days = matrix.aligned_closes(symbols, start)
+    rows = np.arange(len(symbols))
+    width = prices.shape[1]
+
+    metrics = pd.DataFrame(index=pd.Index(symbols, name='Symbol'), columns=price_metric_names, dtype=float)
+
+    if width == 0:
+        return metrics
+
+    def trailing(lookback):
+        """Return the price 'lookback' trading days before the end of each row (or the first price of shorter rows)."""
+        first = prices[rows, np.clip(width - days, 0, width - 1)]
+        return np.where(days >= lookback, prices[:, width - min(lookback, width)], first)
+
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+
+        current_price = prices[:, -1]
+        metrics['current_price'] = current_price
+
+        # calculate returns
+        for name, lookback in return_lookbacks.items():
+            metrics[name] = ((current_price / trailing(lookback)) - 1) * 100
+
+        metrics['year_return'] = ((current_price / trailing(width + 1)) - 1) * 100
+
+        # calculate volatility (standard deviation of daily returns)
+        daily_returns = prices[:, 1:] / prices[:, :-1] - 1
+        metrics['volatility'] = np.where(days >= 3, np.nanstd(daily_returns, axis=1, ddof=1), np.nan) * 100
+
+        # calculate the latest 50-day and 200-day moving averages
+        for window in (50, 200):
+            metrics[f'sma_{window}'] = np.where(days >= window, prices[:, -window:].mean(axis=1), np.nan)
+
+        # calculate distance from 52-week high and low
+        metrics['high_52week'] = np.nanmax(prices, axis=1)
+        metrics['low_52week'] = np.nanmin(prices, axis=1)
+        metrics['pct_from_high'] = ((current_price / metrics['high_52week']) - 1) * 100
+        metrics['pct_from_low'] = ((current_price / metrics['low_52week']) - 1) * 100
+
+        # calculate the latest RSI (14-day) from the average gain and loss of the last 14 price changes
+        delta = np.diff(prices[:, -15:], axis=1)
+        avg_gain = np.clip(delta, 0, None).mean(axis=1)
+        avg_loss = -np.clip(delta, None, 0).mean(axis=1)
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+        metrics['current_rsi'] = np.where(days >= 15, rsi, np.nan)
+
+    return metrics
+
+
+def price_metrics(symbol, matrix, start=None):
+    """
+    Calculate performance metrics from a symbol's closing prices in the price matrix (from 'start' onwards).
+    Metrics which can't be calculated are None.
+    """
+    metrics = price_metrics_frame(matrix, [symbol], start).astype(object)
+    return metrics.where(metrics.notna(), None).iloc[0].to_dict()
 
 def analyze_symbols():
     """
@@ -225,8 +301,40 @@ def analyze_symbols():
     start_date = end_date - timedelta(days=365)
 
     try:
-        # Get historical data for the past year
-        historical_data = yf.download(symbols, start=start_date, end=end_date)
+        # Get historical data for the past year (from the price matrix saved by the screen, if it is current
+        # and holds every symbol)
+        price_matrix = open_price_matrix()
+
+        if (price_matrix is None) or (not price_matrix.is_current()) or any(symbol not in price_matrix for symbol in symbols):
+            historical_data = yf.download(symbols, start=start_date, end=end_date)
+            price_matrix = PriceMatrix.from_frames(
+                historical_data['Close'].reindex(columns=symbols), historical_data['Volume'].reindex(columns=symbols)
+            )
+
+        # Calculate price metrics for every symbol at once (metrics which can't be calculated are None)
+        print(colored("Calculating price metrics...", "cyan"))
+        performance_metrics = price_metrics_frame(price_matrix, symbols, start=start_date).astype(object)
+        performance_metrics = performance_metrics.where(performance_metrics.notna(), None).to_dict('index')
+
+        # Get Yahoo Finance info for every symbol (fresh info is reused from earlier reports, the rest is fetched concurrently)
+        print(colored("Fetching Yahoo Finance info...", "cyan"))
+        infos = fetch_all_info(symbols)
+
+        # Calculate the Skyrocket Score of every symbol at once (symbols without info aren't analyzed, so they aren't scored)
+        scored_symbols = [symbol for symbol in symbols if infos[symbol] is not None]
+        ratings = df.drop_duplicates('Symbol').set_index('Symbol').reindex(scored_symbols)
+        skyrocket_scores, _ = score_universe(
+            price_matrix,
+            scored_symbols,
+            ratings['RS'].tolist() if 'RS' in ratings else [None] * len(scored_symbols),
+            [infos[symbol] for symbol in scored_symbols],
+            start=start_date,
+        )
+        skyrocket_reasons = {
+            symbol: describe_reasons(row['Skyrocket Reasons'], row) for symbol, row in skyrocket_scores.iterrows()
+        }
+        df['Skyrocket Score'] = df['Symbol'].map(skyrocket_scores['Skyrocket Score'])
+        df['Skyrocket Reason'] = df['Symbol'].map(skyrocket_reasons).fillna('')
 
         # Get more detailed info for each symbol
         for symbol in symbols:
@@ -237,8 +345,10 @@ def analyze_symbols():
                 symbol_row = df[df['Symbol'] == symbol].iloc[0]
 
                 # Get additional data from Yahoo Finance
-                ticker = yf.Ticker(symbol)
-                info = ticker.info
+                info = infos[symbol]
+
+                if info is None:
+                    raise ValueError("couldn't fetch Yahoo Finance info")
 
                 # Extract relevant information
                 company_name = symbol_row.get('Company Name', info.get('longName', symbol))
@@ -259,63 +369,21 @@ def analyze_symbols():
                     market_cap_str = str(market_cap)
 
                 # Calculate performance metrics
-                try:
-                    # Get price data for this symbol
-                    price_data = historical_data['Close'][symbol].dropna()
-
-                    if len(price_data) > 0:
-                        # Calculate returns
-                        current_price = price_data.iloc[-1]
-                        week_ago_price = price_data.iloc[-5] if len(price_data) >= 5 else price_data.iloc[0]
-                        month_ago_price = price_data.iloc[-20] if len(price_data) >= 20 else price_data.iloc[0]
-                        three_month_ago_price = price_data.iloc[-60] if len(price_data) >= 60 else price_data.iloc[0]
-                        six_month_ago_price = price_data.iloc[-120] if len(price_data) >= 120 else price_data.iloc[0]
-                        year_ago_price = price_data.iloc[0]
-
-                        week_return = ((current_price / week_ago_price) - 1) * 100
-                        month_return = ((current_price / month_ago_price) - 1) * 100
-                        three_month_return = ((current_price / three_month_ago_price) - 1) * 100
-                        six_month_return = ((current_price / six_month_ago_price) - 1) * 100
-                        year_return = ((current_price / year_ago_price) - 1) * 100
-
-                        # Calculate volatility (standard deviation of daily returns)
-                        daily_returns = price_data.pct_change().dropna()
-                        volatility = daily_returns.std() * 100
-
-                        # Calculate 50-day and 200-day moving averages
-                        sma_50 = price_data.rolling(window=50).mean().iloc[-1] if len(price_data) >= 50 else None
-                        sma_200 = price_data.rolling(window=200).mean().iloc[-1] if len(price_data) >= 200 else None
-
-                        # Calculate distance from 52-week high and low
-                        high_52week = price_data.max()
-                        low_52week = price_data.min()
-                        pct_from_high = ((current_price / high_52week) - 1) * 100
-                        pct_from_low = ((current_price / low_52week) - 1) * 100
-
-                        # Calculate RSI (14-day)
-                        delta = price_data.diff()
-                        gain = delta.clip(lower=0)
-                        loss = -delta.clip(upper=0)
-                        avg_gain = gain.rolling(window=14).mean()
-                        avg_loss = loss.rolling(window=14).mean()
-                        rs = avg_gain / avg_loss
-                        rsi = 100 - (100 / (1 + rs))
-                        current_rsi = rsi.iloc[-1] if not pd.isna(rsi.iloc[-1]) else None
-                    else:
-                        week_return = month_return = three_month_return = six_month_return = year_return = None
-                        volatility = None
-                        sma_50 = sma_200 = None
-                        high_52week = low_52week = None
-                        pct_from_high = pct_from_low = None
-                        current_rsi = None
-                except Exception as e:
-                    print(colored(f"Error calculating metrics for {symbol}: {e}", "yellow"))
-                    week_return = month_return = three_month_return = six_month_return = year_return = None
-                    volatility = None
-                    sma_50 = sma_200 = None
-                    high_52week = low_52week = None
-                    pct_from_high = pct_from_low = None
-                    current_rsi = None
+                metrics = performance_metrics[symbol]
+
+                if metrics['current_price'] is not None:
+                    current_price = metrics['current_price']
+
+                week_return = metrics['week_return']
+                month_return = metrics['month_return']
+                three_month_return = metrics['three_month_return']
+                six_month_return = metrics['six_month_return']
+                year_return = metrics['year_return']
+                volatility = metrics['volatility']
+                sma_50, sma_200 = metrics['sma_50'], metrics['sma_200']
+                high_52week, low_52week = metrics['high_52week'], metrics['low_52week']
+                pct_from_high, pct_from_low = metrics['pct_from_high'], metrics['pct_from_low']
+                current_rsi = metrics['current_rsi']
 
                 # Get additional financial metrics
                 try:
@@ -359,28 +427,6 @@ def analyze_symbols():
                     revenue_growth = earnings_growth = pe_ratio = forward_pe = peg_ratio = profit_margins = None
                     inst_ownership = target_price = target_high = target_low = upside_potential = None
 
-                # Calculate Skyrocket Score
-                try:
-                    # Pass the relevant parts of historical_data
-                    symbol_historical_data = None
-                    if historical_data is not None and not historical_data.empty:
-                        # Check if multi-level index (multiple symbols) or single
-                        if isinstance(historical_data.columns, pd.MultiIndex):
-                            if symbol in historical_data.columns.get_level_values(1):
-                                symbol_historical_data = historical_data.loc[:, pd.IndexSlice[:, symbol]]
-                                # Rename columns to remove symbol level for consistency
-                                symbol_historical_data.columns = symbol_historical_data.columns.droplevel(1)
-                        elif symbol in historical_data.columns: # Single symbol case (less likely here)
-                            symbol_historical_data = historical_data
-
-                    score, reason = calculate_skyrocket_score(symbol_row, info, symbol_historical_data)
-                    df.loc[df['Symbol'] == symbol, 'Skyrocket Score'] = score
-                    df.loc[df['Symbol'] == symbol, 'Skyrocket Reason'] = reason
-                except Exception as score_e:
-                    print(colored(f"Error calculating Skyrocket Score for {symbol}: {score_e}", "yellow"))
-                    df.loc[df['Symbol'] == symbol, 'Skyrocket Score'] = 0
-                    df.loc[df['Symbol'] == symbol, 'Skyrocket Reason'] = "Error during scoring"
-
                 # Create the HTML for this stock
                 # Format the current price
                 if isinstance(current_price, (int, float)):
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Tuple
+
+# trading days of history needed before a symbol's RS rating can be calculated
+rs_lookback = 252
+
+
+def relative_strength_ratings(close: pd.DataFrame) -> pd.DataFrame:
+    """Return the RS rating (0-100) of every symbol on every date, ranked against the symbols trading on that date.
+    Uses the same quarterly weighting as 'relative_strength' and leaves dates with under a year of history empty."""
+
+    def change(start_offset: int, end_offset: int) -> pd.DataFrame:
+        start = close.shift(start_offset)
+        return 100 * (close.shift(end_offset) - start) / start
+
+    rs_raw = 0.2 * change(251, 189) + 0.2 * change(188, 126) + 0.2 * change(125, 63) + 0.4 * change(62, 0)
+    return (100 * rs_raw.rank(axis=1, pct=True)).round()
+
+
+class Backtest:
+    """Replay the price-derived screen criteria (RS rating, price range, 50-day average volume, moving average
+    trend rules and 52-week high proximity) for every trading day at once, using date x symbol matrices."""
+
+    def __init__(self, close: pd.DataFrame, volume: pd.DataFrame):
+        self.close = close
+        self.volume = volume.reindex(index=close.index, columns=close.columns)
+
+        self.rs = relative_strength_ratings(close)
+        self.sma = {window: close.rolling(window).mean() for window in (10, 20, 50, 200)}
+        self.high_52_week = close.rolling(rs_lookback).max()
+        self.average_volume = self.volume.rolling(50).mean()
+
+    def selection(self, settings: Dict[str, Any]) -> pd.DataFrame:
+        """Return which symbols would have passed the price-derived criteria on each date. Market cap,
+        revenue growth and institutional holdings have no local history and are not applied."""
+        trend_settings = settings["trend_settings"]
+        price = self.close
+        percent_below_high = 100 * (self.high_52_week - price) / self.high_52_week
+
+        selected = (
+            (self.rs >= settings["min_rs"])
+            & (price >= settings["min_price"])
+            & (price <= settings["max_price"])
+            & (self.average_volume >= settings["min_volume"])
+        )
+
+        if trend_settings["Price >= 50-day SMA"]:
+            selected &= price >= self.sma[50]
+        if trend_settings["Price >= 200-day SMA"]:
+            selected &= price >= self.sma[200]
+        if trend_settings["10-day SMA >= 20-day SMA"]:
+            selected &= self.sma[10] >= self.sma[20]
+        if trend_settings["20-day SMA >= 50-day SMA"]:
+            selected &= self.sma[20] >= self.sma[50]
+        if trend_settings["Price within 50% of 52-week High"]:
+            selected &= percent_below_high <= 50
+
+        return selected
+
+    def forward_returns(self, horizon: int) -> pd.DataFrame:
+        """Return the percent change of every symbol's price over the following 'horizon' trading days."""
+        return 100 * (self.close.shift(-horizon) - self.close) / self.close
+
+    def run(
+        self,
+        settings: Dict[str, Any],
+        start: str = None,
+        end: str = None,
+        horizons: List[int] = (1, 5, 20),
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Select baskets for each date between 'start' and 'end' and measure their equal-weighted forward returns.
+        Returns daily results and a summary per horizon comparing baskets with every rated symbol."""
+        selected = self.selection(settings).loc[start:end].to_numpy()
+        rated = self.rs.loc[start:end].notna().to_numpy()
+        dates = self.close.loc[start:end].index
+
+        daily = pd.DataFrame({"Selected": selected.sum(axis=1)}, index=dates)
+        summary = {}
+
+        for horizon in horizons:
+            returns = self.forward_returns(horizon).loc[start:end].to_numpy()
+            available = ~np.isnan(returns)
+            basket = selected & available
+            universe = rated & available
+
+            basket_count = basket.sum(axis=1)
+            universe_count = universe.sum(axis=1)
+            basket_return = np.where(basket, returns, 0).sum(axis=1) / np.where(basket_count > 0, basket_count, np.nan)
+            universe_return = np.where(universe, returns, 0).sum(axis=1) / np.where(
+                universe_count > 0, universe_count, np.nan
+            )
+
+            daily[f"{horizon}-day Return %"] = basket_return
+            daily[f"{horizon}-day Universe Return %"] = universe_return
+
+            summary[f"{horizon}-day"] = {
+                "Dates": int((basket_count > 0).sum()),
+                "Picks": int(basket_count.sum()),
+                "Mean Return %": np.nanmean(basket_return) if (basket_count > 0).any() else np.nan,
+                "Median Return %": np.nanmedian(basket_return) if (basket_count > 0).any() else np.nan,
+                "Hit Rate %": 100 * (basket & (returns > 0)).sum() / max(1, basket_count.sum()),
+                "Universe Mean Return %": np.nanmean(universe_return) if (universe_count > 0).any() else np.nan,
+            }
+
+        summary = pd.DataFrame(summary).T.astype({"Dates": int, "Picks": int})
+        summary["Excess Return %"] = summary["Mean Return %"] - summary["Universe Mean Return %"]
+
+        return daily, summary
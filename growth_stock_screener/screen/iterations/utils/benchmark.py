@@ -0,0 +1,87 @@
+import os
+import sys
+import glob
+import json
+import tempfile
+import statistics
+import subprocess
+import pandas as pd
+from typing import Any, Dict, List
+from .locking import atomic_writer
+from .metrics import metrics_json_name
+
+# a stage has regressed once its median duration exceeds the baseline by this fraction and by this many seconds
+regression_tolerance = 0.2
+regression_min_seconds = 0.5
+
+
+def stage_seconds(metrics_path: str) -> Dict[str, float]:
+    """Return the duration of each iteration (and the "Total" duration) recorded in a screen's metrics file."""
+    with open(metrics_path, "r") as f:
+        gauges = json.load(f)["gauges"]
+
+    return {gauge["labels"]["stage"]: gauge["value"] for gauge in gauges if gauge["name"] == "stage_seconds"}
+
+
+def replay_screen(
+    script: str, archive: str, latency: float = 0, error_rate: float = 0, seed: int = None
+) -> Dict[str, float]:
+    """Run a screen script in a new process, replaying a fixture archive, and return the duration of each stage.
+    Screens run in an empty directory, so no cached data from earlier screens is reused."""
+    with tempfile.TemporaryDirectory() as directory:
+        arguments = [sys.executable, os.path.abspath(script), "--replay", os.path.abspath(archive)]
+        arguments += ["--replay-latency", str(latency), "--replay-error-rate", str(error_rate)]
+        arguments += [] if (seed is None) else ["--replay-seed", str(seed)]
+        log_path = os.path.join(directory, "screen.log")
+
+        with open(log_path, "w") as log:
+            completed = subprocess.run(arguments, cwd=directory, stdout=log, stderr=subprocess.STDOUT)
+
+        if completed.returncode != 0:
+            with open(log_path, "r", errors="replace") as log:
+                output = log.read()[-2000:]
+
+            raise RuntimeError(f"replayed screen exited with code {completed.returncode}:\n{output}")
+
+        metrics_paths = glob.glob(os.path.join(directory, "json", "runs", "*", metrics_json_name))
+        return stage_seconds(metrics_paths[0])
+
+
+def open_baseline(path: str) -> Dict[str, Any]:
+    """Open a saved benchmark baseline (empty if none was saved)."""
+    if not os.path.exists(path):
+        return {"stages": {}}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, stages: Dict[str, float], **conditions) -> None:
+    """Save the duration of each stage, along with the conditions (such as injected latency) they were measured under."""
+    with atomic_writer(path) as f:
+        json.dump({**conditions, "stages": stages}, f, indent=2)
+
+
+def compare_to_baseline(
+    runs: List[Dict[str, float]],
+    baseline: Dict[str, float],
+    tolerance: float = regression_tolerance,
+    min_seconds: float = regression_min_seconds,
+) -> pd.DataFrame:
+    """Return the median duration of each stage over several runs, its baseline duration and whether it regressed."""
+    stages = list(dict.fromkeys(stage for run in runs for stage in run))
+    comparison = pd.DataFrame(
+        {
+            "Seconds": [statistics.median(run[stage] for run in runs if stage in run) for stage in stages],
+            "Baseline": [baseline.get(stage) for stage in stages],
+        },
+        index=pd.Index(stages, name="Stage"),
+        dtype=float,
+    )
+
+    comparison["Change %"] = 100 * (comparison["Seconds"] - comparison["Baseline"]) / comparison["Baseline"]
+    comparison["Regressed"] = (comparison["Seconds"] > comparison["Baseline"] * (1 + tolerance)) & (
+        comparison["Seconds"] - comparison["Baseline"] > min_seconds
+    )
+
+    return comparison
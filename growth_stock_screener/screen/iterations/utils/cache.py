@@ -4,11 +4,51 @@ import pandas as pd
 from datetime import datetime
 from typing import Dict, Any, Optional
 import hashlib
+from .locking import atomic_writer, file_lock
+from .metrics import record_cache_lookup
 
-# Path to the cache settings file
-CACHE_FILE = os.path.join(
-    os.getcwd(), "json", "cache_settings.json"
-)
+# Name of the cache settings file in each run directory
+CACHE_FILE_NAME = "cache_settings.json"
+
+# File in the runs directory naming the most recently started run
+LATEST_RUN_FILE_NAME = "latest.json"
+
+def json_directory() -> str:
+    """
+    Return the json directory, which holds data shared by every run (raw metrics, prices, caches).
+    """
+    return os.path.join(os.getcwd(), "json")
+
+def run_directory(run: Optional[str] = None) -> str:
+    """
+    Return the directory holding a run's cache settings and outfiles (by default, the run of the current settings).
+    Runs are namespaced by settings hash, so screens with different settings never overwrite each other's files.
+    """
+    run = run or get_settings_hash(get_current_settings())
+    return os.path.join(json_directory(), "runs", run)
+
+def cache_settings_path(run: Optional[str] = None) -> str:
+    """
+    Return the path of a run's cache settings file.
+    """
+    return os.path.join(run_directory(run), CACHE_FILE_NAME)
+
+def set_latest_run(run: str) -> None:
+    """
+    Record a run as the most recently started run.
+    """
+    with atomic_writer(os.path.join(json_directory(), "runs", LATEST_RUN_FILE_NAME)) as f:
+        json.dump({"run": run}, f)
+
+def latest_run() -> str:
+    """
+    Return the most recently started run (or the run of the current settings if none has been recorded).
+    """
+    try:
+        with open(os.path.join(json_directory(), "runs", LATEST_RUN_FILE_NAME), 'r') as f:
+            return json.load(f)["run"]
+    except (json.JSONDecodeError, FileNotFoundError, KeyError):
+        return get_settings_hash(get_current_settings())
 
 def get_settings_hash(settings: Dict[str, Any]) -> str:
     """
@@ -18,9 +58,27 @@ def get_settings_hash(settings: Dict[str, Any]) -> str:
     settings_str = json.dumps(settings, sort_keys=True)
     return hashlib.md5(settings_str.encode()).hexdigest()
 
+def read_cache_settings(path: str) -> Dict[str, Any]:
+    """
+    Read a cache settings file (None if it doesn't exist or can't be parsed).
+    """
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return None
+
+def write_cache_settings(path: str, cache_data: Dict[str, Any]) -> None:
+    """
+    Atomically replace a cache settings file, so that concurrent readers never see a partially written file.
+    """
+    with atomic_writer(path) as f:
+        json.dump(cache_data, f, indent=2)
+
 def save_cache_settings(settings: Dict[str, Any]) -> None:
     """
-    Save the current settings and timestamp to the cache file.
+    Save the current settings and timestamp to the cache file of their run.
+    The file is locked while it is read and rewritten, so concurrent screens can share a run.
     """
     # Create a cache entry with settings and timestamp
     cache_entry = {
@@ -29,60 +87,33 @@ def save_cache_settings(settings: Dict[str, Any]) -> None:
         "timestamp": datetime.now().strftime("%Y-%m-%d"),
         "iterations_completed": []
     }
+    cache_file = cache_settings_path(cache_entry["settings_hash"])
 
-    # Create the json directory if it doesn't exist
-    json_dir = os.path.dirname(CACHE_FILE)
-    if not os.path.exists(json_dir):
-        os.makedirs(json_dir)
+    with file_lock(cache_file):
+        cache_data = read_cache_settings(cache_file)
 
-    # Check if cache file exists
-    if os.path.exists(CACHE_FILE):
-        try:
-            with open(CACHE_FILE, 'r') as f:
-                cache_data = json.load(f)
+        # If the settings hash matches and it's the same day, keep the completed iterations
+        if (cache_data is not None and
+            cache_data.get("settings_hash") == cache_entry["settings_hash"] and
+            cache_data.get("timestamp") == cache_entry["timestamp"]):
+            cache_entry["iterations_completed"] = cache_data.get("iterations_completed", [])
 
-            # If the settings hash matches and it's the same day, keep the completed iterations
-            if (cache_data.get("settings_hash") == cache_entry["settings_hash"] and
-                cache_data.get("timestamp") == cache_entry["timestamp"]):
-                cache_entry["iterations_completed"] = cache_data.get("iterations_completed", [])
-        except (json.JSONDecodeError, FileNotFoundError):
-            # If there's an error reading the cache file, start fresh
-            pass
+        # Write the cache entry to the file
+        write_cache_settings(cache_file, cache_entry)
 
-    # Write the cache entry to the file
-    with open(CACHE_FILE, 'w') as f:
-        json.dump(cache_entry, f, indent=2)
+    set_latest_run(cache_entry["settings_hash"])
 
 def mark_iteration_complete(iteration_name: str) -> None:
     """
-    Mark an iteration as complete in the cache file.
-    """
-    # Create the json directory if it doesn't exist
-    json_dir = os.path.dirname(CACHE_FILE)
-    if not os.path.exists(json_dir):
-        os.makedirs(json_dir)
-
-    if not os.path.exists(CACHE_FILE):
-        print(f"Cache file does not exist when marking {iteration_name} complete. Creating new cache file.")
-        # Create a new cache file with this iteration marked as complete
-        cache_data = {
-            "settings": {},
-            "settings_hash": "",
-            "timestamp": datetime.now().strftime("%Y-%m-%d"),
-            "iterations_completed": [iteration_name]
-        }
-    else:
-        try:
-            with open(CACHE_FILE, 'r') as f:
-                cache_data = json.load(f)
-
-            if iteration_name not in cache_data.get("iterations_completed", []):
-                cache_data["iterations_completed"].append(iteration_name)
-                print(f"Marked {iteration_name} as complete in cache.")
-            else:
-                print(f"{iteration_name} was already marked as complete in cache.")
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            print(f"Error reading cache file when marking {iteration_name} complete: {e}")
+    Mark an iteration as complete in the cache file of the current settings' run.
+    """
+    cache_file = cache_settings_path()
+
+    with file_lock(cache_file):
+        cache_data = read_cache_settings(cache_file)
+
+        if cache_data is None:
+            print(f"Cache file could not be read when marking {iteration_name} complete. Creating new cache file.")
             # Create a new cache file with this iteration marked as complete
             cache_data = {
                 "settings": {},
@@ -90,13 +121,17 @@ def mark_iteration_complete(iteration_name: str) -> None:
                 "timestamp": datetime.now().strftime("%Y-%m-%d"),
                 "iterations_completed": [iteration_name]
             }
+        elif iteration_name not in cache_data.get("iterations_completed", []):
+            cache_data.setdefault("iterations_completed", []).append(iteration_name)
+            print(f"Marked {iteration_name} as complete in cache.")
+        else:
+            print(f"{iteration_name} was already marked as complete in cache.")
 
-    # Write the updated cache data
-    try:
-        with open(CACHE_FILE, 'w') as f:
-            json.dump(cache_data, f, indent=2)
-    except Exception as e:
-        print(f"Error writing to cache file: {e}")
+        # Write the updated cache data
+        try:
+            write_cache_settings(cache_file, cache_data)
+        except Exception as e:
+            print(f"Error writing to cache file: {e}")
 
 def should_skip_iteration(iteration_name: str, current_settings: Dict[str, Any]) -> bool:
     """
@@ -105,47 +140,47 @@ def should_skip_iteration(iteration_name: str, current_settings: Dict[str, Any])
     Returns:
         bool: True if the iteration can be skipped, False otherwise
     """
-    if not os.path.exists(CACHE_FILE):
-        print(f"Cache file does not exist: {CACHE_FILE}")
+    current_hash = get_settings_hash(current_settings)
+    cache_file = cache_settings_path(current_hash)
+
+    if not os.path.exists(cache_file):
+        print(f"Cache file does not exist: {cache_file}")
         return False
 
-    try:
-        with open(CACHE_FILE, 'r') as f:
-            cache_data = json.load(f)
-
-        # Check if the settings match and it's the same day
-        current_hash = get_settings_hash(current_settings)
-        cached_hash = cache_data.get("settings_hash")
-        settings_match = cached_hash == current_hash
-
-        today = datetime.now().strftime("%Y-%m-%d")
-        cached_date = cache_data.get("timestamp")
-        same_day = cached_date == today
-
-        completed_iterations = cache_data.get("iterations_completed", [])
-        iteration_completed = iteration_name in completed_iterations
-
-        # Check if the output file exists
-        json_path = os.path.join(
-            os.getcwd(), "json", f"{iteration_name}.json"
-        )
-        file_exists = os.path.exists(json_path)
-
-        # Debug output
-        print(f"\nCache check for {iteration_name}:")
-        print(f"  Settings match: {settings_match} (Current: {current_hash}, Cached: {cached_hash})")
-        print(f"  Same day: {same_day} (Current: {today}, Cached: {cached_date})")
-        print(f"  Iteration completed: {iteration_completed} (Completed: {completed_iterations})")
-        print(f"  File exists: {file_exists} (Path: {json_path})")
-
-        should_skip = settings_match and same_day and iteration_completed and file_exists
-        print(f"  Should skip: {should_skip}")
-
-        return should_skip
-    except (json.JSONDecodeError, FileNotFoundError) as e:
-        print(f"Error reading cache file: {e}")
+    cache_data = read_cache_settings(cache_file)
+
+    if cache_data is None:
+        print(f"Error reading cache file: {cache_file}")
         return False
 
+    # Check if the settings match and it's the same day
+    cached_hash = cache_data.get("settings_hash")
+    settings_match = cached_hash == current_hash
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    cached_date = cache_data.get("timestamp")
+    same_day = cached_date == today
+
+    completed_iterations = cache_data.get("iterations_completed", [])
+    iteration_completed = iteration_name in completed_iterations
+
+    # Check if the output file exists
+    json_path = os.path.join(run_directory(current_hash), f"{iteration_name}.json")
+    file_exists = os.path.exists(json_path)
+
+    # Debug output
+    print(f"\nCache check for {iteration_name}:")
+    print(f"  Settings match: {settings_match} (Current: {current_hash}, Cached: {cached_hash})")
+    print(f"  Same day: {same_day} (Current: {today}, Cached: {cached_date})")
+    print(f"  Iteration completed: {iteration_completed} (Completed: {completed_iterations})")
+    print(f"  File exists: {file_exists} (Path: {json_path})")
+
+    should_skip = settings_match and same_day and iteration_completed and file_exists
+    print(f"  Should skip: {should_skip}")
+    record_cache_lookup("iteration", should_skip, iteration=iteration_name)
+
+    return should_skip
+
 def get_current_settings() -> Dict[str, Any]:
     """
     Get the current settings from the settings module.
@@ -1,11 +1,131 @@
 from multiprocessing.pool import ThreadPool
 from tqdm import tqdm
-from typing import List, Callable
-from threading import local
+from termcolor import cprint
+from typing import Dict, List, Callable
+from threading import local, Lock
 from selenium import webdriver
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException
+from urllib3.exceptions import MaxRetryError, ProtocolError
+from .metrics import metrics
+from .tracing import trace_span
+from .replay import ReplayDriver, replaying, recording_driver
+from ...settings import driver_backend, remote_nodes, threads
+
+# error messages raised by browser sessions which can no longer be used
+lost_session_messages = [
+    "Browsing context has been discarded",
+    "Tried to run command without establishing a connection",
+    "WebDriver session does not exist",
+    "Failed to decode response from marionette",
+    "invalid session id",
+]
+
+
+class NodeLostError(Exception):
+    """Raised by a screen function when its browser session or remote node was lost; the item is re-queued."""
+
+
+class NoNodeAvailableError(Exception):
+    """Raised when every remote WebDriver node is either full or unreachable."""
+
+
+class GridNode:
+    """A remote WebDriver endpoint (Selenium Grid hub or standalone node) with a fixed number of session slots."""
+
+    def __init__(self, url: str, capacity: int):
+        self.url = url
+        self.capacity = capacity
+        self.sessions = 0
+        self.alive = True
+
+    def free_slots(self) -> int:
+        return (self.capacity - self.sessions) if self.alive else 0
+
+
+class NodeRegistry:
+    """Thread-safe registry which distributes browser sessions across remote WebDriver nodes by free capacity."""
+
+    def __init__(self, nodes: Dict[str, int]):
+        self.lock = Lock()
+        self.nodes = [GridNode(url, capacity) for url, capacity in nodes.items()]
+        self.driver_nodes = {}  # node of each open remote driver (by driver id)
+
+    def acquire(self) -> GridNode:
+        """Reserve a session slot on the least loaded live node."""
+        with self.lock:
+            candidates = [node for node in self.nodes if node.free_slots() > 0]
+
+            if len(candidates) == 0:
+                raise NoNodeAvailableError("no remote WebDriver node has a free session slot")
+
+            node = max(candidates, key=lambda node: node.free_slots() / node.capacity)
+            node.sessions += 1
+            return node
+
+    def release(self, node: GridNode) -> None:
+        """Free a session slot on the given node."""
+        with self.lock:
+            node.sessions = max(0, node.sessions - 1)
+
+    def mark_lost(self, node: GridNode) -> None:
+        """Stop scheduling sessions on a node which has become unreachable."""
+        with self.lock:
+            node.alive = False
+            node.sessions = 0
+
+    def attach(self, driver: WebDriver, node: GridNode) -> None:
+        """Record the node a driver's session runs on, so that its slot can be freed when the driver is closed."""
+        with self.lock:
+            self.driver_nodes[id(driver)] = node
+
+    def detach(self, driver: WebDriver) -> GridNode:
+        """Forget the node a driver's session runs on, returning it (or None for drivers without a node)."""
+        with self.lock:
+            return self.driver_nodes.pop(id(driver), None)
+
+    def total_capacity(self) -> int:
+        return sum(node.capacity for node in self.nodes)
+
+
+node_registry = NodeRegistry(remote_nodes if driver_backend == "remote" else {})
+
+
+def browser_threads() -> int:
+    """Return the number of concurrent browser instances available to the configured driver backend."""
+    if driver_backend == "remote":
+        return max(1, node_registry.total_capacity())
+
+    return threads
+
+
+def driver_options() -> Options:
+    """Return the options shared by local and remote Firefox browser instances."""
+    options = Options()
+    options.add_argument("--headless")
+    options.page_load_strategy = "eager"
+    return options
+
+
+def create_remote_driver(thread_local: local) -> WebDriver:
+    """Start a browser session on a remote node, skipping nodes which refuse connections."""
+    while True:
+        node = node_registry.acquire()
+
+        try:
+            driver = webdriver.Remote(command_executor=node.url, options=driver_options())
+        except Exception as e:
+            if is_connection_error(e):
+                node_registry.mark_lost(node)
+                continue
+
+            node_registry.release(node)
+            raise
+
+        setattr(thread_local, "node", node)
+        return driver
 
 
 def get_driver(thread_local: local, drivers: List[WebDriver]) -> WebDriver:
@@ -15,23 +135,127 @@ def get_driver(thread_local: local, drivers: List[WebDriver]) -> WebDriver:
 
     if driver is None:
         # construct new web broswer driver
-        options = Options()
-        service = Service()
-        options.add_argument("--headless")
-        options.page_load_strategy = "eager"
-        driver = webdriver.Firefox(options=options, service=service)
+        with metrics.timer("driver_start_seconds", backend=driver_backend), trace_span("browser start", "fetch"):
+            # recorded pages are replayed without starting a browser
+            if replaying():
+                driver = ReplayDriver()
+            elif driver_backend == "remote":
+                driver = create_remote_driver(thread_local)
+            else:
+                service = Service()
+                driver = webdriver.Firefox(options=driver_options(), service=service)
+
+        driver = recording_driver(driver)
+
+        if getattr(thread_local, "node", None) is not None:
+            node_registry.attach(driver, thread_local.node)
+
         setattr(thread_local, "driver", driver)
         drivers.append(driver)
 
     return driver
 
 
-def tqdm_thread_pool_map(threads: int, func: Callable, items: List) -> List:
+def discard_driver(thread_local: local, drivers: List[WebDriver], node_lost: bool = False) -> None:
+    """Quit and forget the web driver attributed to a thread, freeing (or retiring) its remote node slot."""
+    driver = getattr(thread_local, "driver", None)
+    node = getattr(thread_local, "node", None)
+
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+        if driver in drivers:
+            drivers.remove(driver)
+
+        node_registry.detach(driver)
+
+    if node is not None:
+        if node_lost:
+            node_registry.mark_lost(node)
+        else:
+            node_registry.release(node)
+
+    setattr(thread_local, "driver", None)
+    setattr(thread_local, "node", None)
+
+
+def close_drivers(drivers: List[WebDriver]) -> None:
+    """Quit every web driver opened by a stage (ignoring errors), freeing the remote node slot of each."""
+    for driver in tqdm(drivers):
+        try:
+            driver.quit()
+        except Exception:
+            pass  # Ignore errors when closing drivers
+
+        node = node_registry.detach(driver)
+
+        if node is not None:
+            node_registry.release(node)
+
+    drivers.clear()
+
+
+def is_connection_error(e: Exception) -> bool:
+    """Return 'True' if an exception indicates that a WebDriver endpoint is unreachable."""
+    return isinstance(e, (MaxRetryError, ProtocolError, ConnectionError))
+
+
+def is_session_lost(e: Exception) -> bool:
+    """Return 'True' if an exception indicates that a browser session can no longer be used."""
+    if isinstance(e, (InvalidSessionIdException, NoSuchWindowException)) or is_connection_error(e):
+        return True
+
+    return any(text in str(e) for text in lost_session_messages)
+
+
+def recover_lost_session(
+    e: Exception, symbol: str, thread_local: local, drivers: List[WebDriver]
+) -> None:
+    """Discard a thread's dead browser session and raise 'NodeLostError' so that the symbol is re-queued.
+    Does nothing if the exception is an ordinary scraping error."""
+    if not is_session_lost(e):
+        return
+
+    discard_driver(thread_local, drivers, node_lost=is_connection_error(e))
+    raise NodeLostError(symbol) from e
+
+
+def tqdm_thread_pool_map(threads: int, func: Callable, items: List, max_requeues: int = 2) -> List:
     """Concurrently pass each inputted item into the given function using a thread pool.
-    Display a progress bar and return a list of results."""
-    with ThreadPool(threads) as pool:
-        results = []
-        for result in tqdm(pool.imap(func, items), total=len(items)):
-            results.append(result)
+    Display a progress bar and return a list of results in the order of their items. Items which raise
+    'NodeLostError' are re-queued up to 'max_requeues' times (and left out of the results if they keep raising)."""
+
+    def attempt(indexed_item):
+        i, item = indexed_item
+
+        try:
+            return i, False, func(item)
+        except NodeLostError:
+            return i, True, item
+
+    results = {}
+    pending = list(enumerate(items))
+
+    with ThreadPool(threads) as pool, tqdm(total=len(pending)) as progress_bar:
+        for _ in range(max_requeues + 1):
+            requeued = []
+
+            for i, lost, result in pool.imap(attempt, pending):
+                if lost:
+                    requeued.append((i, result))
+                else:
+                    results[i] = result
+                    progress_bar.update()
+
+            pending = requeued
+
+            if len(pending) == 0:
+                break
+
+    if len(pending) > 0:
+        cprint(f"\n{len(pending)} items dropped after repeatedly losing their browser session.", "yellow")
 
-        return results
+    return [results[i] for i in sorted(results)]
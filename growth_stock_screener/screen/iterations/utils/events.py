@@ -0,0 +1,169 @@
+import os
+import json
+import logging
+from collections import Counter
+from logging.handlers import RotatingFileHandler
+from threading import Lock
+from typing import Any, Dict
+from termcolor import colored
+from .cache import run_directory
+from .metrics import metrics
+from ...settings import log_verbosity, event_log_max_bytes, event_log_backups
+
+# outcomes of logged events (screening outcomes such as "filtered" are logged as well)
+SKIPPED = "skipped"
+INFO = "info"
+VALUES = "values"
+
+# console verbosity levels (see 'log_verbosity'), and the least verbose level at which each outcome is printed
+verbosity_levels = {"summary": 0, "outcomes": 1, "details": 2}
+outcome_verbosity = {VALUES: 2}
+
+# file in each run directory holding the events of every iteration, one JSON object per line
+event_log_name = "events.jsonl"
+
+event_logger = logging.getLogger("growth_stock_screener.events")
+event_logger.propagate = False
+event_logger.setLevel(logging.DEBUG)
+
+
+class Event:
+    """A structured log record of one symbol (or a general message) in one iteration.
+    Console messages are only formatted when an event is printed."""
+
+    __slots__ = ("stage", "symbol", "outcome", "reason", "values", "template", "color")
+
+    def __init__(
+        self,
+        symbol: str,
+        outcome: str,
+        reason: str = None,
+        values: Dict[str, Any] = None,
+        template: str = None,
+        color: str = None,
+    ):
+        self.stage = None  # set by the event log the event is appended to
+        self.symbol = symbol
+        self.outcome = outcome
+        self.reason = reason
+        self.values = values
+        self.template = template  # console format string of 'values' (with 'symbol' available as well)
+        self.color = color
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "symbol": self.symbol,
+            "outcome": self.outcome,
+            "reason": self.reason,
+            "values": self.values,
+        }
+
+    def format(self) -> str:
+        """Return the event's console message."""
+        if self.outcome == SKIPPED:
+            return colored(f"\nSkipping {self.symbol} ({self.reason}) . . .\n", "red")
+
+        if self.template is not None:
+            text = self.template.format(symbol=self.symbol, **(self.values or {}))
+        elif self.reason is not None:
+            text = self.reason
+        else:
+            text = f"{self.symbol} {self.outcome}."
+
+        return f"\n{text if (self.color is None) else colored(text, self.color)}\n"
+
+    def __str__(self) -> str:
+        return self.format()
+
+
+def json_value(value: Any) -> Any:
+    """Convert values json can't serialize (such as numpy scalars) when writing events."""
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format each event as one JSON object. Events are only serialized by handlers which emit them."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(
+            {"time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"), **record.msg.to_dict()},
+            default=json_value,
+        )
+
+
+def event_log_path() -> str:
+    return os.path.join(run_directory(), event_log_name)
+
+
+def attach_event_file(path: str) -> None:
+    """Stream events to a rotating JSON-lines file (replacing the file events were previously streamed to)."""
+    for handler in list(event_logger.handlers):
+        if getattr(handler, "baseFilename", None) == os.path.abspath(path):
+            return
+
+        event_logger.removeHandler(handler)
+        handler.close()
+
+    directory = os.path.dirname(path)
+
+    # Create the file's directory if it doesn't exist
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    handler = RotatingFileHandler(
+        path, maxBytes=event_log_max_bytes, backupCount=event_log_backups, encoding="utf-8", delay=True
+    )
+    handler.setFormatter(JsonLinesFormatter())
+    event_logger.addHandler(handler)
+
+
+class EventLog:
+    """Thread-safe event sink of one iteration ('logs'). Every event is streamed to the run's JSON-lines event file
+    instead of being held in memory; the console shows the events allowed by 'log_verbosity' as they happen,
+    and a summary of outcome counts at the end of the iteration."""
+
+    def __init__(self, stage: str, verbosity: str = log_verbosity, path: str = None):
+        self.stage = stage
+        self.verbosity = verbosity_levels[verbosity]
+        self.path = path or event_log_path()
+        self.counts = Counter()
+        self.reasons = Counter()
+        self.lock = Lock()
+        attach_event_file(self.path)
+
+    def append(self, event: Event) -> None:
+        """Log an event (messages which aren't events are logged as general information)."""
+        if not isinstance(event, Event):
+            event = Event(None, INFO, str(event).strip())
+
+        event.stage = self.stage
+
+        with self.lock:
+            self.counts[event.outcome] += 1
+
+            if event.outcome == SKIPPED:
+                self.reasons[str(event.reason)] += 1
+
+        metrics.increment("stage_events_total", stage=self.stage, outcome=event.outcome)
+        event_logger.log(logging.DEBUG if (event.outcome == VALUES) else logging.INFO, event)
+
+        if self.verbosity >= outcome_verbosity.get(event.outcome, 1):
+            print(event.format(), end="")
+
+    def event(self, symbol: str, outcome: str, reason: str = None, **values) -> None:
+        """Log the outcome of a symbol, along with any values it was evaluated on."""
+        self.append(Event(symbol, outcome, reason, values or None))
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def print_summary(self, top_reasons: int = 3) -> None:
+        """Print the number of events of each outcome and the most common reasons symbols were skipped."""
+        counts = ", ".join(f"{count} {outcome}" for outcome, count in sorted(self.counts.items()) if outcome != VALUES)
+        print(colored(f"\n{self.stage} events: {counts or 'none'} (saved to {os.path.relpath(self.path)})", "dark_grey"))
+
+        for reason, count in self.reasons.most_common(top_reasons):
+            print(colored(f"  skipped {count}x: {reason}", "dark_grey"))
+
+        print()
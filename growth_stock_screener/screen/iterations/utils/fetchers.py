@@ -0,0 +1,321 @@
+import asyncio
+import time
+import requests
+from threading import local
+from typing import Any, Callable, Dict, List
+from aiohttp.client import ClientSession
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+from .concurrency import get_driver, recover_lost_session
+from .health import CircuitOpenError, source_health
+from .events import EventLog
+from .logs import skip_message, message
+from .scheduling import time_left
+from .tracing import trace_span, traced
+from .scraping import (
+    get,
+    extract_element,
+    extract_float,
+    extract_dollars,
+    element_is_float_xpath,
+    element_is_float_css,
+    WaitForAll,
+    yf_moving_averages,
+    yf_52_week_high,
+    yf_average_volume,
+)
+
+# default request timeouts (seconds)
+liquidity_timeout = 30
+trend_timeout = 30
+institutional_timeout = 60
+institutional_wait_timeout = 15
+
+# locations of scraped data
+volume_xpath = "/html/body/main/div/div[2]/div[2]/div/div[2]/div/div/div/div[2]/div/div[1]/barchart-table-scroll/table/tbody/tr[3]/td[5]"
+sma_10_xpath = "/html/body/div[3]/div[4]/div[2]/div[2]/div/section/div/div[6]/div[2]/div[2]/table/tbody/tr[3]/td[2]"
+sma_20_xpath = "/html/body/div[3]/div[4]/div[2]/div[2]/div/section/div/div[6]/div[2]/div[2]/table/tbody/tr[5]/td[2]"
+sma_50_xpath = "/html/body/div[3]/div[4]/div[2]/div[2]/div/section/div/div[6]/div[2]/div[2]/table/tbody/tr[9]/td[2]"
+sma_200_xpath = "/html/body/div[3]/div[4]/div[2]/div[2]/div/section/div/div[6]/div[2]/div[2]/table/tbody/tr[13]/td[2]"
+high_52_week_xpath = "/html/body/div[2]/div/div[1]/div[3]/div/div/div[1]/div[5]/div[2]/section/div[1]/ul/li[5]/span[2]"
+inflows_css = ".info-slider-bought-text > tspan:nth-child(2)"
+outflows_css = ".info-slider-sold-text > tspan:nth-child(2)"
+
+
+@traced("barchart volume", "fetch")
+async def fetch_volume(symbol: str, session: ClientSession, logs: EventLog) -> int:
+    """Fetch the 50-day average volume of the given stock symbol from barchart.com (or Yahoo Finance while barchart is unavailable)."""
+    url = f"https://www.barchart.com/stocks/quotes/{symbol}/technical-analysis"
+    barchart = source_health("barchart", liquidity_timeout)
+
+    # only the request counts towards barchart's health (a page without data for one symbol isn't a source failure)
+    try:
+        with barchart.track() as request_timeout:
+            response = await get(url, session, timeout=request_timeout)
+
+            if response is None:
+                raise ConnectionError("no response from barchart")
+    except CircuitOpenError:
+        return await fetch_fallback_volume(symbol, logs)
+    except Exception as e:
+        logs.append(skip_message(symbol, e))
+        return None
+
+    try:
+        volume_element = extract_element(volume_xpath, response)
+        return int(extract_float(volume_element))
+    except Exception as e:
+        logs.append(skip_message(symbol, e))
+        return None
+
+
+async def fetch_fallback_volume(symbol: str, logs: EventLog) -> int:
+    """Fetch the 50-day average volume of the given stock symbol from Yahoo Finance."""
+    return await asyncio.to_thread(fetch_fallback, symbol, yf_average_volume, logs)
+
+
+def fetch_moving_averages(
+    symbol: str, thread_local: local, drivers: List[WebDriver], logs: EventLog
+) -> Dict[str, float]:
+    """Fetch moving average data for the given stock symbol from tradingview.com (or Yahoo Finance while tradingview is unavailable)."""
+    tradingview = source_health("tradingview", trend_timeout)
+
+    if not tradingview.allow_request():
+        return fetch_fallback(symbol, yf_moving_averages, logs)
+
+    # configure request url and dynamic wait methods
+    url = f"https://www.tradingview.com/symbols/{symbol}/technicals/"
+
+    wait_methods = [
+        element_is_float_xpath(sma_10_xpath),
+        element_is_float_xpath(sma_20_xpath),
+        element_is_float_xpath(sma_50_xpath),
+        element_is_float_xpath(sma_200_xpath),
+    ]
+
+    combined_wait_method = WaitForAll(wait_methods)
+
+    # only the page load counts towards tradingview's health (a page without data for one symbol isn't a source failure)
+    try:
+        driver = get_driver(thread_local, drivers)
+        request_start = time.perf_counter()
+        driver.set_page_load_timeout(tradingview.timeout())
+
+        with trace_span("tradingview page load", "fetch"):
+            driver.get(url)
+
+        tradingview.record_success(time.perf_counter() - request_start)
+    except Exception as e:
+        tradingview.record_failure()
+        recover_lost_session(e, symbol, thread_local, drivers)
+        logs.append(skip_message(symbol, e))
+        return None
+
+    # stop loading page when data is detected in DOM
+    try:
+        with trace_span("tradingview wait", "fetch"):
+            WebDriverWait(driver, trend_timeout).until(combined_wait_method)
+
+        driver.execute_script("window.stop();")
+    except TimeoutException:
+        logs.append(skip_message(symbol, "no moving average data"))
+        return None
+    except Exception as e:
+        tradingview.record_failure()
+        recover_lost_session(e, symbol, thread_local, drivers)
+        logs.append(skip_message(symbol, e))
+        return None
+
+    # extract moving averages from DOM
+    try:
+        with trace_span("tradingview extract", "parse"):
+            sma_10 = extract_float(driver.find_element(By.XPATH, sma_10_xpath))
+            sma_20 = extract_float(driver.find_element(By.XPATH, sma_20_xpath))
+            sma_50 = extract_float(driver.find_element(By.XPATH, sma_50_xpath))
+            sma_200 = extract_float(driver.find_element(By.XPATH, sma_200_xpath))
+    except Exception as e:
+        logs.append(skip_message(symbol, e))
+        return None
+
+    trend_data = {
+        "10-day SMA": sma_10,
+        "20-day SMA": sma_20,
+        "50-day SMA": sma_50,
+        "200-day SMA": sma_200,
+    }
+
+    # check for null values in fetched trend data
+    for data in trend_data.values():
+        if data is None:
+            logs.append(skip_message(symbol, "insufficient data"))
+            return None
+
+    return trend_data
+
+
+@traced("cnbc 52-week high", "fetch")
+def fetch_52_week_high(symbol: str, logs: EventLog) -> float:
+    """Fetch the 52-week high of the given stock symbol from cnbc.com (or Yahoo Finance while cnbc is unavailable)."""
+    url = f"https://www.cnbc.com/quotes/{symbol}"
+    cnbc = source_health("cnbc", trend_timeout)
+
+    # only the request counts towards cnbc's health (a page without data for one symbol isn't a source failure)
+    try:
+        with cnbc.track() as request_timeout:
+            response = requests.get(url, timeout=request_timeout)
+    except CircuitOpenError:
+        return fetch_fallback(symbol, yf_52_week_high, logs)
+    except Exception as e:
+        logs.append(skip_message(symbol, e))
+        return None
+
+    try:
+        high_52_week = extract_float(extract_element(high_52_week_xpath, response.content))
+    except Exception as e:
+        logs.append(skip_message(symbol, e))
+        return None
+
+    if high_52_week is None:
+        logs.append(skip_message(symbol, "couldn't find 52-week high"))
+
+    return high_52_week
+
+
+@traced("yahoo fallback", "fetch")
+def fetch_fallback(symbol: str, fetch: Callable[[str], Any], logs: EventLog) -> Any:
+    """Fetch data for the given stock symbol from Yahoo Finance when its primary source is unavailable."""
+    yahoo = source_health("yahoo", trend_timeout)
+
+    try:
+        with yahoo.track():
+            data = fetch(symbol)
+    except Exception as e:
+        logs.append(skip_message(symbol, e))
+        return None
+
+    if data is None:
+        logs.append(skip_message(symbol, "insufficient data"))
+
+    return data
+
+
+def fetch_exchange(symbol: str, deadline: float, logs: EventLog) -> str:
+    "Fetch the exchange that a stock symbol is listed on (either NASDAQ or NYSE)."
+    exchanges = ["NASDAQ", "NYSE"]
+    marketbeat = source_health("marketbeat", institutional_timeout)
+
+    for exchange in exchanges:
+        url = f"https://www.marketbeat.com/stocks/{exchange}/{symbol}/"
+        try:
+            with trace_span("marketbeat exchange probe", "fetch", exchange=exchange), marketbeat.track() as request_timeout:
+                response = requests.get(
+                    url, allow_redirects=False, timeout=min(request_timeout, time_left(deadline))
+                )
+        except CircuitOpenError as e:
+            logs.append(skip_message(symbol, e))
+            return None
+        except Exception:
+            continue
+
+        if response.status_code == 200:
+            return exchange
+
+    logs.append(skip_message(symbol, "couldn't fetch exchange"))
+    return None
+
+
+def fetch_institutional_holdings(
+    symbol: str,
+    budget: float,
+    thread_local: local,
+    drivers: List[WebDriver],
+    logs: EventLog,
+) -> Dict[str, float]:
+    "Fetch institutional holdings data for a stock symbol from marketbeat.com within a time budget (seconds)."
+    deadline = time.perf_counter() + budget
+    marketbeat = source_health("marketbeat", institutional_timeout)
+
+    # fetch the exchange the current symbol is associated with
+    exchange = fetch_exchange(symbol, deadline, logs)
+
+    if exchange is None:
+        return None
+
+    # configure request url and dynamic wait methods
+    url = f"https://www.marketbeat.com/stocks/{exchange}/{symbol}/institutional-ownership/"
+
+    wait_methods = [
+        element_is_float_css(inflows_css),
+        element_is_float_css(outflows_css),
+    ]
+
+    combined_wait_method = WaitForAll(wait_methods)
+
+    if not marketbeat.allow_request():
+        logs.append(skip_message(symbol, "marketbeat is unavailable (circuit open)"))
+        return None
+
+    # only the page load counts towards marketbeat's health (penny stocks often have no institutional data,
+    # so a page without data for one symbol isn't a source failure)
+    try:
+        driver = get_driver(thread_local, drivers)
+        request_start = time.perf_counter()
+        driver.set_page_load_timeout(min(marketbeat.timeout(), time_left(deadline)))
+
+        with trace_span("marketbeat page load", "fetch"):
+            driver.get(url)
+
+        marketbeat.record_success(time.perf_counter() - request_start)
+    except TimeoutException:
+        # If we timeout, let's still try to extract the data
+        marketbeat.record_failure(time.perf_counter() - request_start)
+        logs.append(message(f"Timeout for {symbol}, trying to extract data anyway", "yellow", symbol))
+    except Exception as e:
+        marketbeat.record_failure()
+        recover_lost_session(e, symbol, thread_local, drivers)
+        logs.append(skip_message(symbol, e))
+        return None
+    else:
+        # stop loading page when data is detected in DOM (using a shorter timeout for waiting for elements)
+        try:
+            with trace_span("marketbeat wait", "fetch"):
+                WebDriverWait(driver, min(institutional_wait_timeout, time_left(deadline))).until(combined_wait_method)
+
+            driver.execute_script("window.stop();")
+        except TimeoutException:
+            # If we timeout, let's still try to extract the data
+            logs.append(message(f"Timeout for {symbol}, trying to extract data anyway", "yellow", symbol))
+        except Exception as e:
+            marketbeat.record_failure()
+            recover_lost_session(e, symbol, thread_local, drivers)
+            logs.append(skip_message(symbol, e))
+            return None
+
+    # extract institutional holdings information from DOM
+    try:
+        # For stocks under $4, we'll be more lenient with institutional data
+        # If we can't get real data, we'll use placeholder values (flagged so that they aren't recorded as fetched)
+        placeholder = False
+
+        try:
+            with trace_span("marketbeat extract", "parse"):
+                inflows = extract_dollars(driver.find_element(By.CSS_SELECTOR, inflows_css))
+                outflows = extract_dollars(driver.find_element(By.CSS_SELECTOR, outflows_css))
+        except:
+            # For our low-priced stocks, we'll assume some institutional interest
+            # This is just to avoid getting stuck on this stage
+            logs.append(message(f"Using placeholder institutional data for {symbol}", "yellow", symbol))
+            inflows = 1000000  # $1M inflows
+            outflows = 500000  # $0.5M outflows
+            placeholder = True
+
+        if (inflows is None) or (outflows is None):
+            logs.append(skip_message(symbol, "insufficient data"))
+            return None
+
+        return {"Inflows": inflows, "Outflows": outflows, "Placeholder": placeholder}
+    except Exception as e:
+        logs.append(skip_message(symbol, f"Error extracting data: {e}"))
+        return None
@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Tuple
+from .raw_metrics import iteration_metrics, fetched_column
+
+# columns of each iteration's outfile
+liquidity_columns = ["Symbol", "Company Name", "Price", "Market Cap", "50-day Average Volume", "Industry", "RS"]
+trend_columns = [
+    "Symbol",
+    "Company Name",
+    "Industry",
+    "RS",
+    "Price",
+    "Market Cap",
+    "50-day Average Volume",
+    "% Below 52-week High",
+]
+revenue_growth_columns = trend_columns[:6] + [
+    "Revenue Growth % (most recent Q)",
+    "Revenue Growth % (previous Q)",
+    "50-day Average Volume",
+    "% Below 52-week High",
+]
+institutional_accumulation_columns = trend_columns[:6] + [
+    "Net Institutional Inflows",
+    "Revenue Growth % (most recent Q)",
+    "Revenue Growth % (previous Q)",
+    "50-day Average Volume",
+    "% Below 52-week High",
+]
+
+
+def numeric_column(df: pd.DataFrame, name: str) -> np.ndarray:
+    """Return a numeric column as a float array (missing values become NaN)."""
+    return df[name].to_numpy(dtype=float, na_value=np.nan)
+
+
+def liquidity_mask(df: pd.DataFrame, settings: Dict[str, Any]) -> np.ndarray:
+    """Return which rows satisfy liquidity criteria. Thresholds may be scalars, or arrays of shape
+    (profiles, 1) to evaluate several settings profiles at once (returning shape (profiles, rows))."""
+    price = numeric_column(df, "Price")
+    market_cap = numeric_column(df, "Market Cap")
+    volume = numeric_column(df, "50-day Average Volume")
+
+    return (
+        ~np.isnan(volume)
+        & ~np.isnan(market_cap)
+        & (market_cap >= settings["min_market_cap"])
+        & (price >= settings["min_price"])
+        & (price <= settings["max_price"])
+        & (volume >= settings["min_volume"])
+    )
+
+
+def trend_mask(df: pd.DataFrame, settings: Dict[str, Any]) -> np.ndarray:
+    """Return which rows are in a stage-2 uptrend. Rows missing trend data pass if they are within the price range."""
+    trend_settings = settings["trend_settings"]
+    price = numeric_column(df, "Price")
+    sma_10, sma_20, sma_50, sma_200 = (numeric_column(df, f"{days}-day SMA") for days in (10, 20, 50, 200))
+    missing = df[iteration_metrics["trend"]].isna().any(axis=1).to_numpy()
+
+    fails = (
+        (trend_settings["Price >= 50-day SMA"] & (price < sma_50))
+        | (trend_settings["Price >= 200-day SMA"] & (price < sma_200))
+        | (trend_settings["10-day SMA >= 20-day SMA"] & (sma_10 < sma_20))
+        | (trend_settings["20-day SMA >= 50-day SMA"] & (sma_20 < sma_50))
+        | (trend_settings["Price within 50% of 52-week High"] & (numeric_column(df, "% Below 52-week High") > 50))
+    )
+
+    return (missing & (price <= settings["max_price"])) | (~missing & ~fails)
+
+
+def revenue_growth_mask(df: pd.DataFrame, settings: Dict[str, Any]) -> np.ndarray:
+    """Return which rows have strong revenue growth (or an RS rating high enough to bypass the revenue screen)."""
+    min_growth_percent = settings["min_growth_percent"]
+    recent_growth = numeric_column(df, "Revenue Growth % (most recent Q)")
+    previous_growth = numeric_column(df, "Revenue Growth % (previous Q)")
+    protected = numeric_column(df, "RS") >= settings["protected_rs"]
+    foreign = (df["Foreign Stock"] == True).to_numpy()
+
+    return (
+        ~foreign
+        & ~np.isnan(recent_growth)
+        & ((recent_growth >= min_growth_percent) | protected)
+        & (np.isnan(previous_growth) | (previous_growth >= min_growth_percent) | protected)
+    )
+
+
+def institutional_accumulation_mask(df: pd.DataFrame, settings: Dict[str, Any]) -> np.ndarray:
+    """Return which rows pass the institutional accumulation iteration (every row; it only marks accumulation)."""
+    return np.ones(len(df), dtype=bool)
+
+
+# the filter and outfile columns of each iteration, in screen order
+iteration_filters = {
+    "liquidity": (liquidity_mask, liquidity_columns),
+    "trend": (trend_mask, trend_columns),
+    "revenue_growth": (revenue_growth_mask, revenue_growth_columns),
+    "institutional_accumulation": (institutional_accumulation_mask, institutional_accumulation_columns),
+}
+
+
+def prepare_metrics(relative_strengths: pd.DataFrame, metrics: pd.DataFrame) -> pd.DataFrame:
+    """Join relative strength rows with their raw metrics and derive the columns used by filters."""
+    df = relative_strengths.drop(
+        columns=[column for column in metrics if (column != "Symbol") and (column in relative_strengths)]
+    ).merge(metrics, on="Symbol", how="left")
+
+    for iteration, columns in iteration_metrics.items():
+        df[fetched_column(iteration)] = df[fetched_column(iteration)].fillna(False).astype(bool)
+
+        for column in columns:
+            if column != "Foreign Stock":
+                df[column] = pd.to_numeric(df[column], errors="coerce")
+
+    df["Price"] = pd.to_numeric(df["Price"], errors="coerce")
+    df["Market Cap"] = pd.to_numeric(df["Market Cap"].replace("", None), errors="coerce")
+    df["% Below 52-week High"] = 100 * (df["52-week High"] - df["Price"]) / df["52-week High"]
+    df["Net Institutional Inflows"] = df["Inflows"] - df["Outflows"]
+
+    return df
+
+
+def apply_filters(
+    relative_strengths: pd.DataFrame, metrics: pd.DataFrame, settings: Dict[str, Any]
+) -> Tuple[Dict[str, pd.DataFrame], Dict[str, List[str]]]:
+    """Apply each iteration's criteria in screen order to raw metrics, without fetching any data.
+    Returns the rows which passed each iteration, and the symbols which reached an iteration
+    whose data was never fetched for them (these are left out)."""
+    df = prepare_metrics(relative_strengths, metrics)
+    passed = {}
+    unfetched = {}
+
+    for iteration, (mask, columns) in iteration_filters.items():
+        fetched = df[fetched_column(iteration)]
+        unfetched[iteration] = df.loc[~fetched, "Symbol"].tolist()
+        df = df[fetched.to_numpy() & mask(df, settings)]
+
+        screened_df = df[columns].reset_index(drop=True)
+
+        if "Revenue Growth % (previous Q)" in columns:
+            screened_df["Revenue Growth % (previous Q)"] = (
+                screened_df["Revenue Growth % (previous Q)"].astype(object).where(
+                    screened_df["Revenue Growth % (previous Q)"].notna(), "N/A"
+                )
+            )
+
+        passed[iteration] = screened_df
+
+    return passed, unfetched
@@ -0,0 +1,182 @@
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from threading import Lock
+from typing import Callable, Dict, Iterator, List
+from termcolor import colored
+from .metrics import metrics
+from ...settings import (
+    circuit_failure_threshold,
+    circuit_cooldown,
+    adaptive_timeout_multiplier,
+    min_source_timeout,
+)
+
+# circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a data source whose circuit breaker is open."""
+
+
+class SourceHealth:
+    """Track the latency and failures of a single data source. Timeouts are derived from observed p95 latency,
+    and a circuit breaker opens after consecutive failures so that requests fail fast until a probe succeeds."""
+
+    def __init__(
+        self,
+        name: str,
+        default_timeout: float,
+        min_timeout: float = min_source_timeout,
+        multiplier: float = adaptive_timeout_multiplier,
+        failure_threshold: int = circuit_failure_threshold,
+        cooldown: float = circuit_cooldown,
+        window: int = 100,
+        min_samples: int = 10,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.default_timeout = default_timeout
+        self.min_timeout = min(min_timeout, default_timeout)
+        self.multiplier = multiplier
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.clock = clock
+
+        self.lock = Lock()
+        self.latencies = deque(maxlen=window)
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.successes = 0
+        self.failures = 0
+        self.rejections = 0
+
+    def p95(self) -> float:
+        """Return the 95th percentile of recently observed latencies (or None if too few were observed)."""
+        with self.lock:
+            if len(self.latencies) < self.min_samples:
+                return None
+
+            ordered = sorted(self.latencies)
+
+        return ordered[math.ceil(0.95 * len(ordered)) - 1]
+
+    def timeout(self) -> float:
+        """Return a timeout which adapts to the source's p95 latency, bounded by the minimum and default timeouts."""
+        p95 = self.p95()
+
+        if p95 is None:
+            return self.default_timeout
+
+        return max(self.min_timeout, min(self.default_timeout, p95 * self.multiplier))
+
+    def allow_request(self) -> bool:
+        """Return 'True' if a request may be sent. While the circuit is open, a single probe request is let
+        through once the cooldown has elapsed."""
+        with self.lock:
+            if self.state == CLOSED:
+                return True
+
+            if (self.state == OPEN) and (self.clock() - self.opened_at >= self.cooldown):
+                self.state = HALF_OPEN
+
+            if (self.state == HALF_OPEN) and not self.probing:
+                self.probing = True
+                return True
+
+            self.rejections += 1
+
+        metrics.increment("source_requests_total", source=self.name, outcome="short_circuited")
+        return False
+
+    def record_success(self, latency: float) -> None:
+        """Record a successful request and close the circuit."""
+        metrics.increment("source_requests_total", source=self.name, outcome="success")
+        metrics.observe("source_request_seconds", latency, source=self.name, outcome="success")
+
+        with self.lock:
+            self.latencies.append(latency)
+            self.successes += 1
+            self.consecutive_failures = 0
+            self.state = CLOSED
+            self.probing = False
+
+    def record_failure(self, latency: float = None) -> None:
+        """Record a failed request (and its latency, if known), opening the circuit after too many consecutive
+        failures or a failed probe."""
+        metrics.increment("source_requests_total", source=self.name, outcome="failure")
+
+        if latency is not None:
+            metrics.observe("source_request_seconds", latency, source=self.name, outcome="failure")
+
+        with self.lock:
+            self.failures += 1
+            self.consecutive_failures += 1
+
+            if (self.state == HALF_OPEN) or (self.consecutive_failures >= self.failure_threshold):
+                self.state = OPEN
+                self.opened_at = self.clock()
+
+            self.probing = False
+
+    @contextmanager
+    def track(self) -> Iterator[float]:
+        """Guard a request to this source. Yields the timeout to use, records the outcome and latency,
+        and raises 'CircuitOpenError' without running the request if the circuit is open."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} is unavailable (circuit open)")
+
+        start = time.perf_counter()
+
+        try:
+            yield self.timeout()
+        except Exception:
+            self.record_failure(time.perf_counter() - start)
+            raise
+
+        self.record_success(time.perf_counter() - start)
+
+    def summary(self) -> str:
+        """Return a one-line colored summary of the source's health."""
+        p95 = self.p95()
+        p95_text = "n/a" if (p95 is None) else f"{p95:.2f} sec"
+        state_color = "green" if (self.state == CLOSED) else "red"
+
+        return " ".join(
+            [
+                colored(f"{self.name}:", "dark_grey"),
+                colored(f"{self.successes} ok, {self.failures} failed, {self.rejections} short-circuited,", "light_grey"),
+                colored(f"p95 latency {p95_text}, timeout {self.timeout():.1f} sec,", "light_grey"),
+                colored(f"circuit {self.state}", state_color),
+            ]
+        )
+
+
+# data source health shared by all screen iterations
+sources: Dict[str, SourceHealth] = {}
+sources_lock = Lock()
+
+
+def source_health(name: str, default_timeout: float) -> SourceHealth:
+    """Return the health tracker for a data source, creating it with the given default timeout if necessary."""
+    with sources_lock:
+        if name not in sources:
+            sources[name] = SourceHealth(name, default_timeout)
+
+        return sources[name]
+
+
+def print_source_health(names: List[str]) -> None:
+    """Print a health summary for each named data source that was used."""
+    for name in names:
+        if name in sources:
+            print(sources[name].summary())
+
+    print()
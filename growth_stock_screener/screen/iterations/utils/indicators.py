@@ -0,0 +1,287 @@
+import copy
+import os
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import List
+from .cache import json_directory
+from .locking import atomic_writer
+
+# file holding the indicator state saved by the relative strength iteration
+indicator_state_name = "indicator_state"
+
+# trading days per year (the longest window of any indicator)
+year = 252
+sma_windows = (10, 20, 50, 200)
+volume_window = 50
+
+# offsets (trading days before the latest bar) of the prices which start and end each RS quarter
+rs_anchors = ((251, 189), (188, 126), (125, 63), (62, 0))
+rs_weights = (0.2, 0.2, 0.2, 0.4)
+
+
+def indicator_state_path() -> str:
+    return os.path.join(json_directory(), f"{indicator_state_name}.npz")
+
+
+class IndicatorState:
+    """Fixed-window indicators for a universe of symbols, updated in O(symbols) per new trading day.
+    Closing prices for the past year are kept in a ring buffer (which also holds the RS quarter anchor prices),
+    rolling sums and missing-value counts give the 10/20/50/200-day SMAs and 50-day average volume,
+    and a monotonic deque per symbol gives the 52-week high."""
+
+    def __init__(self, symbols: List[str], bars: int = 0):
+        count = len(symbols)
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.bars = bars  # number of trading days appended so far
+        self.dates = np.full(year, np.datetime64("NaT"), dtype="datetime64[ns]")
+        self.closes = np.full((year, count), np.nan)
+        self.volumes = np.full((volume_window, count), np.nan)
+        self.first_bar = np.full(count, -1)  # first trading day with a closing price (-1 if none yet)
+
+        # empty slots count as missing values, so each window starts out fully missing
+        self.close_sums = {window: np.zeros(count) for window in sma_windows}
+        self.close_gaps = {window: np.full(count, window) for window in sma_windows + (year,)}
+        self.volume_sum = np.zeros(count)
+        self.volume_gaps = np.full(count, volume_window)
+
+        # (bar, close) pairs with decreasing closes; the front holds the highest close of the past year
+        self.highs = [deque() for _ in self.symbols]
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def last_date(self) -> pd.Timestamp:
+        """Return the date of the latest bar (or None if no bars have been appended)."""
+        return None if (self.bars == 0) else pd.Timestamp(self.dates[(self.bars - 1) % year])
+
+    def append(self, date: pd.Timestamp, close: np.ndarray, volume: np.ndarray) -> None:
+        """Append one trading day's closing prices and volumes (one value per symbol, NaN if missing)."""
+        close = np.asarray(close, dtype=float)
+        volume = np.asarray(volume, dtype=float)
+        position = self.bars % year
+        close_missing = np.isnan(close)
+
+        # update each window with the entering value and the value leaving it
+        for window in sma_windows:
+            leaving = self.closes[(self.bars - window) % year]
+            self.close_sums[window] += np.nan_to_num(close) - np.nan_to_num(leaving)
+
+        for window in sma_windows + (year,):
+            leaving = self.closes[(self.bars - window) % year]
+            self.close_gaps[window] += close_missing.astype(int) - np.isnan(leaving)
+
+        volume_position = self.bars % volume_window
+        leaving_volume = self.volumes[volume_position]
+        self.volume_sum += np.nan_to_num(volume) - np.nan_to_num(leaving_volume)
+        self.volume_gaps += np.isnan(volume).astype(int) - np.isnan(leaving_volume)
+
+        self.closes[position] = close
+        self.volumes[volume_position] = volume
+        self.dates[position] = np.datetime64(pd.Timestamp(date).tz_localize(None), "ns")
+        self.first_bar[(self.first_bar == -1) & ~close_missing] = self.bars
+
+        # maintain the monotonic deques of symbols which traded
+        expired = self.bars - year
+
+        for i in np.flatnonzero(~close_missing):
+            highs = self.highs[i]
+            price = close[i]
+
+            while highs and (highs[-1][1] <= price):
+                highs.pop()
+
+            highs.append((self.bars, price))
+
+        for highs in self.highs:
+            while highs and (highs[0][0] <= expired):
+                highs.popleft()
+
+        self.bars += 1
+
+        # recompute rolling sums exactly once per year to keep floating-point error from accumulating
+        if self.bars % year == 0:
+            self.recompute()
+
+    def recompute(self) -> None:
+        """Recompute rolling sums from the ring buffers."""
+        for window in sma_windows:
+            self.close_sums[window] = np.nansum(self.window(window), axis=0)
+
+        self.volume_sum = np.nansum(self.volumes, axis=0)
+
+    def window(self, length: int) -> np.ndarray:
+        """Return the closing prices of the latest 'length' trading days (oldest first)."""
+        positions = [(self.bars - length + i) % year for i in range(length)]
+        return self.closes[positions]
+
+    def close_at(self, offset: int) -> np.ndarray:
+        """Return each symbol's closing price 'offset' trading days before the latest bar."""
+        if offset >= min(self.bars, year):
+            return np.full(len(self.symbols), np.nan)
+
+        return self.closes[(self.bars - 1 - offset) % year]
+
+    def sma(self, window: int) -> np.ndarray:
+        """Return each symbol's simple moving average (NaN unless a price is present for every day in the window)."""
+        return np.where(self.close_gaps[window] == 0, self.close_sums[window] / window, np.nan)
+
+    def average_volume(self) -> np.ndarray:
+        """Return each symbol's 50-day average volume (NaN unless every day in the window has a volume)."""
+        return np.where(self.volume_gaps == 0, self.volume_sum / volume_window, np.nan)
+
+    def high_52_week(self) -> np.ndarray:
+        """Return each symbol's highest close of the past year (NaN unless every day in the year has a price)."""
+        highs = np.array([highs[0][1] if highs else np.nan for highs in self.highs])
+        return np.where(self.close_gaps[year] == 0, highs, np.nan)
+
+    def trading_days(self) -> np.ndarray:
+        """Return the number of trading days since each symbol's first closing price."""
+        return np.where(self.first_bar >= 0, self.bars - self.first_bar, 0)
+
+    def relative_strength_raw(self) -> np.ndarray:
+        """Return each symbol's raw relative strength from its quarter anchor prices (see 'relative_strength')."""
+        rs_raw = np.zeros(len(self.symbols))
+
+        for weight, (start, end) in zip(rs_weights, rs_anchors):
+            start_price = self.close_at(start)
+            rs_raw += weight * 100 * (self.close_at(end) - start_price) / start_price
+
+        return rs_raw
+
+    def frame(self) -> pd.DataFrame:
+        """Return every indicator as a DataFrame with one row per symbol."""
+        return pd.DataFrame(
+            {
+                "Price": self.close_at(0),
+                "10-day SMA": self.sma(10),
+                "20-day SMA": self.sma(20),
+                "50-day SMA": self.sma(50),
+                "200-day SMA": self.sma(200),
+                "52-week High": self.high_52_week(),
+                "50-day Average Volume": self.average_volume(),
+                "RS (raw)": self.relative_strength_raw(),
+            },
+            index=pd.Index(self.symbols, name="Symbol"),
+        )
+
+    def copy(self) -> "IndicatorState":
+        """Return an independent copy of the state."""
+        return copy.deepcopy(self)
+
+    def update(self, close: pd.DataFrame, volume: pd.DataFrame) -> int:
+        """Append every bar dated after the latest bar from date x symbol tables. Returns the number of bars appended."""
+        last_date = self.last_date()
+        close = close.reindex(columns=self.symbols)
+        volume = volume.reindex(index=close.index, columns=self.symbols)
+        appended = 0
+
+        for date, row in close.iterrows():
+            if (last_date is not None) and (pd.Timestamp(date).tz_localize(None) <= last_date):
+                continue
+
+            self.append(date, row.to_numpy(dtype=float), volume.loc[date].to_numpy(dtype=float))
+            appended += 1
+
+        return appended
+
+    @classmethod
+    def from_history(cls, close: pd.DataFrame, volume: pd.DataFrame) -> "IndicatorState":
+        """Build the state of every symbol in a date x symbol history."""
+        state = cls(list(close.columns))
+        state.update(close, volume)
+        return state
+
+    def backfill(self, close: pd.DataFrame, volume: pd.DataFrame) -> None:
+        """Add new symbols from a date x symbol history, replaying the bars of the past year aligned to this state's dates."""
+        symbols = [symbol for symbol in close.columns if symbol not in self]
+
+        if (len(symbols) == 0) or (self.bars == 0):
+            return
+
+        # replay only the past year, starting at the same bar number so that ring buffer positions line up
+        length = min(self.bars, year)
+        dates = pd.DatetimeIndex(self.dates[[(self.bars - length + i) % year for i in range(length)]])
+        close = close[symbols].set_axis(pd.DatetimeIndex(close.index).tz_localize(None))
+        volume = volume.reindex(columns=symbols).set_axis(pd.DatetimeIndex(volume.index).tz_localize(None))
+
+        # count the trading days since each symbol's first price, which may be before the replayed year
+        history = close.loc[: dates[-1]]
+        trading_days = (history.notna().cumsum() > 0).sum().to_numpy()
+
+        close = close.reindex(dates)
+        volume = volume.reindex(dates)
+        other = IndicatorState(symbols, bars=self.bars - length)
+
+        for date in dates:
+            other.append(date, close.loc[date].to_numpy(dtype=float), volume.loc[date].to_numpy(dtype=float))
+
+        other.first_bar = np.where(trading_days > 0, self.bars - trading_days, -1)
+        self.merge(other)
+
+    def merge(self, other: "IndicatorState") -> None:
+        """Add the symbols of another state which is aligned to the same bars."""
+        self.symbols += other.symbols
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.closes = np.concatenate([self.closes, other.closes], axis=1)
+        self.volumes = np.concatenate([self.volumes, other.volumes], axis=1)
+        self.first_bar = np.concatenate([self.first_bar, other.first_bar])
+        self.volume_sum = np.concatenate([self.volume_sum, other.volume_sum])
+        self.volume_gaps = np.concatenate([self.volume_gaps, other.volume_gaps])
+        self.highs += other.highs
+
+        for window in sma_windows:
+            self.close_sums[window] = np.concatenate([self.close_sums[window], other.close_sums[window]])
+
+        for window in self.close_gaps:
+            self.close_gaps[window] = np.concatenate([self.close_gaps[window], other.close_gaps[window]])
+
+    def save(self) -> None:
+        """Save the state in the json directory (replacing the saved state atomically)."""
+        # store the monotonic deques as one flat array with per-symbol lengths
+        high_lengths = np.array([len(highs) for highs in self.highs])
+        high_entries = np.array([entry for highs in self.highs for entry in highs], dtype=float).reshape(-1, 2)
+
+        with atomic_writer(indicator_state_path(), "wb") as f:
+            np.savez_compressed(
+                f,
+                symbols=np.array(self.symbols, dtype=str),
+                bars=self.bars,
+                dates=self.dates,
+                closes=self.closes,
+                volumes=self.volumes,
+                first_bar=self.first_bar,
+                volume_sum=self.volume_sum,
+                volume_gaps=self.volume_gaps,
+                high_lengths=high_lengths,
+                high_entries=high_entries,
+                **{f"close_sum_{window}": self.close_sums[window] for window in sma_windows},
+                **{f"close_gaps_{window}": self.close_gaps[window] for window in self.close_gaps},
+            )
+
+
+def open_indicator_state() -> IndicatorState:
+    """Open the saved indicator state (or None if none has been saved)."""
+    if not os.path.exists(indicator_state_path()):
+        return None
+
+    with np.load(indicator_state_path()) as store:
+        state = IndicatorState(store["symbols"].tolist(), bars=int(store["bars"]))
+        state.dates = store["dates"]
+        state.closes = store["closes"]
+        state.volumes = store["volumes"]
+        state.first_bar = store["first_bar"]
+        state.volume_sum = store["volume_sum"]
+        state.volume_gaps = store["volume_gaps"]
+        state.close_sums = {window: store[f"close_sum_{window}"] for window in sma_windows}
+        state.close_gaps = {window: store[f"close_gaps_{window}"] for window in sma_windows + (year,)}
+
+        entries = store["high_entries"]
+        ends = np.cumsum(store["high_lengths"])
+        starts = ends - store["high_lengths"]
+        state.highs = [
+            deque((int(bar), price) for bar, price in entries[start:end]) for start, end in zip(starts, ends)
+        ]
+
+    return state
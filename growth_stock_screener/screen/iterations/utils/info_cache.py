@@ -0,0 +1,106 @@
+import os
+import json
+import pandas as pd
+import yfinance as yf
+from threading import Lock
+from multiprocessing.pool import ThreadPool
+from typing import Any, Dict, List
+from tqdm import tqdm
+from .cache import json_directory
+from .locking import atomic_writer, file_lock
+from .metrics import track_request, record_cache_lookup
+from .tracing import trace_span
+from ...settings import info_ttl, info_concurrency
+
+# file holding the Yahoo Finance info of each symbol, shared by every report
+info_cache_name = "yahoo_info"
+
+
+def info_cache_path() -> str:
+    return os.path.join(json_directory(), f"{info_cache_name}.json")
+
+
+class InfoCache:
+    """Yahoo Finance info (fundamentals, as returned by 'yf.Ticker(symbol).info') of each symbol, with when it was
+    fetched. Info is reused until it is 'ttl' days old. The cache is shared by every report, so saving merges this
+    process's changes into the saved cache."""
+
+    def __init__(self, entries: Dict[str, Dict[str, Any]] = None, ttl: float = info_ttl):
+        self.entries = dict(entries or {})
+        self.ttl = ttl
+        self.changed = set()  # symbols fetched since the cache was opened
+        self.lock = Lock()
+
+    def get(self, symbol: str) -> Dict[str, Any]:
+        """Return a symbol's info (or None if it isn't cached or has gone stale)."""
+        entry = self.entries.get(symbol, None)
+        fresh = (entry is not None) and (pd.Timestamp.now() - pd.Timestamp(entry["fetched"]) < pd.Timedelta(days=self.ttl))
+        record_cache_lookup("yahoo_info", fresh)
+
+        return entry["info"] if fresh else None
+
+    def add(self, symbol: str, info: Dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[symbol] = {"fetched": f"{pd.Timestamp.now():%Y-%m-%d %H:%M:%S}", "info": info}
+            self.changed.add(symbol)
+
+    def save(self) -> None:
+        """Merge the entries fetched since the cache was opened into the saved cache (locking it, so that concurrent
+        reports don't lose each other's entries) and save entries which are still fresh in the json directory."""
+        with file_lock(info_cache_path()):
+            saved = read_info_cache_entries()
+
+            with self.lock:
+                for symbol in self.changed:
+                    saved[symbol] = self.entries[symbol]
+
+                self.entries = saved
+                self.changed = set()
+                oldest = pd.Timestamp.now() - pd.Timedelta(days=self.ttl)
+                entries = {symbol: entry for symbol, entry in saved.items() if pd.Timestamp(entry["fetched"]) > oldest}
+
+            with atomic_writer(info_cache_path()) as f:
+                json.dump(entries, f, sort_keys=True, default=str)
+
+
+def read_info_cache_entries() -> Dict[str, Dict[str, Any]]:
+    """Read the entries of the saved info cache (empty if none has been saved)."""
+    try:
+        with open(info_cache_path(), "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {}
+
+
+def open_info_cache() -> InfoCache:
+    """Open the saved info cache (or an empty cache if none has been saved)."""
+    return InfoCache(read_info_cache_entries())
+
+
+def fetch_info(symbol: str) -> Dict[str, Any]:
+    """Fetch a symbol's info from Yahoo Finance (or None if the request failed)."""
+    try:
+        with trace_span("yahoo info", "fetch", symbol=symbol), track_request("yahoo_info"):
+            return yf.Ticker(symbol).info
+    except Exception:
+        return None
+
+
+def fetch_all_info(symbols: List[str], cache: InfoCache = None, concurrency: int = info_concurrency) -> Dict[str, Dict[str, Any]]:
+    """Return the Yahoo Finance info of each symbol (None for symbols whose info couldn't be fetched). Fresh info is
+    read from the cache, and the rest is fetched by up to 'concurrency' threads and added to the cache."""
+    cache = cache or open_info_cache()
+    infos = {symbol: cache.get(symbol) for symbol in symbols}
+    missing = [symbol for symbol, info in infos.items() if info is None]
+
+    if len(missing) > 0:
+        with ThreadPool(max(1, min(concurrency, len(missing)))) as pool:
+            for symbol, info in zip(missing, tqdm(pool.imap(fetch_info, missing), total=len(missing))):
+                infos[symbol] = info
+
+                if info is not None:
+                    cache.add(symbol, info)
+
+        cache.save()
+
+    return infos
@@ -0,0 +1,73 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+try:
+    import fcntl
+
+    def lock_file(f: IO) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+
+    def unlock_file(f: IO) -> None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+except ImportError:  # Windows
+    import msvcrt
+
+    def lock_file(f: IO) -> None:
+        # LK_LOCK gives up after 10 seconds, so keep retrying until the lock is acquired
+        while True:
+            try:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                continue
+
+    def unlock_file(f: IO) -> None:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Hold an exclusive advisory lock on a file (using '<path>.lock') across processes and threads.
+    Readers and writers of files shared by concurrent screens take this lock around read-modify-write cycles."""
+    directory = os.path.dirname(path)
+
+    # Create the lock file's directory if it doesn't exist
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    with open(f"{path}.lock", "a+") as f:
+        lock_file(f)
+
+        try:
+            yield
+        finally:
+            unlock_file(f)
+
+
+@contextmanager
+def atomic_writer(path: str, mode: str = "w") -> Iterator[IO]:
+    """Open a temporary file which replaces the file at 'path' once it has been completely written,
+    so that other processes never read a partially written file."""
+    directory = os.path.dirname(path)
+
+    # Create the file's directory if it doesn't exist
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+    try:
+        with open(temporary_path, mode) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(temporary_path, path)
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
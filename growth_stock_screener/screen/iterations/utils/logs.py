@@ -1,5 +1,7 @@
 from termcolor import colored, cprint
 from typing import Dict
+from .events import Event, SKIPPED, INFO, VALUES
+from .metrics import metrics
 
 
 def heading_icon(color: str) -> str:
@@ -8,9 +10,17 @@ def heading_icon(color: str) -> str:
 
 
 def print_status(
-    process: str, stage: int, starting: bool, elapsed_seconds: float = None
+    process: str, stage: int, starting: bool, elapsed_seconds: float = None, symbols: int = None
 ) -> None:
-    """Print a header or footer for each screen iteration. Setting 'starting' to 'True' prints a header; prints a footer otherwise."""
+    """Print a header or footer for each screen iteration. Setting 'starting' to 'True' prints a header; prints a footer otherwise.
+    Footers record the iteration's duration (and its throughput, if the number of symbols it processed is given)."""
+    if not starting:
+        metrics.set_gauge("stage_seconds", elapsed_seconds, stage=process)
+
+        if symbols is not None:
+            metrics.set_gauge("stage_symbols", symbols, stage=process)
+            metrics.set_gauge("stage_symbols_per_second", symbols / max(elapsed_seconds, 1e-9), stage=process)
+
     if starting:
         print(
             heading_icon("blue"),
@@ -60,19 +70,24 @@ def print_divider() -> None:
     )
 
 
-def skip_message(symbol: str, message: str) -> str:
-    """Return a custom message logging screening errors."""
-    return colored(f"\nSkipping {symbol} ({message}) . . .\n", "red")
+def skip_message(symbol: str, message: str) -> Event:
+    """Return an event logging screening errors."""
+    return Event(symbol, SKIPPED, str(message))
+
+
+def filter_message(symbol: str) -> Event:
+    """Return an event for logging when a stock is filtered out by a screen."""
+    return Event(symbol, "filtered", template="{symbol} filtered out.", color="dark_grey")
 
 
-def filter_message(symbol: str) -> str:
-    """Return a custom message for logging when a stock is filtered out by a screen."""
-    return colored(f"\n{symbol} filtered out.\n", "dark_grey")
+def message(message: str, color: str = None, symbol: str = None) -> Event:
+    """Return a custom event for logging purposes."""
+    return Event(symbol, INFO, message, color=color)
 
 
-def message(message: str) -> str:
-    """Return a custom message for logging purposes."""
-    return f"\n{message}\n"
+def values_message(symbol: str, template: str, **values) -> Event:
+    """Return an event logging the values a symbol was evaluated on ('template' formats them for the console)."""
+    return Event(symbol, VALUES, values=values, template=template)
 
 
 def print_done_message(elapsed_seconds: float, outfile_name: str) -> None:
@@ -0,0 +1,238 @@
+import os
+import json
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from threading import Lock
+from typing import Any, Dict, Iterator, List, Tuple
+from .locking import atomic_writer
+
+# upper bounds (seconds) of latency histogram buckets
+latency_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+# prefix of every metric name in Prometheus text format
+metric_prefix = "screener_"
+
+# files written in each run directory
+metrics_json_name = "metrics.json"
+metrics_prometheus_name = "metrics.prom"
+
+metric_descriptions = {
+    "source_requests_total": "Requests sent to each data source, by outcome.",
+    "source_request_seconds": "Latency of requests to each data source, by outcome.",
+    "cache_requests_total": "Cache lookups, by cache and result (hit or miss).",
+    "stage_events_total": "Log events of each iteration, by outcome.",
+    "stage_seconds": "Duration of each iteration.",
+    "stage_symbols": "Symbols processed by each iteration.",
+    "stage_symbols_per_second": "Throughput of each iteration.",
+    "driver_start_seconds": "Time taken to start a browser instance.",
+    "parse_seconds": "Time taken to parse a fetched document.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Counts of observed values in fixed buckets, along with their sum."""
+
+    def __init__(self, buckets: Tuple[float, ...] = latency_buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last bucket holds values above every bound
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> List[Tuple[str, int]]:
+        """Return (upper bound, number of values at or below it) pairs, ending with "+Inf"."""
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        totals = []
+        total = 0
+
+        for bound, count in zip(bounds, self.counts):
+            total += count
+            totals.append((bound, total))
+
+        return totals
+
+    def quantile(self, q: float) -> float:
+        """Return the upper bound of the bucket holding the given quantile (None if nothing was observed,
+        or if the quantile lies above every bound)."""
+        rank = q * self.count
+        total = 0
+
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+
+            if (self.count > 0) and (total >= rank):
+                return bound
+
+        return None
+
+
+def label_key(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def format_labels(labels: Labels, extra: Dict[str, str] = None) -> str:
+    """Return labels in Prometheus text format (e.g. '{source="cnbc",outcome="success"}')."""
+    pairs = list(labels) + list((extra or {}).items())
+
+    if len(pairs) == 0:
+        return ""
+
+    escaped = [(name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for name, value in pairs]
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and latency histograms, each identified by a name and a set of labels
+    (such as the data source, iteration or outcome). Written as JSON and Prometheus text at the end of a screen."""
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.lock = Lock()
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        """Add to a counter."""
+        key = label_key(labels)
+
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        with self.lock:
+            self.gauges.setdefault(name, {})[label_key(labels)] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Add a value (such as a latency in seconds) to a histogram."""
+        key = label_key(labels)
+
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+
+            if key not in series:
+                series[key] = Histogram()
+
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observe the time taken by a block of code in a histogram."""
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def counter_value(self, name: str, **labels) -> float:
+        with self.lock:
+            return self.counters.get(name, {}).get(label_key(labels), 0)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.counters = {}
+            self.gauges = {}
+            self.histograms = {}
+
+    def to_dict(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Return every metric as JSON-serializable records."""
+        with self.lock:
+            return {
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for name, series in sorted(self.counters.items())
+                    for labels, value in sorted(series.items())
+                ],
+                "gauges": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for name, series in sorted(self.gauges.items())
+                    for labels, value in sorted(series.items())
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "p50": histogram.quantile(0.5),
+                        "p95": histogram.quantile(0.95),
+                        "buckets": dict(histogram.cumulative_counts()),
+                    }
+                    for name, series in sorted(self.histograms.items())
+                    for labels, histogram in sorted(series.items())
+                ],
+            }
+
+    def to_prometheus(self) -> str:
+        """Return every metric in Prometheus text exposition format."""
+        lines = []
+
+        def header(name: str, kind: str) -> None:
+            lines.append(f"# HELP {metric_prefix}{name} {metric_descriptions.get(name, name)}")
+            lines.append(f"# TYPE {metric_prefix}{name} {kind}")
+
+        with self.lock:
+            for kind, series_by_name in [("counter", self.counters), ("gauge", self.gauges)]:
+                for name, series in sorted(series_by_name.items()):
+                    header(name, kind)
+
+                    for labels, value in sorted(series.items()):
+                        lines.append(f"{metric_prefix}{name}{format_labels(labels)} {value}")
+
+            for name, series in sorted(self.histograms.items()):
+                header(name, "histogram")
+
+                for labels, histogram in sorted(series.items()):
+                    for bound, total in histogram.cumulative_counts():
+                        lines.append(f"{metric_prefix}{name}_bucket{format_labels(labels, {'le': bound})} {total}")
+
+                    lines.append(f"{metric_prefix}{name}_sum{format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{metric_prefix}{name}_count{format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def save(self, directory: str = None) -> str:
+        """Write the metrics as JSON and Prometheus text files in a directory (by default, the run's outfile directory)
+        and return the path of the JSON file."""
+        from .cache import run_directory
+
+        directory = directory or run_directory()
+        json_path = os.path.join(directory, metrics_json_name)
+
+        with atomic_writer(json_path) as f:
+            json.dump(self.to_dict(), f, indent=2, default=str)
+
+        with atomic_writer(os.path.join(directory, metrics_prometheus_name)) as f:
+            f.write(self.to_prometheus())
+
+        return json_path
+
+
+# metrics shared by every iteration and data source of a screen
+metrics = MetricsRegistry()
+
+
+@contextmanager
+def track_request(source: str) -> Iterator[None]:
+    """Record the outcome and latency of a request to a data source which has no health tracker."""
+    start = time.perf_counter()
+    outcome = "failure"
+
+    try:
+        yield
+        outcome = "success"
+    finally:
+        metrics.increment("source_requests_total", source=source, outcome=outcome)
+        metrics.observe("source_request_seconds", time.perf_counter() - start, source=source, outcome=outcome)
+
+
+def record_cache_lookup(cache: str, hit: bool, **labels) -> None:
+    metrics.increment("cache_requests_total", cache=cache, result="hit" if hit else "miss", **labels)
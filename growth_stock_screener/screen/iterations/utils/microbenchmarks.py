@@ -0,0 +1,165 @@
+import os
+import json
+import math
+import time
+import platform
+import subprocess
+import pandas as pd
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+from .calculations import percent_change, relative_strength
+from .sec_requests import extract_revenue, subtract_prev_quarters, find_most_updated, revenues_from_company_facts
+from .scraping import extract_float, extract_dollars
+from .skyrocket import calculate_skyrocket_score, score_universe
+from .analysis import price_metrics_frame
+from .price_matrix import PriceMatrix
+from .replay import ReplayElement
+from .synthetic import SyntheticUniverse
+from .benchmark import compare_to_baseline
+from .locking import atomic_writer
+
+# file holding the kernel timings of each commit they were measured at
+kernel_results_name = "kernel_benchmarks.json"
+
+# a kernel has regressed once its median duration exceeds the baseline by this fraction
+# (kernels take milliseconds, so there is no minimum slowdown in seconds as there is for whole screens)
+kernel_regression_tolerance = 0.25
+
+
+def kernel_benchmarks(batch: int = 1000, seed: int = 0) -> Dict[str, Callable[[], Any]]:
+    """Return a function running each compute kernel over a batch of symbols, with fixture data from a synthetic
+    universe of 'batch' symbols (so every run of the same batch size and seed evaluates the same data)."""
+    universe = SyntheticUniverse(
+        batch, seed=seed, missing_rate=0, young_rate=0, unresolved_rate=0, foreign_rate=0, no_cik_rate=0
+    )
+    close, volume = universe.price_history()
+    closes = close.to_numpy()
+    matrix = PriceMatrix.from_frames(close, volume)
+    histories = {symbol: matrix.history(symbol) for symbol in universe.symbols}
+
+    # quarter start and end prices of each symbol (as relative strength anchors them)
+    anchors = [closes[-offset - 1] for offset in (251, 189, 188, 126, 125, 63, 62, 0)]
+    quarters = list(zip(*anchors))
+
+    # revenue filings, as parsed from SEC companyfacts payloads
+    facts = [universe.company_facts(symbol)["facts"]["us-gaap"]["Revenues"]["units"]["USD"] for symbol in universe.symbols]
+    revenues = [revenues_from_company_facts(symbol, {"Revenues": {"units": {"USD": rows}}}) for symbol, rows in zip(universe.symbols, facts)]
+    concepts = [[rows[:-2], rows, rows[:-1]] for rows in facts]
+    annual_frame = revenues[0]["frame"][~revenues[0]["frame"].str.contains("Q")].iloc[-1]
+    quarter_frame = revenues[0]["frame"].iloc[-1]
+
+    # scraped element texts
+    volumes = [ReplayElement(f"{volume:,.0f}") for volume in universe.average_volume]
+    dollars = [ReplayElement(text) for symbol in universe.symbols for text in universe.marketbeat_elements(symbol).values()]
+
+    # screened rows and Yahoo Finance info of each symbol
+    rows = [{"Symbol": symbol, "RS": 50 + (i % 50)} for i, symbol in enumerate(universe.symbols)]
+    infos = [
+        {
+            "revenueGrowth": universe.revenue_growth[i],
+            "currentPrice": float(universe.last_price[i]),
+            "institutionsPercentHeld": (i % 40) / 100,
+        }
+        for i in range(batch)
+    ]
+
+    return {
+        "percent_change": lambda: [percent_change(start, end) for prices in quarters for start, end in zip(prices[::2], prices[1::2])],
+        "relative_strength": lambda: [relative_strength(*prices) for prices in quarters],
+        "extract_revenue": lambda: [extract_revenue(quarter_frame, df) for df in revenues],
+        "subtract_prev_quarters": lambda: [subtract_prev_quarters(annual_frame, df) for df in revenues],
+        "find_most_updated": lambda: [find_most_updated(concept) for concept in concepts],
+        "extract_float": lambda: [extract_float(element) for element in volumes],
+        "extract_dollars": lambda: [extract_dollars(element) for element in dollars],
+        "calculate_skyrocket_score": lambda: [
+            calculate_skyrocket_score(row, info, histories[row["Symbol"]]) for row, info in zip(rows, infos)
+        ],
+        "price_metrics_frame": lambda: price_metrics_frame(matrix, universe.symbols).to_dict("records"),
+        "skyrocket_scores": lambda: score_universe(matrix, universe.symbols, [row["RS"] for row in rows], infos)[0][
+            "Skyrocket Score"
+        ].tolist(),
+    }
+
+
+def time_kernels(kernels: Dict[str, Callable[[], Any]], repeats: int = 5, min_seconds: float = 0.05) -> List[Dict[str, float]]:
+    """Return the seconds each kernel took to run over its batch in each repeat. Fast kernels run over their batch
+    several times per repeat (at least 'min_seconds' in total) to be timed precisely, and kernels are interleaved,
+    so drift in machine load affects each of them alike."""
+    loops = {}
+
+    for name, kernel in kernels.items():
+        start = time.perf_counter()
+        kernel()
+        loops[name] = max(1, math.ceil(min_seconds / max(time.perf_counter() - start, 1e-9)))
+
+    runs = []
+
+    for _ in range(repeats):
+        run = {}
+
+        for name, kernel in kernels.items():
+            start = time.perf_counter()
+
+            for _ in range(loops[name]):
+                kernel()
+
+            run[name] = (time.perf_counter() - start) / loops[name]
+
+        runs.append(run)
+
+    return runs
+
+
+def current_commit() -> str:
+    """Return the abbreviated hash of the checked out commit ('-dirty' if the tree has changes), or 'unknown'."""
+    try:
+        completed = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            timeout=10,
+        )
+        return completed.stdout.strip() or "unknown"
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+
+
+def open_kernel_results(path: str = kernel_results_name) -> Dict[str, Dict[str, Any]]:
+    """Open the kernel timings saved for each commit (empty if none were saved)."""
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_kernel_results(path: str, commit: str, kernels: Dict[str, float], **conditions) -> None:
+    """Save the median duration of each kernel at a commit (replacing earlier timings of the same commit)."""
+    results = open_kernel_results(path)
+    results[commit] = {
+        "date": datetime.now().isoformat(sep=" ", timespec="microseconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        **conditions,
+        "kernels": kernels,
+    }
+
+    with atomic_writer(path) as f:
+        json.dump(results, f, indent=2)
+
+
+def baseline_commit(results: Dict[str, Dict[str, Any]], commit: str) -> str:
+    """Return the most recently measured commit other than the given one (ignoring timings of trees with uncommitted
+    changes), or None. Changes not yet committed are compared against the commit they were made on."""
+    commits = [other for other in results if (other != commit) and not other.endswith("-dirty")]
+    return max(commits, key=lambda other: results[other]["date"], default=None)
+
+
+def compare_kernels(
+    runs: List[Dict[str, float]], baseline: Dict[str, float], tolerance: float = kernel_regression_tolerance
+) -> pd.DataFrame:
+    """Return the median duration of each kernel, its baseline duration and whether it regressed."""
+    comparison = compare_to_baseline(runs, baseline, tolerance=tolerance, min_seconds=0)
+    comparison.index.name = "Kernel"
+    return comparison
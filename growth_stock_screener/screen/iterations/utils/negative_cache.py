@@ -0,0 +1,132 @@
+import os
+import json
+import pandas as pd
+from threading import Lock
+from typing import Dict, List, Tuple
+from .cache import json_directory
+from .locking import atomic_writer, file_lock
+from .logs import skip_message
+from .metrics import metrics
+from ...settings import negative_cache_ttls
+
+# file holding symbols which cannot pass the screen for a known reason
+negative_cache_name = "negative_cache"
+
+# reasons a symbol cannot pass the screen
+NO_CIK = "no_cik"  # no SEC CIK, so revenue data can't be fetched
+FOREIGN_FILER = "foreign_filer"  # files 20-F reports instead of US-GAAP 10-Q reports
+TOO_YOUNG = "too_young"  # under a year of trading history (expires once the symbol has traded for a year)
+UNRESOLVED = "unresolved"  # no price data could be downloaded
+
+negative_cache_messages = {
+    NO_CIK: "no SEC CIK",
+    FOREIGN_FILER: "foreign stock",
+    TOO_YOUNG: "stock has not traded long enough",
+    UNRESOLVED: "no price data",
+}
+
+
+def negative_cache_path() -> str:
+    return os.path.join(json_directory(), f"{negative_cache_name}.json")
+
+
+class NegativeCache:
+    """Symbols which cannot pass the screen, each with a reason and an expiry date. Iterations consult
+    the cache before fetching data, and entries are kept until they expire (see 'negative_cache_ttls').
+    The cache is shared by every run, so saving merges this process's changes into the saved cache."""
+
+    def __init__(self, entries: Dict[str, Dict[str, str]] = None):
+        self.entries = dict(entries or {})
+        self.changed = set()  # symbols added or removed since the cache was opened
+        self.lock = Lock()
+
+    def add(self, symbol: str, reason: str, expires: pd.Timestamp = None) -> None:
+        """Record that a symbol cannot pass until its expiry date (by default, 'negative_cache_ttls' days from today)."""
+        if expires is None:
+            expires = pd.Timestamp.now().normalize() + pd.Timedelta(days=negative_cache_ttls[reason])
+
+        with self.lock:
+            self.entries[symbol] = {"reason": reason, "expires": f"{pd.Timestamp(expires):%Y-%m-%d}"}
+            self.changed.add(symbol)
+
+    def add_too_young(self, symbol: str, trading_days: int) -> None:
+        """Record a symbol without a year of trading history until it will have traded for 252 days."""
+        self.add(symbol, TOO_YOUNG, pd.Timestamp.now().normalize() + pd.offsets.BDay(max(1, 252 - int(trading_days))))
+
+    def remove(self, symbol: str) -> None:
+        with self.lock:
+            self.entries.pop(symbol, None)
+            self.changed.add(symbol)
+
+    def reason(self, symbol: str) -> str:
+        """Return why a symbol cannot pass (or None if it isn't cached or its entry has expired)."""
+        entry = self.entries.get(symbol, None)
+
+        if (entry is None) or (pd.Timestamp(entry["expires"]) <= pd.Timestamp.now()):
+            return None
+
+        return entry["reason"]
+
+    def partition(self, symbols: List[str], reasons: List[str]) -> Tuple[List[str], Dict[str, str]]:
+        """Split symbols into those to fetch and those cached with one of the given reasons (symbol -> reason)."""
+        remaining = []
+        skipped = {}
+
+        for symbol in symbols:
+            reason = self.reason(symbol)
+
+            if reason in reasons:
+                skipped[symbol] = reason
+            else:
+                remaining.append(symbol)
+
+        metrics.increment("cache_requests_total", len(skipped), cache="negative_cache", result="hit")
+        metrics.increment("cache_requests_total", len(remaining), cache="negative_cache", result="miss")
+        return remaining, skipped
+
+    def expires(self, symbol: str) -> str:
+        return self.entries[symbol]["expires"]
+
+    def save(self) -> None:
+        """Merge the entries changed since the cache was opened into the saved cache (locking it, so that
+        concurrent screens don't lose each other's entries) and save unexpired entries in the json directory."""
+        with file_lock(negative_cache_path()):
+            saved = read_negative_cache_entries()
+
+            with self.lock:
+                for symbol in self.changed:
+                    if symbol in self.entries:
+                        saved[symbol] = self.entries[symbol]
+                    else:
+                        saved.pop(symbol, None)
+
+                self.entries = saved
+                self.changed = set()
+                entries = {symbol: entry for symbol, entry in self.entries.items() if self.reason(symbol) is not None}
+
+            with atomic_writer(negative_cache_path()) as f:
+                json.dump(entries, f, indent=2, sort_keys=True)
+
+
+def read_negative_cache_entries() -> Dict[str, Dict[str, str]]:
+    """Read the entries of the saved negative cache (empty if none has been saved)."""
+    try:
+        with open(negative_cache_path(), "r") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError):
+        return {}
+
+
+def open_negative_cache() -> NegativeCache:
+    """Open the saved negative cache (or an empty cache if none has been saved)."""
+    return NegativeCache(read_negative_cache_entries())
+
+
+# shared by every iteration of a screen
+negative_cache = open_negative_cache()
+
+
+def cached_skip_message(symbol: str) -> str:
+    """Return the log message of a symbol skipped because of its negative cache entry."""
+    reason = negative_cache_messages[negative_cache.reason(symbol)]
+    return skip_message(symbol, f"{reason}, cached until {negative_cache.expires(symbol)}")
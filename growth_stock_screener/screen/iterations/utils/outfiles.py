@@ -1,25 +1,23 @@
 import pandas as pd
 import os
+from .cache import run_directory
+from .locking import atomic_writer
 
 
-def open_outfile(filename: str) -> pd.DataFrame:
-    """Open json outfile data as pandas dataframe."""
-    json_path = os.path.join(
-        os.getcwd(), "json", f"{filename}.json"
-    )
-    df = pd.read_json(json_path)
+def outfile_path(filename: str, run: str = None) -> str:
+    return os.path.join(run_directory(run), f"{filename}.json")
+
+
+def open_outfile(filename: str, run: str = None) -> pd.DataFrame:
+    """Open json outfile data (of the current settings' run, unless another run is given) as pandas dataframe."""
+    df = pd.read_json(outfile_path(filename, run))
     return df
 
 
 def create_outfile(data: pd.DataFrame, filename: str) -> None:
-    """Serialize a pandas dataframe in JSON format and save in the json directory."""
+    """Serialize a pandas dataframe in JSON format and save in the current settings' run directory.
+    The file is replaced atomically, so concurrent readers never see a partially written outfile."""
     serialized_json = data.to_json()
-    json_dir = os.path.join(os.getcwd(), "json")
-    outfile_path = os.path.join(json_dir, f"{filename}.json")
-
-    # Create the json directory if it doesn't exist
-    if not os.path.exists(json_dir):
-        os.makedirs(json_dir)
 
-    with open(outfile_path, "w") as outfile:
+    with atomic_writer(outfile_path(filename)) as outfile:
         outfile.write(serialized_json)
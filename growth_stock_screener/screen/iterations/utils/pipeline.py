@@ -0,0 +1,165 @@
+import asyncio
+import time
+import aiohttp
+from queue import Queue
+from threading import Lock, Thread
+from typing import Any, Callable, Coroutine, List
+from tqdm import tqdm
+from .concurrency import NodeLostError
+
+# marks the end of a pipeline stage's input
+end_of_stream = object()
+
+
+class RateLimiter:
+    """Thread-safe limiter which spaces out calls so that at most 'rate' calls start per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self.lock = Lock()
+        self.next_slot = 0.0
+
+    def wait(self) -> None:
+        """Block until the caller may send its next request."""
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+
+        time.sleep(max(0, slot - now))
+
+
+class AsyncLoopThread:
+    """Run an asyncio event loop and a shared aiohttp session in a background thread so that
+    worker threads can run coroutines (such as aiohttp requests) without their own event loops."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.session = self.run(self.create_session())
+
+    async def create_session(self) -> aiohttp.ClientSession:
+        return aiohttp.ClientSession()
+
+    def run(self, coroutine: Coroutine) -> Any:
+        """Run a coroutine on the background event loop and block until its result is available."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def close(self) -> None:
+        """Close the shared session and stop the background event loop."""
+        self.run(self.session.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class PipelineStage:
+    """A screen iteration in a streaming pipeline. 'func' consumes one item and returns the item to
+    pass to the next stage, or None if the item did not pass."""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], threads: int, max_requeues: int = 2):
+        self.name = name
+        self.func = func
+        self.threads = max(1, threads)
+        self.max_requeues = max_requeues
+        self.outputs = []
+        self.errors = []
+        self.processed = 0
+        self.input_closed_at = None  # time.monotonic() at which every upstream item had arrived
+        self.elapsed_seconds = None
+
+
+class Pipeline:
+    """Connect stages with bounded queues. Each stage consumes items as soon as the upstream stage passes them,
+    so stages which wait on different hosts overlap instead of running one after another."""
+
+    def __init__(self, stages: List[PipelineStage], queue_size: int):
+        self.stages = stages
+        self.queues = [Queue(maxsize=queue_size) for _ in stages]
+        self.remaining_workers = [stage.threads for stage in stages]
+        self.lock = Lock()
+
+    def close_input(self, index: int) -> None:
+        """Signal every worker of a stage that no more items will arrive."""
+        stage = self.stages[index]
+        stage.input_closed_at = time.monotonic()
+
+        for _ in range(stage.threads):
+            self.queues[index].put(end_of_stream)
+
+    def work(self, index: int, start: float, progress_bar: tqdm) -> None:
+        """Consume items for a stage until its input is closed, forwarding passing items downstream."""
+        stage = self.stages[index]
+        is_last = index == len(self.stages) - 1
+
+        while True:
+            item = self.queues[index].get()
+
+            if item is end_of_stream:
+                break
+
+            result = None
+
+            for attempt in range(stage.max_requeues + 1):
+                try:
+                    result = stage.func(item)
+                    break
+                except NodeLostError:
+                    # items which keep losing their browser session are dropped, but recorded as errors
+                    if attempt == stage.max_requeues:
+                        stage.errors.append((item, NodeLostError(f"browser session lost {attempt + 1} times")))
+                except Exception as e:
+                    stage.errors.append((item, e))
+                    break
+
+            with self.lock:
+                stage.processed += 1
+                progress_bar.update()
+
+                if result is not None:
+                    stage.outputs.append(result)
+
+            if (result is not None) and not is_last:
+                self.queues[index + 1].put(result)
+
+        with self.lock:
+            self.remaining_workers[index] -= 1
+            finished = self.remaining_workers[index] == 0
+
+        if finished:
+            stage.elapsed_seconds = time.perf_counter() - start
+
+            if not is_last:
+                self.close_input(index + 1)
+
+    def run(self, items: List) -> None:
+        """Stream the given items through every stage and wait for the last stage to finish."""
+        start = time.perf_counter()
+        progress_bars = [
+            tqdm(desc=stage.name, position=i, total=(len(items) if i == 0 else None))
+            for i, stage in enumerate(self.stages)
+        ]
+
+        def feed() -> None:
+            for item in items:
+                self.queues[0].put(item)
+
+            self.close_input(0)
+
+        threads = [Thread(target=feed)]
+
+        for i, stage in enumerate(self.stages):
+            threads.extend(
+                Thread(target=self.work, args=(i, start, progress_bars[i]))
+                for _ in range(stage.threads)
+            )
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        for progress_bar in progress_bars:
+            progress_bar.close()
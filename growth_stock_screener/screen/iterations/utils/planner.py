@@ -0,0 +1,207 @@
+import threading
+from collections import defaultdict, deque
+from typing import Any, Callable, Dict, List, Tuple
+from tqdm import tqdm
+from .concurrency import NodeLostError
+
+# planner objectives
+MIN_REQUESTS = "requests"
+MIN_WALL_TIME = "wall_time"
+
+
+class MetricNode:
+    """A per-symbol metric fetched from a single host. 'fetch' takes a symbol and returns the metric's value (or None),
+    and 'cost' is the expected number of seconds a single fetch keeps one of the host's connections busy."""
+
+    def __init__(self, name: str, host: str, fetch: Callable[[str], Any], cost: float = 1.0):
+        self.name = name
+        self.host = host
+        self.fetch = fetch
+        self.cost = cost
+
+
+class PlannedStage:
+    """A screen iteration in a fetch plan: the metrics it needs, and the filter which turns a row and its metrics
+    into an outcome and record ('evaluate(row, metrics)'). Rows whose record is None do not reach the next stage."""
+
+    def __init__(
+        self,
+        name: str,
+        nodes: List[MetricNode],
+        evaluate: Callable[[dict, Dict[str, Any]], Tuple[str, dict]],
+    ):
+        self.name = name
+        self.nodes = nodes
+        self.evaluate = evaluate
+
+
+class FetchPlanner:
+    """Fetch the metrics of every stage as independent (symbol, metric) tasks, running each host's tasks on its own
+    pool of 'host_limits[host]' threads so that all hosts are used in parallel. Filters are applied as soon as a
+    stage's metrics are available.
+
+    With the 'wall_time' objective, every metric of every symbol is fetched up front. With the 'requests' objective,
+    a stage's metrics are only fetched for symbols which passed the previous stages, except for symbols chosen by
+    'speculate(row)', which are fetched up front as if by 'wall_time'."""
+
+    def __init__(
+        self,
+        stages: List[PlannedStage],
+        host_limits: Dict[str, int],
+        objective: str = MIN_WALL_TIME,
+        speculate: Callable[[dict], bool] = None,
+        max_requeues: int = 2,
+    ):
+        if objective not in (MIN_REQUESTS, MIN_WALL_TIME):
+            raise ValueError(f"unknown planner objective: {objective}")
+
+        for stage in stages:
+            for node in stage.nodes:
+                if host_limits.get(node.host, 0) < 1:
+                    raise ValueError(f"no connection limit set for host: {node.host}")
+
+        self.stages = stages
+        self.host_limits = host_limits
+        self.objective = objective
+        self.speculate = speculate
+        self.max_requeues = max_requeues
+        self.requests = defaultdict(int)
+        self.errors = []
+
+    def hosts(self) -> List[str]:
+        """Return the hosts used by the plan's metrics."""
+        return list(dict.fromkeys(node.host for stage in self.stages for node in stage.nodes))
+
+    def estimate(self, count: int) -> Dict[str, float]:
+        """Return the number of requests and the lower bound on wall time (seconds) of fetching every metric for 'count' symbols."""
+        host_seconds = defaultdict(float)
+
+        for stage in self.stages:
+            for node in stage.nodes:
+                host_seconds[node.host] += count * node.cost
+
+        return {
+            "requests": count * sum(len(stage.nodes) for stage in self.stages),
+            "wall_time": max(
+                (seconds / self.host_limits[host] for host, seconds in host_seconds.items()), default=0.0
+            ),
+        }
+
+    def fetch(self, node: MetricNode, symbol: str) -> Any:
+        """Fetch a single metric, retrying on other browser nodes if the current one is lost."""
+        for _ in range(self.max_requeues + 1):
+            try:
+                return node.fetch(symbol)
+            except NodeLostError:
+                continue
+            except Exception as e:
+                self.errors.append((symbol, node.name, e))
+                return None
+
+        return None
+
+    def run(self, rows: List[dict]) -> List[List[dict]]:
+        """Fetch metrics for each row and apply each stage's filter in order. Returns the records which passed each stage."""
+        condition = threading.Condition()
+        queues = {host: deque() for host in self.hosts()}
+        metrics = [{} for _ in rows]
+        scheduled = [set() for _ in rows]
+        progress = [0 for _ in rows]  # number of stages each row has passed through
+        records = list(rows)
+        passed = [[] for _ in self.stages]
+        pending = 0
+        finished = False
+        progress_bar = tqdm(total=0)
+
+        def schedule(i: int, stage_index: int) -> None:
+            nonlocal pending
+
+            for node in self.stages[stage_index].nodes:
+                if node.name not in scheduled[i]:
+                    scheduled[i].add(node.name)
+                    queues[node.host].append((i, node))
+                    pending += 1
+                    progress_bar.total += 1
+
+        def advance(i: int) -> None:
+            # apply every stage whose metrics have all arrived
+            while progress[i] < len(self.stages):
+                stage = self.stages[progress[i]]
+
+                if any(node.name not in metrics[i] for node in stage.nodes):
+                    return
+
+                # a row whose filter raises (such as a malformed row) fails the stage
+                try:
+                    _, record = stage.evaluate(records[i], {node.name: metrics[i][node.name] for node in stage.nodes})
+                except Exception as e:
+                    self.errors.append((rows[i]["Symbol"], stage.name, e))
+                    record = None
+
+                if record is None:
+                    progress[i] = len(self.stages)
+                    return
+
+                passed[progress[i]].append((i, record))
+                records[i] = record
+                progress[i] += 1
+
+                if progress[i] < len(self.stages):
+                    schedule(i, progress[i])
+
+        def worker(host: str) -> None:
+            nonlocal pending, finished
+
+            while True:
+                with condition:
+                    while (len(queues[host]) == 0) and not finished:
+                        condition.wait()
+
+                    if len(queues[host]) == 0:
+                        return
+
+                    i, node = queues[host].popleft()
+
+                value = self.fetch(node, rows[i]["Symbol"])
+
+                with condition:
+                    # the task is always counted as done, so that other workers never wait on it forever
+                    try:
+                        self.requests[node.host] += 1
+                        metrics[i][node.name] = value
+                        advance(i)
+                    finally:
+                        pending -= 1
+                        progress_bar.update()
+
+                        if pending == 0:
+                            finished = True
+
+                        condition.notify_all()
+
+        with condition:
+            for i, row in enumerate(rows):
+                eager = (self.objective == MIN_WALL_TIME) or (
+                    (self.speculate is not None) and self.speculate(row)
+                )
+
+                for stage_index in range(len(self.stages) if eager else 1):
+                    schedule(i, stage_index)
+
+            finished = pending == 0
+            progress_bar.refresh()
+
+        workers = [
+            threading.Thread(target=worker, args=(host,))
+            for host in queues
+            for _ in range(self.host_limits[host])
+        ]
+
+        for thread in workers:
+            thread.start()
+
+        for thread in workers:
+            thread.join()
+
+        progress_bar.close()
+        return [[record for _, record in sorted(stage_passed, key=lambda x: x[0])] for stage_passed in passed]
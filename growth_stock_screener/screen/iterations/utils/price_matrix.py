@@ -0,0 +1,155 @@
+import os
+import numpy as np
+import pandas as pd
+from functools import partial
+from multiprocessing import Pool
+from tqdm import tqdm
+from typing import Callable, List, Tuple
+from .cache import json_directory
+from .locking import atomic_writer, file_lock
+
+# directory holding the memory-mapped closing prices and volumes (saved alongside the price store)
+price_matrix_name = "price_matrix"
+price_matrix_fields = ("close", "volume")
+
+# the matrix attached by each process pool worker
+worker_matrix = None
+
+
+def price_matrix_path() -> str:
+    return os.path.join(json_directory(), price_matrix_name)
+
+
+class PriceMatrix:
+    """Daily closing prices and volumes as contiguous float32 arrays of shape (symbols, dates), with a symbol index.
+    Each symbol's history is one contiguous row, so per-symbol views are taken without copying. Matrices opened
+    from disk are memory-mapped read-only, letting every process share the same pages."""
+
+    def __init__(self, dates: pd.DatetimeIndex, symbols: List[str], close: np.ndarray, volume: np.ndarray, path: str = None):
+        self.dates = pd.DatetimeIndex(dates, name="Date")
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.close = close
+        self.volume = volume
+        self.path = path  # directory the arrays are mapped from (None if held in memory)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.index
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def is_current(self, max_age: int = 2, now: pd.Timestamp = None) -> bool:
+        """Return 'True' if the latest close is at most 'max_age' trading days (business days) old."""
+        if len(self.dates) == 0:
+            return False
+
+        today = pd.Timestamp.now() if (now is None) else pd.Timestamp(now)
+        return self.dates[-1] >= today.normalize() - pd.offsets.BDay(max_age)
+
+    def start_position(self, start: pd.Timestamp = None) -> int:
+        """Return the position of the first date on or after 'start' (0 if no start is given)."""
+        return 0 if (start is None) else int(self.dates.searchsorted(pd.Timestamp(start)))
+
+    def series(self, symbol: str, field: str = "close", start: pd.Timestamp = None) -> np.ndarray:
+        """Return a view of one symbol's closing prices or volumes (from 'start' onwards)."""
+        return getattr(self, field)[self.index[symbol], self.start_position(start):]
+
+    def aligned_closes(self, symbols: List[str], start: pd.Timestamp = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the closing prices of the given symbols (from 'start' onwards) as float64 rows with each symbol's
+        valid prices moved to the end of its row in order (missing bars first), along with each symbol's number of
+        valid prices. Trailing windows of the same columns then hold every symbol's latest prices."""
+        close = np.asarray(self.close[[self.index[symbol] for symbol in symbols], self.start_position(start):], dtype=float)
+        valid = ~np.isnan(close)
+
+        # a stable sort of the validity mask puts missing bars first while keeping valid prices in date order
+        order = np.argsort(valid, axis=1, kind="stable")
+        return np.take_along_axis(close, order, axis=1), valid.sum(axis=1)
+
+    def history(self, symbol: str, start: pd.Timestamp = None) -> pd.DataFrame:
+        """Return one symbol's closing prices and volumes as a DataFrame indexed by date (from 'start' onwards)."""
+        position = self.start_position(start)
+
+        return pd.DataFrame(
+            {field.capitalize(): self.series(symbol, field, start) for field in price_matrix_fields},
+            index=self.dates[position:],
+        )
+
+    @classmethod
+    def from_frames(cls, close: pd.DataFrame, volume: pd.DataFrame) -> "PriceMatrix":
+        """Build an in-memory matrix from date x symbol closing price and volume tables."""
+        volume = volume.reindex(index=close.index, columns=close.columns)
+
+        return cls(
+            pd.DatetimeIndex(close.index).tz_localize(None),
+            list(close.columns),
+            np.ascontiguousarray(close.to_numpy(dtype=np.float32, na_value=np.nan).T),
+            np.ascontiguousarray(volume.to_numpy(dtype=np.float32, na_value=np.nan).T),
+        )
+
+
+def save_price_matrix(close: pd.DataFrame, volume: pd.DataFrame, path: str = None) -> None:
+    """Write date x symbol closing price and volume tables as memory-mappable float32 files.
+    Files are written under temporary names and then renamed, so open memory maps keep their old data, and the
+    matrix is locked while it is replaced, so it is never opened with an index that doesn't match its arrays."""
+    path = path or price_matrix_path()
+    matrix = PriceMatrix.from_frames(close, volume)
+
+    with file_lock(os.path.join(path, "index.npz")):
+        for field in price_matrix_fields:
+            with atomic_writer(os.path.join(path, f"{field}.f32"), "wb") as f:
+                getattr(matrix, field).tofile(f)
+
+        with atomic_writer(os.path.join(path, "index.npz"), "wb") as f:
+            np.savez(
+                f,
+                dates=matrix.dates.to_numpy(dtype="datetime64[ns]"),
+                symbols=np.array(matrix.symbols, dtype=str),
+            )
+
+
+def open_price_matrix(path: str = None) -> PriceMatrix:
+    """Memory-map the saved price matrix read-only (or return None if none has been saved)."""
+    path = path or price_matrix_path()
+
+    if not os.path.exists(os.path.join(path, "index.npz")):
+        return None
+
+    with file_lock(os.path.join(path, "index.npz")):
+        with np.load(os.path.join(path, "index.npz")) as index:
+            dates = pd.DatetimeIndex(index["dates"])
+            symbols = index["symbols"].tolist()
+
+        shape = (len(symbols), len(dates))
+        arrays = {}
+
+        for field in price_matrix_fields:
+            if 0 in shape:
+                arrays[field] = np.empty(shape, dtype=np.float32)
+            else:
+                arrays[field] = np.memmap(os.path.join(path, f"{field}.f32"), dtype=np.float32, mode="r", shape=shape)
+
+    return PriceMatrix(dates, symbols, arrays["close"], arrays["volume"], path)
+
+
+def attach_price_matrix(path: str) -> None:
+    """Process pool initializer which memory-maps the price matrix once per worker."""
+    global worker_matrix
+    worker_matrix = open_price_matrix(path)
+
+
+def call_with_matrix(func: Callable, item):
+    """Call a process pool function with the worker's price matrix."""
+    return func(item, worker_matrix)
+
+
+def tqdm_process_pool_map(processes: int, func: Callable, items: List, matrix: PriceMatrix) -> List:
+    """Pass each item and the price matrix into the given function ('func(item, matrix)') using a process pool.
+    Workers attach to the memory-mapped matrix instead of receiving copies of it, so only items and results are
+    pickled ('func' must be defined at module level). Matrices held in memory are processed in this process.
+    Display a progress bar and return a list of results in the order of the inputted items."""
+    if (matrix.path is None) or (processes <= 1) or (len(items) <= 1):
+        return [func(item, matrix) for item in tqdm(items)]
+
+    with Pool(min(processes, len(items)), initializer=attach_price_matrix, initargs=(matrix.path,)) as pool:
+        return list(tqdm(pool.imap(partial(call_with_matrix, func), items), total=len(items)))
@@ -0,0 +1,61 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Tuple
+from .cache import json_directory
+from .locking import atomic_writer, file_lock
+from .price_matrix import save_price_matrix
+
+# file holding daily closing prices and volumes downloaded by the relative strength iteration
+price_store_name = "prices"
+
+
+def price_store_path() -> str:
+    return os.path.join(json_directory(), f"{price_store_name}.npz")
+
+
+def write_price_store(close: pd.DataFrame, volume: pd.DataFrame) -> None:
+    """Atomically replace the saved price store and price matrix (callers hold the price store's lock)."""
+    volume = volume.reindex(index=close.index, columns=close.columns)
+
+    with atomic_writer(price_store_path(), "wb") as f:
+        np.savez_compressed(
+            f,
+            dates=pd.DatetimeIndex(close.index).tz_localize(None).to_numpy(dtype="datetime64[ns]"),
+            symbols=np.array(close.columns, dtype=str),
+            close=close.to_numpy(dtype=float, na_value=np.nan),
+            volume=volume.to_numpy(dtype=float, na_value=np.nan),
+        )
+    save_price_matrix(close, volume)
+
+
+def save_price_store(close: pd.DataFrame, volume: pd.DataFrame) -> None:
+    """Save date x symbol closing price and volume tables in the json directory (and as a memory-mapped price matrix)."""
+    with file_lock(price_store_path()):
+        write_price_store(close, volume)
+
+
+def append_price_store(close: pd.DataFrame, volume: pd.DataFrame) -> None:
+    """Add new dates and symbols to the saved price store (new values replace saved values for the same date).
+    The store is locked while it is read and rewritten, so concurrent screens don't drop each other's prices."""
+    with file_lock(price_store_path()):
+        if not os.path.exists(price_store_path()):
+            write_price_store(close, volume)
+            return
+
+        stored_close, stored_volume = open_price_store()
+        close = close.set_axis(pd.DatetimeIndex(close.index).tz_localize(None))
+        volume = volume.set_axis(pd.DatetimeIndex(volume.index).tz_localize(None))
+        write_price_store(close.combine_first(stored_close), volume.combine_first(stored_volume))
+
+
+def open_price_store() -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Open the saved closing price and volume tables (indexed by date, with one column per symbol)."""
+    with np.load(price_store_path()) as store:
+        index = pd.DatetimeIndex(store["dates"], name="Date")
+        columns = pd.Index(store["symbols"], name="Symbol")
+
+        return (
+            pd.DataFrame(store["close"], index=index, columns=columns),
+            pd.DataFrame(store["volume"], index=index, columns=columns),
+        )
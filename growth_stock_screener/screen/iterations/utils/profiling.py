@@ -0,0 +1,248 @@
+import os
+import sys
+import json
+import time
+import cProfile
+import pstats
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+from termcolor import colored
+from .cache import run_directory
+from .logs import format_seconds
+
+try:
+    import psutil
+except ImportError:  # process memory is read from /proc instead (Linux only)
+    psutil = None
+
+# directory (in the run's outfile directory) holding profiles
+profile_directory_name = "profile"
+
+
+def process_rss(pid: int = None) -> int:
+    """Return the resident set size (bytes) of a process (by default, this process), or None if it can't be read."""
+    pid = pid or os.getpid()
+
+    try:
+        if psutil is not None:
+            return psutil.Process(pid).memory_info().rss
+
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+def child_processes(pid: int = None) -> List[int]:
+    """Return the ids of every descendant of a process (by default, this process), such as browser instances."""
+    pid = pid or os.getpid()
+
+    try:
+        if psutil is not None:
+            return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+
+        # map each process to its parent, then collect descendants
+        parents = {}
+
+        for entry in os.listdir("/proc"):
+            if entry.isdigit():
+                try:
+                    with open(f"/proc/{entry}/stat", "r") as f:
+                        parents[int(entry)] = int(f.read().rsplit(")", 1)[1].split()[1])
+                except (OSError, IndexError, ValueError):
+                    continue
+    except Exception:
+        return []
+
+    descendants = []
+    frontier = [pid]
+
+    while frontier:
+        parent = frontier.pop()
+        children = [child for child, child_parent in parents.items() if child_parent == parent]
+        descendants += children
+        frontier += children
+
+    return descendants
+
+
+def children_rss() -> int:
+    """Return the total resident set size (bytes) of this process's descendants."""
+    return sum(rss for rss in map(process_rss, child_processes()) if rss is not None)
+
+
+def collapsed_stack(frame) -> str:
+    """Return a frame's call stack in collapsed format ('outermost;...;innermost')."""
+    names = []
+
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+
+    return ";".join(reversed(names))
+
+
+class Sampler(threading.Thread):
+    """Background thread which periodically samples memory usage and the call stack of every other thread."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.peak_rss = process_rss() or 0
+        self.peak_children_rss = 0
+        self.stacks = Counter()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        self.peak_rss = max(self.peak_rss, process_rss() or 0)
+        self.peak_children_rss = max(self.peak_children_rss, children_rss())
+        threads = {thread.ident: thread.name for thread in threading.enumerate()}
+
+        for ident, frame in sys._current_frames().items():
+            if ident != self.ident:
+                self.stacks[f"{threads.get(ident, ident)};{collapsed_stack(frame)}"] += 1
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.join()
+        self.sample()
+
+
+class StageProfiler:
+    """Profile screen iterations one at a time ('with profiler.stage(name): ...'). Each stage is run under cProfile
+    (main thread) and tracemalloc, while a sampler records peak RSS of this process and its child processes
+    (browser instances) along with collapsed call stacks of every thread. Disabled profilers run stages as-is."""
+
+    def __init__(self, enabled: bool = True, directory: str = None, interval: float = 0.05, top: int = 10):
+        self.enabled = enabled
+        self.directory = directory
+        self.interval = interval
+        self.top = top
+        self.stages: List[Dict[str, Any]] = []
+
+    def stage_path(self, name: str, extension: str) -> str:
+        filename = f"{len(self.stages) + 1:02d}_{name.lower().replace(' ', '_')}.{extension}"
+        return os.path.join(self.directory, filename)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+
+        self.directory = self.directory or os.path.join(run_directory(), profile_directory_name)
+        os.makedirs(self.directory, exist_ok=True)
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+        tracemalloc.reset_peak()
+        heap_start = tracemalloc.get_traced_memory()[0]
+        snapshot_start = tracemalloc.take_snapshot()
+        sampler = Sampler(self.interval)
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+
+        sampler.start()
+        profile.enable()
+
+        try:
+            yield
+        finally:
+            profile.disable()
+            sampler.stop()
+            self.record(name, time.perf_counter() - start, profile, sampler, heap_start, snapshot_start)
+
+    def record(
+        self,
+        name: str,
+        seconds: float,
+        profile: cProfile.Profile,
+        sampler: Sampler,
+        heap_start: int,
+        snapshot_start: tracemalloc.Snapshot,
+    ) -> None:
+        """Save a stage's profile and collapsed stacks, and summarize its hottest functions and allocation sites."""
+        heap_peak = tracemalloc.get_traced_memory()[1]
+        allocations = tracemalloc.take_snapshot().compare_to(snapshot_start, "lineno")
+        profile_path = self.stage_path(name, "prof")
+        stacks_path = self.stage_path(name, "collapsed")
+
+        profile.dump_stats(profile_path)
+
+        with open(stacks_path, "w") as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        stats = pstats.Stats(profile).stats
+        hot_functions = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[: self.top]
+
+        self.stages.append(
+            {
+                "stage": name,
+                "seconds": seconds,
+                "peak_rss": sampler.peak_rss,
+                "peak_heap_growth": heap_peak - heap_start,
+                "peak_children_rss": sampler.peak_children_rss,
+                "profile": profile_path,
+                "collapsed_stacks": stacks_path,
+                "hot_functions": [
+                    {
+                        "function": f"{function} ({os.path.basename(filename)}:{line})",
+                        "calls": calls,
+                        "self_seconds": self_seconds,
+                        "cumulative_seconds": cumulative_seconds,
+                    }
+                    for (filename, line, function), (_, calls, self_seconds, cumulative_seconds, _) in hot_functions
+                ],
+                "allocation_sites": [
+                    {"site": str(statistic.traceback[0]), "size_diff": statistic.size_diff, "count_diff": statistic.count_diff}
+                    for statistic in allocations[: self.top]
+                ],
+            }
+        )
+
+    def save(self) -> str:
+        """Stop tracing memory, save the summary of every profiled stage as JSON and return its path."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        path = os.path.join(self.directory, "summary.json")
+
+        with open(path, "w") as f:
+            json.dump(self.stages, f, indent=2)
+
+        return path
+
+    def print_summary(self, functions: int = 5) -> None:
+        """Print each stage's duration and memory watermarks, with its hottest functions and allocation sites."""
+        megabytes = lambda value: f"{value / 1e6:,.0f} MB"
+
+        for stage in self.stages:
+            print(
+                colored(f"\n{stage['stage']}", "blue"),
+                colored(
+                    f"{format_seconds(stage['seconds'])} | peak RSS {megabytes(stage['peak_rss'])} | peak heap growth "
+                    f"{megabytes(stage['peak_heap_growth'])} | peak child process RSS {megabytes(stage['peak_children_rss'])}",
+                    "light_grey",
+                ),
+            )
+
+            for function in stage["hot_functions"][:functions]:
+                print(
+                    colored(
+                        f"  {function['self_seconds']:8.2f} s self {function['cumulative_seconds']:8.2f} s total  {function['function']}",
+                        "dark_grey",
+                    )
+                )
+
+            for site in stage["allocation_sites"][:functions]:
+                print(colored(f"  {megabytes(site['size_diff']):>10} allocated  {site['site']}", "dark_grey"))
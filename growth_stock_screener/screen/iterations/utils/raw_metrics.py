@@ -0,0 +1,248 @@
+import os
+import pandas as pd
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+from .cache import json_directory
+from .locking import atomic_writer, file_lock
+from .metrics import record_cache_lookup
+from .sec_requests import extract_comparison_revenues
+from ...settings import metric_ttls
+
+# outfile holding every fetched value for every symbol attempted
+metrics_table_name = "raw_metrics"
+
+# raw metrics recorded by each screen iteration
+iteration_metrics = {
+    "liquidity": ["50-day Average Volume"],
+    "trend": ["10-day SMA", "20-day SMA", "50-day SMA", "200-day SMA", "52-week High"],
+    "revenue_growth": [
+        "Revenue Growth % (most recent Q)",
+        "Revenue Growth % (previous Q)",
+        "Foreign Stock",
+        "Revenue (most recent Q)",
+        "Revenue (most recent Q, year earlier)",
+        "Revenue (previous Q)",
+        "Revenue (previous Q, year earlier)",
+    ],
+    "institutional_accumulation": ["Inflows", "Outflows"],
+}
+
+# metrics which must be present for a fetch to have succeeded (only successful fetches are reused while fresh)
+required_metrics = {
+    "liquidity": ["50-day Average Volume"],
+    "trend": iteration_metrics["trend"],
+    "revenue_growth": ["Foreign Stock"],
+    "institutional_accumulation": ["Inflows", "Outflows"],
+}
+
+# exchange time zone and closing time, used by metrics which stay fresh until the next market close
+market_timezone = "America/New_York"
+market_close_hour = 16
+
+
+def fetched_column(iteration: str) -> str:
+    """Return the name of the column marking symbols whose data was fetched by the given iteration."""
+    return f"Fetched ({iteration})"
+
+
+def fetched_at_column(iteration: str) -> str:
+    """Return the name of the column holding when an iteration's data was successfully fetched for a symbol."""
+    return f"Fetched At ({iteration})"
+
+
+def next_market_close(time: pd.Timestamp) -> pd.Timestamp:
+    """Return the first weekday market close after the given time (exchange holidays are not skipped)."""
+    local_time = time.tz_convert(market_timezone).tz_localize(None)
+    close = local_time.normalize() + pd.Timedelta(hours=market_close_hour)
+
+    if local_time >= close:
+        close += pd.Timedelta(days=1)
+
+    while close.weekday() >= 5:
+        close += pd.Timedelta(days=1)
+
+    return close.tz_localize(market_timezone)
+
+
+def metrics_table_path() -> str:
+    return os.path.join(json_directory(), f"{metrics_table_name}.json")
+
+
+def iteration_columns(iteration: str) -> List[str]:
+    """Return the columns of the metrics table written when an iteration records a symbol's metrics."""
+    return iteration_metrics[iteration] + [fetched_column(iteration), fetched_at_column(iteration)]
+
+
+def metrics_expiry(iteration: str, fetched_at: pd.Timestamp) -> pd.Timestamp:
+    """Return when metrics fetched at the given time go stale ('metric_ttls' holds days, or "close" for the next market close)."""
+    ttl = metric_ttls[iteration]
+
+    if ttl == "close":
+        return next_market_close(fetched_at)
+
+    return fetched_at + pd.Timedelta(days=ttl)
+
+
+class MetricsTable:
+    """Thread-safe table of raw per-symbol metrics. Values are recorded whether or not a symbol passes,
+    so that thresholds can be re-applied without fetching any data again. The table is shared by every run, so
+    saving merges the metrics recorded by this process into the saved table instead of overwriting it."""
+
+    def __init__(self, rows: Dict[str, Dict[str, Any]] = None):
+        self.rows = {} if (rows is None) else rows
+        self.recorded = set()  # (symbol, iteration) pairs recorded since the table was opened
+        self.lock = Lock()
+
+    def record(self, iteration: str, symbol: str, values: Dict[str, Any]) -> None:
+        """Record the metrics fetched by an iteration for a symbol (missing metrics are stored as None),
+        along with the fetch time if every required metric is present."""
+        complete = all(values.get(metric, None) is not None for metric in required_metrics[iteration])
+
+        with self.lock:
+            row = self.rows.setdefault(symbol, {"Symbol": symbol})
+            row.update({metric: values.get(metric, None) for metric in iteration_metrics[iteration]})
+            row[fetched_column(iteration)] = True
+            row[fetched_at_column(iteration)] = pd.Timestamp.now(tz="UTC").isoformat() if complete else None
+            self.recorded.add((symbol, iteration))
+
+    def fresh_metrics(self, iteration: str, symbol: str, track: bool = True) -> Dict[str, Any]:
+        """Return the metrics an iteration fetched for a symbol if they were fetched successfully and
+        haven't gone stale (see 'metric_ttls'), otherwise None. Setting 'track' to 'False' leaves the lookup
+        out of the cache hit rate."""
+        with self.lock:
+            row = self.rows.get(symbol, {})
+            fetched_at = row.get(fetched_at_column(iteration), None)
+            fresh = (fetched_at is not None) and (metrics_expiry(iteration, pd.Timestamp(fetched_at)) > pd.Timestamp.now(tz="UTC"))
+            values = {metric: row.get(metric, None) for metric in iteration_metrics[iteration]} if fresh else None
+
+        if track:
+            record_cache_lookup("metrics_table", fresh, iteration=iteration)
+
+        return values
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the table as a DataFrame with one row per symbol."""
+        columns = ["Symbol"] + [column for iteration in iteration_metrics for column in iteration_columns(iteration)]
+
+        with self.lock:
+            df = pd.DataFrame(list(self.rows.values()), columns=columns)
+
+        for iteration in iteration_metrics:
+            df[fetched_column(iteration)] = df[fetched_column(iteration)].fillna(False).astype(bool)
+
+        return df
+
+    def save(self) -> None:
+        """Merge the metrics recorded since the table was opened into the saved table (locking it, so that
+        concurrent screens don't lose each other's metrics) and save the result in the json directory."""
+        with file_lock(metrics_table_path()):
+            saved = read_metrics_rows()
+
+            with self.lock:
+                for symbol, iteration in self.recorded:
+                    row = saved.setdefault(symbol, {"Symbol": symbol})
+                    row.update({column: self.rows[symbol].get(column, None) for column in iteration_columns(iteration)})
+
+                self.rows = {**self.rows, **saved}
+                self.recorded = set()
+
+            with atomic_writer(metrics_table_path()) as f:
+                f.write(self.to_frame().to_json())
+
+
+def read_metrics_rows() -> Dict[str, Dict[str, Any]]:
+    """Read the rows of the saved metrics table (empty if none has been saved)."""
+    if not os.path.exists(metrics_table_path()):
+        return {}
+
+    df = pd.read_json(metrics_table_path())
+    df = df.astype(object).where(pd.notna(df), None)
+    return {row["Symbol"]: row for row in df.to_dict("records")}
+
+
+def open_metrics_table() -> MetricsTable:
+    """Open the saved metrics table (or an empty table if none has been saved)."""
+    return MetricsTable(read_metrics_rows())
+
+
+def liquidity_metrics(volume: int) -> Dict[str, Any]:
+    """Return the raw metrics fetched by the liquidity iteration."""
+    return {"50-day Average Volume": volume}
+
+
+def trend_metrics(trend_data: Dict[str, float], high_52_week: float) -> Dict[str, Any]:
+    """Return the raw metrics fetched by the trend iteration."""
+    return {**(trend_data or {}), "52-week High": high_52_week}
+
+
+def revenue_growth_metrics(revenue_df: pd.DataFrame) -> Dict[str, Any]:
+    """Return the raw metrics fetched by the revenue growth iteration."""
+    return comparison_revenue_metrics(extract_comparison_revenues(revenue_df))
+
+
+def comparison_revenue_metrics(revenues: Dict[str, Dict[str, float]]) -> Dict[str, Any]:
+    """Return the raw revenue growth metrics of revenues extracted with 'extract_comparison_revenues'."""
+    if revenues is None:
+        return {}
+
+    if "Foreign Stock" in revenues:
+        return {"Foreign Stock": True}
+
+    previous_quarter = revenues.get("Q1", {})
+
+    return {
+        "Revenue Growth % (most recent Q)": revenues["Q2"]["Growth"],
+        "Revenue Growth % (previous Q)": previous_quarter.get("Growth", None),
+        "Foreign Stock": False,
+        "Revenue (most recent Q)": revenues["Q2"]["Current"],
+        "Revenue (most recent Q, year earlier)": revenues["Q2"]["Previous"],
+        "Revenue (previous Q)": previous_quarter.get("Current", None),
+        "Revenue (previous Q, year earlier)": previous_quarter.get("Previous", None),
+    }
+
+
+def institutional_metrics(holdings_data: Dict[str, float]) -> Dict[str, Any]:
+    """Return the raw metrics fetched by the institutional accumulation iteration (placeholder holdings are
+    left out, so that they are recorded as an incomplete fetch and never reused as fresh data)."""
+    if (holdings_data is None) or holdings_data.get("Placeholder", False):
+        return {}
+
+    return {"Inflows": holdings_data["Inflows"], "Outflows": holdings_data["Outflows"]}
+
+
+def volume_from_metrics(values: Dict[str, Any]) -> int:
+    """Return the 50-day average volume held in recorded liquidity metrics."""
+    return values["50-day Average Volume"]
+
+
+def trend_from_metrics(values: Dict[str, Any]) -> Tuple[Dict[str, float], float]:
+    """Return the moving averages and 52-week high held in recorded trend metrics."""
+    return {metric: values[metric] for metric in iteration_metrics["trend"][:4]}, values["52-week High"]
+
+
+def revenues_from_metrics(values: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Return revenues in the format of 'extract_comparison_revenues' from recorded revenue growth metrics."""
+    if values["Foreign Stock"]:
+        return {"Foreign Stock": {}}
+
+    revenues = {
+        "Q2": {
+            "Current": values["Revenue (most recent Q)"],
+            "Previous": values["Revenue (most recent Q, year earlier)"],
+            "Growth": values["Revenue Growth % (most recent Q)"],
+        }
+    }
+
+    if values["Revenue Growth % (previous Q)"] is not None:
+        revenues["Q1"] = {
+            "Current": values["Revenue (previous Q)"],
+            "Previous": values["Revenue (previous Q, year earlier)"],
+            "Growth": values["Revenue Growth % (previous Q)"],
+        }
+
+    return revenues
+
+
+def holdings_from_metrics(values: Dict[str, Any]) -> Dict[str, float]:
+    """Return the institutional holdings held in recorded institutional accumulation metrics."""
+    return {"Inflows": values["Inflows"], "Outflows": values["Outflows"]}
@@ -0,0 +1,381 @@
+import os
+import json
+import time
+import random
+import atexit
+import hashlib
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from aiohttp.client import ClientSession
+from requests.adapters import HTTPAdapter
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from .locking import atomic_writer
+
+try:
+    from curl_cffi import requests as curl_requests
+except ImportError:  # yfinance versions without curl_cffi send requests through the requests package
+    curl_requests = None
+
+# public API re-exported by the utils package (recording and replay state is read through 'replaying')
+__all__ = [
+    "start_recording",
+    "start_replay",
+    "stop_replay",
+    "replaying",
+    "recording_driver",
+    "ReplayDriver",
+    "FixtureArchive",
+    "request_key",
+    "argument_value",
+]
+
+# query parameters which change from one run to the next (date ranges and session tokens), left out of recorded requests
+volatile_parameters = {"period1", "period2", "crumb", "_"}
+
+# response headers kept in recordings
+recorded_headers = ["Content-Type", "Location"]
+
+# method of recorded browser pages (the text of each element found on a page)
+BROWSER = "BROWSER"
+
+archive_index_name = "index.json"
+
+
+def request_key(method: str, url: Any, params: Any = None) -> str:
+    """Return the key a request is recorded under: its method and url, with query parameters sorted and volatile ones removed."""
+    scheme, netloc, path, query, _ = urlsplit(str(url))
+    pairs = parse_qsl(query, keep_blank_values=True)
+
+    if params is not None:
+        pairs += list(params.items() if isinstance(params, dict) else params)
+
+    query = urlencode(sorted((name, str(value)) for name, value in pairs if name not in volatile_parameters))
+    return f"{method.upper()} {urlunsplit((scheme, netloc, path, query, ''))}"
+
+
+def key_hash(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class FixtureArchive:
+    """Directory of recorded responses: one body file per request (named by the hash of its key),
+    and an index of each request's key, status and headers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(self.index_path()):
+            with open(self.index_path(), "r") as f:
+                self.entries = json.load(f)
+
+    def index_path(self) -> str:
+        return os.path.join(self.path, archive_index_name)
+
+    def add(self, key: str, status: int, headers: Dict[str, str], body: bytes) -> None:
+        """Record a response (replacing any earlier response to the same request)."""
+        digest = key_hash(key)
+
+        with atomic_writer(os.path.join(self.path, digest), "wb") as f:
+            f.write(body)
+
+        with self.lock:
+            self.entries[digest] = {
+                "key": key,
+                "status": status,
+                "headers": {name: headers[name] for name in recorded_headers if headers.get(name) is not None},
+            }
+
+    def response(self, digest: str) -> Tuple[Dict[str, Any], bytes]:
+        """Return the recorded entry and body of a request (by the hash of its key), or None if it wasn't recorded."""
+        entry = self.entries.get(digest)
+
+        if entry is None:
+            return None
+
+        with open(os.path.join(self.path, digest), "rb") as f:
+            return entry, f.read()
+
+    def save(self) -> None:
+        with self.lock:
+            entries = dict(self.entries)
+
+        with atomic_writer(self.index_path()) as f:
+            json.dump(entries, f, indent=1, sort_keys=True)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Local stand-in for every recorded source. Serves recorded responses at '/<request key hash>' after an injected
+    latency (seconds), and answers a fraction of requests ('error_rate') with 503 errors."""
+
+    daemon_threads = True
+
+    def __init__(self, archive: FixtureArchive, latency: float = 0, error_rate: float = 0, seed: int = None):
+        super().__init__(("127.0.0.1", 0), ReplayHandler)
+        self.archive = archive
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.thread = threading.Thread(target=self.serve_forever, args=(0.05,), name="replay server", daemon=True)
+
+    def url(self, key: str) -> str:
+        return f"http://127.0.0.1:{self.server_port}/{key_hash(key)}"
+
+    def inject_error(self) -> bool:
+        with self.random_lock:
+            return self.random.random() < self.error_rate
+
+    def start(self) -> None:
+        self.thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        server = self.server
+        time.sleep(server.latency)
+
+        # discard request bodies
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        response = server.archive.response(self.path.lstrip("/"))
+
+        if server.inject_error():
+            status, headers, body = 503, {}, b"injected error"
+        elif response is None:
+            status, headers, body = 404, {}, b"request was not recorded"
+        else:
+            entry, body = response
+            status, headers = entry["status"], entry["headers"]
+
+        self.send_response(status)
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_POST = do_GET
+
+    def log_message(self, *args) -> None:
+        pass
+
+
+# the archive being recorded to, or the server replaying one (both are None while sources are reached over the network)
+recording: FixtureArchive = None
+replay_server: ReplayServer = None
+
+original_adapter_send = HTTPAdapter.send
+original_aiohttp_request = ClientSession._request
+original_curl_request = None if (curl_requests is None) else curl_requests.Session.request
+
+
+def adapter_send(self, request, **kwargs):
+    """Send a request made with the requests package (including redirects)."""
+    key = request_key(request.method, request.url)
+
+    if replay_server is not None:
+        request.url = replay_server.url(key)
+        return original_adapter_send(self, request, **{**kwargs, "proxies": {}})
+
+    response = original_adapter_send(self, request, **kwargs)
+
+    if recording is not None:
+        recording.add(key, response.status_code, response.headers, response.content)
+
+    return response
+
+
+async def aiohttp_request(self, method, str_or_url, **kwargs):
+    """Send a request made with an aiohttp session."""
+    key = request_key(method, str_or_url, kwargs.get("params"))
+
+    if replay_server is not None:
+        kwargs.pop("params", None)
+        return await original_aiohttp_request(self, method, replay_server.url(key), **kwargs)
+
+    response = await original_aiohttp_request(self, method, str_or_url, **kwargs)
+
+    if recording is not None:
+        recording.add(key, response.status, response.headers, await response.read())
+
+    return response
+
+
+def curl_request(self, method, url, *args, **kwargs):
+    """Send a request made with a curl_cffi session (as yfinance does)."""
+    key = request_key(method, url, kwargs.get("params"))
+
+    if replay_server is not None:
+        kwargs.pop("params", None)
+        return original_curl_request(self, method, replay_server.url(key), *args, **kwargs)
+
+    response = original_curl_request(self, method, url, *args, **kwargs)
+
+    if recording is not None:
+        recording.add(key, response.status_code, response.headers, response.content)
+
+    return response
+
+
+def install_transports() -> None:
+    HTTPAdapter.send = adapter_send
+    ClientSession._request = aiohttp_request
+
+    if curl_requests is not None:
+        curl_requests.Session.request = curl_request
+
+
+def restore_transports() -> None:
+    HTTPAdapter.send = original_adapter_send
+    ClientSession._request = original_aiohttp_request
+
+    if curl_requests is not None:
+        curl_requests.Session.request = original_curl_request
+
+
+def start_recording(path: str) -> FixtureArchive:
+    """Record every HTTP response and browser page of this process to a fixture archive (saved when the process exits)."""
+    global recording
+    stop_replay()
+
+    recording = FixtureArchive(path)
+    install_transports()
+    atexit.register(recording.save)
+    return recording
+
+
+def start_replay(path: str, latency: float = 0, error_rate: float = 0, seed: int = None) -> ReplayServer:
+    """Serve every HTTP request and browser page of this process from a fixture archive, without network access."""
+    global replay_server
+    stop_replay()
+
+    replay_server = ReplayServer(FixtureArchive(path), latency, error_rate, seed)
+    replay_server.start()
+    install_transports()
+
+    # the replay server is always reached directly
+    if "127.0.0.1" not in os.environ.get("NO_PROXY", ""):
+        os.environ["NO_PROXY"] = ",".join(filter(None, [os.environ.get("NO_PROXY"), "127.0.0.1"]))
+
+    return replay_server
+
+
+def stop_replay() -> None:
+    """Stop recording (saving the archive) or replaying, and reach sources over the network again."""
+    global recording, replay_server
+
+    if recording is not None:
+        recording.save()
+        atexit.unregister(recording.save)
+
+    if replay_server is not None:
+        replay_server.stop()
+
+    recording = None
+    replay_server = None
+    restore_transports()
+
+
+def replaying() -> bool:
+    return replay_server is not None
+
+
+class RecordingDriver:
+    """Browser which records the text of every element found on each page it loads."""
+
+    def __init__(self, driver, archive: FixtureArchive):
+        self.driver = driver
+        self.archive = archive
+        self.url = None
+        self.elements: Dict[str, str] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.driver, name)
+
+    def get(self, url: str) -> None:
+        self.url = url
+        self.elements = {}
+        self.driver.get(url)
+
+    def find_element(self, by: str = By.ID, value: str = None):
+        element = self.driver.find_element(by, value)
+        text = element.text
+
+        # pages are saved again whenever an element's text changes (such as once data has loaded)
+        if self.elements.get(f"{by}={value}") != text:
+            self.elements[f"{by}={value}"] = text
+            self.archive.add(
+                request_key(BROWSER, self.url), 200, {"Content-Type": "application/json"}, json.dumps(self.elements).encode()
+            )
+
+        return element
+
+
+class ReplayElement:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class ReplayDriver:
+    """Stand-in browser which loads the elements recorded on each page from the replay server."""
+
+    # the replay server is always reached directly
+    opener = urllib.request.build_opener(urllib.request.ProxyHandler({}))
+
+    def __init__(self):
+        self.elements: Dict[str, str] = {}
+        self.page_load_timeout = None
+
+    def set_page_load_timeout(self, seconds: float) -> None:
+        self.page_load_timeout = seconds
+
+    def get(self, url: str) -> None:
+        self.elements = {}
+
+        try:
+            with self.opener.open(replay_server.url(request_key(BROWSER, url)), timeout=self.page_load_timeout) as response:
+                self.elements = json.loads(response.read())
+        except (HTTPError, URLError, TimeoutError) as e:
+            raise WebDriverException(f"replayed page failed to load ({e})")
+
+    def find_element(self, by: str = By.ID, value: str = None) -> ReplayElement:
+        text = self.elements.get(f"{by}={value}")
+
+        if text is None:
+            raise NoSuchElementException(f"no element was recorded at {by}={value}")
+
+        return ReplayElement(text)
+
+    def execute_script(self, script: str, *args) -> None:
+        return None
+
+    def quit(self) -> None:
+        pass
+
+
+def recording_driver(driver):
+    """Return a browser which records the pages it loads while recording (or the browser itself)."""
+    return driver if (recording is None) else RecordingDriver(driver, recording)
+
+
+def argument_value(arguments: List[str], name: str, default: str = None) -> str:
+    """Return the value following a command-line flag (such as '--replay <archive>'), or a default if the flag isn't given."""
+    if name in arguments and arguments.index(name) + 1 < len(arguments):
+        return arguments[arguments.index(name) + 1]
+
+    return default
@@ -0,0 +1,241 @@
+import os
+import time
+import tempfile
+import tracemalloc
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from typing import Any, Callable, Dict, List, Tuple
+from .events import EventLog
+from .outfiles import create_outfile
+from .summary import create_summary_file
+from .indicators import IndicatorState
+from .replay import ReplayElement
+from .scraping import extract_element, extract_float
+from .sec_requests import revenues_from_company_facts
+from .screening import (
+    PASSED,
+    evaluate_relative_strengths,
+    rate_relative_strengths,
+    evaluate_liquidity,
+    evaluate_trend,
+    evaluate_revenue_growth,
+)
+from .synthetic import SyntheticUniverse
+from .fetchers import volume_xpath, sma_10_xpath, sma_20_xpath, sma_50_xpath, sma_200_xpath, high_52_week_xpath
+from .tracing import tracer
+from ...settings import min_rs
+
+# stages whose duration grows faster than this power of the universe size are reported as superlinear
+superlinear_exponent = 1.2
+
+
+class SyntheticScreen:
+    """The relative strength, liquidity, trend, revenue growth and report stages of a screen, run against a synthetic
+    universe in place of its sources. Each stage evaluates symbols with the same functions as the screen's iterations
+    and saves the same outfiles; time spent synthesizing responses is tracked apart from the stage itself."""
+
+    def __init__(self, universe: SyntheticUniverse):
+        self.universe = universe
+        self.fixture_seconds = 0
+        self.df = None
+
+    def fixture(self, make: Callable[..., Any], *args) -> Any:
+        """Return a synthesized response (timed separately, since a screen would wait on the network instead)."""
+        start = time.perf_counter()
+
+        try:
+            return make(*args)
+        finally:
+            self.fixture_seconds += time.perf_counter() - start
+
+    def stages(self) -> List[Tuple[str, Callable[[], None]]]:
+        return [
+            ("Relative Strength", self.relative_strength),
+            ("Liquidity", self.liquidity),
+            ("Trend", self.trend),
+            ("Revenue Growth", self.revenue_growth),
+            ("Report", self.report),
+        ]
+
+    def passed_rows(self, logs: EventLog, evaluate: Callable[[pd.Series], Tuple[str, Dict]]) -> pd.DataFrame:
+        records = []
+
+        for _, row in self.df.iterrows():
+            outcome, record = evaluate(row)
+
+            if outcome == PASSED:
+                records.append(record)
+
+        return pd.DataFrame(records)
+
+    def relative_strength(self) -> None:
+        logs = EventLog("Relative Strength", "summary")
+        listings = self.fixture(self.universe.listings).set_index("Symbol")
+        close, volume = self.fixture(self.universe.price_history)
+
+        state = IndicatorState.from_history(close, volume)
+        records, _ = evaluate_relative_strengths(state, self.universe.symbols, listings, logs)
+        rs_df = rate_relative_strengths(records)
+
+        self.df = rs_df[rs_df["RS"] >= min_rs]
+        create_outfile(self.df, "relative_strengths")
+
+    def liquidity(self) -> None:
+        logs = EventLog("Liquidity", "summary")
+
+        def evaluate(row: pd.Series) -> Tuple[str, Dict]:
+            page = self.fixture(self.universe.barchart_page, row["Symbol"])
+            volume = int(extract_float(extract_element(volume_xpath, page)))
+            return evaluate_liquidity(row, volume, logs)
+
+        self.df = self.passed_rows(logs, evaluate)
+        create_outfile(self.df, "liquidity")
+
+    def trend(self) -> None:
+        logs = EventLog("Trend", "summary")
+        xpaths = {"10-day SMA": sma_10_xpath, "20-day SMA": sma_20_xpath, "50-day SMA": sma_50_xpath, "200-day SMA": sma_200_xpath}
+
+        def evaluate(row: pd.Series) -> Tuple[str, Dict]:
+            elements = self.fixture(self.universe.tradingview_elements, row["Symbol"])
+            trend_data = {name: extract_float(ReplayElement(elements[f"xpath={xpath}"])) for name, xpath in xpaths.items()}
+
+            page = self.fixture(self.universe.cnbc_page, row["Symbol"])
+            high_52_week = extract_float(extract_element(high_52_week_xpath, page))
+            return evaluate_trend(row, trend_data, high_52_week, logs)
+
+        self.df = self.passed_rows(logs, evaluate)
+        create_outfile(self.df, "trend")
+
+    def revenue_growth(self) -> None:
+        logs = EventLog("Revenue Growth", "summary")
+
+        def evaluate(row: pd.Series) -> Tuple[str, Dict]:
+            symbol = row["Symbol"]
+            revenue_df = None
+
+            if not self.universe.no_cik[self.universe.index[symbol]]:
+                facts = self.fixture(self.universe.company_facts, symbol)["facts"]
+                revenue_df = revenues_from_company_facts(symbol, facts["us-gaap"])
+
+            return evaluate_revenue_growth(row, revenue_df, logs)
+
+        self.df = self.passed_rows(logs, evaluate)
+        create_outfile(self.df, "revenue_growth")
+
+    def report(self) -> None:
+        # institutional accumulation doesn't filter symbols, so the final results are the revenue growth results
+        create_outfile(self.df, "institutional_accumulation")
+        create_summary_file()
+
+
+def measure_stages(universe: SyntheticUniverse, memory: bool = False) -> Dict[str, Dict[str, float]]:
+    """Run every stage of a synthetic screen in an empty directory, returning the seconds each stage took
+    (and with 'memory', its peak traced allocations in bytes, which slows stages down)."""
+    results = {}
+    working_directory = os.getcwd()
+    tracing = tracer.enabled
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        tracer.enabled = False
+
+        if memory:
+            tracemalloc.start()
+
+        try:
+            screen = SyntheticScreen(universe)
+
+            for name, stage in screen.stages():
+                screen.fixture_seconds = 0
+
+                if memory:
+                    tracemalloc.reset_peak()
+                    baseline = tracemalloc.get_traced_memory()[0]
+
+                start = time.perf_counter()
+                stage()
+                seconds = time.perf_counter() - start - screen.fixture_seconds
+
+                results[name] = {"Symbols": len(screen.df), "Seconds": seconds}
+
+                if memory:
+                    results[name]["Peak Bytes"] = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            if memory:
+                tracemalloc.stop()
+
+            tracer.enabled = tracing
+            os.chdir(working_directory)
+
+    return results
+
+
+def measure_scaling(sizes: List[int], memory: bool = True, **universe_options) -> pd.DataFrame:
+    """Return the duration (and peak memory) of each synthetic screen stage at every universe size.
+    Stages are timed without tracing allocations, then run again to measure memory."""
+    rows = []
+
+    for size in sizes:
+        universe = SyntheticUniverse(size, **universe_options)
+        timings = measure_stages(universe)
+        peaks = measure_stages(universe, memory=True) if memory else {}
+
+        for stage, timing in timings.items():
+            rows.append(
+                {
+                    "Size": size,
+                    "Stage": stage,
+                    "Symbols": timing["Symbols"],
+                    "Seconds": timing["Seconds"],
+                    "Peak MB": peaks[stage]["Peak Bytes"] / 1000000 if memory else np.nan,
+                }
+            )
+
+    return pd.DataFrame(rows)
+
+
+def scaling_exponents(measurements: pd.DataFrame) -> pd.DataFrame:
+    """Fit each stage's duration and peak memory to a power of the universe size ('Size ^ exponent'). Stages with
+    a time exponent above 'superlinear_exponent' scale superlinearly (for instance, with a per-symbol cost which
+    itself grows with the universe)."""
+    exponents = {}
+
+    for stage, group in measurements.groupby("Stage", sort=False):
+        exponents[stage] = {}
+
+        for column, name in [("Seconds", "Time Exponent"), ("Peak MB", "Memory Exponent")]:
+            points = group[(group[column] > 0) & (group["Size"] > 0)]
+
+            if len(points) < 2:
+                exponents[stage][name] = np.nan
+                continue
+
+            exponents[stage][name] = np.polyfit(np.log(points["Size"]), np.log(points[column]), 1)[0]
+
+    exponents_df = pd.DataFrame.from_dict(exponents, orient="index")
+    exponents_df.index.name = "Stage"
+    exponents_df["Superlinear"] = exponents_df["Time Exponent"] > superlinear_exponent
+    return exponents_df
+
+
+def plot_scaling(measurements: pd.DataFrame, path: str) -> None:
+    """Plot each stage's duration and peak memory against universe size (log-log) and save the figure."""
+    figure, (time_axes, memory_axes) = plt.subplots(1, 2, figsize=(12, 5))
+
+    for stage, group in measurements.groupby("Stage", sort=False):
+        time_axes.plot(group["Size"], group["Seconds"], marker="o", label=stage)
+        memory_axes.plot(group["Size"], group["Peak MB"], marker="o", label=stage)
+
+    for axes, label in [(time_axes, "Seconds"), (memory_axes, "Peak memory (MB)")]:
+        axes.set_xscale("log")
+        axes.set_yscale("log")
+        axes.set_xlabel("Universe size (symbols)")
+        axes.set_ylabel(label)
+        axes.grid(True, which="both", alpha=0.3)
+
+    time_axes.legend()
+    figure.suptitle("Synthetic screen scaling")
+    figure.tight_layout()
+    figure.savefig(path)
+    plt.close(figure)
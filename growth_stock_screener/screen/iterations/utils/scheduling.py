@@ -0,0 +1,142 @@
+import time
+import threading
+import pandas as pd
+from collections import deque
+from typing import Any, Callable, List, Tuple
+from tqdm import tqdm
+from termcolor import cprint
+from .concurrency import NodeLostError
+
+
+def time_left(deadline: float, minimum: float = 1.0) -> float:
+    """Return the seconds remaining before a 'time.perf_counter()' deadline (never less than 'minimum')."""
+    return max(minimum, deadline - time.perf_counter())
+
+
+def prioritize(df: pd.DataFrame, columns: List[str]) -> List[int]:
+    """Return the positional indices of a DataFrame's rows sorted by the given columns in descending order.
+    Missing or non-numeric values are ranked last, and ties keep their original order."""
+    columns = [column for column in columns if column in df]
+
+    if len(columns) == 0:
+        return list(range(len(df)))
+
+    keys = pd.DataFrame(
+        {column: pd.to_numeric(df[column], errors="coerce") for column in columns}
+    ).reset_index(drop=True)
+    order = keys.sort_values(by=columns, ascending=False, na_position="last", kind="stable")
+
+    return order.index.tolist()
+
+
+class DeadlineScheduler:
+    """Run items through a saturated pool of worker threads in priority order. Each item receives a time budget
+    carved from the time remaining before the deadline; items which cannot start before the deadline are skipped."""
+
+    def __init__(
+        self,
+        threads: int,
+        deadline: float,
+        min_budget: float,
+        max_budget: float,
+        max_requeues: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.threads = max(1, threads)
+        self.deadline = deadline
+        self.min_budget = min_budget
+        self.max_budget = max_budget
+        self.max_requeues = max_requeues
+        self.clock = clock
+
+    def budget(self, remaining_time: float, pending: int) -> float:
+        """Return the time budget for the next item given the time left and the number of items not yet started."""
+        fair_share = remaining_time * self.threads / max(1, pending)
+        budget = max(self.min_budget, min(self.max_budget, fair_share))
+        return min(budget, remaining_time)
+
+    def run(
+        self,
+        func: Callable[[Any, float], Any],
+        items: List,
+        checkpoint: Callable[[], None] = None,
+        checkpoint_every: int = 10,
+        on_error: Callable[[Any, Exception], None] = None,
+    ) -> Tuple[List, List]:
+        """Call 'func(item, budget)' for each item in order and return the results and the skipped items.
+        'checkpoint' is called after every 'checkpoint_every' completed items. Items which raise
+        'NodeLostError' are re-queued at the front of the queue up to 'max_requeues' times (and then passed to
+        'on_error' as dropped). Items which raise any other exception are passed to 'on_error' (or printed) and the
+        worker moves on to the next item. Only items which weren't started before the deadline are skipped."""
+        lock = threading.Lock()
+        queue = deque((item, 0) for item in items)
+        results = []
+        skipped = []
+        completed = 0
+        deadline_at = self.clock() + self.deadline
+        progress_bar = tqdm(total=len(queue))
+
+        def report(item: Any, e: Exception) -> None:
+            """Report an item which raised (called while holding the lock)."""
+            if on_error is not None:
+                on_error(item, e)
+            else:
+                cprint(f"\nError running item {item}: {e}", "yellow")
+
+            progress_bar.update()
+
+        def worker() -> None:
+            nonlocal completed
+
+            while True:
+                with lock:
+                    if len(queue) == 0:
+                        return
+
+                    item, requeues = queue.popleft()
+                    remaining_time = deadline_at - self.clock()
+
+                    if remaining_time <= 0:
+                        skipped.append(item)
+                        skipped.extend(queued_item for queued_item, _ in queue)
+                        progress_bar.update(len(queue) + 1)
+                        queue.clear()
+                        return
+
+                    budget = self.budget(remaining_time, len(queue) + 1)
+
+                try:
+                    result = func(item, budget)
+                except NodeLostError:
+                    with lock:
+                        # items which keep losing their browser session are dropped, but reported as errors
+                        if requeues < self.max_requeues:
+                            queue.appendleft((item, requeues + 1))
+                        else:
+                            report(item, NodeLostError(f"browser session lost {requeues + 1} times"))
+                    continue
+                except Exception as e:
+                    with lock:
+                        report(item, e)
+                    continue
+
+                with lock:
+                    results.append(result)
+                    completed += 1
+                    progress_bar.update()
+
+                    if (checkpoint is not None) and (completed % checkpoint_every == 0):
+                        checkpoint()
+
+        workers = [
+            threading.Thread(target=worker) for _ in range(min(self.threads, max(1, len(queue))))
+        ]
+
+        for thread in workers:
+            thread.start()
+
+        for thread in workers:
+            thread.join()
+
+        progress_bar.close()
+        return results, skipped
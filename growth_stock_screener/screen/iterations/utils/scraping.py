@@ -2,18 +2,25 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 from selenium.common.exceptions import StaleElementReferenceException
 from selenium.webdriver.common.by import By
-from typing import Callable, List
-from aiohttp.client import ClientSession
+from typing import Any, Callable, Dict, List, Tuple
+from multiprocessing.pool import ThreadPool
+from functools import lru_cache
+from aiohttp.client import ClientSession, ClientTimeout
 from lxml import html
 import re
+import time
 import yfinance as yf
 import pandas as pd
+from .metrics import metrics
+from .tracing import trace_span
 
 
-async def get(url: str, session: ClientSession, headers=None, json=False) -> str:
+async def get(url: str, session: ClientSession, headers=None, json=False, timeout: float = None) -> str:
     """Send a GET request for the given url and return the response as a string. Setting 'json' to 'True' will return a json object."""
+    options = {} if (timeout is None) else {"timeout": ClientTimeout(total=timeout)}
+
     try:
-        async with session.get(url, headers=headers) as response:
+        async with session.get(url, headers=headers, **options) as response:
             if json:
                 return await response.json()
             else:
@@ -27,7 +34,8 @@ def extract_element(xpath: str, response: str) -> WebElement:
     if response is None:
         return None
 
-    dom = html.fromstring(response)
+    with metrics.timer("parse_seconds", parser="lxml"), trace_span("lxml parse", "parse"):
+        dom = html.fromstring(response)
 
     try:
         element = dom.xpath(xpath)[0]
@@ -104,38 +112,150 @@ class WaitForAll:
             return False
 
 
-def yf_download_batches(
-    batch_size: int, symbol_list: List[str], timeout: int
-) -> pd.DataFrame:
-    """Download historical stock price data in batches using yfinance."""
+def missing_symbols(tickers: pd.DataFrame, symbols: List[str]) -> List[str]:
+    """Return the symbols without a single closing price in a yfinance download."""
+    if (len(tickers) == 0) or ("Close" not in tickers.columns.get_level_values(0)):
+        return list(symbols)
 
-    def download_batch(start: int, end: int) -> pd.DataFrame:
-        """Download a batch of historical stock price data from start to end - 1."""
-        print(
-            f"Batch {batch_number}: Symbols {start + 1} to {end} ({symbol_list[start]} — {symbol_list[end - 1]})"
-        )
-        batch = yf.download(
-            [symbol_list[i] for i in range(start, end)], period="2y", timeout=timeout
+    close = tickers["Close"].reindex(columns=symbols)
+    return close.columns[close.isna().all()].tolist()
+
+
+def yf_download_parallel(
+    symbol_list: List[str],
+    batch_size: int,
+    concurrency: int,
+    timeout: int,
+    retries: int = 2,
+    backoff: float = 2,
+    **download_args,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Download historical stock price and volume data using yfinance ('download_args' are passed to 'yf.download').
+    Symbols are split into batches which are downloaded concurrently, up to 'concurrency' at a time. Symbols
+    without any data are retried (in new batches) up to 'retries' times, waiting 'backoff' seconds before the
+    first retry and doubling the wait before each one after (no retries are made if no symbol returned data). Returns the downloaded data (symbols which never
+    returned data have empty columns) and a report with the timing, coverage and missing symbols of each batch."""
+
+    def download_batch(batch: Tuple[int, List[str]]) -> Tuple[pd.DataFrame, List[str], Dict[str, Any]]:
+        """Download one batch of symbols, returning the data of symbols which were found and the missing symbols."""
+        batch_number, symbols = batch
+        batch_start = time.perf_counter()
+
+        try:
+            tickers = yf.download(symbols, timeout=timeout, **{"progress": False, **download_args})
+        except Exception:
+            tickers = pd.DataFrame()
+
+        missing = missing_symbols(tickers, symbols)
+        outcome = "failure" if (len(missing) == len(symbols)) else "success"
+        metrics.increment("source_requests_total", source="yahoo_download", outcome=outcome)
+        metrics.observe(
+            "source_request_seconds", time.perf_counter() - batch_start, source="yahoo_download", outcome=outcome
         )
-        print()
-        return batch
+
+        if len(missing) < len(symbols):
+            tickers = tickers.drop(columns=missing, level=1)
+
+        record = {
+            "Attempt": attempt + 1,
+            "Batch": batch_number,
+            "Symbols": len(symbols),
+            "Missing": len(missing),
+            "Coverage %": 100 * (len(symbols) - len(missing)) / len(symbols),
+            "Seconds": time.perf_counter() - batch_start,
+            "Missing Symbols": missing,
+        }
+
+        return (tickers if (len(missing) < len(symbols)) else None), missing, record
 
     dfs = []
-    start = 0
-    end = min(batch_size, len(symbol_list))
-    batch_number = 1
+    report = []
+    pending = list(symbol_list)
+
+    for attempt in range(retries + 1):
+        if attempt > 0:
+            wait = backoff * 2 ** (attempt - 1)
+            print(f"Retrying {len(pending)} symbols without data in {wait:.0f} seconds . . .")
+            time.sleep(wait)
+
+        batches = list(enumerate([pending[i : i + batch_size] for i in range(0, len(pending), batch_size)], 1))
+        pending = []
+        found = False
+
+        with ThreadPool(max(1, min(concurrency, len(batches)))) as pool:
+            for tickers, missing, record in pool.imap(download_batch, batches):
+                symbols = batches[record["Batch"] - 1][1]
+                print(
+                    f"Batch {record['Batch']}: {symbols[0]} — {symbols[-1]} | {record['Coverage %']:.1f}% coverage"
+                    f" | {record['Seconds']:.1f} s"
+                )
+
+                if tickers is not None:
+                    dfs.append(tickers)
+                    found = True
+
+                pending += missing
+                report.append(record)
+
+        # stop if no symbol returned data (the requested dates have no bars, or the source is unreachable)
+        if (len(pending) == 0) or not found:
+            break
 
-    # loop-and-a-half
-    while end < len(symbol_list):
-        dfs.append(download_batch(start, end))
+    print()
 
-        # increment counters
-        start += batch_size
-        end = min(end + batch_size, len(symbol_list))
-        batch_number += 1
+    if len(dfs) == 0:
+        return pd.DataFrame(), pd.DataFrame(report)
 
-    dfs.append(download_batch(start, end))
+    # concatenate the columns of each DataFrame and give symbols which never returned data empty columns
+    tickers = pd.concat(dfs, axis=1).sort_index()
+    fields = tickers.columns.get_level_values(0).unique()
+
+    return tickers.reindex(columns=pd.MultiIndex.from_product([fields, symbol_list])), pd.DataFrame(report)
+
+
+def confirmed_missing(report: pd.DataFrame) -> List[str]:
+    """Return the symbols which returned no data in a batch that returned data for other symbols (so the source was
+    reachable and the symbols themselves had no data; they may still have returned data when retried). Symbols missing
+    only from batches which returned no data at all may have failed transiently."""
+    if len(report) == 0:
+        return []
+
+    completed = report[report["Coverage %"] > 0]
+    return list(dict.fromkeys(symbol for missing in completed["Missing Symbols"] for symbol in missing))
+
+
+@lru_cache(maxsize=256)
+def yf_history(symbol: str) -> pd.DataFrame:
+    """Download one year of daily price and volume history for a symbol from Yahoo Finance (cached per run)."""
+    return yf.Ticker(symbol).history(period="1y")
+
+
+def yf_moving_averages(symbol: str) -> Dict[str, float]:
+    """Calculate the 10, 20, 50, and 200-day SMAs of a symbol from Yahoo Finance price history."""
+    closes = yf_history(symbol)["Close"].dropna()
+
+    if len(closes) < 200:
+        return None
+
+    return {
+        "10-day SMA": closes.iloc[-10:].mean(),
+        "20-day SMA": closes.iloc[-20:].mean(),
+        "50-day SMA": closes.iloc[-50:].mean(),
+        "200-day SMA": closes.iloc[-200:].mean(),
+    }
+
+
+def yf_52_week_high(symbol: str) -> float:
+    """Return the 52-week high of a symbol from Yahoo Finance price history."""
+    highs = yf_history(symbol)["High"].dropna()
+    return None if (len(highs) == 0) else highs.max()
+
+
+def yf_average_volume(symbol: str, days: int = 50) -> int:
+    """Return the average daily volume of a symbol over the given number of days from Yahoo Finance."""
+    volumes = yf_history(symbol)["Volume"].dropna()
+
+    if len(volumes) < days:
+        return None
 
-    # concatenate the 'Close' columns in each DataFrame
-    price_dfs = map(lambda df: df["Close"], dfs)
-    return pd.concat(price_dfs, axis=1)
+    return int(volumes.iloc[-days:].mean())
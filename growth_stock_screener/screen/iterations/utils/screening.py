@@ -0,0 +1,377 @@
+import pandas as pd
+from typing import Collection, Dict, List, Tuple
+from .calculations import percent_change, relative_strength
+from .events import EventLog
+from .logs import skip_message, filter_message, message, values_message
+from .sec_requests import extract_comparison_revenues
+from .indicators import IndicatorState
+from .negative_cache import negative_cache, UNRESOLVED
+from .tracing import traced
+from ...settings import (
+    min_market_cap,
+    min_price,
+    max_price,
+    min_volume,
+    trend_settings,
+    min_growth_percent,
+    protected_rs,
+)
+
+# outcomes of screening a single symbol
+PASSED = "passed"
+FAILED = "failed"
+FILTERED = "filtered"
+
+# console formats of the values each iteration evaluates a symbol on
+rs_template = """{symbol} | Relative Strength (raw): {rs_raw:.3f}
+            Q1 : start: ${q1_start:.2f}, end: ${q1_end:.2f}
+            Q2 : start: ${q2_start:.2f}, end: ${q2_end:.2f}
+            Q3 : start: ${q3_start:.2f}, end: ${q3_end:.2f}
+            Q4 : start: ${q4_start:.2f}, end: ${q4_end:.2f}"""
+liquidity_template = "{symbol} | Market Cap: ${market_cap_billions:.1f}B | Price: ${price:,.2f} | 50-day Avg. Volume: {volume:,.0f} shares"
+missing_trend_template = "{symbol} | Price: ${price:.2f} | Including despite missing trend data"
+trend_template = """{symbol} | 10-day SMA: ${sma_10}, 20-day SMA: ${sma_20}, 50-day SMA: ${sma_50}, 200-day SMA: ${sma_200}
+        Current Price: ${price:.2f}, 52-week high: ${high_52_week}, Percent Below 52-week High: {percent_below_high:.0f}%"""
+revenue_template = """{symbol} | Q1 revenue growth: {Q1[Growth]:.0f}%, Q2 revenue growth: {Q2[Growth]:.0f}%, RS: {rs}
+            Q1 : current revenue: ${Q1[Current]:,.0f}, previous revenue: ${Q1[Previous]:,.0f}
+            Q2 : current revenue: ${Q2[Current]:,.0f}, previous revenue: ${Q2[Previous]:,.0f}"""
+recent_revenue_template = """{symbol} | Q2 revenue growth: {Q2[Growth]:.0f}%, RS: {rs}
+            Q2 : current revenue: ${Q2[Current]:,.0f}, previous revenue: ${Q2[Previous]:,.0f}"""
+institutional_template = """{symbol} | Net Institutional Inflows (most recent Q): ${net_inflows:,.0f}
+            Inflows: ${inflows:,.0f}, Outflows: ${outflows:,.0f}"""
+
+
+def evaluate_relative_strengths(
+    state: IndicatorState,
+    symbols: List[str],
+    listings: pd.DataFrame,
+    logs: EventLog,
+    unresolved: Collection[str] = None,
+) -> Tuple[List[Dict], List[str]]:
+    """Return the relative strength record (with its raw RS, before ranking) of every symbol with a year of price history
+    in an indicator state, along with the symbols whose price history has gaps. Symbols with under a year of history are
+    added to the negative cache, as are symbols without price data which are known to be 'unresolved' (every symbol
+    without price data if 'unresolved' isn't given)."""
+    records = []
+    failed_symbols = []
+    trading_days = state.trading_days()
+    anchors = {offset: state.close_at(offset) for offset in (251, 189, 188, 126, 125, 63, 62, 0)}
+
+    for symbol in symbols:
+        i = state.index.get(symbol, None)
+
+        # eliminate symbol if no price data was downloaded
+        if (i is None) or (trading_days[i] == 0):
+            # symbols whose download failed along with the rest of their batch are fetched again by the next screen
+            if (unresolved is None) or (symbol in unresolved):
+                negative_cache.add(symbol, UNRESOLVED)
+
+            logs.append(skip_message(symbol, "no price data"))
+            continue
+
+        # eliminate symbol if it has not traded for 1yr
+        if trading_days[i] < 252:
+            negative_cache.add_too_young(symbol, trading_days[i])
+            logs.append(skip_message(symbol, "stock has not traded long enough"))
+            continue
+
+        # calculate raw relative strength using the following formula:
+        # RS = 0.2(Q1 %Δ) + 0.2(Q2 %Δ) + 0.2(Q3 %Δ) + 0.4(Q4 %Δ)
+        q1_start = anchors[251][i]  # day 1
+        q1_end = anchors[189][i]  # day 63
+
+        q2_start = anchors[188][i]  # day 64
+        q2_end = anchors[126][i]  # day 126
+
+        q3_start = anchors[125][i]  # day 127
+        q3_end = anchors[63][i]  # day 189
+
+        q4_start = anchors[62][i]  # day 190
+        q4_end = anchors[0][i]  # day 252
+
+        # eliminate symbol if nan values are present
+        if (
+            pd.isna(q1_start)
+            or pd.isna(q1_end)
+            or pd.isna(q2_start)
+            or pd.isna(q2_end)
+            or pd.isna(q3_start)
+            or pd.isna(q3_end)
+            or pd.isna(q4_start)
+            or pd.isna(q4_end)
+        ):
+            logs.append(skip_message(symbol, "insufficient data"))
+            failed_symbols.append(symbol)
+            continue
+
+        rs_raw = relative_strength(
+            q1_start, q1_end, q2_start, q2_end, q3_start, q3_end, q4_start, q4_end
+        )
+
+        logs.append(
+            values_message(
+                symbol,
+                rs_template,
+                rs_raw=rs_raw,
+                q1_start=q1_start,
+                q1_end=q1_end,
+                q2_start=q2_start,
+                q2_end=q2_end,
+                q3_start=q3_start,
+                q3_end=q3_end,
+                q4_start=q4_start,
+                q4_end=q4_end,
+            )
+        )
+
+        row = listings.loc[symbol]
+
+        records.append(
+            {
+                "Symbol": symbol,
+                "Company Name": row["Company Name"],
+                "Market Cap": row["Market Cap"],
+                "Industry": row["Industry"],
+                "Price": q4_end,
+                "RS (raw)": rs_raw,
+            }
+        )
+
+    return records, failed_symbols
+
+
+def rate_relative_strengths(records: List[Dict]) -> pd.DataFrame:
+    """Rank raw relative strengths into RS ratings (0-100)."""
+    rs_df = pd.DataFrame(records)
+    rs_df["RS"] = rs_df["RS (raw)"].rank(pct=True)
+    rs_df["RS"] = rs_df["RS"].map(lambda rs: round(100 * rs))
+    return rs_df.drop(columns=["RS (raw)"])
+
+
+@traced("evaluate", "compute")
+def evaluate_liquidity(row: pd.Series, volume: int, logs: EventLog) -> Tuple[str, Dict]:
+    """Return whether a relative strength row satisfies liquidity criteria, along with its liquidity record if it passed."""
+    symbol = row["Symbol"]
+    price = row["Price"]
+    market_cap = row["Market Cap"]
+
+    # check if null values are present in screen criteria
+    if volume is None:
+        return FAILED, None
+
+    if pd.isna(market_cap) or market_cap == "":
+        logs.append(skip_message(symbol, "couldn't fetch market cap"))
+        return FAILED, None
+
+    # convert market cap from string literal to float
+    market_cap = float(market_cap)
+
+    # print volume info to console
+    logs.append(
+        values_message(symbol, liquidity_template, market_cap_billions=market_cap / 1000000000, price=price, volume=volume)
+    )
+
+    # filter out illiquid stocks or stocks outside our price range
+    if (market_cap < min_market_cap) or (price < min_price) or (price > max_price) or (volume < min_volume):
+        logs.append(filter_message(symbol))
+        return FILTERED, None
+
+    return PASSED, {
+        "Symbol": symbol,
+        "Company Name": row["Company Name"],
+        "Price": price,
+        "Market Cap": market_cap,
+        "50-day Average Volume": volume,
+        "Industry": row["Industry"],
+        "RS": row["RS"],
+    }
+
+
+@traced("evaluate", "compute")
+def evaluate_trend(
+    row: pd.Series, trend_data: Dict[str, float], high_52_week: float, logs: EventLog
+) -> Tuple[str, Dict]:
+    """Return whether a liquidity row is in a stage-2 uptrend, along with its trend record if it passed."""
+    symbol = row["Symbol"]
+    price = row["Price"]
+
+    # For stocks under $4, we're more interested in growth potential than current trend
+    # So we'll be more lenient with trend criteria
+
+    # If we couldn't get trend data, we'll still include the stock if it's under $4
+    if trend_data is None or high_52_week is None:
+        # For stocks we can't get trend data for, we'll still include them
+        # if they meet our price criteria (under $4)
+        if price <= max_price:
+            logs.append(values_message(symbol, missing_trend_template, price=price))
+            return PASSED, {
+                "Symbol": symbol,
+                "Company Name": row["Company Name"],
+                "Industry": row["Industry"],
+                "RS": row["RS"],
+                "Price": price,
+                "Market Cap": row["Market Cap"],
+                "50-day Average Volume": row["50-day Average Volume"],
+                "% Below 52-week High": None,  # We don't have this data
+            }
+
+        return FAILED, None
+
+    # If we have trend data, we'll use it
+    sma_10 = trend_data["10-day SMA"]
+    sma_20 = trend_data["20-day SMA"]
+    sma_50 = trend_data["50-day SMA"]
+    sma_200 = trend_data["200-day SMA"]
+
+    percent_below_high = -1 * percent_change(high_52_week, price)
+
+    # print trend info to console
+    logs.append(
+        values_message(
+            symbol,
+            trend_template,
+            sma_10=sma_10,
+            sma_20=sma_20,
+            sma_50=sma_50,
+            sma_200=sma_200,
+            price=price,
+            high_52_week=high_52_week,
+            percent_below_high=percent_below_high,
+        )
+    )
+
+    # set up screen criteria based on global settings
+    fails = False
+    if trend_settings["Price >= 50-day SMA"]:
+        fails = fails or (price < sma_50)
+    if trend_settings["Price >= 200-day SMA"]:
+        fails = fails or (price < sma_200)
+    if trend_settings["10-day SMA >= 20-day SMA"]:
+        fails = fails or (sma_10 < sma_20)
+    if trend_settings["20-day SMA >= 50-day SMA"]:
+        fails = fails or (sma_20 < sma_50)
+    if trend_settings["Price within 50% of 52-week High"]:
+        fails = fails or (percent_below_high > 50)
+
+    # filter out stocks which are not in a stage-2 uptrend
+    if fails:
+        logs.append(filter_message(symbol))
+        return FILTERED, None
+
+    return PASSED, {
+        "Symbol": symbol,
+        "Company Name": row["Company Name"],
+        "Industry": row["Industry"],
+        "RS": row["RS"],
+        "Price": price,
+        "Market Cap": row["Market Cap"],
+        "50-day Average Volume": row["50-day Average Volume"],
+        "% Below 52-week High": percent_below_high,
+    }
+
+
+def evaluate_revenue_growth(
+    row: pd.Series, revenue_df: pd.DataFrame, logs: EventLog
+) -> Tuple[str, Dict]:
+    """Return whether a trend row has strong revenue growth, along with its revenue growth record if it passed."""
+    return evaluate_comparison_revenues(row, extract_comparison_revenues(revenue_df), logs)
+
+
+@traced("evaluate", "compute")
+def evaluate_comparison_revenues(
+    row: pd.Series, revenues: Dict[str, Dict[str, float]], logs: EventLog
+) -> Tuple[str, Dict]:
+    """Evaluate revenue growth from revenues already extracted with 'extract_comparison_revenues'."""
+    symbol = row["Symbol"]
+    rs = row["RS"]
+
+    # handle null values from missing data
+    if revenues is None:
+        logs.append(skip_message(symbol, "insufficient data"))
+        return FAILED, None
+
+    if "Foreign Stock" in revenues:
+        logs.append(skip_message(symbol, "foreign stock"))
+        return FILTERED, None
+
+    # print revenue growth data to console
+    template = revenue_template if ("Q1" in revenues) else recent_revenue_template
+    logs.append(values_message(symbol, template, rs=rs, **revenues))
+
+    # filter out stocks with low quarterly revenue growth
+    if (revenues["Q2"]["Growth"] < min_growth_percent) and (rs < protected_rs):
+        logs.append(filter_message(symbol))
+        return FILTERED, None
+
+    if (
+        ("Q1" in revenues)
+        and (revenues["Q1"]["Growth"] < min_growth_percent)
+        and (rs < protected_rs)
+    ):
+        logs.append(filter_message(symbol))
+        return FILTERED, None
+
+    return PASSED, {
+        "Symbol": symbol,
+        "Company Name": row["Company Name"],
+        "Industry": row["Industry"],
+        "RS": rs,
+        "Price": row["Price"],
+        "Market Cap": row["Market Cap"],
+        "Revenue Growth % (most recent Q)": revenues["Q2"]["Growth"],
+        "Revenue Growth % (previous Q)": "N/A"
+        if ("Q1" not in revenues)
+        else revenues["Q1"]["Growth"],
+        "50-day Average Volume": row["50-day Average Volume"],
+        "% Below 52-week High": row["% Below 52-week High"],
+    }
+
+
+@traced("evaluate", "compute")
+def evaluate_institutional_accumulation(
+    row: pd.Series, holdings_data: Dict[str, float], logs: EventLog
+) -> Tuple[str, Dict]:
+    """Return the institutional accumulation record of a revenue growth row. No symbols are filtered out;
+    the outcome is 'FAILED' when holdings data is missing."""
+    symbol = row["Symbol"]
+    outcome = PASSED
+
+    # check for failed GET requests
+    if holdings_data is None:
+        # For low-priced stocks, we'll still include them even without institutional data
+        logs.append(message(f"No institutional data for {symbol}, but including anyway", "yellow", symbol))
+        outcome = FAILED
+        net_inflows = None
+    else:
+        net_inflows = holdings_data["Inflows"] - holdings_data["Outflows"]
+
+        # add institutional holdings info to logs
+        logs.append(
+            values_message(
+                symbol,
+                institutional_template,
+                net_inflows=net_inflows,
+                inflows=holdings_data["Inflows"],
+                outflows=holdings_data["Outflows"],
+            )
+        )
+
+        # mark stocks which are under institutional accumulation
+        if net_inflows >= 0:
+            logs.append(message(f"{symbol} was under institutional accumulation last quarter.", "dark_grey", symbol))
+
+    # Always add the symbol to successful_symbols, even if we couldn't get institutional data
+    # For stocks under $4, we're more interested in other factors
+    return outcome, {
+        "Symbol": symbol,
+        "Company Name": row["Company Name"],
+        "Industry": row["Industry"],
+        "RS": row["RS"],
+        "Price": row["Price"],
+        "Market Cap": row["Market Cap"],
+        "Net Institutional Inflows": net_inflows,
+        "Revenue Growth % (most recent Q)": row.get("Revenue Growth % (most recent Q)", None),
+        "Revenue Growth % (previous Q)": row.get("Revenue Growth % (previous Q)", None),
+        "50-day Average Volume": row.get("50-day Average Volume", None),
+        "% Below 52-week High": row.get("% Below 52-week High", None),
+    }
@@ -8,24 +8,28 @@ import asyncio
 import aiohttp
 from aiohttp.client import ClientSession
 import time
+from functools import lru_cache
 from .scraping import get
+from .metrics import track_request, record_cache_lookup
+from .tracing import trace_span
+from .calculations import percent_change
+from .negative_cache import negative_cache, NO_CIK, FOREIGN_FILER
 
 # constants
 header = {"User-Agent": "name@domain.com"}
 
-# get table to convert from stock tickers to cik's
-response = requests.get(
-    "https://www.sec.gov/files/company_tickers.json", headers=header
-)
-conversions_df = pd.DataFrame.from_dict(response.json(), orient="index").set_index(
-    "ticker"
-)
+
+@lru_cache(maxsize=1)
+def conversions_table() -> pd.DataFrame:
+    """Return the table converting stock tickers to cik's (downloaded from SEC.gov the first time it is needed)."""
+    response = requests.get("https://www.sec.gov/files/company_tickers.json", headers=header)
+    return pd.DataFrame.from_dict(response.json(), orient="index").set_index("ticker")
 
 
 def get_cik(symbol: str) -> str:
     """Convert a stock symbol into a cik used by the SEC for corporate filings."""
     try:
-        cik = conversions_df.loc[symbol]["cik_str"]
+        cik = conversions_table().loc[symbol]["cik_str"]
         cik_padded = str(cik).zfill(10)
         return cik_padded
     except KeyError:
@@ -44,8 +48,9 @@ async def get_company_facts(symbol: str, session: ClientSession) -> dict:
 
     # attempt GET request and return company facts
     try:
-        response = await get(url, session, headers=header, json=True)
-        company_facts = response["facts"]
+        with trace_span("sec company facts", "fetch", symbol=symbol), track_request("sec"):
+            response = await get(url, session, headers=header, json=True)
+            company_facts = response["facts"]
 
         if "us-gaap" not in company_facts:
             return {"Foreign Stock": True}
@@ -55,15 +60,39 @@ async def get_company_facts(symbol: str, session: ClientSession) -> dict:
         return None
 
 
+def cached_revenues(symbol: str) -> pd.DataFrame:
+    """Return the revenue data implied by a symbol's negative cache entry, without sending a request."""
+    if negative_cache.reason(symbol) == FOREIGN_FILER:
+        return pd.DataFrame.from_dict([{"Foreign Stock": True}])
+
+    return None
+
+
 async def fetch_revenues(symbol: str, session: ClientSession) -> pd.DataFrame:
     """Fetch quarterly revenue data for a stock symbol from SEC filings."""
+    # skip symbols already known to have no CIK or to be foreign filers
+    cached = negative_cache.reason(symbol) in [NO_CIK, FOREIGN_FILER]
+    record_cache_lookup("negative_cache", cached)
+
+    if cached:
+        return cached_revenues(symbol)
+
+    if get_cik(symbol) is None:
+        negative_cache.add(symbol, NO_CIK)
+        return None
+
     # get all available SEC data on company
     data = await get_company_facts(symbol, session)
+    return revenues_from_company_facts(symbol, data)
 
+
+def revenues_from_company_facts(symbol: str, data: dict) -> pd.DataFrame:
+    """Extract quarterly and annual revenue data from a company's SEC concept data."""
     if data is None:
         return None
 
     if "Foreign Stock" in data:
+        negative_cache.add(symbol, FOREIGN_FILER)
         return pd.DataFrame.from_dict([data])
 
     # different companies file revenue with varying concepts, and we must check which concept has the most up-to-date data
@@ -86,6 +115,7 @@ async def fetch_revenues(symbol: str, session: ClientSession) -> pd.DataFrame:
 
                 # check for foreign stocks
                 if (len(rows) > 0) and (rows[0]["form"] == "20-F"):
+                    negative_cache.add(symbol, FOREIGN_FILER)
                     return pd.DataFrame.from_dict([{"Foreign Stock": True}])
 
                 revenue_concept_data.append(rows)
@@ -136,10 +166,15 @@ def fetch_all_revenues(symbols: List[str]) -> Dict[str, pd.DataFrame]:
     """Fetch quarterly revenue data for multiple stock symbols from SEC filings."""
 
     async def helper(symbols: List[str]) -> Dict[str, pd.DataFrame]:
-        ret = {}
+        # symbols already known to have no CIK or to be foreign filers don't need requests
+        symbols, skipped = negative_cache.partition(symbols, [NO_CIK, FOREIGN_FILER])
+        ret = {symbol: cached_revenues(symbol) for symbol in skipped}
         remaining_symbols = len(symbols)
         index = 0
 
+        if len(skipped) > 0:
+            print(f"{len(skipped)} symbols skipped (no SEC CIK or foreign filer, cached).")
+
         print("Fetching revenue data . . .\n")
 
         # create a progress bar and aiohttp session
@@ -227,3 +262,56 @@ def previous_timeframe(timeframe: str) -> str:
     year = int(timeframe[2:6]) - 1
     quarter = timeframe[6:]
     return f"CY{year}{quarter}"
+
+
+def quarterly_revenue_growth(timeframe: str, df: pd.DataFrame) -> Dict[str, float]:
+    """Calculate the revenue growth for the given timeframe compared to the same timeframe one year earlier."""
+    if timeframe is None:
+        return None
+
+    # fetch revenues for the inputted timeframe and the same timeframe 1 year ago
+    prev_timeframe = previous_timeframe(timeframe)
+    revenue = extract_revenue(timeframe, df)
+    prev_revenue = extract_revenue(prev_timeframe, df)
+
+    # handle cases where data is unavailable or growth is incalculable
+    if (revenue is None) or (prev_revenue is None) or (prev_revenue <= 0):
+        return None
+
+    # return a dictionary containing revenue growth data
+    growth = percent_change(prev_revenue, revenue)
+
+    return {"Current": revenue, "Previous": prev_revenue, "Growth": growth}
+
+
+def extract_comparison_revenues(revenue_df: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    """Extract revenue from the two most recent financial quarters and their corresponding quarters one year ago."""
+    if revenue_df is None:
+        return None
+
+    if "Foreign Stock" in revenue_df:
+        return {"Foreign Stock": {}}
+
+    # extract the two lowest rows of the revenues DataFrame
+    q1_row = revenue_df.iloc[-2] if (len(revenue_df) >= 2) else None
+    q2_row = revenue_df.iloc[-1] if (len(revenue_df) >= 1) else None
+
+    # determine the timeframe of each row's revenue report
+    q1_timeframe = q1_row["frame"] if (q1_row is not None) else None
+    q2_timeframe = q2_row["frame"] if (q2_row is not None) else None
+
+    # calculate the revenue growth for each timeframe compared to the same timeframe 1 year ago
+    q1_growth = quarterly_revenue_growth(q1_timeframe, revenue_df)
+    q2_growth = quarterly_revenue_growth(q2_timeframe, revenue_df)
+
+    # return revenue details as a dictionary
+    if q2_growth is None:
+        return None
+
+    if q1_growth is None:
+        return {"Q2": q2_growth}
+
+    return {
+        "Q1": q1_growth,
+        "Q2": q2_growth,
+    }
@@ -1,126 +1,196 @@
+import heapq
+import warnings
 import pandas as pd
 import numpy as np
+from ...settings import skyrocket_weights, skyrocket_thresholds, skyrocket_top_n
+
+# label of each reason a score can be given for (with the metric shown in it); each reason's code is the bit at its position
+reason_labels = {
+    'strong_revenue_growth': ("Strong Revenue Growth ({:.1f}%)", 'revenue_growth'),
+    'positive_revenue_growth': ("Positive Revenue Growth ({:.1f}%)", 'revenue_growth'),
+    'excellent_year_return': ("Excellent 1Y Return ({:.1f}%)", 'year_return'),
+    'good_year_return': ("Good 1Y Return ({:.1f}%)", 'year_return'),
+    'near_high': ("Near 52W High ({:.1f}%)", 'pct_from_high'),
+    'high_rs': ("High RS Rating ({:.0f})", 'rs'),
+    'good_rs': ("Good RS Rating ({:.0f})", 'rs'),
+    'institutional_interest': ("Institutional Interest ({:.1f}%)", 'inst_ownership'),
+    'above_sma_50': ("Price > 50-day SMA", None),
+    'above_sma_200': ("Price > 200-day SMA", None),
+}
+reason_codes = {name: 1 << bit for bit, name in enumerate(reason_labels)}
+
+# scores are capped at this many points
+max_skyrocket_score = 10
+
+# metrics each symbol is scored on
+skyrocket_metric_names = [
+    'rs', 'revenue_growth', 'inst_ownership', 'current_price', 'year_return', 'pct_from_high', 'sma_50', 'sma_200'
+]
+
+
+def to_number(value):
+    """
+    Convert a value to a float (NaN if it is missing or not numeric).
+    """
+    try:
+        return np.nan if value is None else float(value)
+    except (ValueError, TypeError):
+        return np.nan
+
+
+def skyrocket_metrics(prices, days, rs, infos=None):
+    """
+    Calculate the metrics scored for each symbol, returning an array per metric (NaN where a metric is unavailable).
+    'prices' holds each symbol's closing prices right-aligned (see PriceMatrix.aligned_closes) and 'days' its number
+    of valid prices. 'infos' holds each symbol's Yahoo Finance info (or None); without infos only prices and
+    RS ratings are scored. A symbol's current price is taken from its info if available, otherwise its latest close.
+    """
+    count = len(rs)
+    metrics = {name: np.full(count, np.nan) for name in skyrocket_metric_names}
+    metrics['rs'] = np.array([to_number(rating) for rating in rs], dtype=float)
+
+    if infos is None:
+        current_price = np.full(count, np.nan)
+    else:
+        infos = [info or {} for info in infos]
+        revenue_growth = [to_number(info.get('revenueGrowth', None)) for info in infos]
+        inst_ownership = [to_number(info.get('institutionsPercentHeld', None)) for info in infos]
+        metrics['revenue_growth'] = np.array(revenue_growth, dtype=float) * 100
+        metrics['inst_ownership'] = np.array(inst_ownership, dtype=float) * 100
+        current_price = np.array([to_number(info.get('currentPrice', None)) for info in infos], dtype=float)
+
+    width = prices.shape[1]
+
+    if width == 0:
+        metrics['current_price'] = current_price
+        return metrics
+
+    with np.errstate(divide='ignore', invalid='ignore'), warnings.catch_warnings():
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+
+        # symbols without prices aren't scored on price performance, even when their info has a current price
+        current_price = np.where(np.isnan(current_price), prices[:, -1], current_price)
+        current_price = np.where(days > 0, current_price, np.nan)
+        metrics['current_price'] = current_price
+
+        first = prices[np.arange(count), np.clip(width - days, 0, width - 1)]
+        high = np.nanmax(prices, axis=1)
+        metrics['year_return'] = np.where(first != 0, ((current_price / first) - 1) * 100, np.nan)
+        metrics['pct_from_high'] = np.where(high != 0, ((current_price / high) - 1) * 100, np.nan)
+
+        for window in (50, 200):
+            metrics[f'sma_{window}'] = np.where(days >= window, prices[:, -window:].mean(axis=1), np.nan)
+
+    return metrics
+
+
+def score_metrics(metrics, weights=skyrocket_weights, thresholds=skyrocket_thresholds):
+    """
+    Score every symbol's skyrocket metrics at once, returning each row's score (capped at 10) and the
+    reasons it was given points for as a bitmask of reason codes. Unavailable metrics score no points, and reasons
+    weighted 0 are never given.
+    """
+    values = {name: np.asarray(metrics[name], dtype=float) for name in skyrocket_metric_names}
+    growth, year_return, rs = values['revenue_growth'], values['year_return'], values['rs']
+    price = values['current_price']
+
+    strong_growth = growth > thresholds['strong_revenue_growth']
+    excellent_return = year_return > thresholds['excellent_year_return']
+    high_rs = rs >= thresholds['high_rs']
+
+    conditions = {
+        'strong_revenue_growth': strong_growth,
+        'positive_revenue_growth': ~strong_growth & (growth > thresholds['positive_revenue_growth']),
+        'excellent_year_return': excellent_return,
+        'good_year_return': ~excellent_return & (year_return > thresholds['good_year_return']),
+        'near_high': values['pct_from_high'] > thresholds['near_high'],
+        'high_rs': high_rs,
+        'good_rs': ~high_rs & (rs >= thresholds['good_rs']),
+        'institutional_interest': values['inst_ownership'] > thresholds['institutional_interest'],
+        'above_sma_50': price > values['sma_50'],
+        'above_sma_200': price > values['sma_200'],
+    }
+
+    scores = np.zeros(len(rs), dtype=np.int16)
+    masks = np.zeros(len(rs), dtype=np.uint16)
+
+    for name, condition in conditions.items():
+        if weights.get(name, 0) != 0:
+            scores += np.where(condition, weights[name], 0).astype(np.int16)
+            masks |= np.where(condition, reason_codes[name], 0).astype(np.uint16)
+
+    return np.clip(scores, 0, max_skyrocket_score).astype(np.int8), masks
+
+
+def describe_reasons(mask, metrics):
+    """
+    Return the reasons in a bitmask of reason codes as text, showing the metric of each reason (from a mapping of a
+    symbol's skyrocket metrics), or "N/A" if the mask holds no reasons.
+    """
+    reasons = []
+
+    for name, (label, metric) in reason_labels.items():
+        if int(mask) & reason_codes[name]:
+            reasons.append(label if metric is None else label.format(metrics[metric]))
+
+    return ", ".join(reasons) if reasons else "N/A"
+
+
+def score_universe(matrix, symbols, rs, infos=None, start=None, weights=skyrocket_weights,
+                   thresholds=skyrocket_thresholds, top_n=skyrocket_top_n, chunk_size=5000):
+    """
+    Score every symbol in the price matrix (closing prices from 'start' onwards) in array passes of 'chunk_size'
+    symbols, keeping a running top 'top_n' in a heap. 'rs' holds each symbol's RS rating and 'infos' each symbol's
+    Yahoo Finance info (see skyrocket_metrics). Returns a DataFrame indexed by symbol with each symbol's skyrocket
+    metrics, 'Skyrocket Score' and 'Skyrocket Reasons' (bitmask of reason codes), and the symbols with the 'top_n'
+    highest scores, highest first (ties go to the earlier symbol).
+    """
+    frames = []
+    top = []  # (score, -position) of the highest scores so far, lowest first
+
+    for begin in range(0, len(symbols), chunk_size):
+        chunk = symbols[begin:begin + chunk_size]
+        prices, days = matrix.aligned_closes(chunk, start)
+        metrics = skyrocket_metrics(
+            prices, days, rs[begin:begin + chunk_size], None if infos is None else infos[begin:begin + chunk_size]
+        )
+        scores, masks = score_metrics(metrics, weights, thresholds)
+        frames.append(pd.DataFrame(
+            {**metrics, 'Skyrocket Score': scores, 'Skyrocket Reasons': masks}, index=pd.Index(chunk, name='Symbol')
+        ))
+
+        # only the chunk's 'top_n' highest scores can enter the running top
+        for position in np.argsort(-scores, kind='stable')[:top_n]:
+            item = (int(scores[position]), -(begin + int(position)))
+
+            if len(top) < top_n:
+                heapq.heappush(top, item)
+            elif item > top[0]:
+                heapq.heapreplace(top, item)
+
+    if len(frames) == 0:
+        columns = skyrocket_metric_names + ['Skyrocket Score', 'Skyrocket Reasons']
+        return pd.DataFrame(columns=columns, index=pd.Index([], name='Symbol')), []
+
+    return pd.concat(frames), [symbols[-position] for _, position in sorted(top, reverse=True)]
+
 
 def calculate_skyrocket_score(symbol_data, info, historical_price_data):
     """
-    Calculates a simplified Skyrocket Score based on available metrics.
+    Calculates a simplified Skyrocket Score for one symbol based on available metrics.
     Score is out of 10.
     Returns score (int) and reason (str).
     """
-    score = 0
-    reasons = []
-    symbol = symbol_data['Symbol'] # Get symbol for indexing historical data
-
-    # 1. Revenue Growth (Max 2 points)
-    revenue_growth = info.get('revenueGrowth', None)
-    if revenue_growth is not None:
-        try:
-            revenue_growth_pct = float(revenue_growth) * 100
-            if revenue_growth_pct > 30:
-                score += 2
-                reasons.append(f"Strong Revenue Growth ({revenue_growth_pct:.1f}%)")
-            elif revenue_growth_pct > 15:
-                score += 1
-                reasons.append(f"Positive Revenue Growth ({revenue_growth_pct:.1f}%)")
-        except (ValueError, TypeError):
-            pass # Ignore if conversion fails
-
-    # 2. Price Performance (Max 3 points) - Using 1-year return and distance from high
-    year_return = None
-    pct_from_high = None
-    current_price = info.get('currentPrice', None) # Use current price from info if available
+    prices = np.empty((1, 0))
 
     # Check if historical_price_data is a valid DataFrame and contains 'Close' column
     if isinstance(historical_price_data, pd.DataFrame) and not historical_price_data.empty and 'Close' in historical_price_data.columns:
-        price_data = historical_price_data['Close'].dropna()
-        if len(price_data) > 0:
-            # Use info's current price if available, otherwise fallback to latest historical
-            if current_price is None:
-                 current_price = price_data.iloc[-1]
-
-            if current_price is not None: # Ensure we have a price
-                try:
-                    current_price_float = float(current_price)
-                    year_ago_price = price_data.iloc[0]
-                    if year_ago_price != 0: # Avoid division by zero
-                        year_return = ((current_price_float / year_ago_price) - 1) * 100
-
-                    high_52week = price_data.max()
-                    if high_52week != 0: # Avoid division by zero
-                        pct_from_high = ((current_price_float / high_52week) - 1) * 100
-                except (ValueError, TypeError):
-                     pass # Ignore if conversion fails
-
-    if year_return is not None:
-        if year_return > 100:
-            score += 2
-            reasons.append(f"Excellent 1Y Return ({year_return:.1f}%)")
-        elif year_return > 30:
-            score += 1
-            reasons.append(f"Good 1Y Return ({year_return:.1f}%)")
-
-    if pct_from_high is not None and pct_from_high > -25: # Closer to high is better momentum
-        score += 1
-        reasons.append(f"Near 52W High ({pct_from_high:.1f}%)")
-
-
-    # 3. RS Rating (Max 2 points)
-    rs_rating = symbol_data.get('RS', None)
-    if rs_rating is not None:
-        try:
-            rs_rating_float = float(rs_rating)
-            if rs_rating_float >= 90:
-                score += 2
-                reasons.append(f"High RS Rating ({rs_rating_float:.0f})")
-            elif rs_rating_float >= 80:
-                score += 1
-                reasons.append(f"Good RS Rating ({rs_rating_float:.0f})")
-        except (ValueError, TypeError):
-            pass # Ignore if conversion fails
-
-    # 4. Institutional Ownership (Max 1 point)
-    # Use 'institutionsPercentHeld' as it seems more common in yfinance info
-    inst_ownership = info.get('institutionsPercentHeld', None)
-    if inst_ownership is not None:
-        try:
-            inst_ownership_pct = float(inst_ownership) * 100
-            if inst_ownership_pct > 20:
-                score += 1
-                reasons.append(f"Institutional Interest ({inst_ownership_pct:.1f}%)")
-        except (ValueError, TypeError):
-            pass # Ignore if conversion fails
-
-    # 5. Trend (SMA) (Max 2 points)
-    sma_50 = None
-    sma_200 = None
-    # Check again if historical_price_data is valid and contains 'Close'
-    if isinstance(historical_price_data, pd.DataFrame) and not historical_price_data.empty and 'Close' in historical_price_data.columns:
-         price_data = historical_price_data['Close'].dropna()
-         if len(price_data) >= 50:
-             sma_50 = price_data.rolling(window=50).mean().iloc[-1]
-         if len(price_data) >= 200:
-             sma_200 = price_data.rolling(window=200).mean().iloc[-1]
-
-    if current_price is not None and sma_50 is not None:
-        try:
-            if float(current_price) > sma_50:
-                score += 1
-                reasons.append("Price > 50-day SMA")
-        except (ValueError, TypeError):
-            pass
-    if current_price is not None and sma_200 is not None:
-        try:
-            if float(current_price) > sma_200:
-                score += 1
-                reasons.append("Price > 200-day SMA")
-        except (ValueError, TypeError):
-            pass
-
-
-    # Normalize score to be out of 10 (Max possible score is 10)
-    final_score = min(score, 10)
-
-    return final_score, ", ".join(reasons) if reasons else "N/A"
+        prices = historical_price_data['Close'].dropna().to_numpy(dtype=float)[np.newaxis, :]
+
+    metrics = skyrocket_metrics(prices, np.array([prices.shape[1]]), [symbol_data.get('RS', None)], [info])
+    scores, masks = score_metrics(metrics)
+
+    return int(scores[0]), describe_reasons(masks[0], {name: values[0] for name, values in metrics.items()})
 
 
 def generate_top_10_html(scored_df):
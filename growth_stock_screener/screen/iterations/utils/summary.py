@@ -1,158 +1,161 @@
 import os
+import numpy as np
 import pandas as pd
 from datetime import datetime
+from typing import Dict, List
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 from .outfiles import open_outfile
 
+# stages summarized (sheet name and outfile of each)
+summary_stages = [
+    {"name": "1. Relative Strength", "file": "relative_strengths"},
+    {"name": "2. Liquidity", "file": "liquidity"},
+    {"name": "3. Trend", "file": "trend"},
+    {"name": "4. Revenue Growth", "file": "revenue_growth"},
+    {"name": "5. Final Results", "file": "institutional_accumulation"}
+]
+
+# names of the styles shared by every header cell and every other cell
+header_style_name = "Summary Header"
+cell_style_name = "Summary Cell"
+
+
+def summary_styles() -> List[NamedStyle]:
+    """
+    Return the named styles of the summary's header and body cells (cells refer to these instead of each holding
+    their own font, fill and border).
+    """
+    thin = Side(style="thin")
+    thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    return [
+        NamedStyle(
+            name=header_style_name,
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center", wrap_text=True),
+            border=thin_border,
+        ),
+        NamedStyle(name=cell_style_name, border=thin_border),
+    ]
+
+
+def column_widths(df: pd.DataFrame, header: bool = True) -> List[float]:
+    """
+    Return the width of each column fitting its longest value as text (and its header), measuring every value of a
+    column at once.
+    """
+    lengths = df.astype(str).apply(lambda column: column.str.len()).max().fillna(0)
+
+    if header:
+        lengths = np.maximum(lengths.to_numpy(), df.columns.astype(str).str.len().to_numpy())
+
+    return [(int(length) + 2) * 1.2 for length in lengths]
+
+
+def styled_cell(ws, value, style: str) -> WriteOnlyCell:
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def write_stage_sheet(wb: Workbook, title: str, df: pd.DataFrame) -> None:
+    """
+    Stream a stage's rows into a new sheet of a write-only workbook, with a styled header row frozen above them.
+    """
+    ws = wb.create_sheet(title=title)
+
+    # column widths and frozen panes must be set before any row is written
+    for c_idx, width in enumerate(column_widths(df), 1):
+        ws.column_dimensions[get_column_letter(c_idx)].width = width
+
+    ws.freeze_panes = "A2"
+    ws.append([styled_cell(ws, value, header_style_name) for value in df.columns])
+
+    # each row is written as soon as it is appended, so the same styled cells are reused for every row
+    cells = [styled_cell(ws, None, cell_style_name) for _ in df.columns]
+
+    for row in df.itertuples(index=False, name=None):
+        for cell, value in zip(cells, row):
+            cell.value = value
+
+        ws.append(cells)
+
+
+def write_summary_sheet(wb: Workbook, frames: Dict[str, pd.DataFrame]) -> None:
+    """
+    Write the summary sheet, with the number of stocks remaining after each stage which could be loaded.
+    """
+    ws = wb.create_sheet(title="Summary")
+
+    # Get the counts for each stage (percentages are of the first stage's count)
+    first = summary_stages[0]["name"]
+    total_stocks = len(frames[first]) if first in frames else 0
+    rows = [["Growth Stock Screener Summary"], [], ["Date:", datetime.now().strftime("%Y-%m-%d %H:%M:%S")], []]
+    header = ["Stage", "Stocks Remaining", "% of Total"]
+    counts = []
+
+    for stage in summary_stages:
+        if stage["name"] in frames:
+            count = len(frames[stage["name"]])
+            percentage = f"{(count / total_stocks) * 100:.2f}%" if total_stocks > 0 else "N/A"
+            counts.append([stage["name"], count, percentage])
+
+    widths = column_widths(pd.DataFrame(rows + [header] + counts), header=False)
+
+    for c_idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(c_idx)].width = width
+
+    title = WriteOnlyCell(ws, value=rows[0][0])
+    title.font = Font(bold=True, size=16)
+    ws.merged_cells.add("A1:D1")
+    ws.append([title])
+
+    for row in rows[1:]:
+        ws.append(row)
+
+    ws.append([styled_cell(ws, value, header_style_name) for value in header])
+
+    for row in counts:
+        ws.append([styled_cell(ws, value, cell_style_name) for value in row])
+
+
 def create_summary_file():
     """
     Create a summary Excel file with tabs for each stage of the screening process.
+    Each stage's outfile is loaded once, and rows are streamed through a write-only workbook.
     """
-    # Define the stages and their corresponding JSON files
-    stages = [
-        {"name": "1. Relative Strength", "file": "relative_strengths"},
-        {"name": "2. Liquidity", "file": "liquidity"},
-        {"name": "3. Trend", "file": "trend"},
-        {"name": "4. Revenue Growth", "file": "revenue_growth"},
-        {"name": "5. Final Results", "file": "institutional_accumulation"}
-    ]
-    
-    # Create a new workbook
-    wb = Workbook()
-    
-    # Remove the default sheet
-    default_sheet = wb.active
-    wb.remove(default_sheet)
-    
-    # Define styles
-    header_font = Font(bold=True, color="FFFFFF")
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-    thin_border = Border(
-        left=Side(style="thin"), 
-        right=Side(style="thin"), 
-        top=Side(style="thin"), 
-        bottom=Side(style="thin")
-    )
-    
-    # Create a sheet for each stage
-    for stage in stages:
-        try:
-            # Try to open the JSON file for this stage
-            df = open_outfile(stage["file"])
-            
-            # Create a new sheet
-            ws = wb.create_sheet(title=stage["name"])
-            
-            # Write the data to the sheet
-            for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-                for c_idx, value in enumerate(row, 1):
-                    cell = ws.cell(row=r_idx, column=c_idx, value=value)
-                    
-                    # Apply styles to header row
-                    if r_idx == 1:
-                        cell.font = header_font
-                        cell.fill = header_fill
-                        cell.alignment = header_alignment
-                        cell.border = thin_border
-                    else:
-                        cell.border = thin_border
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-                
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                
-                adjusted_width = (max_length + 2) * 1.2
-                ws.column_dimensions[column_letter].width = adjusted_width
-            
-            # Freeze the header row
-            ws.freeze_panes = "A2"
-            
-        except Exception as e:
-            print(f"Error creating sheet for {stage['name']}: {e}")
-    
-    # Create a summary sheet
-    summary_sheet = wb.create_sheet(title="Summary", index=0)
-    
-    # Add summary information
-    summary_sheet["A1"] = "Growth Stock Screener Summary"
-    summary_sheet["A1"].font = Font(bold=True, size=16)
-    summary_sheet.merge_cells("A1:D1")
-    
-    summary_sheet["A3"] = "Date:"
-    summary_sheet["B3"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    summary_sheet["A5"] = "Stage"
-    summary_sheet["B5"] = "Stocks Remaining"
-    summary_sheet["C5"] = "% of Total"
-    
-    # Apply header styles
-    for cell in summary_sheet["5:5"]:
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = thin_border
-    
-    # Get the counts for each stage
-    row = 6
-    total_stocks = 0
-    
-    for i, stage in enumerate(stages):
+    # Load each stage's outfile once (stages which can't be loaded are left out of the summary)
+    frames = {}
+
+    for stage in summary_stages:
         try:
-            df = open_outfile(stage["file"])
-            count = len(df)
-            
-            # Get the total from the first stage
-            if i == 0:
-                total_stocks = count
-            
-            summary_sheet[f"A{row}"] = stage["name"]
-            summary_sheet[f"B{row}"] = count
-            
-            # Calculate percentage of total
-            if total_stocks > 0:
-                percentage = (count / total_stocks) * 100
-                summary_sheet[f"C{row}"] = f"{percentage:.2f}%"
-            else:
-                summary_sheet[f"C{row}"] = "N/A"
-            
-            # Apply border
-            for cell in summary_sheet[f"{row}:{row}"]:
-                cell.border = thin_border
-            
-            row += 1
+            frames[stage["name"]] = open_outfile(stage["file"])
         except Exception as e:
-            print(f"Error adding summary for {stage['name']}: {e}")
-    
-    # Auto-adjust column widths
-    for column in summary_sheet.columns:
-        max_length = 0
-        column_letter = get_column_letter(column[0].column)
-        
-        for cell in column:
+            print(f"Error loading {stage['name']}: {e}")
+
+    # Create a new write-only workbook with shared styles
+    wb = Workbook(write_only=True)
+
+    for style in summary_styles():
+        wb.add_named_style(style)
+
+    # The summary sheet comes first, followed by a sheet for each stage
+    write_summary_sheet(wb, frames)
+
+    for stage in summary_stages:
+        if stage["name"] in frames:
             try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        
-        adjusted_width = (max_length + 2) * 1.2
-        summary_sheet.column_dimensions[column_letter].width = adjusted_width
-    
+                write_stage_sheet(wb, stage["name"], frames[stage["name"]])
+            except Exception as e:
+                print(f"Error creating sheet for {stage['name']}: {e}")
+
     # Save the workbook
     time_string = datetime.now().strftime("%Y-%m-%d %H-%M-%S")
     file_path = os.path.join(os.getcwd(), f"screen_summary {time_string}.xlsx")
     wb.save(file_path)
-    
+
     return file_path
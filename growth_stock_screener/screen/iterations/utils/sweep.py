@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Tuple
+from .filters import iteration_filters, prepare_metrics, numeric_column
+from .raw_metrics import fetched_column
+
+
+def profile_arrays(profiles: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Stack each setting of the given profiles into an array of shape (profiles, 1) so that filters broadcast
+    over profiles and rows at once."""
+    settings = list(profiles.values())
+    arrays = {
+        key: np.array([profile[key] for profile in settings]).reshape(-1, 1)
+        for key in settings[0]
+        if key != "trend_settings"
+    }
+    arrays["trend_settings"] = {
+        key: np.array([bool(profile["trend_settings"][key]) for profile in settings]).reshape(-1, 1)
+        for key in settings[0]["trend_settings"]
+    }
+
+    return arrays
+
+
+def evaluate_profiles(
+    relative_strengths: pd.DataFrame, metrics: pd.DataFrame, profiles: Dict[str, Dict[str, Any]]
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Apply every profile's criteria to raw metrics in one vectorized pass. Returns a comparison table
+    (one row per profile) and a table of which symbols passed every iteration under each profile."""
+    df = prepare_metrics(relative_strengths, metrics)
+    arrays = profile_arrays(profiles)
+    symbols = df["Symbol"].to_numpy()
+
+    # reached[p, i] is True while symbol i is still passing under profile p
+    reached = numeric_column(df, "RS") >= arrays["min_rs"]
+    summary = {"Relative Strength": reached.sum(axis=1)}
+    unfetched = np.zeros(len(profiles), dtype=int)
+
+    for iteration, (mask, _) in iteration_filters.items():
+        fetched = df[fetched_column(iteration)].to_numpy()
+        unfetched += (reached & ~fetched).sum(axis=1)
+        reached = reached & fetched & mask(df, arrays)
+        summary[iteration.replace("_", " ").title()] = reached.sum(axis=1)
+
+    under_accumulation = reached & (numeric_column(df, "Net Institutional Inflows") >= 0)
+    summary["Under Accumulation"] = under_accumulation.sum(axis=1)
+    summary["Missing Data"] = unfetched
+    summary["Survivors"] = [", ".join(symbols[passed]) for passed in reached]
+
+    comparison = pd.DataFrame(summary, index=pd.Index(list(profiles), name="Profile"))
+    survivors = pd.DataFrame(reached.T, index=pd.Index(symbols, name="Symbol"), columns=list(profiles))
+
+    return comparison, survivors[survivors.any(axis=1)]
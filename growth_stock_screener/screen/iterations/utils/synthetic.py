@@ -0,0 +1,304 @@
+import re
+import json
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+from .replay import FixtureArchive, request_key, BROWSER
+from .fetchers import (
+    volume_xpath,
+    sma_10_xpath,
+    sma_20_xpath,
+    sma_50_xpath,
+    sma_200_xpath,
+    high_52_week_xpath,
+    inflows_css,
+    outflows_css,
+)
+
+# the last trading day of every synthetic price history (fixed, so universes are reproducible)
+synthetic_end_date = "2024-06-28"
+
+# first calendar year of synthetic SEC filings (each company files three years of 10-Q/10-K reports and one more 10-Q)
+synthetic_filing_year = 2021
+
+synthetic_industries = [
+    "Biotechnology: Pharmaceutical Preparations",
+    "Computer Software: Prepackaged Software",
+    "EDP Services",
+    "Medical/Dental Instruments",
+    "Oil & Gas Production",
+    "Major Banks",
+    "Semiconductors",
+    "Industrial Machinery/Components",
+    "Real Estate Investment Trusts",
+    "Restaurants",
+]
+
+page_padding = "<div><span>synthetic page padding</span></div>"
+
+
+@lru_cache(maxsize=None)
+def page_skeleton(xpath: str, page_bytes: int) -> Tuple[str, str]:
+    """Return the html before and after the text of an element at an absolute xpath (such as '/html/body/div[2]/span'),
+    with empty earlier siblings at each step of the path and padding after the element, to about 'page_bytes' long."""
+    prefix = ""
+    suffix = ""
+
+    for step in xpath.strip("/").split("/"):
+        tag, position = re.fullmatch(r"([\w-]+)(?:\[(\d+)\])?", step).groups()
+        prefix += f"<{tag}></{tag}>" * (int(position or 1) - 1) + f"<{tag}>"
+        suffix = f"</{tag}>" + suffix
+
+    # pad the body after the element, so the element keeps its position
+    padding = page_padding * max(0, (page_bytes - len(prefix) - len(suffix)) // len(page_padding))
+    suffix = suffix.replace("</body>", f"{padding}</body>")
+
+    return prefix, suffix
+
+
+def html_at_xpath(xpath: str, text: str, page_bytes: int = 0) -> str:
+    """Return an html page with the given text at an absolute xpath."""
+    prefix, suffix = page_skeleton(xpath, page_bytes)
+    return f"{prefix}{text}{suffix}"
+
+
+def synthetic_symbol(i: int, letters: int) -> str:
+    """Return the i'th symbol of a universe (AAAA, AAAB, ...)."""
+    symbol = ""
+
+    for _ in range(letters):
+        i, letter = divmod(i, 26)
+        symbol = chr(ord("A") + letter) + symbol
+
+    return symbol
+
+
+class SyntheticUniverse:
+    """Reproducible stand-in for every source of a screen, at any number of symbols: NASDAQ listings, Yahoo Finance
+    price/volume histories, SEC tickers and companyfacts payloads, and the pages scraped from barchart, tradingview,
+    cnbc and marketbeat. Prices follow geometric Brownian motion from penny-stock levels, and the share of symbols
+    which are recently listed (with IPO ages drawn from an exponential distribution), have no price data, have gaps in
+    their histories, file as foreign issuers, have no SEC CIK or have no market cap are each configurable."""
+
+    def __init__(
+        self,
+        size: int,
+        seed: int = 0,
+        days: int = 260,
+        missing_rate: float = 0.002,
+        young_rate: float = 0.1,
+        mean_ipo_age: float = 120,
+        unresolved_rate: float = 0.02,
+        foreign_rate: float = 0.05,
+        no_cik_rate: float = 0.05,
+        missing_market_cap_rate: float = 0.02,
+        page_bytes: int = 20000,
+    ):
+        self.size = size
+        self.seed = seed
+        self.days = days
+        self.missing_rate = missing_rate
+        self.page_bytes = page_bytes
+
+        rng = np.random.default_rng([seed, 0])
+        letters = max(4, int(np.ceil(np.log(max(size, 2)) / np.log(26))))
+
+        self.symbols = [synthetic_symbol(i, letters) for i in range(size)]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.dates = pd.bdate_range(end=synthetic_end_date, periods=days)
+
+        # price paths
+        self.start_price = rng.lognormal(np.log(1.5), 0.8, size)
+        self.drift = rng.normal(0.0005, 0.002, size)
+        self.volatility = rng.uniform(0.02, 0.06, size)
+        self.base_volume = rng.lognormal(np.log(200000), 1.2, size)
+        self.shares = rng.lognormal(np.log(20000000), 1.0, size)
+
+        # listing ages, in trading days (0 for symbols listed before the history starts)
+        young = rng.random(size) < young_rate
+        ipo_age = np.clip(rng.exponential(mean_ipo_age, size), 1, days - 1).astype(int)
+        self.ipo_day = np.where(young, days - ipo_age, 0)
+
+        # data quality of each symbol
+        self.unresolved = rng.random(size) < unresolved_rate
+        self.foreign = rng.random(size) < foreign_rate
+        self.no_cik = rng.random(size) < no_cik_rate
+        self.missing_market_cap = rng.random(size) < missing_market_cap_rate
+        self.industry = rng.integers(0, len(synthetic_industries), size)
+
+        # revenue of each company's first synthetic quarter, and its yearly growth rate
+        self.base_revenue = rng.lognormal(np.log(5000000), 1.5, size)
+        self.revenue_growth = np.maximum(rng.normal(0.2, 0.4, size), -0.9)
+
+        # indicators of each symbol, as they would be scraped
+        close, volume = self.price_history()
+        self.last_price = close.ffill().iloc[-1].to_numpy()
+        self.sma = {window: close.iloc[-window:].mean().to_numpy() for window in (10, 20, 50, 200)}
+        self.high_52_week = close.iloc[-252:].max().to_numpy()
+        self.average_volume = volume.iloc[-50:].mean().to_numpy()
+
+    def price_history(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Return the daily close prices and volumes of every symbol (date x symbol, as downloaded from Yahoo Finance).
+        Bars before a symbol's IPO, every bar of symbols without price data, and randomly missing bars are NaN."""
+        rng = np.random.default_rng([self.seed, 1])
+
+        returns = rng.normal(self.drift, self.volatility, (self.days, self.size))
+        close = self.start_price * np.exp(np.cumsum(returns, axis=0))
+        volume = np.round(self.base_volume * rng.lognormal(0, 0.5, (self.days, self.size)))
+
+        missing = rng.random((self.days, self.size)) < self.missing_rate
+        missing |= np.arange(self.days)[:, None] < self.ipo_day
+        missing[:, self.unresolved] = True
+
+        close[missing] = np.nan
+        volume[missing] = np.nan
+
+        return (
+            pd.DataFrame(close, index=self.dates, columns=self.symbols),
+            pd.DataFrame(volume, index=self.dates, columns=self.symbols),
+        )
+
+    def company_name(self, i: int) -> str:
+        return f"{self.symbols[i].title()} Holdings Inc. Common Stock"
+
+    def market_cap(self, i: int) -> str:
+        if self.missing_market_cap[i] or np.isnan(self.last_price[i]):
+            return ""
+
+        return f"{self.last_price[i] * self.shares[i]:.2f}"
+
+    def listings(self) -> pd.DataFrame:
+        """Return the listings of every symbol, as saved by the NASDAQ listings iteration."""
+        return pd.DataFrame(
+            {
+                "Symbol": self.symbols,
+                "Company Name": [self.company_name(i) for i in range(self.size)],
+                "Market Cap": [self.market_cap(i) for i in range(self.size)],
+                "Industry": [synthetic_industries[industry] for industry in self.industry],
+            }
+        )
+
+    def nasdaq_response(self) -> Dict[str, Any]:
+        """Return the NASDAQ screener API's response listing every symbol."""
+        rows = [
+            {
+                "symbol": symbol,
+                "name": self.company_name(i),
+                "lastsale": "NA" if np.isnan(self.last_price[i]) else f"${self.last_price[i]:.2f}",
+                "netchange": "0.00",
+                "pctchange": "0.000%",
+                "volume": f"{self.base_volume[i]:.0f}",
+                "marketCap": self.market_cap(i),
+                "country": "Canada" if self.foreign[i] else "United States",
+                "ipoyear": "",
+                "industry": synthetic_industries[self.industry[i]],
+                "sector": "",
+                "url": f"/market-activity/stocks/{symbol.lower()}",
+            }
+            for i, symbol in enumerate(self.symbols)
+        ]
+        return {"data": {"asOf": None, "headers": {}, "rows": rows}, "message": None, "status": {"rCode": 200}}
+
+    def cik(self, i: int) -> int:
+        return 1000000 + i
+
+    def company_tickers(self) -> Dict[str, Dict[str, Any]]:
+        """Return SEC.gov's table of tickers and CIKs (without companies which have no CIK)."""
+        return {
+            str(i): {"cik_str": self.cik(i), "ticker": symbol, "title": self.company_name(i)}
+            for i, symbol in enumerate(self.symbols)
+            if not self.no_cik[i]
+        }
+
+    def company_facts(self, symbol: str) -> Dict[str, Any]:
+        """Return SEC.gov's companyfacts payload of a symbol, with quarterly (10-Q) and annual (10-K) revenues framed
+        by calendar period, and unframed rows repeating earlier periods (as later filings do). Foreign issuers file 20-F reports."""
+        i = self.index[symbol]
+        rows = []
+        quarters = []
+
+        for year in range(synthetic_filing_year, synthetic_filing_year + 4):
+            for quarter in range(1, 5):
+                # the last year has a single quarter filed
+                if (year == synthetic_filing_year + 3) and (quarter > 1):
+                    break
+
+                period = 4 * (year - synthetic_filing_year) + (quarter - 1)
+                revenue = self.base_revenue[i] * (1 + self.revenue_growth[i]) ** (period / 4) * (1 + 0.05 * (quarter % 2))
+                quarters.append(revenue)
+                start = pd.Timestamp(year=year, month=3 * quarter - 2, day=1)
+                end = start + pd.offsets.QuarterEnd(0)
+
+                if self.foreign[i]:
+                    if quarter == 4:
+                        rows.append(self.revenue_row(pd.Timestamp(year=year, month=1, day=1), end, sum(quarters[-4:]), "20-F", f"CY{year}"))
+                elif quarter < 4:
+                    rows.append(self.revenue_row(start, end, revenue, "10-Q", f"CY{year}Q{quarter}"))
+                else:
+                    # annual revenues stand in for the fourth quarter, as 10-K reports do
+                    rows.append(self.revenue_row(pd.Timestamp(year=year, month=1, day=1), end, sum(quarters[-4:]), "10-K", f"CY{year}"))
+
+                # repeat the previous year's quarter without a frame
+                if (not self.foreign[i]) and (quarter < 4) and (len(quarters) > 4):
+                    rows.append(self.revenue_row(start - pd.DateOffset(years=1), end - pd.DateOffset(years=1), quarters[-5], "10-Q"))
+
+        return {
+            "cik": self.cik(i),
+            "entityName": self.company_name(i),
+            "facts": {"us-gaap": {"Revenues": {"label": "Revenues", "units": {"USD": rows}}}},
+        }
+
+    @staticmethod
+    def revenue_row(start: pd.Timestamp, end: pd.Timestamp, value: float, form: str, frame: str = None) -> Dict[str, Any]:
+        row = {"start": f"{start:%Y-%m-%d}", "end": f"{end:%Y-%m-%d}", "val": int(value), "form": form}
+
+        if frame is not None:
+            row["frame"] = frame
+
+        return row
+
+    def barchart_page(self, symbol: str) -> str:
+        """Return a barchart.com technical analysis page, with the symbol's 50-day average volume."""
+        return html_at_xpath(volume_xpath, f"{self.average_volume[self.index[symbol]]:,.0f}", self.page_bytes)
+
+    def cnbc_page(self, symbol: str) -> str:
+        """Return a cnbc.com quote page, with the symbol's 52-week high."""
+        return html_at_xpath(high_52_week_xpath, f"{self.high_52_week[self.index[symbol]]:.2f}", self.page_bytes)
+
+    def tradingview_elements(self, symbol: str) -> Dict[str, str]:
+        """Return the moving averages found on a symbol's tradingview.com technicals page (by element locator)."""
+        i = self.index[symbol]
+        xpaths = {10: sma_10_xpath, 20: sma_20_xpath, 50: sma_50_xpath, 200: sma_200_xpath}
+        return {f"xpath={xpath}": f"{self.sma[window][i]:.4f}" for window, xpath in xpaths.items()}
+
+    def marketbeat_elements(self, symbol: str) -> Dict[str, str]:
+        """Return the institutional inflows and outflows found on a symbol's marketbeat.com ownership page (by element locator)."""
+        shares = self.shares[self.index[symbol]]
+        return {f"css selector={inflows_css}": f"${shares * 0.03 / 1000000:.2f}M", f"css selector={outflows_css}": f"${shares * 0.02 / 1000000:.2f}M"}
+
+    def write_archive(self, path: str) -> FixtureArchive:
+        """Write the responses of every source to a fixture archive (which 'run_benchmark.py' replays). Yahoo Finance
+        responses aren't synthesized, so price data is replayed as missing."""
+        archive = FixtureArchive(path)
+        html = {"Content-Type": "text/html"}
+        json_type = {"Content-Type": "application/json"}
+
+        def add(key: str, body: Any, headers: Dict[str, str] = json_type) -> None:
+            archive.add(key, 200, headers, body.encode() if isinstance(body, str) else json.dumps(body).encode())
+
+        add(request_key("GET", "https://api.nasdaq.com/api/screener/stocks?tableonly=true&limit=25&offset=0&download=true"), self.nasdaq_response())
+        add(request_key("GET", "https://www.sec.gov/files/company_tickers.json"), self.company_tickers())
+
+        for i, symbol in enumerate(self.symbols):
+            if not self.no_cik[i]:
+                add(request_key("GET", f"https://data.sec.gov/api/xbrl/companyfacts/CIK{str(self.cik(i)).zfill(10)}.json"), self.company_facts(symbol))
+
+            add(request_key("GET", f"https://www.barchart.com/stocks/quotes/{symbol}/technical-analysis"), self.barchart_page(symbol), html)
+            add(request_key("GET", f"https://www.cnbc.com/quotes/{symbol}"), self.cnbc_page(symbol), html)
+            add(request_key(BROWSER, f"https://www.tradingview.com/symbols/{symbol}/technicals/"), self.tradingview_elements(symbol))
+            add(request_key("GET", f"https://www.marketbeat.com/stocks/NASDAQ/{symbol}/"), "", html)
+            add(request_key(BROWSER, f"https://www.marketbeat.com/stocks/NASDAQ/{symbol}/institutional-ownership/"), self.marketbeat_elements(symbol))
+
+        archive.save()
+        return archive
@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from itertools import count
+from typing import Any, Callable, Dict, Iterator, List
+from .locking import atomic_writer
+from ...settings import trace_spans
+
+# file in each run directory holding the screen's timeline (Chrome trace event format)
+trace_name = "trace.json"
+
+
+class Span:
+    """An open span: where it was opened (thread and asyncio task) and the track it is drawn on."""
+
+    __slots__ = ("name", "thread", "task", "track")
+
+    def __init__(self, name: str, thread: int, task: asyncio.Task, track: str):
+        self.name = name
+        self.thread = thread
+        self.task = task
+        self.track = track
+
+
+# innermost open span of the current thread or asyncio task
+current_span: ContextVar = ContextVar("current_span", default=None)
+
+
+def running_task() -> asyncio.Task:
+    try:
+        return asyncio.current_task()
+    except RuntimeError:  # no running event loop
+        return None
+
+
+class Tracer:
+    """Thread-safe recorder of nested spans (stage, symbol, then fetch/parse/compute steps) with their start and end
+    times and attributes. Spans of a thread are drawn on the thread's track; concurrent asyncio tasks each take the
+    first free track of their thread, so that every track holds properly nested spans."""
+
+    def __init__(self, enabled: bool = trace_spans):
+        self.enabled = enabled
+        self.origin = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+        self.tracks: Dict[str, int] = {}  # track name -> trace thread id
+        self.busy_lanes: Dict[str, set] = {}  # thread name -> task tracks in use
+        self.lock = threading.Lock()
+
+    def track_id(self, track: str) -> int:
+        with self.lock:
+            return self.tracks.setdefault(track, len(self.tracks) + 1)
+
+    def acquire_lane(self, thread: str) -> int:
+        with self.lock:
+            busy = self.busy_lanes.setdefault(thread, set())
+            lane = next(lane for lane in count() if lane not in busy)
+            busy.add(lane)
+
+        return lane
+
+    def release_lane(self, thread: str, lane: int) -> None:
+        with self.lock:
+            self.busy_lanes[thread].discard(lane)
+
+    @contextmanager
+    def span(self, name: str, category: str = "compute", **attributes) -> Iterator[Dict[str, Any]]:
+        """Trace a block of code. Yields the span's attributes, which can be added to before the span ends
+        (exceptions raised in the block are recorded as an "error" attribute)."""
+        if not self.enabled:
+            yield attributes
+            return
+
+        parent = current_span.get()
+        thread = threading.current_thread()
+        task = running_task()
+        lane = None
+
+        if (parent is not None) and (parent.thread == thread.ident) and (parent.task is task):
+            track = parent.track
+        elif task is not None:
+            lane = self.acquire_lane(thread.name)
+            track = f"{thread.name} (task {lane})"
+        else:
+            track = thread.name
+
+        if parent is not None:
+            attributes["parent"] = parent.name
+
+        token = current_span.set(Span(name, thread.ident, task, track))
+        start = time.perf_counter()
+
+        try:
+            yield attributes
+        except Exception as e:
+            attributes["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            end = time.perf_counter()
+            current_span.reset(token)
+
+            if lane is not None:
+                self.release_lane(thread.name, lane)
+
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self.origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": self.track_id(track),
+                    "args": attributes,
+                }
+            )
+
+    def slowest(self, category: str = "symbol", spans: int = 5) -> List[Dict[str, Any]]:
+        """Return the longest spans of a category, longest first."""
+        events = [event for event in self.events if event["cat"] == category]
+        return sorted(events, key=lambda event: event["dur"], reverse=True)[:spans]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the recorded spans in Chrome trace event format, with each track named."""
+        with self.lock:
+            names = [
+                {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": track}}
+                for track, tid in self.tracks.items()
+            ]
+
+        return {"traceEvents": names + list(self.events), "displayTimeUnit": "ms"}
+
+    def save(self, directory: str = None) -> str:
+        """Write the trace to a directory (by default, the run's outfile directory) and return its path."""
+        from .cache import run_directory
+
+        path = os.path.join(directory or run_directory(), trace_name)
+
+        with atomic_writer(path) as f:
+            json.dump(self.to_dict(), f, default=str)
+
+        return path
+
+
+# spans of every iteration of a screen
+tracer = Tracer()
+
+
+def trace_span(name: str, category: str = "compute", **attributes):
+    """Trace a block of code ('with trace_span(symbol, "symbol", stage=iteration_name): ...')."""
+    return tracer.span(name, category, **attributes)
+
+
+def traced(name: str, category: str = "compute") -> Callable[[Callable], Callable]:
+    """Decorator tracing every call of a function (or coroutine function) in a span."""
+
+    def decorator(function: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(function):
+
+            @wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with tracer.span(name, category):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with tracer.span(name, category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,93 @@
+import itertools
+import json
+from types import ModuleType
+from typing import Any, Dict, List
+
+# settings which a sweep profile may override
+sweep_keys = [
+    "min_rs",
+    "min_market_cap",
+    "min_price",
+    "max_price",
+    "min_volume",
+    "trend_settings",
+    "min_growth_percent",
+    "protected_rs",
+]
+
+# whether the lowest ('min') or highest ('max') value of a setting lets the most symbols through
+permissive = {
+    "min_rs": min,
+    "min_market_cap": min,
+    "min_price": min,
+    "max_price": max,
+    "min_volume": min,
+    "min_growth_percent": min,
+    "protected_rs": min,
+}
+
+
+def apply_overrides(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of the base settings with the given overrides applied. Individual trend settings
+    may be overridden with keys such as 'trend_settings.Price >= 50-day SMA'."""
+    settings = {key: base[key] for key in sweep_keys}
+    settings["trend_settings"] = dict(base["trend_settings"])
+
+    for key, value in overrides.items():
+        if key.startswith("trend_settings."):
+            trend_key = key[len("trend_settings."):]
+
+            if trend_key not in settings["trend_settings"]:
+                raise ValueError(f"unknown trend setting: {trend_key}")
+
+            settings["trend_settings"][trend_key] = value
+        elif key == "trend_settings":
+            settings["trend_settings"].update(value)
+        elif key in sweep_keys:
+            settings[key] = value
+        else:
+            raise ValueError(f"setting cannot be swept: {key}")
+
+    return settings
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> Dict[str, Dict[str, Any]]:
+    """Return one named set of overrides for every combination of the values in a grid."""
+    keys = list(grid)
+
+    return {
+        ", ".join(f"{key}={value}" for key, value in zip(keys, values)): dict(zip(keys, values))
+        for values in itertools.product(*(grid[key] for key in keys))
+    }
+
+
+def load_profiles(path: str, base: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Load named settings profiles from a JSON file containing a 'profiles' object (name -> overrides),
+    a 'grid' object (setting -> list of values), or both. Each profile overrides the base settings."""
+    with open(path, "r") as f:
+        sweep = json.load(f)
+
+    overrides = {**sweep.get("profiles", {}), **expand_grid(sweep.get("grid", {}))}
+
+    if len(overrides) == 0:
+        raise ValueError(f"no profiles found in {path}")
+
+    return {name: apply_overrides(base, profile) for name, profile in overrides.items()}
+
+
+def union_settings(profiles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Return the settings which let through every symbol that passes at least one of the given profiles.
+    Running the screen once with these settings fetches all the data each profile needs."""
+    settings = {key: function(profile[key] for profile in profiles) for key, function in permissive.items()}
+    settings["trend_settings"] = {
+        key: all(profile["trend_settings"][key] for profile in profiles)
+        for key in profiles[0]["trend_settings"]
+    }
+
+    return settings
+
+
+def apply_settings(module: ModuleType, settings: Dict[str, Any]) -> None:
+    """Overwrite values in the settings module. Must be called before the screen iterations are imported."""
+    for key, value in settings.items():
+        setattr(module, key, value)
@@ -4,6 +4,11 @@ import multiprocessing
 
 # Iteration 1: Relative Strength
 min_rs: int = 80  # minimum RS rating to pass (integer from 0-100) - lowered to include more candidates
+price_history_period: str = "2y"  # daily price history to download (at least "2y"); longer periods let backtests cover more dates
+indicator_state_max_age: int = 7  # days; a saved indicator state this recent is updated with only the latest bars instead of re-downloading the full history
+download_batch_size: int = 500   # symbols per price download request
+download_concurrency: int = 4    # price download requests running at once
+download_retries: int = 2        # times symbols which returned no price data are downloaded again
 
 # Iteration 2: Liquidity
 min_market_cap: float = 10000000   # minimum market cap (USD) - lowered to $10M to include more micro-cap companies
@@ -25,10 +30,94 @@ min_growth_percent: float = 20  # minimum revenue growth for a quarter compared
 protected_rs: int = 90          # minimum RS rating to bypass revenue screen iteration (see README) - lowered to include more candidates
 
 # Iteration 5: Institutional Accumulation
-# (no parameters to modify)
+institutional_max_time: int = 300  # seconds allowed for this iteration; the lowest-priority symbols are skipped once it runs out
+institutional_priority = ["RS", "Revenue Growth % (most recent Q)"]  # columns (highest value first) deciding which symbols are fetched first
+
+# EXECUTION ("sequential" runs iterations 2-5 one after another; "pipelined" streams each passing symbol straight into the next iteration)
+execution_mode: str = "sequential"  # "sequential", "pipelined" or "planned"
+pipeline_queue_size: int = 100      # maximum number of symbols waiting between two pipelined iterations
+
+# Planned execution fetches every metric as an independent task, with each host limited to its own number of concurrent connections
+planner_objective: str = "wall_time"  # "wall_time" fetches every metric up front; "requests" only fetches metrics for symbols which passed the previous iterations
+planner_speculative_rs: int = 95      # with the "requests" objective, symbols with at least this RS rating are still fetched up front
+host_limits = {                       # concurrent connections per host (browser-bound hosts share the "threads" browser instances instead)
+    "barchart.com": 10,
+    "cnbc.com": 5,
+    "sec.gov": 10,
+}
+
+# METRIC FRESHNESS (each symbol's fetched metrics are reused by later screens until they go stale; a number of days,
+# or "close" to keep them until the next market close)
+metric_ttls = {
+    "liquidity": "close",                 # 50-day average volume
+    "trend": "close",                     # moving averages and 52-week high
+    "revenue_growth": 7,                  # quarterly revenues
+    "institutional_accumulation": 30,     # institutional inflows and outflows
+}
+
+# YAHOO FINANCE INFO (fundamentals shown in the analysis report; each symbol's info is reused by later reports until it goes stale)
+info_ttl: float = 1                   # days each symbol's Yahoo Finance info stays fresh
+info_concurrency: int = 8             # concurrent Yahoo Finance info requests
+
+# SKYROCKET SCORE (points each reason adds to a symbol's score, which is capped at 10, and the value each reason's metric must beat;
+# the relative strength iteration scores every rated symbol from prices and RS alone, the analysis report also scores fundamentals)
+skyrocket_weights = {
+    "strong_revenue_growth": 2,    # Yahoo Finance revenue growth (percentage) above its threshold
+    "positive_revenue_growth": 1,  # ^ above its threshold, but not strong
+    "excellent_year_return": 2,    # 1-year return (percentage) above its threshold
+    "good_year_return": 1,         # ^ above its threshold, but not excellent
+    "near_high": 1,                # distance from 52-week high (percentage, negative) above its threshold
+    "high_rs": 2,                  # RS rating at least its threshold
+    "good_rs": 1,                  # ^ at least its threshold, but not high
+    "institutional_interest": 1,   # institutional ownership (percentage) above its threshold
+    "above_sma_50": 1,             # price above the 50-day SMA
+    "above_sma_200": 1,            # price above the 200-day SMA
+}
+skyrocket_thresholds = {
+    "strong_revenue_growth": 30,
+    "positive_revenue_growth": 15,
+    "excellent_year_return": 100,
+    "good_year_return": 30,
+    "near_high": -25,
+    "high_rs": 90,
+    "good_rs": 80,
+    "institutional_interest": 20,
+}
+skyrocket_top_n: int = 10             # highest scoring symbols listed after each scoring
+
+# NEGATIVE CACHE (symbols which cannot pass are skipped for this many days instead of being fetched again; stocks with under a year of
+# trading history are skipped until they have traded for a year)
+negative_cache_ttls = {
+    "no_cik": 30,         # no SEC CIK for revenue data
+    "foreign_filer": 90,  # files 20-F instead of 10-Q reports
+    "unresolved": 7,      # no price data could be downloaded
+}
+
+# LOGGING (every symbol's outcome is streamed to a rotating JSON-lines file, "events.jsonl", in the run's outfile directory)
+log_verbosity: str = "summary"        # "summary" prints outcome counts per iteration; "outcomes" also prints skipped and filtered symbols as they happen; "details" also prints each symbol's values
+event_log_max_bytes: int = 10000000   # size at which the event file is rotated
+event_log_backups: int = 3            # number of rotated event files kept
+trace_spans: bool = True              # record a timeline of each iteration, symbol and fetch step to "trace.json" (open in ui.perfetto.dev or chrome://tracing)
 
 # THREADS (manually set the following value if the screener reports errors during the "Trend" or "Institutional Accumulation" iterations)
 # Recommended values are 1-10. Currently set to 3/4 the number of CPU cores on the system (with a max of 10)
 
 # Thread Pool Size
 threads: int = min(int(multiprocessing.cpu_count() * 0.75), 10)  # number of concurrent browser instances to fetch dynamic data (positive integer)
+
+# Process Pool Size
+processes: int = multiprocessing.cpu_count()  # number of worker processes for CPU-bound per-symbol calculations (1 runs them in the screener's process)
+
+# BROWSER BACKEND (set to "remote" to run browser instances on Selenium Grid or standalone-firefox nodes instead of this machine)
+driver_backend: str = "local"  # "local" or "remote"
+
+# Remote WebDriver endpoints and the maximum number of concurrent browser sessions each can host (only used by the "remote" backend)
+remote_nodes = {
+    "http://localhost:4444/wd/hub": 4,
+}
+
+# DATA SOURCES (a source's circuit opens after this many consecutive failed requests; requests then fail fast or use a fallback source)
+circuit_failure_threshold: int = 5
+circuit_cooldown: float = 60          # seconds to wait before probing a source whose circuit is open
+adaptive_timeout_multiplier: float = 3  # request timeouts are set to this multiple of a source's p95 latency
+min_source_timeout: float = 5         # lower bound for adaptive request timeouts (seconds)
@@ -22,11 +22,6 @@ data = {
 
 df = pd.DataFrame(data)
 
-# Create the json directory if it doesn't exist
-json_dir = os.path.join(os.getcwd(), "json")
-if not os.path.exists(json_dir):
-    os.makedirs(json_dir)
-
 # Save the DataFrame as a JSON file
 create_outfile(df, "revenue_growth")
 
@@ -0,0 +1,75 @@
+import unittest
+import numpy as np
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+
+
+def reference_metrics(prices):
+    """Calculate price metrics one symbol at a time with full rolling series (as the report once did)."""
+    price_data = pd.Series(prices, dtype=float).dropna()
+    metrics = dict.fromkeys(price_metric_names)
+
+    if len(price_data) == 0:
+        return metrics
+
+    current_price = price_data.iloc[-1]
+    metrics["current_price"] = current_price
+
+    for name, lookback in return_lookbacks.items():
+        ago = price_data.iloc[-lookback] if len(price_data) >= lookback else price_data.iloc[0]
+        metrics[name] = ((current_price / ago) - 1) * 100
+
+    metrics["year_return"] = ((current_price / price_data.iloc[0]) - 1) * 100
+    metrics["volatility"] = price_data.pct_change().dropna().std() * 100
+    metrics["sma_50"] = price_data.rolling(window=50).mean().iloc[-1] if len(price_data) >= 50 else None
+    metrics["sma_200"] = price_data.rolling(window=200).mean().iloc[-1] if len(price_data) >= 200 else None
+    metrics["high_52week"] = price_data.max()
+    metrics["low_52week"] = price_data.min()
+    metrics["pct_from_high"] = ((current_price / metrics["high_52week"]) - 1) * 100
+    metrics["pct_from_low"] = ((current_price / metrics["low_52week"]) - 1) * 100
+
+    delta = price_data.diff()
+    rs = delta.clip(lower=0).rolling(window=14).mean() / (-delta.clip(upper=0)).rolling(window=14).mean()
+    metrics["current_rsi"] = (100 - (100 / (1 + rs))).iloc[-1]
+    return {name: (None if pd.isna(value) else value) for name, value in metrics.items()}
+
+
+class TestPriceMetrics(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        dates = pd.bdate_range("2024-01-01", periods=252)
+        close = pd.DataFrame(
+            np.exp(np.cumsum(rng.normal(0, 0.03, (252, 6)), axis=0)), index=dates, columns=list("ABCDEF")
+        )
+        close.iloc[:200, 1] = np.nan  # listed 52 days ago
+        close.iloc[rng.random(252) < 0.1, 2] = np.nan  # missing bars
+        close.iloc[:-10, 3] = np.nan  # too short for most metrics
+        close.iloc[:, 4] = np.nan  # no data
+        close.iloc[-20:, 5] = close.iloc[-21, 5] * np.linspace(1, 1.5, 20)  # only gains lately
+
+        self.close = close
+        self.matrix = PriceMatrix.from_frames(close, close * 0)
+
+    def test_metrics_match_per_symbol_rolling_calculations(self):
+        frame = price_metrics_frame(self.matrix, list(self.close.columns))
+
+        for symbol in self.close.columns:
+            expected = reference_metrics(self.matrix.series(symbol))
+            actual = price_metrics(symbol, self.matrix)
+
+            for name in price_metric_names:
+                if expected[name] is None:
+                    self.assertIsNone(actual[name], f"{symbol} {name}")
+                    self.assertTrue(pd.isna(frame.loc[symbol, name]))
+                else:
+                    self.assertAlmostEqual(actual[name], expected[name], places=6, msg=f"{symbol} {name}")
+
+        self.assertEqual(frame.loc["F", "current_rsi"], 100)
+
+    def test_metrics_start_at_given_date(self):
+        start = self.close.index[100]
+        frame = price_metrics_frame(self.matrix, ["A", "C"], start=start)
+
+        self.assertEqual(list(frame.index), ["A", "C"])
+        self.assertAlmostEqual(frame.loc["A", "year_return"], reference_metrics(self.matrix.series("A", start=start))["year_return"])
+        self.assertTrue(np.isnan(frame.loc["A", "sma_200"]))
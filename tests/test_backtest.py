@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+from tests.test_filters import settings
+
+
+def price_frames(days=300, symbols=6, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2023-01-02", periods=days)
+    drift = np.linspace(-0.002, 0.004, symbols)
+    close = 2 * np.exp(np.cumsum(drift + rng.normal(0, 0.01, (days, symbols)), axis=0))
+    volume = rng.integers(5000, 50000, (days, symbols)).astype(float)
+    columns = [f"S{i}" for i in range(symbols)]
+
+    return pd.DataFrame(close, index=dates, columns=columns), pd.DataFrame(volume, index=dates, columns=columns)
+
+
+class TestBacktest(unittest.TestCase):
+    def setUp(self):
+        self.close, self.volume = price_frames()
+        self.backtest = Backtest(self.close, self.volume)
+
+    def test_rs_matches_single_day_calculation(self):
+        col = self.close["S3"]
+        end = len(col) - 1
+        expected_raw = {
+            symbol: relative_strength(*[self.close[symbol].iloc[end - offset] for offset in (251, 189, 188, 126, 125, 63, 62, 0)])
+            for symbol in self.close
+        }
+        expected = (100 * pd.Series(expected_raw).rank(pct=True)).round()
+
+        pd.testing.assert_series_equal(self.backtest.rs.iloc[-1], expected, check_names=False)
+        self.assertTrue(self.backtest.rs.iloc[250].isna().all())
+        self.assertFalse(self.backtest.rs.iloc[251].isna().any())
+
+    def test_selection_applies_thresholds(self):
+        loose = {**settings, "min_rs": 0, "min_price": 0, "max_price": 1e9, "min_volume": 0}
+        loose["trend_settings"] = {key: False for key in settings["trend_settings"]}
+        selected = self.backtest.selection(loose)
+
+        pd.testing.assert_frame_equal(selected, self.backtest.rs.notna() & self.backtest.average_volume.notna())
+
+        strict = {**loose, "min_rs": 90}
+        self.assertTrue((self.backtest.selection(strict).sum(axis=1) <= 1).all())
+
+    def test_forward_returns(self):
+        daily, summary = self.backtest.run({**settings, "min_rs": 50, "max_price": 1e9, "min_volume": 0}, horizons=[1, 5])
+        returns = self.backtest.forward_returns(5)
+        selected = self.backtest.selection({**settings, "min_rs": 50, "max_price": 1e9, "min_volume": 0})
+        date = daily.index[260]
+        expected = returns.loc[date][selected.loc[date]].mean()
+
+        self.assertAlmostEqual(daily.loc[date, "5-day Return %"], expected)
+        self.assertTrue(np.isnan(daily["5-day Return %"].iloc[-1]))
+        self.assertEqual(list(summary.index), ["1-day", "5-day"])
+        self.assertGreater(summary.loc["5-day", "Picks"], 0)
+
+    def test_date_range(self):
+        daily, _ = self.backtest.run({**settings, "min_rs": 80}, "2023-12-01", "2023-12-29")
+        self.assertEqual(daily.index.min(), pd.Timestamp("2023-12-01"))
+        self.assertEqual(daily.index.max(), pd.Timestamp("2023-12-29"))
+
+
+class TestPriceStore(unittest.TestCase):
+    def test_round_trip(self):
+        close, volume = price_frames(days=20, symbols=3)
+        close.iloc[0, 1] = np.nan
+        cwd = os.getcwd()
+
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                save_price_store(close, volume)
+                stored_close, stored_volume = open_price_store()
+            finally:
+                os.chdir(cwd)
+
+        pd.testing.assert_frame_equal(stored_close, close, check_names=False, check_freq=False, check_index_type=False)
+        pd.testing.assert_frame_equal(stored_volume, volume, check_names=False, check_freq=False, check_index_type=False)
@@ -0,0 +1,77 @@
+import threading
+import unittest
+from unittest.mock import patch
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class FakeDriver:
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+        raise RuntimeError("session already gone")
+
+
+class TestNodeRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = NodeRegistry({"http://a:4444": 2, "http://b:4444": 1})
+
+    def test_sessions_go_to_least_loaded_live_node(self):
+        first = self.registry.acquire()
+        second = self.registry.acquire()
+        third = self.registry.acquire()
+
+        self.assertEqual(first.url, "http://a:4444")
+        self.assertEqual(second.url, "http://b:4444")
+        self.assertEqual(third.url, "http://a:4444")
+        self.assertRaises(NoNodeAvailableError, self.registry.acquire)
+
+        self.registry.release(second)
+        self.assertEqual(self.registry.acquire().url, "http://b:4444")
+
+    def test_lost_nodes_are_never_scheduled_again(self):
+        node = self.registry.acquire()
+        self.registry.mark_lost(node)
+        self.registry.release(node)
+
+        self.assertEqual(node.free_slots(), 0)
+        self.assertEqual(self.registry.acquire().url, "http://b:4444")
+        self.assertRaises(NoNodeAvailableError, self.registry.acquire)
+
+    def test_closing_drivers_frees_their_node_slots(self):
+        drivers = [FakeDriver(), FakeDriver(), FakeDriver()]
+
+        with patch("growth_stock_screener.screen.iterations.utils.concurrency.node_registry", self.registry):
+            for driver in drivers:
+                self.registry.attach(driver, self.registry.acquire())
+
+            self.assertRaises(NoNodeAvailableError, self.registry.acquire)
+            close_drivers(drivers)
+
+        self.assertEqual(drivers, [])
+        self.assertEqual([node.sessions for node in self.registry.nodes], [0, 0])
+        self.assertEqual(self.registry.driver_nodes, {})
+
+
+class TestThreadPoolMap(unittest.TestCase):
+    def test_items_losing_their_session_are_requeued(self):
+        attempts = {}
+        lock = threading.Lock()
+
+        def screen(item):
+            with lock:
+                attempts[item] = attempts.get(item, 0) + 1
+
+            # odd items lose their session once, item 4 loses it every time
+            if (item == 4) or (item % 2 == 1 and attempts[item] == 1):
+                raise NodeLostError(item)
+
+            return item
+
+        results = tqdm_thread_pool_map(3, screen, list(range(6)), max_requeues=2)
+
+        self.assertEqual(results, [0, 1, 2, 3, 5])
+        self.assertEqual(attempts[1], 2)
+        self.assertEqual(attempts[4], 3)
+        self.assertEqual(attempts[0], 1)
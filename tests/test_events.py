@@ -0,0 +1,81 @@
+import io
+import os
+import json
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+
+
+def read_events(path):
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f]
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "events.jsonl")
+
+    def tearDown(self):
+        for handler in list(event_logger.handlers):
+            event_logger.removeHandler(handler)
+            handler.close()
+
+        self.directory.cleanup()
+
+    def test_events_are_streamed_as_json_lines(self):
+        logs = EventLog("liquidity", "summary", self.path)
+        row = pd.Series({"Symbol": "AAA", "Price": 2.5, "Market Cap": 1e6, "Company Name": "A", "Industry": "I", "RS": 95})
+
+        with redirect_stdout(io.StringIO()) as console:
+            evaluate_liquidity(row, 5000, logs)
+            logs.append(skip_message("BBB", "insufficient data"))
+            logs.append("plain message")
+
+        events = read_events(self.path)
+        self.assertEqual([event["outcome"] for event in events], [VALUES, "filtered", SKIPPED, INFO])
+        self.assertEqual({event["stage"] for event in events}, {"liquidity"})
+        self.assertEqual(events[0]["values"]["volume"], 5000)
+        self.assertEqual(events[2]["reason"], "insufficient data")
+        self.assertEqual(events[3]["reason"], "plain message")
+        self.assertEqual(console.getvalue(), "")
+        self.assertEqual(logs.counts[SKIPPED], 1)
+
+    def test_verbosity(self):
+        outcomes = EventLog("trend", "outcomes", self.path)
+        details = EventLog("trend", "details", self.path)
+        event = values_message("AAA", "{symbol} | Price: ${price:.2f}", price=1.234)
+
+        with redirect_stdout(io.StringIO()) as console:
+            outcomes.append(event)
+            outcomes.append(filter_message("AAA"))
+
+        self.assertNotIn("Price", console.getvalue())
+        self.assertIn("AAA filtered out.", console.getvalue())
+
+        with redirect_stdout(io.StringIO()) as console:
+            details.append(event)
+
+        self.assertIn("AAA | Price: $1.23", console.getvalue())
+
+    def test_summary(self):
+        logs = EventLog("revenue_growth", "summary", self.path)
+        logs.append(skip_message("AAA", "foreign stock"))
+        logs.append(skip_message("BBB", "foreign stock"))
+        logs.append(filter_message("CCC"))
+
+        with redirect_stdout(io.StringIO()) as console:
+            logs.print_summary()
+
+        self.assertIn("1 filtered, 2 skipped", console.getvalue())
+        self.assertIn("skipped 2x: foreign stock", console.getvalue())
+        self.assertEqual(len(logs), 3)
+
+    def test_printed_events_show_their_message(self):
+        with redirect_stdout(io.StringIO()) as console:
+            print(skip_message("AAA", "volume: no response from barchart"))
+
+        self.assertIn("Skipping AAA (volume: no response from barchart)", console.getvalue())
+        self.assertNotIn("Event object", console.getvalue())
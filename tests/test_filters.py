@@ -0,0 +1,154 @@
+import unittest
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+
+settings = {
+    "min_market_cap": 10000000,
+    "min_price": 0.20,
+    "max_price": 4.00,
+    "min_volume": 10000,
+    "trend_settings": {
+        "Price >= 50-day SMA": False,
+        "Price >= 200-day SMA": False,
+        "10-day SMA >= 20-day SMA": False,
+        "20-day SMA >= 50-day SMA": False,
+        "Price within 50% of 52-week High": True,
+    },
+    "min_growth_percent": 20,
+    "protected_rs": 90,
+}
+
+
+def rs_row(symbol, price, rs, market_cap=50000000):
+    return {
+        "Symbol": symbol,
+        "Company Name": f"{symbol} Inc.",
+        "Industry": "Software",
+        "RS": rs,
+        "Price": price,
+        "Market Cap": market_cap,
+    }
+
+
+class TestFilters(unittest.TestCase):
+    def setUp(self):
+        self.relative_strengths = pd.DataFrame(
+            [
+                rs_row("AAA", 2.0, 85),
+                rs_row("BBB", 3.0, 95),
+                rs_row("CCC", 1.0, 80),
+                rs_row("DDD", 5.0, 99),
+                rs_row("EEE", 1.5, 82, market_cap=""),
+            ]
+        )
+        table = MetricsTable()
+
+        for symbol, volume in [("AAA", 50000), ("BBB", 20000), ("CCC", 5000), ("DDD", 90000), ("EEE", 90000)]:
+            table.record("liquidity", symbol, liquidity_metrics(volume))
+
+        sma = {"10-day SMA": 1.0, "20-day SMA": 1.0, "50-day SMA": 1.0, "200-day SMA": 1.0}
+        table.record("trend", "AAA", trend_metrics(sma, 3.0))
+        table.record("trend", "BBB", trend_metrics(sma, 10.0))
+        table.record("trend", "CCC", trend_metrics(sma, 1.2))
+        table.record("revenue_growth", "AAA", {"Revenue Growth % (most recent Q)": 45.0, "Foreign Stock": False})
+        table.record("institutional_accumulation", "AAA", institutional_metrics({"Inflows": 300.0, "Outflows": 100.0}))
+        self.metrics = table.to_frame()
+
+    def test_default_settings(self):
+        passed, unfetched = apply_filters(self.relative_strengths, self.metrics, settings)
+
+        self.assertEqual(passed["liquidity"]["Symbol"].tolist(), ["AAA", "BBB"])
+        self.assertEqual(passed["trend"]["Symbol"].tolist(), ["AAA"])
+        self.assertAlmostEqual(passed["trend"]["% Below 52-week High"][0], 100 / 3)
+        self.assertEqual(passed["revenue_growth"]["Revenue Growth % (previous Q)"][0], "N/A")
+        self.assertEqual(passed["institutional_accumulation"]["Net Institutional Inflows"][0], 200.0)
+        self.assertEqual(list(passed["institutional_accumulation"].columns), institutional_accumulation_columns)
+        self.assertEqual(unfetched["trend"], [])
+
+    def test_relaxed_thresholds_report_unfetched(self):
+        relaxed = {**settings, "min_volume": 1000, "max_price": 10}
+        passed, unfetched = apply_filters(self.relative_strengths, self.metrics, relaxed)
+
+        self.assertEqual(passed["liquidity"]["Symbol"].tolist(), ["AAA", "BBB", "CCC", "DDD"])
+        self.assertEqual(unfetched["trend"], ["DDD"])
+        self.assertEqual(passed["trend"]["Symbol"].tolist(), ["AAA", "CCC"])
+        self.assertEqual(unfetched["revenue_growth"], ["CCC"])
+
+    def test_trend_settings(self):
+        trend_settings = {**settings["trend_settings"], "Price within 50% of 52-week High": False}
+        passed, _ = apply_filters(
+            self.relative_strengths, self.metrics, {**settings, "trend_settings": trend_settings}
+        )
+        self.assertEqual(passed["trend"]["Symbol"].tolist(), ["AAA", "BBB"])
+
+    def test_matches_evaluators(self):
+        passed, _ = apply_filters(self.relative_strengths, self.metrics, settings)
+        row = self.relative_strengths.iloc[0]
+        _, record = evaluate_liquidity(row, 50000, [])
+
+        self.assertEqual(record, passed["liquidity"].iloc[0].to_dict())
+
+
+class TestMetricsTable(unittest.TestCase):
+    def test_missing_metrics_are_recorded(self):
+        table = MetricsTable()
+        table.record("trend", "AAA", trend_metrics(None, 3.0))
+        df = table.to_frame()
+
+        self.assertTrue(df.loc[0, fetched_column("trend")])
+        self.assertFalse(df.loc[0, fetched_column("liquidity")])
+        self.assertTrue(pd.isna(df.loc[0, "10-day SMA"]))
+        self.assertEqual(df.loc[0, "52-week High"], 3.0)
+
+    def test_foreign_revenue(self):
+        revenue_df = pd.DataFrame.from_dict([{"Foreign Stock": True}])
+        self.assertEqual(revenue_growth_metrics(revenue_df), {"Foreign Stock": True})
+        self.assertEqual(revenue_growth_metrics(None), {})
+
+    def test_fresh_metrics(self):
+        table = MetricsTable()
+        table.record("liquidity", "AAA", liquidity_metrics(50000))
+        table.record("liquidity", "BBB", liquidity_metrics(None))
+        table.record("trend", "AAA", trend_metrics(None, 3.0))
+
+        self.assertEqual(volume_from_metrics(table.fresh_metrics("liquidity", "AAA")), 50000)
+        self.assertIsNone(table.fresh_metrics("liquidity", "BBB"))
+        self.assertIsNone(table.fresh_metrics("trend", "AAA"))
+        self.assertIsNone(table.fresh_metrics("institutional_accumulation", "AAA"))
+
+        # metrics fetched long ago have gone stale
+        table.rows["AAA"][fetched_at_column("liquidity")] = "2020-01-01T00:00:00+00:00"
+        self.assertIsNone(table.fresh_metrics("liquidity", "AAA"))
+
+    def test_placeholder_holdings_are_never_fresh(self):
+        table = MetricsTable()
+        table.record("institutional_accumulation", "AAA", institutional_metrics({"Inflows": 300.0, "Outflows": 100.0, "Placeholder": False}))
+        table.record("institutional_accumulation", "BBB", institutional_metrics({"Inflows": 1000000, "Outflows": 500000, "Placeholder": True}))
+
+        self.assertEqual(holdings_from_metrics(table.fresh_metrics("institutional_accumulation", "AAA")), {"Inflows": 300.0, "Outflows": 100.0})
+        self.assertIsNone(table.fresh_metrics("institutional_accumulation", "BBB"))
+        self.assertIsNone(table.rows["BBB"]["Inflows"])
+
+    def test_next_market_close(self):
+        friday_morning = pd.Timestamp("2024-06-07 10:00", tz="America/New_York")
+        friday_evening = pd.Timestamp("2024-06-07 21:00", tz="America/New_York")
+
+        self.assertEqual(next_market_close(friday_morning), pd.Timestamp("2024-06-07 16:00", tz="America/New_York"))
+        self.assertEqual(next_market_close(friday_evening), pd.Timestamp("2024-06-10 16:00", tz="America/New_York"))
+        self.assertEqual(
+            next_market_close(friday_evening.tz_convert("UTC")), pd.Timestamp("2024-06-10 16:00", tz="America/New_York")
+        )
+
+    def test_revenues_from_metrics(self):
+        revenues = {
+            "Q1": {"Current": 120.0, "Previous": 100.0, "Growth": 20.0},
+            "Q2": {"Current": 150.0, "Previous": 100.0, "Growth": 50.0},
+        }
+        table = MetricsTable()
+        table.record("revenue_growth", "AAA", comparison_revenue_metrics(revenues))
+        table.record("revenue_growth", "BBB", comparison_revenue_metrics({"Q2": revenues["Q2"]}))
+        table.record("revenue_growth", "CCC", comparison_revenue_metrics({"Foreign Stock": {}}))
+
+        self.assertEqual(revenues_from_metrics(table.fresh_metrics("revenue_growth", "AAA")), revenues)
+        self.assertEqual(revenues_from_metrics(table.fresh_metrics("revenue_growth", "BBB")), {"Q2": revenues["Q2"]})
+        self.assertEqual(revenues_from_metrics(table.fresh_metrics("revenue_growth", "CCC")), {"Foreign Stock": {}})
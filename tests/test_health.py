@@ -0,0 +1,233 @@
+import os
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, WebDriverException
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestAdaptiveTimeout(unittest.TestCase):
+    def test_default_timeout_without_samples(self):
+        source = SourceHealth("test", 30, min_timeout=5, min_samples=10)
+        self.assertEqual(source.timeout(), 30)
+
+        for i in range(9):
+            source.record_success(1.0)
+
+        self.assertEqual(source.timeout(), 30)
+
+    def test_timeout_follows_p95(self):
+        source = SourceHealth("test", 30, min_timeout=1, multiplier=3, min_samples=10)
+
+        for i in range(19):
+            source.record_success(1.0)
+        source.record_success(4.0)
+
+        self.assertAlmostEqual(source.p95(), 1.0)
+        self.assertAlmostEqual(source.timeout(), 3.0)
+
+    def test_timeout_is_bounded(self):
+        fast = SourceHealth("fast", 30, min_timeout=5, multiplier=3, min_samples=1)
+        fast.record_success(0.1)
+        self.assertEqual(fast.timeout(), 5)
+
+        slow = SourceHealth("slow", 30, min_timeout=5, multiplier=3, min_samples=1)
+        slow.record_success(25)
+        self.assertEqual(slow.timeout(), 30)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.source = SourceHealth(
+            "test", 30, failure_threshold=3, cooldown=60, clock=self.clock
+        )
+
+    def test_opens_after_consecutive_failures(self):
+        for i in range(2):
+            self.source.record_failure()
+            self.assertTrue(self.source.allow_request())
+
+        self.source.record_failure()
+        self.assertFalse(self.source.allow_request())
+        self.assertEqual(self.source.rejections, 1)
+
+    def test_success_resets_failures(self):
+        self.source.record_failure()
+        self.source.record_failure()
+        self.source.record_success(1.0)
+        self.source.record_failure()
+        self.assertTrue(self.source.allow_request())
+
+    def test_single_probe_after_cooldown(self):
+        for i in range(3):
+            self.source.record_failure()
+
+        self.clock.now = 59
+        self.assertFalse(self.source.allow_request())
+
+        self.clock.now = 60
+        self.assertTrue(self.source.allow_request())
+        self.assertFalse(self.source.allow_request())
+
+    def test_successful_probe_closes_circuit(self):
+        for i in range(3):
+            self.source.record_failure()
+
+        self.clock.now = 60
+        self.assertTrue(self.source.allow_request())
+        self.source.record_success(1.0)
+        self.assertTrue(self.source.allow_request())
+        self.assertTrue(self.source.allow_request())
+
+    def test_failed_probe_reopens_circuit(self):
+        for i in range(3):
+            self.source.record_failure()
+
+        self.clock.now = 60
+        self.assertTrue(self.source.allow_request())
+        self.source.record_failure()
+
+        self.clock.now = 119
+        self.assertFalse(self.source.allow_request())
+
+        self.clock.now = 120
+        self.assertTrue(self.source.allow_request())
+
+    def test_track_fails_fast_when_open(self):
+        for i in range(3):
+            self.source.record_failure()
+
+        def request():
+            with self.source.track():
+                self.fail("request should not be sent while the circuit is open")
+
+        self.assertRaises(CircuitOpenError, request)
+
+    def test_track_records_outcomes(self):
+        with self.source.track() as timeout:
+            self.assertEqual(timeout, 30)
+
+        def failing_request():
+            with self.source.track():
+                raise ValueError("blocked")
+
+        self.assertRaises(ValueError, failing_request)
+        self.assertEqual(self.source.successes, 1)
+        self.assertEqual(self.source.failures, 1)
+
+
+class TestSourceFailures(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.logs = EventLog("liquidity", "summary", os.path.join(self.directory.name, "events.jsonl"))
+        self.barchart = SourceHealth("barchart", 30, failure_threshold=2)
+
+    def tearDown(self):
+        for handler in list(event_logger.handlers):
+            event_logger.removeHandler(handler)
+            handler.close()
+
+        self.directory.cleanup()
+
+    def fetch(self, page):
+        async def get(url, session, timeout=None):
+            return page
+
+        with patch.dict("growth_stock_screener.screen.iterations.utils.health.sources", {"barchart": self.barchart}), patch(
+            "growth_stock_screener.screen.iterations.utils.fetchers.get", get
+        ):
+            return asyncio.run(fetch_volume("AAA", None, self.logs))
+
+    def test_pages_without_data_are_not_source_failures(self):
+        for _ in range(3):
+            self.assertIsNone(self.fetch("<html><body><p>no data</p></body></html>"))
+
+        self.assertEqual(self.barchart.failures, 0)
+        self.assertEqual(self.barchart.successes, 3)
+        self.assertEqual(self.barchart.state, CLOSED)
+
+    def test_failed_requests_are_source_failures(self):
+        for _ in range(2):
+            self.assertIsNone(self.fetch(None))
+
+        self.assertEqual(self.barchart.failures, 2)
+        self.assertNotEqual(self.barchart.state, CLOSED)
+
+
+class FakeBrowser:
+    def __init__(self, error=None):
+        self.error = error
+
+    def set_page_load_timeout(self, timeout):
+        pass
+
+    def get(self, url):
+        if self.error is not None:
+            raise self.error
+
+    def find_element(self, by, value):
+        raise NoSuchElementException(value)
+
+    def execute_script(self, script):
+        pass
+
+
+class NoData:
+    def __init__(self, driver, timeout):
+        pass
+
+    def until(self, method):
+        raise TimeoutException("data never loaded")
+
+
+class TestBrowserSourceFailures(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.logs = EventLog("trend", "summary", os.path.join(self.directory.name, "events.jsonl"))
+        self.sources = {
+            "tradingview": SourceHealth("tradingview", 30, failure_threshold=5),
+            "marketbeat": SourceHealth("marketbeat", 60, failure_threshold=5),
+        }
+
+    def tearDown(self):
+        for handler in list(event_logger.handlers):
+            event_logger.removeHandler(handler)
+            handler.close()
+
+        self.directory.cleanup()
+
+    def fetch(self, fetch_symbol, driver):
+        fetchers = "growth_stock_screener.screen.iterations.utils.fetchers"
+
+        with patch.dict("growth_stock_screener.screen.iterations.utils.health.sources", self.sources), patch(
+            f"{fetchers}.get_driver", lambda thread_local, drivers: driver
+        ), patch(f"{fetchers}.WebDriverWait", NoData), patch(f"{fetchers}.fetch_exchange", lambda *args: "NASDAQ"):
+            return [fetch_symbol(symbol) for symbol in ["AAA", "BBB", "CCC", "DDD", "EEE"]]
+
+    def test_pages_without_data_are_not_source_failures(self):
+        averages = self.fetch(lambda symbol: fetch_moving_averages(symbol, None, [], self.logs), FakeBrowser())
+        holdings = self.fetch(lambda symbol: fetch_institutional_holdings(symbol, 60, None, [], self.logs), FakeBrowser())
+
+        self.assertEqual(averages, [None] * 5)
+        self.assertTrue(all(holding["Placeholder"] for holding in holdings))
+
+        for source in self.sources.values():
+            self.assertEqual(source.failures, 0)
+            self.assertEqual(source.successes, 5)
+            self.assertEqual(source.state, CLOSED)
+
+    def test_failed_page_loads_are_source_failures(self):
+        self.fetch(lambda symbol: fetch_moving_averages(symbol, None, [], self.logs), FakeBrowser(WebDriverException("unreachable")))
+
+        self.assertEqual(self.sources["tradingview"].failures, 5)
+        self.assertNotEqual(self.sources["tradingview"].state, CLOSED)
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+from tests.test_backtest import price_frames
+
+
+class TestIndicatorState(unittest.TestCase):
+    def setUp(self):
+        self.close, self.volume = price_frames(days=600, symbols=5)
+        self.close.iloc[100:103, 1] = np.nan
+        self.close.iloc[:400, 4] = np.nan
+        self.volume.iloc[580, 2] = np.nan
+        self.backtest = Backtest(self.close, self.volume)
+
+    def assert_matches_backtest(self, state, day):
+        frame = state.frame()
+        np.testing.assert_allclose(frame["10-day SMA"], self.backtest.sma[10].iloc[day], rtol=1e-9)
+        np.testing.assert_allclose(frame["200-day SMA"], self.backtest.sma[200].iloc[day], rtol=1e-9)
+        np.testing.assert_allclose(frame["52-week High"], self.backtest.high_52_week.iloc[day])
+        np.testing.assert_allclose(frame["50-day Average Volume"], self.backtest.average_volume.iloc[day], rtol=1e-9)
+        np.testing.assert_allclose(frame["Price"], self.close.iloc[day])
+
+    def test_incremental_updates_match_full_recalculation(self):
+        state = IndicatorState.from_history(self.close.iloc[:300], self.volume.iloc[:300])
+        self.assert_matches_backtest(state, 299)
+
+        for day in range(300, 600):
+            state.append(self.close.index[day], self.close.iloc[day].to_numpy(), self.volume.iloc[day].to_numpy())
+
+        self.assert_matches_backtest(state, 599)
+        self.assertEqual(state.last_date(), self.close.index[-1])
+
+    def test_relative_strength(self):
+        state = IndicatorState.from_history(self.close, self.volume)
+        expected = [
+            relative_strength(*[self.close[symbol].iloc[-1 - offset] for offset in (251, 189, 188, 126, 125, 63, 62, 0)])
+            for symbol in ["S0", "S1", "S2", "S3"]
+        ]
+
+        np.testing.assert_allclose(state.relative_strength_raw()[:4], expected)
+        self.assertTrue(np.isnan(state.relative_strength_raw()[4]))
+        self.assertEqual(list(state.trading_days()), [600, 600, 600, 600, 200])
+
+    def test_update_skips_known_bars(self):
+        state = IndicatorState.from_history(self.close.iloc[:500], self.volume.iloc[:500])
+        appended = state.update(self.close.iloc[490:], self.volume.iloc[490:])
+
+        self.assertEqual(appended, 100)
+        self.assert_matches_backtest(state, 599)
+
+    def test_backfill(self):
+        state = IndicatorState.from_history(self.close[["S0", "S1"]], self.volume[["S0", "S1"]])
+        state.backfill(self.close, self.volume)
+
+        self.assertEqual(state.symbols, ["S0", "S1", "S2", "S3", "S4"])
+        self.assert_matches_backtest(state, 599)
+        self.assertEqual(list(state.trading_days()), [600, 600, 600, 600, 200])
+
+        state.append(self.close.index[-1] + pd.Timedelta(days=1), np.full(5, 1.0), np.full(5, 1.0))
+        self.assertEqual(state.frame()["Price"].tolist(), [1.0] * 5)
+
+    def test_save_and_open(self):
+        state = IndicatorState.from_history(self.close, self.volume)
+        cwd = os.getcwd()
+
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+            try:
+                state.save()
+                opened = open_indicator_state()
+            finally:
+                os.chdir(cwd)
+
+        pd.testing.assert_frame_equal(opened.frame(), state.frame())
+        self.assertEqual(opened.last_date(), state.last_date())
+        self.assertEqual([list(highs) for highs in opened.highs], [list(highs) for highs in state.highs])
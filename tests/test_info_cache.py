@@ -0,0 +1,89 @@
+import os
+import time
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class FakeTicker:
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def info(self):
+        with FakeTicker.lock:
+            FakeTicker.active += 1
+            FakeTicker.peak = max(FakeTicker.peak, FakeTicker.active)
+
+        time.sleep(0.05)
+
+        with FakeTicker.lock:
+            FakeTicker.active -= 1
+
+        if self.symbol == "FAIL":
+            raise ValueError("no info")
+
+        return {"symbol": self.symbol, "revenueGrowth": 0.3}
+
+
+class TestInfoCache(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+        FakeTicker.peak = 0
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_info_is_fetched_concurrently_and_reused_from_disk(self):
+        symbols = ["AAA", "BBB", "CCC", "DDD", "FAIL"]
+
+        with patch("growth_stock_screener.screen.iterations.utils.info_cache.yf.Ticker", FakeTicker):
+            start = time.perf_counter()
+            infos = fetch_all_info(symbols, concurrency=5)
+            elapsed = time.perf_counter() - start
+
+        self.assertEqual(infos["AAA"], {"symbol": "AAA", "revenueGrowth": 0.3})
+        self.assertIsNone(infos["FAIL"])
+        self.assertGreater(FakeTicker.peak, 1)
+        self.assertLess(elapsed, 0.2)
+
+        # a later report reads every fetched symbol from the saved cache (failed symbols are fetched again)
+        cache = open_info_cache()
+        self.assertEqual(sorted(cache.entries), ["AAA", "BBB", "CCC", "DDD"])
+
+        with patch("growth_stock_screener.screen.iterations.utils.info_cache.fetch_info", lambda symbol: {"symbol": "refetched"}):
+            infos = fetch_all_info(symbols, cache)
+
+        self.assertEqual(infos["DDD"], {"symbol": "DDD", "revenueGrowth": 0.3})
+        self.assertEqual(infos["FAIL"], {"symbol": "refetched"})
+
+    def test_stale_info_is_refetched_and_dropped_on_save(self):
+        stale = f"{pd.Timestamp.now() - pd.Timedelta(days=2):%Y-%m-%d %H:%M:%S}"
+        cache = InfoCache({"OLD": {"fetched": stale, "info": {"symbol": "OLD"}}}, ttl=1)
+        self.assertIsNone(cache.get("OLD"))
+
+        cache.add("NEW", {"symbol": "NEW"})
+        cache.save()
+
+        self.assertEqual(cache.get("NEW"), {"symbol": "NEW"})
+        self.assertEqual(list(read_info_cache_entries()), ["NEW"])
+
+    def test_saves_merge_concurrent_reports(self):
+        first = open_info_cache()
+        second = open_info_cache()
+        first.add("AAA", {"symbol": "AAA"})
+        second.add("BBB", {"symbol": "BBB"})
+        first.save()
+        second.save()
+
+        self.assertEqual(sorted(open_info_cache().entries), ["AAA", "BBB"])
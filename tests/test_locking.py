@@ -0,0 +1,104 @@
+import os
+import json
+import tempfile
+import unittest
+import pandas as pd
+from multiprocessing import Pool
+from growth_stock_screener.screen.iterations.utils import *
+
+
+def increment_counter(path, times=50):
+    for _ in range(times):
+        with file_lock(path):
+            with open(path, "r") as f:
+                count = int(f.read())
+
+            with atomic_writer(path) as f:
+                f.write(str(count + 1))
+
+
+class TestLocking(unittest.TestCase):
+    def test_lock_serializes_processes(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "counter.txt")
+
+            with open(path, "w") as f:
+                f.write("0")
+
+            with Pool(4) as pool:
+                pool.map(increment_counter, [path] * 4)
+
+            with open(path, "r") as f:
+                self.assertEqual(int(f.read()), 200)
+
+    def test_failed_write_keeps_original(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.json")
+
+            with atomic_writer(path) as f:
+                json.dump({"a": 1}, f)
+
+            with self.assertRaises(ValueError):
+                with atomic_writer(path) as f:
+                    f.write("{")
+                    raise ValueError
+
+            with open(path, "r") as f:
+                self.assertEqual(json.load(f), {"a": 1})
+
+            self.assertEqual(os.listdir(directory), ["data.json"])
+
+
+class TestSharedDirectory(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_outfiles_are_namespaced_by_settings(self):
+        settings = get_current_settings()
+        run = get_settings_hash(settings)
+
+        save_cache_settings(settings)
+        create_outfile(pd.DataFrame({"Symbol": ["AAA"]}), "liquidity")
+        mark_iteration_complete("liquidity")
+
+        self.assertTrue(os.path.exists(os.path.join("json", "runs", run, "liquidity.json")))
+        self.assertEqual(latest_run(), run)
+        self.assertEqual(open_outfile("liquidity", run)["Symbol"].tolist(), ["AAA"])
+        self.assertTrue(should_skip_iteration("liquidity", settings))
+        self.assertFalse(should_skip_iteration("liquidity", {**settings, "min_rs": -1}))
+
+    def test_metrics_tables_merge_on_save(self):
+        first = open_metrics_table()
+        second = open_metrics_table()
+        first.record("liquidity", "AAA", liquidity_metrics(100))
+        second.record("liquidity", "BBB", liquidity_metrics(200))
+        second.record("trend", "AAA", trend_metrics({"10-day SMA": 1.0}, 2.0))
+        first.save()
+        second.save()
+
+        rows = open_metrics_table().rows
+        self.assertEqual(sorted(rows), ["AAA", "BBB"])
+        self.assertEqual(rows["AAA"]["50-day Average Volume"], 100)
+        self.assertEqual(rows["AAA"]["52-week High"], 2.0)
+        self.assertEqual(rows["BBB"]["50-day Average Volume"], 200)
+
+    def test_negative_caches_merge_on_save(self):
+        first = open_negative_cache()
+        first.add("AAA", NO_CIK)
+        first.add("BBB", NO_CIK)
+        first.save()
+
+        second = open_negative_cache()
+        third = open_negative_cache()
+        second.remove("AAA")
+        third.add("CCC", FOREIGN_FILER)
+        second.save()
+        third.save()
+
+        self.assertEqual(sorted(open_negative_cache().entries), ["BBB", "CCC"])
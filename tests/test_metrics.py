@@ -0,0 +1,79 @@
+import os
+import json
+import tempfile
+import unittest
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_counters_gauges_and_histograms(self):
+        registry = MetricsRegistry()
+        registry.increment("source_requests_total", source="cnbc", outcome="success")
+        registry.increment("source_requests_total", 2, source="cnbc", outcome="success")
+        registry.set_gauge("stage_seconds", 1.5, stage="Trend")
+
+        for latency in [0.02, 0.2, 0.3, 3]:
+            registry.observe("source_request_seconds", latency, source="cnbc")
+
+        self.assertEqual(registry.counter_value("source_requests_total", outcome="success", source="cnbc"), 3)
+
+        histogram = registry.to_dict()["histograms"][0]
+        self.assertEqual(histogram["count"], 4)
+        self.assertAlmostEqual(histogram["sum"], 3.52)
+        self.assertEqual(histogram["p50"], 0.25)
+        self.assertEqual(histogram["p95"], 5)
+        self.assertEqual(histogram["buckets"]["0.5"], 3)
+        self.assertEqual(histogram["buckets"]["+Inf"], 4)
+
+    def test_prometheus_format(self):
+        registry = MetricsRegistry()
+        registry.increment("cache_requests_total", cache="metrics_table", result="hit")
+        registry.observe("parse_seconds", 0.001, parser="lxml")
+        text = registry.to_prometheus()
+
+        self.assertIn("# TYPE screener_cache_requests_total counter", text)
+        self.assertIn('screener_cache_requests_total{cache="metrics_table",result="hit"} 1', text)
+        self.assertIn('screener_parse_seconds_bucket{parser="lxml",le="0.005"} 1', text)
+        self.assertIn('screener_parse_seconds_bucket{parser="lxml",le="+Inf"} 1', text)
+        self.assertIn('screener_parse_seconds_count{parser="lxml"} 1', text)
+
+    def test_save(self):
+        registry = MetricsRegistry()
+        registry.set_gauge("stage_symbols", 10, stage="Liquidity")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = registry.save(directory)
+
+            with open(path, "r") as f:
+                self.assertEqual(json.load(f)["gauges"][0]["value"], 10)
+
+            self.assertTrue(os.path.exists(os.path.join(directory, "metrics.prom")))
+
+
+class TestInstrumentation(unittest.TestCase):
+    def test_source_health_records_requests(self):
+        source = SourceHealth("test_source", default_timeout=10)
+        before = metrics.counter_value("source_requests_total", source="test_source", outcome="failure")
+
+        with self.assertRaises(ValueError):
+            with source.track():
+                raise ValueError
+
+        with source.track():
+            pass
+
+        self.assertEqual(metrics.counter_value("source_requests_total", source="test_source", outcome="failure"), before + 1)
+        self.assertEqual(metrics.counter_value("source_requests_total", source="test_source", outcome="success"), 1)
+
+    def test_metrics_table_lookups(self):
+        table = MetricsTable()
+        table.record("liquidity", "AAA", liquidity_metrics(1000))
+        hits = metrics.counter_value("cache_requests_total", cache="metrics_table", result="hit", iteration="liquidity")
+        misses = metrics.counter_value("cache_requests_total", cache="metrics_table", result="miss", iteration="liquidity")
+
+        table.fresh_metrics("liquidity", "AAA")
+        table.fresh_metrics("liquidity", "BBB")
+        table.fresh_metrics("liquidity", "BBB", track=False)
+
+        self.assertEqual(metrics.counter_value("cache_requests_total", cache="metrics_table", result="hit", iteration="liquidity"), hits + 1)
+        self.assertEqual(metrics.counter_value("cache_requests_total", cache="metrics_table", result="miss", iteration="liquidity"), misses + 1)
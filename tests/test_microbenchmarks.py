@@ -0,0 +1,54 @@
+import os
+import time
+import tempfile
+import unittest
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class TestMicrobenchmarks(unittest.TestCase):
+    def test_every_kernel_runs_over_its_batch(self):
+        kernels = kernel_benchmarks(batch=20)
+        self.assertEqual(
+            list(kernels),
+            [
+                "percent_change",
+                "relative_strength",
+                "extract_revenue",
+                "subtract_prev_quarters",
+                "find_most_updated",
+                "extract_float",
+                "extract_dollars",
+                "calculate_skyrocket_score",
+                "price_metrics_frame",
+                "skyrocket_scores",
+            ],
+        )
+
+        for name, kernel in kernels.items():
+            results = kernel()
+            self.assertGreaterEqual(len(results), 20, name)
+            self.assertTrue(all(result is not None for result in results), name)
+
+    def test_kernels_are_timed_per_batch(self):
+        runs = time_kernels({"sleep": lambda: time.sleep(0.002)}, repeats=3, min_seconds=0.01)
+
+        self.assertEqual(len(runs), 3)
+        self.assertTrue(all(0.002 <= run["sleep"] < 0.01 for run in runs))
+
+    def test_regressions_are_measured_against_latest_clean_commit(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, kernel_results_name)
+            save_kernel_results(path, "aaaaaaa", {"kernel": 1.0}, batch=10)
+            save_kernel_results(path, "bbbbbbb", {"kernel": 2.0}, batch=10)
+            save_kernel_results(path, "bbbbbbb-dirty", {"kernel": 0.5}, batch=10)
+            results = open_kernel_results(path)
+
+        self.assertEqual(results["aaaaaaa"]["batch"], 10)
+        self.assertEqual(baseline_commit(results, "bbbbbbb-dirty"), "bbbbbbb")
+        self.assertEqual(baseline_commit(results, "bbbbbbb"), "aaaaaaa")
+        self.assertIsNone(baseline_commit({}, "aaaaaaa"))
+
+        comparison = compare_kernels([{"kernel": 2.6}, {"kernel": 2.4}, {"kernel": 3.0}], results["bbbbbbb"]["kernels"])
+        self.assertAlmostEqual(comparison.loc["kernel", "Seconds"], 2.6)
+        self.assertTrue(comparison.loc["kernel", "Regressed"])
+        self.assertFalse(compare_kernels([{"kernel": 2.4}], results["bbbbbbb"]["kernels"]).loc["kernel", "Regressed"])
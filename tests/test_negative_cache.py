@@ -0,0 +1,91 @@
+import os
+import asyncio
+import tempfile
+import unittest
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class TestNegativeCache(unittest.TestCase):
+    def test_entries_expire(self):
+        cache = NegativeCache()
+        cache.add("AAA", FOREIGN_FILER)
+        cache.add("BBB", NO_CIK, expires=pd.Timestamp.now() - pd.Timedelta(days=1))
+        cache.add_too_young("CCC", 250)
+
+        self.assertEqual(cache.reason("AAA"), FOREIGN_FILER)
+        self.assertIsNone(cache.reason("BBB"))
+        self.assertIsNone(cache.reason("DDD"))
+        self.assertEqual(cache.reason("CCC"), TOO_YOUNG)
+        self.assertLessEqual(pd.Timestamp(cache.expires("CCC")), pd.Timestamp.now() + pd.Timedelta(days=5))
+
+        expected = pd.Timestamp.now().normalize() + pd.Timedelta(days=negative_cache_ttls[FOREIGN_FILER])
+        self.assertEqual(cache.expires("AAA"), f"{expected:%Y-%m-%d}")
+
+    def test_partition(self):
+        cache = NegativeCache()
+        cache.add("AAA", FOREIGN_FILER)
+        cache.add("BBB", UNRESOLVED)
+
+        remaining, skipped = cache.partition(["AAA", "BBB", "CCC"], [TOO_YOUNG, UNRESOLVED])
+
+        self.assertEqual(remaining, ["AAA", "CCC"])
+        self.assertEqual(skipped, {"BBB": UNRESOLVED})
+
+    def test_save_drops_expired_entries(self):
+        cwd = os.getcwd()
+
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+
+            try:
+                cache = NegativeCache()
+                cache.add("AAA", NO_CIK)
+                cache.add("BBB", NO_CIK, expires=pd.Timestamp.now() - pd.Timedelta(days=1))
+                cache.save()
+                reopened = open_negative_cache()
+            finally:
+                os.chdir(cwd)
+
+        self.assertEqual(list(reopened.entries), ["AAA"])
+        self.assertEqual(reopened.reason("AAA"), NO_CIK)
+
+    def test_cached_symbols_are_not_fetched(self):
+        negative_cache.add("ZZZFOREIGN", FOREIGN_FILER)
+        negative_cache.add("ZZZNOCIK", NO_CIK)
+
+        try:
+            # no session is needed, since no requests are sent
+            foreign = asyncio.run(fetch_revenues("ZZZFOREIGN", None))
+            self.assertTrue(foreign["Foreign Stock"].iloc[0])
+            self.assertIsNone(asyncio.run(fetch_revenues("ZZZNOCIK", None)))
+        finally:
+            negative_cache.remove("ZZZFOREIGN")
+            negative_cache.remove("ZZZNOCIK")
+
+
+class TestUnresolvedSymbols(unittest.TestCase):
+    def setUp(self):
+        self.entries = dict(negative_cache.entries)
+        self.changed = set(negative_cache.changed)
+
+    def tearDown(self):
+        negative_cache.entries = self.entries
+        negative_cache.changed = self.changed
+
+    def test_only_confirmed_unresolved_symbols_are_cached(self):
+        dates = pd.bdate_range("2024-01-01", periods=260)
+        close = pd.DataFrame({"AAA": 1.0, "BBB": float("nan"), "CCC": float("nan")}, index=dates)
+        state = IndicatorState.from_history(close, close * 1000)
+        listings = pd.DataFrame(
+            {"Company Name": ["A"], "Market Cap": [1e9], "Industry": ["I"]}, index=pd.Index(["AAA"], name="Symbol")
+        )
+        logs = EventLog("relative_strengths", "summary", os.devnull)
+
+        # "BBB" returned no data while the rest of its batch downloaded; "CCC"'s whole batch failed
+        records, _ = evaluate_relative_strengths(state, ["AAA", "BBB", "CCC"], listings, logs, unresolved={"BBB"})
+
+        self.assertEqual([record["Symbol"] for record in records], ["AAA"])
+        self.assertEqual(negative_cache.reason("BBB"), UNRESOLVED)
+        self.assertIsNone(negative_cache.reason("CCC"))
+
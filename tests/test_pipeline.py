@@ -0,0 +1,73 @@
+import time
+import unittest
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class TestPipeline(unittest.TestCase):
+    def test_items_stream_through_stages(self):
+        stages = [
+            PipelineStage("double", lambda x: x * 2, 3),
+            PipelineStage("keep multiples of 4", lambda x: x if x % 4 == 0 else None, 2),
+            PipelineStage("increment", lambda x: x + 1, 1),
+        ]
+        Pipeline(stages, queue_size=2).run(list(range(20)))
+
+        self.assertEqual(sorted(stages[0].outputs), [x * 2 for x in range(20)])
+        self.assertEqual(sorted(stages[1].outputs), [x for x in range(0, 40, 4)])
+        self.assertEqual(sorted(stages[2].outputs), [x + 1 for x in range(0, 40, 4)])
+        self.assertEqual([stage.processed for stage in stages], [20, 20, 10])
+
+        for stage in stages:
+            self.assertIsNotNone(stage.input_closed_at)
+            self.assertIsNotNone(stage.elapsed_seconds)
+
+    def test_errors_are_collected(self):
+        def fail_on_odd(x):
+            if x % 2 == 1:
+                raise ValueError("odd")
+            return x
+
+        stage = PipelineStage("even", fail_on_odd, 2)
+        Pipeline([stage], queue_size=1).run(list(range(6)))
+
+        self.assertEqual(sorted(stage.outputs), [0, 2, 4])
+        self.assertEqual(sorted(item for item, _ in stage.errors), [1, 3, 5])
+
+    def test_lost_nodes_are_retried(self):
+        attempts = []
+
+        def flaky(x):
+            attempts.append(x)
+            if attempts.count(x) == 1:
+                raise NodeLostError("node lost")
+            return x
+
+        stage = PipelineStage("flaky", flaky, 1, max_requeues=2)
+        Pipeline([stage], queue_size=4).run([1, 2])
+
+        self.assertEqual(sorted(stage.outputs), [1, 2])
+        self.assertEqual(len(attempts), 4)
+
+    def test_items_losing_every_session_are_recorded_as_errors(self):
+        def lost(x):
+            if x == 2:
+                raise NodeLostError("node lost")
+            return x
+
+        stage = PipelineStage("lost", lost, 1, max_requeues=2)
+        Pipeline([stage], queue_size=4).run([1, 2, 3])
+
+        self.assertEqual(sorted(stage.outputs), [1, 3])
+        self.assertEqual([(item, str(e)) for item, e in stage.errors], [(2, "browser session lost 3 times")])
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_calls_are_spaced(self):
+        limiter = RateLimiter(100)
+        start = time.monotonic()
+
+        for i in range(5):
+            limiter.wait()
+
+        self.assertGreaterEqual(time.monotonic() - start, 0.035)
+
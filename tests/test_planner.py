@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class FakeHost:
+    def __init__(self, values, delay=0.0):
+        self.values = values
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.fetched = []
+        self.active = 0
+        self.max_active = 0
+
+    def __call__(self, symbol):
+        with self.lock:
+            self.fetched.append(symbol)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+        time.sleep(self.delay)
+
+        with self.lock:
+            self.active -= 1
+
+        return self.values[symbol]
+
+
+def threshold_filter(metric, minimum):
+    def evaluate(row, metrics):
+        if metrics[metric] < minimum:
+            return FILTERED, None
+        return PASSED, {**row, metric: metrics[metric]}
+
+    return evaluate
+
+
+class TestFetchPlanner(unittest.TestCase):
+    def setUp(self):
+        self.rows = [{"Symbol": symbol, "RS": rs} for symbol, rs in [("A", 99), ("B", 80), ("C", 90)]]
+        self.volume = FakeHost({"A": 100, "B": 5, "C": 50}, delay=0.01)
+        self.growth = FakeHost({"A": 30, "B": 40, "C": 10}, delay=0.01)
+        self.stages = [
+            PlannedStage("Liquidity", [MetricNode("volume", "volume.com", self.volume)], threshold_filter("volume", 10)),
+            PlannedStage("Growth", [MetricNode("growth", "growth.com", self.growth)], threshold_filter("growth", 25)),
+        ]
+        self.limits = {"volume.com": 2, "growth.com": 1}
+
+    def test_wall_time_fetches_everything(self):
+        planner = FetchPlanner(self.stages, self.limits, objective=MIN_WALL_TIME)
+        passed = planner.run(self.rows)
+
+        self.assertEqual([row["Symbol"] for row in passed[0]], ["A", "C"])
+        self.assertEqual([row["Symbol"] for row in passed[1]], ["A"])
+        self.assertEqual(passed[1][0]["volume"], 100)
+        self.assertEqual(sorted(self.growth.fetched), ["A", "B", "C"])
+        self.assertEqual(dict(planner.requests), {"volume.com": 3, "growth.com": 3})
+
+    def test_requests_only_fetches_survivors(self):
+        planner = FetchPlanner(self.stages, self.limits, objective=MIN_REQUESTS)
+        passed = planner.run(self.rows)
+
+        self.assertEqual([row["Symbol"] for row in passed[1]], ["A"])
+        self.assertEqual(sorted(self.growth.fetched), ["A", "C"])
+
+    def test_speculative_fetches(self):
+        planner = FetchPlanner(
+            self.stages, self.limits, objective=MIN_REQUESTS, speculate=lambda row: row["RS"] >= 80
+        )
+        planner.run(self.rows)
+
+        self.assertEqual(sorted(self.growth.fetched), ["A", "B", "C"])
+
+    def test_host_limits(self):
+        rows = [{"Symbol": str(i), "RS": 50} for i in range(12)]
+        volume = FakeHost({row["Symbol"]: 100 for row in rows}, delay=0.01)
+        stages = [PlannedStage("Liquidity", [MetricNode("volume", "volume.com", volume)], threshold_filter("volume", 10))]
+        passed = FetchPlanner(stages, {"volume.com": 3}).run(rows)
+
+        self.assertEqual(len(passed[0]), 12)
+        self.assertLessEqual(volume.max_active, 3)
+        self.assertGreater(volume.max_active, 1)
+
+    def test_estimate(self):
+        stages = [
+            PlannedStage("Liquidity", [MetricNode("volume", "volume.com", None, cost=2)], None),
+            PlannedStage("Growth", [MetricNode("growth", "growth.com", None, cost=1)], None),
+        ]
+        estimate = FetchPlanner(stages, self.limits).estimate(10)
+
+        self.assertEqual(estimate["requests"], 20)
+        self.assertAlmostEqual(estimate["wall_time"], 10.0)
+
+    def test_invalid_configuration(self):
+        self.assertRaises(ValueError, FetchPlanner, self.stages, self.limits, objective="fastest")
+        self.assertRaises(ValueError, FetchPlanner, self.stages, {"volume.com": 2})
+
+    def test_empty_input(self):
+        self.assertEqual(FetchPlanner(self.stages, self.limits).run([]), [[], []])
+
+    def test_failing_filters_fail_the_row(self):
+        def evaluate(row, metrics):
+            if row["Symbol"] == "B":
+                raise ValueError("malformed row")
+            return threshold_filter("volume", 10)(row, metrics)
+
+        self.stages[0].evaluate = evaluate
+        planner = FetchPlanner(self.stages, self.limits, objective=MIN_WALL_TIME)
+        results = []
+        thread = threading.Thread(target=lambda: results.append(planner.run(self.rows)))
+        thread.start()
+        thread.join(timeout=5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertEqual([row["Symbol"] for row in results[0][0]], ["A", "C"])
+        self.assertEqual([(symbol, stage, str(e)) for symbol, stage, e in planner.errors], [("B", "Liquidity", "malformed row")])
@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+from tests.test_backtest import price_frames
+
+
+def last_close(symbol, matrix):
+    return float(matrix.series(symbol)[-1])
+
+
+class TestPriceMatrix(unittest.TestCase):
+    def setUp(self):
+        self.close, self.volume = price_frames(days=60, symbols=4)
+        self.close.iloc[:10, 2] = np.nan
+
+    def test_from_frames_is_symbol_major(self):
+        matrix = PriceMatrix.from_frames(self.close, self.volume)
+
+        self.assertEqual(matrix.close.shape, (4, 60))
+        self.assertEqual(matrix.close.dtype, np.float32)
+        self.assertTrue(matrix.close.flags["C_CONTIGUOUS"])
+        np.testing.assert_allclose(matrix.series("S1"), self.close["S1"].to_numpy(), rtol=1e-6)
+        self.assertTrue(np.shares_memory(matrix.series("S1"), matrix.close))
+
+    def test_is_current(self):
+        matrix = PriceMatrix.from_frames(self.close, self.volume)
+        last_date = matrix.dates[-1]
+
+        self.assertTrue(matrix.is_current(now=last_date))
+        self.assertTrue(matrix.is_current(now=last_date + pd.offsets.BDay(2)))
+        self.assertFalse(matrix.is_current(now=last_date + pd.offsets.BDay(3)))
+        self.assertFalse(PriceMatrix.from_frames(self.close.iloc[:0], self.volume.iloc[:0]).is_current())
+
+    def test_save_and_open(self):
+        with tempfile.TemporaryDirectory() as directory:
+            save_price_matrix(self.close, self.volume, directory)
+            matrix = open_price_matrix(directory)
+
+            self.assertIsInstance(matrix.close, np.memmap)
+            self.assertEqual(matrix.symbols, list(self.close.columns))
+            self.assertIn("S3", matrix)
+
+            start = self.close.index[30]
+            history = matrix.history("S2", start=start)
+            self.assertEqual(list(history.columns), ["Close", "Volume"])
+            self.assertEqual(history.index[0], start)
+            np.testing.assert_allclose(history["Volume"], self.volume["S2"].iloc[30:].to_numpy())
+            self.assertTrue(np.isnan(matrix.series("S2")[:10]).all())
+
+            del matrix, history
+
+    def test_missing_matrix(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertIsNone(open_price_matrix(directory))
+
+    def test_process_pool_map(self):
+        with tempfile.TemporaryDirectory() as directory:
+            save_price_matrix(self.close, self.volume, directory)
+            matrix = open_price_matrix(directory)
+            symbols = ["S3", "S0", "S1"]
+            expected = [float(np.float32(self.close[symbol].iloc[-1])) for symbol in symbols]
+
+            self.assertEqual(tqdm_process_pool_map(2, last_close, symbols, matrix), expected)
+            self.assertEqual(tqdm_process_pool_map(1, last_close, symbols, matrix), expected)
+
+            del matrix
+
+    def test_price_store_writes_matrix(self):
+        cwd = os.getcwd()
+
+        with tempfile.TemporaryDirectory() as directory:
+            os.chdir(directory)
+
+            try:
+                save_price_store(self.close, self.volume)
+                matrix = open_price_matrix()
+                self.assertEqual(len(matrix), 4)
+                self.assertEqual(list(matrix.dates), list(self.close.index))
+                del matrix
+            finally:
+                os.chdir(cwd)
@@ -0,0 +1,57 @@
+import os
+import json
+import pstats
+import tempfile
+import threading
+import unittest
+from growth_stock_screener.screen.iterations.utils import *
+
+
+def allocate(size):
+    return [bytearray(1000) for _ in range(size)]
+
+
+class TestProfiling(unittest.TestCase):
+    def test_stage_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            profiler = StageProfiler(directory=directory, interval=0.01)
+
+            with profiler.stage("Liquidity"):
+                data = allocate(5000)
+                worker = threading.Thread(target=allocate, args=(20000,), name="worker")
+                worker.start()
+                worker.join()
+
+            stage = profiler.stages[0]
+            self.assertEqual(stage["stage"], "Liquidity")
+            self.assertGreater(stage["peak_rss"], 0)
+            self.assertGreaterEqual(stage["peak_heap_growth"], 5000 * 1000)
+            self.assertTrue(any("test_profiling.py" in function["function"] for function in stage["hot_functions"]))
+            self.assertIn("test_profiling.py", stage["allocation_sites"][0]["site"])
+
+            self.assertTrue(stage["profile"].endswith("01_liquidity.prof"))
+            self.assertGreater(pstats.Stats(stage["profile"]).total_calls, 0)
+
+            with open(stage["collapsed_stacks"], "r") as f:
+                stacks = f.read().splitlines()
+
+            self.assertTrue(all(line.rsplit(" ", 1)[1].isdigit() for line in stacks))
+            self.assertTrue(any(line.startswith("MainThread;") for line in stacks))
+
+            with open(profiler.save(), "r") as f:
+                self.assertEqual(json.load(f)[0]["stage"], "Liquidity")
+
+            del data
+
+    def test_disabled_profiler(self):
+        profiler = StageProfiler(enabled=False)
+
+        with profiler.stage("Trend"):
+            pass
+
+        self.assertEqual(profiler.stages, [])
+        self.assertIsNone(profiler.directory)
+
+    def test_process_memory(self):
+        self.assertGreater(process_rss(), 0)
+        self.assertNotIn(os.getpid(), child_processes())
@@ -0,0 +1,149 @@
+import os
+import time
+import json
+import asyncio
+import tempfile
+import threading
+import unittest
+import requests
+import aiohttp
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class SourceHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeElement:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeDriver:
+    def __init__(self, pages):
+        self.pages = pages
+        self.url = None
+
+    def get(self, url):
+        self.url = url
+
+    def find_element(self, by, value):
+        if value not in self.pages[self.url]:
+            raise NoSuchElementException(value)
+
+        return FakeElement(self.pages[self.url][value])
+
+
+async def fetch_json(url):
+    async with aiohttp.ClientSession() as session:
+        return await get(url, session, json=True)
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.archive = os.path.join(self.directory.name, "fixtures")
+        self.source = ThreadingHTTPServer(("127.0.0.1", 0), SourceHandler)
+        threading.Thread(target=self.source.serve_forever, args=(0.05,), daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.source.server_port}"
+
+    def tearDown(self):
+        stop_replay()
+        self.source.shutdown()
+        self.source.server_close()
+        self.directory.cleanup()
+
+    def test_request_keys(self):
+        self.assertEqual(
+            request_key("get", "https://query2.finance.yahoo.com/v8/finance/chart/AAA?period2=2&interval=1d&period1=1"),
+            "GET https://query2.finance.yahoo.com/v8/finance/chart/AAA?interval=1d",
+        )
+        self.assertEqual(
+            request_key("GET", "https://example.com/a?b=2", {"a": 1, "crumb": "x"}), "GET https://example.com/a?a=1&b=2"
+        )
+
+    def test_only_public_api_is_exported(self):
+        from growth_stock_screener.screen.iterations import utils
+
+        # recording and replay state is read through 'replaying', never through stale module globals
+        self.assertFalse(hasattr(utils, "recording"))
+        self.assertFalse(hasattr(utils, "replay_server"))
+        self.assertTrue(callable(utils.replaying))
+
+    def test_record_and_replay(self):
+        start_recording(self.archive)
+        recorded = requests.get(f"{self.url}/quote?symbol=AAA&period1=1").json()
+        recorded_async = asyncio.run(fetch_json(f"{self.url}/facts"))
+        stop_replay()
+
+        # the source is unreachable while replaying
+        self.source.shutdown()
+        start_replay(self.archive)
+
+        self.assertEqual(requests.get(f"{self.url}/quote?symbol=AAA&period1=2").json(), recorded)
+        self.assertEqual(asyncio.run(fetch_json(f"{self.url}/facts")), recorded_async)
+        self.assertEqual(requests.get(f"{self.url}/other").status_code, 404)
+
+    def test_injected_latency_and_errors(self):
+        start_recording(self.archive)
+        requests.get(f"{self.url}/quote")
+        stop_replay()
+
+        start_replay(self.archive, latency=0.05)
+        request_start = time.perf_counter()
+        self.assertEqual(requests.get(f"{self.url}/quote").status_code, 200)
+        self.assertGreaterEqual(time.perf_counter() - request_start, 0.05)
+
+        start_replay(self.archive, error_rate=0.5, seed=1)
+        statuses = [requests.get(f"{self.url}/quote").status_code for _ in range(40)]
+        self.assertEqual(set(statuses), {200, 503})
+
+    def test_browser_pages(self):
+        url = "https://www.marketbeat.com/stocks/NASDAQ/AAA/institutional-ownership/"
+        recording = start_recording(self.archive)
+        driver = recording_driver(FakeDriver({url: {"inflows": "$1.5M"}}))
+        driver.get(url)
+        self.assertEqual(driver.find_element("css selector", "inflows").text, "$1.5M")
+        stop_replay()
+
+        start_replay(self.archive)
+        replay_driver = ReplayDriver()
+        replay_driver.get(url)
+        self.assertEqual(extract_dollars(replay_driver.find_element("css selector", "inflows")), 1500000)
+
+        with self.assertRaises(NoSuchElementException):
+            replay_driver.find_element("css selector", "outflows")
+
+        with self.assertRaises(WebDriverException):
+            replay_driver.get("https://www.marketbeat.com/stocks/NASDAQ/BBB/institutional-ownership/")
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_compare_to_baseline(self):
+        runs = [{"Trend": 10.0, "Total": 20.0}, {"Trend": 14.0, "Total": 21.0}, {"Trend": 13.0, "Total": 22.0}]
+        comparison = compare_to_baseline(runs, {"Trend": 10.0, "Total": 20.8})
+
+        self.assertEqual(comparison["Seconds"].tolist(), [13.0, 21.0])
+        self.assertEqual(comparison["Regressed"].tolist(), [True, False])
+
+        # stages without a baseline never regress
+        self.assertFalse(compare_to_baseline(runs, {})["Regressed"].any())
+
+    def test_baselines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baseline.json")
+            self.assertEqual(open_baseline(path), {"stages": {}})
+
+            save_baseline(path, {"Trend": 1.5}, latency=0.1, error_rate=0)
+            self.assertEqual(open_baseline(path), {"latency": 0.1, "error_rate": 0, "stages": {"Trend": 1.5}})
@@ -0,0 +1,124 @@
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+
+
+def progress_updates(progress):
+    return sum(call.args[0] if call.args else 1 for call in progress.return_value.update.call_args_list)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestPrioritize(unittest.TestCase):
+    def test_descending_order(self):
+        df = pd.DataFrame({"Symbol": ["A", "B", "C"], "RS": [80, 99, 90]})
+        self.assertEqual(prioritize(df, ["RS"]), [1, 2, 0])
+
+    def test_tie_breaking_column(self):
+        df = pd.DataFrame(
+            {"RS": [90, 90, 95], "Growth": [10, 50, 0]},
+            index=[7, 8, 9],
+        )
+        self.assertEqual(prioritize(df, ["RS", "Growth"]), [2, 1, 0])
+
+    def test_missing_values_last(self):
+        df = pd.DataFrame({"RS": [90, 95, 99], "Growth": ["N/A", 25, None]})
+        self.assertEqual(prioritize(df, ["Growth"]), [1, 0, 2])
+
+    def test_unknown_columns_keep_order(self):
+        df = pd.DataFrame({"RS": [80, 99, 90]})
+        self.assertEqual(prioritize(df, ["Unknown"]), [0, 1, 2])
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    def test_budget_is_fair_share(self):
+        scheduler = DeadlineScheduler(2, 100, min_budget=5, max_budget=75)
+        self.assertEqual(scheduler.budget(100, 10), 20)
+        self.assertEqual(scheduler.budget(100, 1), 75)
+        self.assertEqual(scheduler.budget(100, 1000), 5)
+        self.assertEqual(scheduler.budget(3, 1000), 3)
+
+    def test_runs_in_priority_order(self):
+        scheduler = DeadlineScheduler(1, 100, min_budget=1, max_budget=10)
+        results, skipped = scheduler.run(lambda item, budget: item, [3, 1, 2])
+        self.assertEqual(results, [3, 1, 2])
+        self.assertEqual(skipped, [])
+
+    def test_skips_items_after_deadline(self):
+        clock = FakeClock()
+        scheduler = DeadlineScheduler(1, 25, min_budget=1, max_budget=10, clock=clock)
+
+        def work(item, budget):
+            clock.now += 10
+            return item
+
+        with patch("growth_stock_screener.screen.iterations.utils.scheduling.tqdm") as progress:
+            results, skipped = scheduler.run(work, ["a", "b", "c", "d", "e"])
+
+        self.assertEqual(results, ["a", "b", "c"])
+        self.assertEqual(skipped, ["d", "e"])
+        self.assertEqual(progress_updates(progress), 5)
+
+    def test_requeues_lost_sessions(self):
+        attempts = {"b": 0}
+
+        def work(item, budget):
+            if item == "b" and attempts["b"] < 2:
+                attempts["b"] += 1
+                raise NodeLostError(item)
+            return item
+
+        scheduler = DeadlineScheduler(1, 100, min_budget=1, max_budget=10)
+        results, skipped = scheduler.run(work, ["a", "b", "c"])
+        self.assertEqual(results, ["a", "b", "c"])
+        self.assertEqual(skipped, [])
+
+    def test_repeatedly_lost_items_are_reported_as_errors(self):
+        errors = []
+
+        def work(item, budget):
+            if item == "b":
+                raise NodeLostError(item)
+            return item
+
+        scheduler = DeadlineScheduler(1, 100, min_budget=1, max_budget=10, max_requeues=2)
+
+        with patch("growth_stock_screener.screen.iterations.utils.scheduling.tqdm") as progress:
+            results, skipped = scheduler.run(work, ["a", "b", "c"], on_error=lambda item, e: errors.append((item, str(e))))
+
+        self.assertEqual(results, ["a", "c"])
+        self.assertEqual(skipped, [])
+        self.assertEqual(errors, [("b", "browser session lost 3 times")])
+        self.assertEqual(progress_updates(progress), 3)
+
+    def test_checkpoints(self):
+        checkpoints = []
+        scheduler = DeadlineScheduler(2, 100, min_budget=1, max_budget=10)
+        scheduler.run(
+            lambda item, budget: item,
+            list(range(7)),
+            checkpoint=lambda: checkpoints.append(True),
+            checkpoint_every=3,
+        )
+        self.assertEqual(len(checkpoints), 2)
+
+    def test_errors_are_reported_without_stopping_workers(self):
+        errors = []
+
+        def work(item, budget):
+            if item in ("a", "c"):
+                raise ValueError(f"malformed {item}")
+            return item
+
+        scheduler = DeadlineScheduler(1, 100, min_budget=1, max_budget=10)
+        results, skipped = scheduler.run(work, ["a", "b", "c", "d"], on_error=lambda item, e: errors.append((item, str(e))))
+        self.assertEqual(results, ["b", "d"])
+        self.assertEqual(skipped, [])
+        self.assertEqual(errors, [("a", "malformed a"), ("c", "malformed c")])
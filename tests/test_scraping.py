@@ -0,0 +1,80 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+
+
+def download_frame(symbols, empty=()):
+    dates = pd.bdate_range("2024-01-01", periods=3)
+    columns = pd.MultiIndex.from_product([["Close", "Volume"], symbols], names=["Price", "Ticker"])
+    df = pd.DataFrame(1.0, index=dates, columns=columns)
+    df.loc[:, pd.IndexSlice[:, list(empty)]] = np.nan
+    return df
+
+
+class TestParallelDownload(unittest.TestCase):
+    def test_missing_symbols(self):
+        self.assertEqual(missing_symbols(download_frame(["A", "B", "C"], empty=["B"]), ["A", "B", "C"]), ["B"])
+        self.assertEqual(missing_symbols(download_frame(["A"]), ["A", "D"]), ["D"])
+        self.assertEqual(missing_symbols(pd.DataFrame(), ["A"]), ["A"])
+
+    def test_only_missing_symbols_are_retried(self):
+        calls = []
+        flaky = {"C": 1, "E": 5}  # number of attempts returning no data
+
+        def fake_download(symbols, **kwargs):
+            calls.append(list(symbols))
+            empty = [symbol for symbol in symbols if flaky.get(symbol, 0) >= calls_for(symbol)]
+            return download_frame(symbols, empty=empty)
+
+        def calls_for(symbol):
+            return sum(symbol in call for call in calls)
+
+        symbols = ["A", "B", "C", "D", "E"]
+
+        with patch("growth_stock_screener.screen.iterations.utils.scraping.yf.download", fake_download):
+            tickers, report = yf_download_parallel(symbols, 2, 2, 10, retries=2, backoff=0)
+
+        self.assertEqual(sorted(map(sorted, calls[:3])), [["A", "B"], ["C", "D"], ["E"]])
+        self.assertEqual(sorted(calls[3]), ["C", "E"])
+        self.assertEqual(calls[4], ["E"])
+        self.assertEqual(list(tickers["Close"].columns), symbols)
+        self.assertTrue(tickers["Close"]["E"].isna().all())
+        self.assertFalse(tickers["Close"]["C"].isna().any())
+        self.assertEqual(report["Attempt"].tolist(), [1, 1, 1, 2, 3])
+        self.assertEqual(report["Missing"].sum(), 4)
+
+    def test_no_retries_without_any_data(self):
+        calls = []
+
+        def fake_download(symbols, **kwargs):
+            calls.append(list(symbols))
+            return pd.DataFrame()
+
+        with patch("growth_stock_screener.screen.iterations.utils.scraping.yf.download", fake_download):
+            tickers, report = yf_download_parallel(["A", "B"], 1, 2, 10, retries=2, backoff=0)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(tickers), 0)
+        self.assertEqual(report["Coverage %"].tolist(), [0, 0])
+
+    def test_failed_batches_are_not_confirmed_missing(self):
+        calls = []
+
+        def fake_download(symbols, **kwargs):
+            calls.append(list(symbols))
+
+            # the first batch fails entirely, the second returns data for every symbol but "D"
+            if calls.count(["A", "B"]) == 1 and list(symbols) == ["A", "B"]:
+                return pd.DataFrame()
+
+            return download_frame(symbols, empty=[symbol for symbol in symbols if symbol == "D"])
+
+        with patch("growth_stock_screener.screen.iterations.utils.scraping.yf.download", fake_download):
+            tickers, report = yf_download_parallel(["A", "B", "C", "D"], 2, 1, 10, retries=2, backoff=0)
+
+        self.assertFalse(tickers["Close"]["A"].isna().any())
+        self.assertEqual(confirmed_missing(report), ["D"])
+        self.assertEqual(confirmed_missing(pd.DataFrame()), [])
+
@@ -0,0 +1,69 @@
+import unittest
+import numpy as np
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class TestSkyrocketScores(unittest.TestCase):
+    def setUp(self):
+        universe = SyntheticUniverse(300, seed=4, missing_rate=0.02, young_rate=0.3, unresolved_rate=0.05)
+        close, volume = universe.price_history()
+        self.matrix = PriceMatrix.from_frames(close, volume)
+        self.symbols = universe.symbols
+        self.start = close.index[-252]
+
+        rng = np.random.default_rng(4)
+        self.rs = [None if i % 17 == 0 else int(rating) for i, rating in enumerate(rng.integers(1, 100, 300))]
+        self.infos = [
+            None if i % 23 == 0 else {
+                "revenueGrowth": float(rng.normal(0.2, 0.3)),
+                "institutionsPercentHeld": float(rng.random()),
+                **({"currentPrice": float(universe.last_price[i])} if i % 3 else {}),
+            }
+            for i in range(300)
+        ]
+
+    def test_batch_scores_match_per_symbol_scores(self):
+        scored, top = score_universe(self.matrix, self.symbols, self.rs, self.infos, start=self.start, chunk_size=64)
+
+        for i, symbol in enumerate(self.symbols):
+            row = pd.Series({"Symbol": symbol, "RS": self.rs[i]})
+            score, reason = calculate_skyrocket_score(row, self.infos[i] or {}, self.matrix.history(symbol, self.start))
+
+            self.assertEqual(scored.at[symbol, "Skyrocket Score"], score, symbol)
+            self.assertEqual(describe_reasons(scored.at[symbol, "Skyrocket Reasons"], scored.loc[symbol]), reason, symbol)
+
+        # the running top holds the highest scores, with ties going to the earlier symbol (as nlargest orders them)
+        self.assertEqual(top, scored["Skyrocket Score"].nlargest(10, keep="first").index.tolist())
+        self.assertGreater(scored["Skyrocket Score"].max(), 0)
+
+    def test_top_is_independent_of_chunk_size(self):
+        _, top = score_universe(self.matrix, self.symbols, self.rs, top_n=25, chunk_size=7)
+        _, unchunked = score_universe(self.matrix, self.symbols, self.rs, top_n=25)
+
+        self.assertEqual(top, unchunked)
+        self.assertEqual(len(top), 25)
+
+    def test_weights_and_thresholds_are_configurable(self):
+        metrics = {name: np.full(3, np.nan) for name in skyrocket_metric_names}
+        metrics["rs"] = np.array([95, 85, 50])
+        metrics["current_price"] = np.array([2.0, 2.0, 1.0])
+        metrics["sma_50"] = np.array([1.0, 3.0, 0.5])
+
+        scores, masks = score_metrics(metrics)
+        self.assertEqual(scores.tolist(), [3, 1, 1])
+        self.assertEqual(masks[0], reason_codes["high_rs"] | reason_codes["above_sma_50"])
+        self.assertEqual(describe_reasons(masks[2], metrics), "Price > 50-day SMA")
+
+        weights = {**skyrocket_weights, "above_sma_50": 0, "good_rs": 9}
+        thresholds = {**skyrocket_thresholds, "good_rs": 50}
+        scores, masks = score_metrics(metrics, weights, thresholds)
+        self.assertEqual(scores.tolist(), [2, 9, 9])
+        self.assertEqual(masks.tolist(), [reason_codes["high_rs"], reason_codes["good_rs"], reason_codes["good_rs"]])
+
+    def test_scores_are_capped(self):
+        metrics = {name: np.array([1000.0]) for name in skyrocket_metric_names}
+        metrics["current_price"] = np.array([2000.0])
+
+        scores, _ = score_metrics(metrics, {name: 5 for name in skyrocket_weights})
+        self.assertEqual(scores.tolist(), [max_skyrocket_score])
@@ -0,0 +1,58 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from openpyxl import load_workbook
+from growth_stock_screener.screen.iterations.utils import *
+
+
+class TestSummaryFile(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.TemporaryDirectory()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_stages_are_streamed_into_styled_sheets(self):
+        rs_df = pd.DataFrame(
+            {
+                "Symbol": ["AAA", "BBBB", "CC", "DDDDDDDDDD"],
+                "Price": [1.5, 2.25, 3.0, 0.5],
+                "RS": [99, 95, 90, 85],
+                "Industry": ["Software", None, "Biotechnology", "Banks"],
+            }
+        )
+        create_outfile(rs_df, "relative_strengths")
+        create_outfile(rs_df.iloc[:2], "liquidity")
+
+        wb = load_workbook(create_summary_file())
+        self.assertEqual(wb.sheetnames, ["Summary", "1. Relative Strength", "2. Liquidity"])
+
+        # stages which couldn't be loaded are left out of the counts
+        summary = [row[:3] for row in wb["Summary"].iter_rows(min_row=5, values_only=True)]
+        self.assertEqual(
+            summary,
+            [("Stage", "Stocks Remaining", "% of Total"), ("1. Relative Strength", 4, "100.00%"), ("2. Liquidity", 2, "50.00%")],
+        )
+
+        ws = wb["1. Relative Strength"]
+        rows = list(ws.iter_rows(values_only=True))
+        self.assertEqual(rows[0], ("Symbol", "Price", "RS", "Industry"))
+        self.assertEqual(rows[1], ("AAA", 1.5, 99, "Software"))
+        self.assertEqual(rows[2], ("BBBB", 2.25, 95, None))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(ws.freeze_panes, "A2")
+
+        # every cell refers to the shared header or cell style (empty cells included)
+        self.assertEqual(ws["A1"].style, header_style_name)
+        self.assertTrue(ws["A1"].font.bold)
+        self.assertEqual(ws["D3"].style, cell_style_name)
+        self.assertEqual(ws["D3"].border.left.style, "thin")
+
+        # columns fit their longest value (or header)
+        self.assertAlmostEqual(ws.column_dimensions["A"].width, (len("DDDDDDDDDD") + 2) * 1.2)
+        self.assertAlmostEqual(ws.column_dimensions["C"].width, (len("RS") + 2) * 1.2)
+        self.assertAlmostEqual(ws.column_dimensions["D"].width, (len("Biotechnology") + 2) * 1.2)
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+import pandas as pd
+from growth_stock_screener.screen.profiles import *
+from growth_stock_screener.screen.iterations.utils import *
+from tests.test_filters import settings, rs_row
+
+
+class TestProfiles(unittest.TestCase):
+    def setUp(self):
+        self.base = {**settings, "min_rs": 80}
+
+    def test_expand_grid(self):
+        grid = expand_grid({"min_price": [0.2, 0.5], "min_volume": [1000, 5000, 10000]})
+
+        self.assertEqual(len(grid), 6)
+        self.assertEqual(grid["min_price=0.5, min_volume=5000"], {"min_price": 0.5, "min_volume": 5000})
+
+    def test_overrides(self):
+        profile = apply_overrides(self.base, {"min_volume": 1, "trend_settings.Price >= 50-day SMA": True})
+
+        self.assertEqual(profile["min_volume"], 1)
+        self.assertTrue(profile["trend_settings"]["Price >= 50-day SMA"])
+        self.assertFalse(self.base["trend_settings"]["Price >= 50-day SMA"])
+        self.assertRaises(ValueError, apply_overrides, self.base, {"threads": 4})
+        self.assertRaises(ValueError, apply_overrides, self.base, {"trend_settings.Price >= 5-day SMA": True})
+
+    def test_union_settings(self):
+        strict = apply_overrides(self.base, {"min_price": 1, "max_price": 3, "trend_settings.Price >= 50-day SMA": True})
+        loose = apply_overrides(self.base, {"min_price": 0.5, "max_price": 2, "min_rs": 70})
+        union = union_settings([strict, loose])
+
+        self.assertEqual((union["min_price"], union["max_price"], union["min_rs"]), (0.5, 3, 70))
+        self.assertFalse(union["trend_settings"]["Price >= 50-day SMA"])
+        self.assertTrue(union["trend_settings"]["Price within 50% of 52-week High"])
+
+    def test_load_profiles(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "profiles.json")
+
+            with open(path, "w") as f:
+                json.dump({"profiles": {"default": {}}, "grid": {"min_volume": [1, 2]}}, f)
+
+            profiles = load_profiles(path, self.base)
+
+        self.assertEqual(list(profiles), ["default", "min_volume=1", "min_volume=2"])
+        self.assertEqual(profiles["min_volume=2"]["min_volume"], 2)
+
+
+class TestEvaluateProfiles(unittest.TestCase):
+    def test_matches_single_profile_filters(self):
+        relative_strengths = pd.DataFrame(
+            [rs_row("AAA", 2.0, 85), rs_row("BBB", 3.0, 95), rs_row("CCC", 1.0, 80), rs_row("DDD", 0.5, 70)]
+        )
+        table = MetricsTable()
+        sma = {"10-day SMA": 1.0, "20-day SMA": 1.0, "50-day SMA": 1.8, "200-day SMA": 1.0}
+
+        for symbol, volume in [("AAA", 50000), ("BBB", 20000), ("CCC", 5000), ("DDD", 90000)]:
+            table.record("liquidity", symbol, liquidity_metrics(volume))
+            table.record("trend", symbol, trend_metrics(sma, 2.0))
+            table.record("revenue_growth", symbol, {"Revenue Growth % (most recent Q)": 25.0, "Foreign Stock": False})
+            table.record("institutional_accumulation", symbol, {"Inflows": 1.0, "Outflows": 2.0})
+
+        base = {**settings, "min_rs": 80}
+        profiles = {
+            "default": apply_overrides(base, {}),
+            "thin": apply_overrides(base, {"min_volume": 1000, "min_rs": 70}),
+            "above 50-day": apply_overrides(base, {"trend_settings.Price >= 50-day SMA": True}),
+            "fast growth": apply_overrides(base, {"min_growth_percent": 30}),
+        }
+        comparison, survivors = evaluate_profiles(relative_strengths, table.to_frame(), profiles)
+
+        for name, profile in profiles.items():
+            passed, _ = apply_filters(
+                relative_strengths[relative_strengths["RS"] >= profile["min_rs"]], table.to_frame(), profile
+            )
+            expected = passed["institutional_accumulation"]["Symbol"].tolist()
+
+            self.assertEqual(comparison.loc[name, "Institutional Accumulation"], len(expected))
+            self.assertEqual(comparison.loc[name, "Survivors"], ", ".join(expected))
+
+        self.assertEqual(comparison.loc["thin", "Survivors"], "AAA, BBB, CCC")
+        self.assertEqual(comparison.loc["above 50-day", "Survivors"], "AAA, BBB")
+        self.assertEqual(comparison.loc["fast growth", "Survivors"], "BBB")
+        self.assertEqual(comparison.loc["default", "Under Accumulation"], 0)
+        self.assertEqual(list(survivors.index), ["AAA", "BBB", "CCC"])
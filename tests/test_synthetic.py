@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+import requests
+import numpy as np
+import pandas as pd
+from growth_stock_screener.screen.iterations.utils import *
+from growth_stock_screener.screen.iterations.utils.replay import ReplayElement
+
+
+class TestSyntheticUniverse(unittest.TestCase):
+    def setUp(self):
+        self.universe = SyntheticUniverse(400, seed=1, young_rate=0.2, unresolved_rate=0.05, page_bytes=5000)
+
+    def test_universes_are_reproducible(self):
+        close, volume = self.universe.price_history()
+        other_close, other_volume = SyntheticUniverse(400, seed=1, young_rate=0.2, unresolved_rate=0.05).price_history()
+
+        pd.testing.assert_frame_equal(close, other_close)
+        pd.testing.assert_frame_equal(volume, other_volume)
+        self.assertEqual(self.universe.symbols[:3], ["AAAA", "AAAB", "AAAC"])
+        self.assertEqual(len(set(self.universe.symbols)), 400)
+
+    def test_histories_start_at_ipos_and_unresolved_symbols_have_no_data(self):
+        close, _ = self.universe.price_history()
+        trading_days = close.notna().sum().to_numpy()
+
+        self.assertTrue((trading_days[self.universe.unresolved] == 0).all())
+        young = (self.universe.ipo_day > 0) & ~self.universe.unresolved
+        self.assertTrue(young.any())
+        self.assertTrue((trading_days[young] <= self.universe.days - self.universe.ipo_day[young]).all())
+
+    def test_pages_hold_values_at_scraped_locations(self):
+        symbol = self.universe.symbols[7]
+        i = self.universe.index[symbol]
+
+        volume = extract_float(extract_element(volume_xpath, self.universe.barchart_page(symbol)))
+        high_52_week = extract_float(extract_element(high_52_week_xpath, self.universe.cnbc_page(symbol)))
+        sma_50 = extract_float(ReplayElement(self.universe.tradingview_elements(symbol)[f"xpath={sma_50_xpath}"]))
+
+        self.assertEqual(volume, round(self.universe.average_volume[i]))
+        self.assertAlmostEqual(high_52_week, self.universe.high_52_week[i], places=2)
+        self.assertAlmostEqual(sma_50, self.universe.sma[50][i], places=4)
+        self.assertGreaterEqual(len(self.universe.barchart_page(symbol)), 4900)
+
+    def test_company_facts_yield_comparison_revenues(self):
+        domestic = self.universe.symbols[int(np.flatnonzero(~self.universe.foreign)[0])]
+        foreign = self.universe.symbols[int(np.flatnonzero(self.universe.foreign)[0])]
+
+        revenues = extract_comparison_revenues(
+            revenues_from_company_facts(domestic, self.universe.company_facts(domestic)["facts"]["us-gaap"])
+        )
+        self.assertEqual(set(revenues), {"Q1", "Q2"})
+        self.assertAlmostEqual(revenues["Q2"]["Growth"], 100 * self.universe.revenue_growth[self.universe.index[domestic]], places=2)
+
+        foreign_df = revenues_from_company_facts(foreign, self.universe.company_facts(foreign)["facts"]["us-gaap"])
+        self.assertEqual(extract_comparison_revenues(foreign_df), {"Foreign Stock": {}})
+
+    def test_archive_replays_nasdaq_listings(self):
+        with tempfile.TemporaryDirectory() as directory:
+            SyntheticUniverse(20, page_bytes=0).write_archive(directory)
+            start_replay(directory)
+
+            try:
+                url = "https://api.nasdaq.com/api/screener/stocks?tableonly=true&limit=25&offset=0&download=true"
+                rows = requests.get(url).json()["data"]["rows"]
+            finally:
+                stop_replay()
+
+        self.assertEqual([row["symbol"] for row in rows][:2], ["AAAA", "AAAB"])
+
+
+class TestScaling(unittest.TestCase):
+    def setUp(self):
+        self.entries = dict(negative_cache.entries)
+        self.changed = set(negative_cache.changed)
+
+    def tearDown(self):
+        negative_cache.entries = self.entries
+        negative_cache.changed = self.changed
+
+    def test_stages_run_against_synthetic_universe(self):
+        cwd = os.getcwd()
+        results = measure_stages(SyntheticUniverse(300, page_bytes=2000), memory=True)
+
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(list(results), ["Relative Strength", "Liquidity", "Trend", "Revenue Growth", "Report"])
+        self.assertGreater(results["Relative Strength"]["Symbols"], 0)
+        self.assertGreater(results["Relative Strength"]["Peak Bytes"], 0)
+
+        counts = [result["Symbols"] for result in results.values()]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+    def test_scaling_exponents_flag_superlinear_stages(self):
+        sizes = np.array([1000, 10000, 100000])
+        measurements = pd.DataFrame(
+            {
+                "Size": np.concatenate([sizes, sizes]),
+                "Stage": ["Linear"] * 3 + ["Quadratic"] * 3,
+                "Seconds": np.concatenate([sizes * 1e-4, (sizes / 1000.0) ** 2]),
+                "Peak MB": np.concatenate([sizes * 1e-3, sizes * 1e-3]),
+            }
+        )
+        exponents = scaling_exponents(measurements)
+
+        self.assertAlmostEqual(exponents.loc["Linear", "Time Exponent"], 1)
+        self.assertAlmostEqual(exponents.loc["Quadratic", "Time Exponent"], 2)
+        self.assertEqual(exponents["Superlinear"].tolist(), [False, True])
@@ -0,0 +1,118 @@
+import json
+import asyncio
+import tempfile
+import threading
+import unittest
+from growth_stock_screener.screen.iterations.utils import *
+
+
+@traced("parse", "parse")
+def parse(value):
+    return int(value)
+
+
+@traced("fetch", "fetch")
+async def fetch(value):
+    await asyncio.sleep(0.01)
+    return parse(value)
+
+
+class TestTracing(unittest.TestCase):
+    def spans(self, tracer):
+        return {event["name"]: event for event in tracer.events}
+
+    def test_nested_spans(self):
+        tracer = Tracer(enabled=True)
+
+        with tracer.span("Trend", "stage"):
+            with tracer.span("AAA", "symbol", stage="trend") as attributes:
+                with tracer.span("tradingview page load", "fetch"):
+                    pass
+
+                attributes["outcome"] = "passed"
+
+        spans = self.spans(tracer)
+        self.assertEqual(spans["AAA"]["args"], {"stage": "trend", "parent": "Trend", "outcome": "passed"})
+        self.assertEqual(spans["tradingview page load"]["args"]["parent"], "AAA")
+        self.assertEqual(len({event["tid"] for event in tracer.events}), 1)
+
+        # children lie within their parents
+        for child, parent in [("AAA", "Trend"), ("tradingview page load", "AAA")]:
+            self.assertGreaterEqual(spans[child]["ts"], spans[parent]["ts"])
+            self.assertLessEqual(
+                spans[child]["ts"] + spans[child]["dur"], spans[parent]["ts"] + spans[parent]["dur"]
+            )
+
+    def test_errors_are_recorded(self):
+        tracer = Tracer(enabled=True)
+
+        with self.assertRaises(ValueError):
+            with tracer.span("AAA", "symbol"):
+                raise ValueError("no data")
+
+        self.assertEqual(tracer.events[0]["args"]["error"], "ValueError: no data")
+
+    def test_concurrent_tasks_get_their_own_tracks(self):
+        async def screen(symbol):
+            with trace_span(symbol, "symbol"):
+                return await fetch("1")
+
+        async def main():
+            with trace_span("Liquidity", "stage"):
+                return await asyncio.gather(*[screen(symbol) for symbol in ["AAA", "BBB", "CCC"]])
+
+        tracer.events = []
+        self.assertEqual(asyncio.run(main()), [1, 1, 1])
+
+        symbols = [event for event in tracer.events if event["cat"] == "symbol"]
+        self.assertEqual(len({event["tid"] for event in symbols}), 3)
+
+        # each fetch (and the parse it calls) is drawn on its symbol's track
+        for event in tracer.events:
+            if event["cat"] in ["fetch", "parse"]:
+                self.assertIn(event["tid"], {symbol["tid"] for symbol in symbols})
+
+        # tracks are reused by later tasks
+        tracer.events = []
+        asyncio.run(main())
+        self.assertEqual(len({event["tid"] for event in tracer.events}), 4)
+
+    def test_threads_get_their_own_tracks(self):
+        tracer = Tracer(enabled=True)
+
+        def screen(symbol):
+            with tracer.span(symbol, "symbol"):
+                pass
+
+        threads = [threading.Thread(target=screen, args=(symbol,), name=symbol) for symbol in ["AAA", "BBB"]]
+
+        for thread in threads:
+            thread.start()
+            thread.join()
+
+        trace = tracer.to_dict()
+        names = {event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"}
+        self.assertEqual(names, {"AAA", "BBB"})
+
+    def test_save(self):
+        tracer = Tracer(enabled=True)
+
+        for symbol, seconds in [("AAA", 0.02), ("BBB", 0.0)]:
+            with tracer.span(symbol, "symbol"):
+                threading.Event().wait(seconds)
+
+        self.assertEqual([event["name"] for event in tracer.slowest("symbol")], ["AAA", "BBB"])
+
+        with tempfile.TemporaryDirectory() as directory:
+            with open(tracer.save(directory), "r") as f:
+                trace = json.load(f)
+
+        self.assertEqual([event["ph"] for event in trace["traceEvents"]], ["M", "X", "X"])
+
+    def test_disabled_tracer(self):
+        tracer = Tracer(enabled=False)
+
+        with tracer.span("AAA", "symbol") as attributes:
+            attributes["outcome"] = "passed"
+
+        self.assertEqual(tracer.events, [])